@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Durable deploy job queue for the IaC Runner webhook server.
+
+Jobs live in one SQLite file on the /workspace volume, so accepted pushes and
+deploys survive a container restart: ``resume`` puts jobs that were running
+when the process died back in the queue. Pushes for an env coalesce while they
+wait: a push that lands behind another still-queued push for the same env
+folds into it (newest ref, union of services), so a burst of merges costs one
+sync instead of one per merge.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ALL_SERVICES = "__all__"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    env TEXT NOT NULL,
+    ref TEXT,
+    services TEXT,
+    triggered_by TEXT NOT NULL,
+    state TEXT NOT NULL,
+    coalesced INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    response TEXT
+)
+"""
+_COLUMNS = (
+    "id, kind, env, ref, services, triggered_by, state, coalesced, "
+    "enqueued_at, started_at, finished_at, response"
+)
+
+
+@dataclass(frozen=True)
+class Job:
+    id: int
+    kind: str  # "push" (webhook/legacy sync) or "deploy" (/deploy)
+    env: str
+    ref: str | None
+    services: list[str] | None  # None: the deploy's all-services operation
+    triggered_by: str
+    state: str  # queued | running | done
+    coalesced: int  # pushes folded into this one
+    enqueued_at: float
+    started_at: float | None
+    finished_at: float | None
+    response: dict | None
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "Job":
+        services = json.loads(row[4]) if row[4] is not None else None
+        response = json.loads(row[11]) if row[11] is not None else None
+        return cls(*row[:4], services, *row[5:11], response)
+
+
+def merge_services(current: list[str], incoming: list[str]) -> list[str]:
+    """Union of two push service sets; ``__all__`` absorbs everything."""
+    merged = set(current) | set(incoming)
+    return [ALL_SERVICES] if ALL_SERVICES in merged else sorted(merged)
+
+
+class JobQueue:
+    """SQLite-backed FIFO of deploy jobs, one lane per env.
+
+    A single connection serialized by a lock: the webhook server is one
+    process, so this is enough and keeps SQLite's own locking out of the way.
+    ``":memory:"`` gives a non-durable queue with the same behaviour.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            if self.path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _job(self, job_id: int) -> Job:
+        row = self._db.execute(
+            f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return Job.from_row(row)
+
+    def enqueue_push(
+        self,
+        env: str,
+        ref: str | None,
+        services: list[str],
+        triggered_by: str = "push",
+    ) -> tuple[Job, bool]:
+        """Queue a push sync, coalescing into the env's last job if it is a
+        push that has not started. Returns the job and whether it coalesced."""
+        now = time.time()
+        with self._lock, self._db:
+            last = self._db.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE env = ? AND state = 'queued' "
+                "ORDER BY id DESC LIMIT 1",
+                (env,),
+            ).fetchone()
+            if last is not None and last[1] == "push":
+                job = Job.from_row(last)
+                merged = merge_services(job.services or [], services)
+                self._db.execute(
+                    "UPDATE jobs SET ref = ?, services = ?, triggered_by = ?, "
+                    "coalesced = coalesced + 1 WHERE id = ?",
+                    (ref, json.dumps(merged), triggered_by, job.id),
+                )
+                return self._job(job.id), True
+            cursor = self._db.execute(
+                "INSERT INTO jobs (kind, env, ref, services, triggered_by, state, "
+                "enqueued_at) VALUES ('push', ?, ?, ?, ?, 'queued', ?)",
+                (env, ref, json.dumps(merge_services([], services)), triggered_by, now),
+            )
+            return self._job(cursor.lastrowid), False
+
+    def enqueue_deploy(
+        self,
+        env: str,
+        ref: str,
+        services: list[str] | None,
+        triggered_by: str,
+    ) -> Job:
+        """Queue an explicit /deploy. Never coalesced: callers poll its exact
+        env/ref/services result."""
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO jobs (kind, env, ref, services, triggered_by, state, "
+                "enqueued_at) VALUES ('deploy', ?, ?, ?, ?, 'queued', ?)",
+                (
+                    env,
+                    ref,
+                    json.dumps(services) if services is not None else None,
+                    triggered_by,
+                    time.time(),
+                ),
+            )
+            return self._job(cursor.lastrowid)
+
+    def claim(self, env: str) -> Job | None:
+        """Mark the env's oldest queued job running and return it."""
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT id FROM jobs WHERE env = ? AND state = 'queued' "
+                "ORDER BY id LIMIT 1",
+                (env,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET state = 'running', started_at = ? WHERE id = ?",
+                (time.time(), row[0]),
+            )
+            return self._job(row[0])
+
+    def finish(self, job_id: int, response: dict | None = None) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET state = 'done', finished_at = ?, response = ? "
+                "WHERE id = ?",
+                (
+                    time.time(),
+                    json.dumps(response) if response is not None else None,
+                    job_id,
+                ),
+            )
+
+    def resume(self) -> list[Job]:
+        """Requeue jobs a previous process left running; return every queued job.
+
+        A requeued job reruns from the start; syncs are idempotent through
+        the Deployer config-hash gate.
+        """
+        with self._lock, self._db:
+            requeued = self._db.execute(
+                "UPDATE jobs SET state = 'queued', started_at = NULL "
+                "WHERE state = 'running'"
+            ).rowcount
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE state = 'queued' ORDER BY id"
+            ).fetchall()
+        if requeued:
+            logger.warning("Requeued %d job(s) interrupted by a restart", requeued)
+        return [Job.from_row(row) for row in rows]
+
+    def finished_since(self, since: float) -> list[Job]:
+        """Deploy jobs finished at or after ``since`` (wall clock)."""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE kind = 'deploy' "
+                "AND state = 'done' AND finished_at >= ? ORDER BY id",
+                (since,),
+            ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def prune(self, before: float) -> int:
+        """Delete finished jobs older than ``before``; returns how many."""
+        with self._lock, self._db:
+            return self._db.execute(
+                "DELETE FROM jobs WHERE state = 'done' AND finished_at < ?", (before,)
+            ).rowcount
+
+    def stats(self) -> dict:
+        """Queue depth and wait times for /health."""
+        now = time.time()
+        with self._lock:
+            queued = self._db.execute(
+                "SELECT env, COUNT(*), MIN(enqueued_at) FROM jobs "
+                "WHERE state = 'queued' GROUP BY env"
+            ).fetchall()
+            running = self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = 'running'"
+            ).fetchone()[0]
+            last = self._db.execute(
+                "SELECT started_at - enqueued_at FROM jobs "
+                "WHERE started_at IS NOT NULL ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+        oldest = min((row[2] for row in queued), default=None)
+        return {
+            "depth": sum(row[1] for row in queued),
+            "depth_by_env": {row[0]: row[1] for row in queued},
+            "running": running,
+            "oldest_wait_seconds": round(now - oldest, 3) if oldest else 0.0,
+            "last_wait_seconds": round(last[0], 3) if last else None,
+            "durable": self.path != ":memory:",
+        }
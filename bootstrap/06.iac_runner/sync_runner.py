@@ -3,6 +3,7 @@
 Sync Runner - executes invoke sync tasks for changed services.
 """
 
+import atexit
 import fcntl
 import json
 import logging
@@ -10,11 +11,19 @@ import os
 import re
 import subprocess
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
+from typing import Callable
 from urllib.parse import urlparse
 
+if str(Path(__file__).resolve().parent) not in sys.path:
+    sys.path.append(str(Path(__file__).resolve().parent))
+
+from worker_pool import WorkerPool, WorkerPoolError  # noqa: E402
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
 )
@@ -25,6 +34,17 @@ GIT_REPO_URL = os.environ["GIT_REPO_URL"]
 GIT_BRANCH = os.environ.get("GIT_BRANCH", "main")
 DEPLOY_TIMEOUT = int(os.environ.get("DEPLOY_TIMEOUT", "600"))
 MAX_RESULT_OUTPUT_CHARS = int(os.environ.get("MAX_RESULT_OUTPUT_CHARS", "4000"))
+# Independent services sync concurrently; 1 restores the old strictly serial run.
+SYNC_MAX_WORKERS = int(os.environ.get("SYNC_MAX_WORKERS", "4"))
+# One planner process decides which services need a deploy before any sync task
+# is spawned; 0 spawns every selected service's sync as before.
+SYNC_PLANNER = os.environ.get("SYNC_PLANNER", "1") != "0"
+SYNC_PLANNER_TIMEOUT = int(os.environ.get("SYNC_PLANNER_TIMEOUT", "300"))
+SYNC_SELECTION_TIMEOUT = int(os.environ.get("SYNC_SELECTION_TIMEOUT", "120"))
+# Sync tasks fork from a warm per-env worker that has the checkout's libs
+# imported; 0 starts a cold interpreter per task as before.
+SYNC_WORKER_POOL = os.environ.get("SYNC_WORKER_POOL", "1") != "0"
+WORKER_START_TIMEOUT = int(os.environ.get("WORKER_START_TIMEOUT", "120"))
 EXACT_COMMIT_RE = re.compile(r"^[0-9a-fA-F]{40}$")
 
 REPO_NAME = Path(urlparse(GIT_REPO_URL).path).stem
@@ -33,17 +53,34 @@ REPO_NAME = Path(urlparse(GIT_REPO_URL).path).stem
 # `libs/` is NOT importable from /app. The dependency matcher + manifest live in
 # the checked-out repo; put it on the path so the lazy
 # `from libs.deploy_dependencies import ...` calls resolve (after update_repo()).
+# A sync never relies on these: it asks its env worktree (inspect_checkout).
 _CHECKOUT_PATH = str(WORKSPACE / REPO_NAME)
 if _CHECKOUT_PATH not in sys.path:
     sys.path.insert(0, _CHECKOUT_PATH)
 
 WORKSPACE_LOCK_FILE = Path("/tmp/workspace.lock")
 DEPLOYMENT_LOCK_FILE = Path("/tmp/deployment.lock")
+# Each deploy env gets its own worktree of the shared clone under here.
+WORKTREE_ROOT = WORKSPACE / "worktrees"
+# An env worktree unused for this long (e.g. a retired env) is removed.
+WORKTREE_MAX_AGE_SECONDS = int(
+    os.environ.get("WORKTREE_MAX_AGE_SECONDS", str(7 * 24 * 3600))
+)
 INVOKE_BOOTSTRAP = (
     "import platform, runpy, sys; "
     "sys.path.insert(0, '.'); "
     "runpy.run_module('invoke', run_name='__main__')"
 )
+PLANNER_BOOTSTRAP = (
+    "import platform, runpy, sys; "
+    "sys.path.insert(0, '.'); "
+    "runpy.run_module('libs.deploy.sync_planner', run_name='__main__')"
+)
+SELECTION_BOOTSTRAP = (
+    "import platform, runpy, sys; "
+    "sys.path.insert(0, '.'); "
+    "runpy.run_module('libs.deploy.sync_selection', run_name='__main__')"
+)
 
 # The bootstrap/* layer has no deploy.py (it's not a deploy.py-driven service), so its
 # explicit "no sync task" entries are stated here; everything else is DERIVED.
@@ -52,25 +89,35 @@ _BOOTSTRAP_TASKS = {
     "bootstrap/1password": None,
     "bootstrap/iac-runner": None,
 }
+# App layers deploy after the platform services selected in the same sync.
+_APP_LAYERS = ("finance_report", "truealpha")
+DEPENDENCY_FAILED_MARKER = "Not run: prerequisite"
 
 
-def _service_task_map() -> dict[str, "str | None"]:
+def _service_task_map(
+    discovered: dict[str, str] | None = None,
+) -> dict[str, "str | None"]:
     """service_id -> invoke sync task, DERIVED from libs.deploy.deployer.discover_services (the single
     source) instead of a hand-maintained parallel list (Infra-013, same as deploy_contract).
 
-    Lazy import: in the iac-runner image `libs/` is on sys.path only AFTER update_repo() checks
-    the repo out, and every caller runs post-checkout, so this resolves at call time.
+    ``discovered`` is that map as computed in the env worktree (inspect_checkout); a sync
+    always passes it. Without it the runner's own checkout answers — lazy import: in the
+    iac-runner image `libs/` is on sys.path only AFTER update_repo() checks the repo out.
     """
-    from libs.deploy.deployer import discover_services
+    if discovered is None:
+        from libs.deploy.deployer import discover_services
 
-    return {**discover_services(), **_BOOTSTRAP_TASKS}
+        discovered = discover_services()
+    return {**discovered, **_BOOTSTRAP_TASKS}
 
 
-def _all_services() -> list[str]:
+def _all_services(discovered: dict[str, str] | None = None) -> list[str]:
     """Every deployable service_id (= libs.deploy.deployer.discover_services keys), sorted."""
-    from libs.deploy.deployer import discover_services
+    if discovered is None:
+        from libs.deploy.deployer import discover_services
 
-    return sorted(discover_services())
+        discovered = discover_services()
+    return sorted(discovered)
 
 
 def _tail_text(value: str, limit: int = MAX_RESULT_OUTPUT_CHARS) -> str:
@@ -178,6 +225,13 @@ def diagnose_failure(stderr: str, stdout: str = "") -> dict[str, str]:
             ),
         }
 
+    if DEPENDENCY_FAILED_MARKER in combined:
+        return {
+            "error_kind": "dependency_failed",
+            "summary": _first_matching_line(combined, (DEPENDENCY_FAILED_MARKER,)),
+            "next_action": "Fix the failed prerequisite service first; this service was not attempted.",
+        }
+
     if "Timeout after" in combined:
         return {
             "error_kind": "invoke_timeout",
@@ -211,6 +265,8 @@ class ServiceSyncResult:
     skipped: bool = False
     stdout: str = ""
     stderr: str = ""
+    # Request -> task start; only measured for tasks forked from a warm worker.
+    startup_seconds: float | None = None
 
     def to_dict(self) -> dict:
         data = asdict(self)
@@ -364,53 +420,183 @@ def resolve_checkout_ref(repo_path: Path, target_ref: str) -> str | None:
     return None
 
 
-def update_repo(ref: str | None = None) -> bool:
-    """Clone or update the repo to a specific ref (branch/tag/commit)."""
-    repo_path = WORKSPACE / REPO_NAME
-    target_ref = ref if ref is not None else GIT_BRANCH
+def _git_succeeds(args: list[str], repo_path: Path) -> bool:
+    """Run a git command whose failure is an expected answer, not an error."""
+    result = subprocess.run(
+        ["git"] + args,
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    return result.returncode == 0
 
-    with file_lock(WORKSPACE_LOCK_FILE, "workspace"):
-        if not repo_path.exists():
-            logger.info(f"Cloning {GIT_REPO_URL} to {repo_path}")
-            result = subprocess.run(
-                ["git", "clone", GIT_REPO_URL, str(repo_path)],
-                capture_output=True,
-                text=True,
-                timeout=300,
-            )
-            if result.returncode != 0:
-                logger.error(f"Clone failed: {result.stderr}")
-                return False
 
-        logger.info(f"Checking out {target_ref}")
+def fetch_ref(repo_path: Path, target_ref: str) -> bool:
+    """Fetch only what ``target_ref`` needs, falling back to a full fetch.
+
+    An exact commit already in the object store, or a tag that is (and is not
+    also a remote branch), needs no fetch: release tags are immutable and the
+    full ``fetch --tags`` never moved an existing tag either. Otherwise the
+    single commit, or the single branch/tag of that name, is fetched.
+    """
+    if EXACT_COMMIT_RE.fullmatch(target_ref):
+        if _git_succeeds(["cat-file", "-e", f"{target_ref}^{{commit}}"], repo_path):
+            return True
+        refspecs = [target_ref]
+    elif not _git_succeeds(
+        ["rev-parse", "--verify", "--quiet", f"refs/remotes/origin/{target_ref}"],
+        repo_path,
+    ) and _git_succeeds(
+        ["rev-parse", "--verify", "--quiet", f"refs/tags/{target_ref}^{{commit}}"],
+        repo_path,
+    ):
+        return True
+    else:
+        refspecs = [
+            f"+refs/heads/{target_ref}:refs/remotes/origin/{target_ref}",
+            f"refs/tags/{target_ref}:refs/tags/{target_ref}",
+        ]
+    for refspec in refspecs:
+        if _git_succeeds(["fetch", "--no-tags", "origin", refspec], repo_path):
+            return True
+    logger.warning("Targeted fetch of %s failed; fetching all refs", target_ref)
+    return run_git_command(["fetch", "--tags", "--prune", "origin"], repo_path, "fetch")
 
-        if not run_git_command(["reset", "--hard", "HEAD"], repo_path, "reset"):
-            return False
 
-        if not run_git_command(["clean", "-fd"], repo_path, "clean"):
-            return False
+def worktree_path(deploy_env: str) -> Path:
+    """The worktree ``deploy_env`` deploys from (one per normalized env name)."""
+    env_name = deploy_env_overrides(deploy_env)["DEPLOY_ENV"]
+    return WORKTREE_ROOT / f"{REPO_NAME}-{env_name}"
 
-        if not run_git_command(
-            ["fetch", "--tags", "--prune", "origin"], repo_path, "fetch"
-        ):
-            return False
 
-        checkout_ref = resolve_checkout_ref(repo_path, target_ref)
-        if not checkout_ref:
-            logger.error("Unable to resolve deploy ref to a commit: %s", target_ref)
-            return False
+def deployment_lock_file(deploy_env: str) -> Path:
+    """Per-env deployment lock: different envs deploy concurrently."""
+    env_name = deploy_env_overrides(deploy_env)["DEPLOY_ENV"]
+    return DEPLOYMENT_LOCK_FILE.with_name(f"deployment-{env_name}.lock")
 
-        if not run_git_command(
-            ["checkout", "--detach", checkout_ref], repo_path, "checkout"
-        ):
-            return False
 
-        if not run_git_command(
-            ["reset", "--hard", checkout_ref], repo_path, "reset to target"
+def prune_stale_worktrees(repo_path: Path, keep: Path) -> list[Path]:
+    """Remove env worktrees unused for ``WORKTREE_MAX_AGE_SECONDS`` and git's
+    records of worktrees whose directory is gone. Returns the removed paths."""
+    removed: list[Path] = []
+    cutoff = time.time() - WORKTREE_MAX_AGE_SECONDS
+    if WORKTREE_ROOT.is_dir():
+        for path in sorted(WORKTREE_ROOT.iterdir()):
+            if path == keep or not path.is_dir() or path.stat().st_mtime >= cutoff:
+                continue
+            logger.info("Removing stale worktree %s", path)
+            if run_git_command(
+                ["worktree", "remove", "--force", str(path)],
+                repo_path,
+                "worktree remove",
+            ):
+                removed.append(path)
+    run_git_command(["worktree", "prune"], repo_path, "worktree prune")
+    return removed
+
+
+def _worktree_is_clean(tree_path: Path) -> bool:
+    result = subprocess.run(
+        ["git", "status", "--porcelain"],
+        cwd=tree_path,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    return result.returncode == 0 and not result.stdout.strip()
+
+
+def update_repo(ref: str | None = None, deploy_env: str = "staging") -> bool:
+    """Bring ``deploy_env``'s worktree to a specific ref (branch/tag/commit).
+
+    Every env deploys from its own worktree (:func:`worktree_path`) of one
+    shared clone, so envs share the object store but not a working tree. The
+    clone is locked only while fetching and adding/pruning worktrees; the
+    env's own tree is switched under its own lock. A worktree already at the
+    resolved commit with no local changes is left untouched.
+    """
+    repo_path = WORKSPACE / REPO_NAME
+    tree_path = worktree_path(deploy_env)
+    target_ref = ref if ref is not None else GIT_BRANCH
+    env_lock = WORKSPACE_LOCK_FILE.with_name(f"workspace-{tree_path.name}.lock")
+
+    with file_lock(env_lock, f"{tree_path.name} worktree"):
+        with file_lock(WORKSPACE_LOCK_FILE, "workspace"):
+            if not repo_path.exists():
+                logger.info(f"Cloning {GIT_REPO_URL} to {repo_path}")
+                result = subprocess.run(
+                    ["git", "clone", GIT_REPO_URL, str(repo_path)],
+                    capture_output=True,
+                    text=True,
+                    timeout=300,
+                )
+                if result.returncode != 0:
+                    logger.error(f"Clone failed: {result.stderr}")
+                    return False
+
+            logger.info(f"Fetching {target_ref}")
+            if not fetch_ref(repo_path, target_ref):
+                return False
+
+            checkout_ref = resolve_checkout_ref(repo_path, target_ref)
+            if not checkout_ref:
+                logger.error("Unable to resolve deploy ref to a commit: %s", target_ref)
+                return False
+
+            # The runner process imports libs/ and discovers services from the
+            # clone's own checkout (sys.path above). Move it to newly deployed
+            # commits, but not back to an older one (prod trailing staging), so
+            # alternating envs does not thrash it. Deploys run in worktrees, so
+            # this never changes files under a running deploy.
+            head = resolve_checkout_head(repo_path)
+            if head != checkout_ref.lower() and not (
+                head
+                and _git_succeeds(
+                    ["merge-base", "--is-ancestor", checkout_ref, head], repo_path
+                )
+            ):
+                if not run_git_command(
+                    ["checkout", "--detach", "--force", checkout_ref],
+                    repo_path,
+                    "checkout",
+                ):
+                    return False
+
+            prune_stale_worktrees(repo_path, keep=tree_path)
+            if not (tree_path / ".git").exists():
+                tree_path.parent.mkdir(parents=True, exist_ok=True)
+                logger.info("Adding worktree %s", tree_path)
+                add = ["worktree", "add", "--detach", "--force", str(tree_path)]
+                if not run_git_command(
+                    [*add, checkout_ref],
+                    repo_path,
+                    "worktree add",
+                ):
+                    return False
+
+        if resolve_checkout_head(tree_path) == checkout_ref.lower() and (
+            _worktree_is_clean(tree_path)
         ):
-            return False
+            logger.info("Worktree %s already at %s", tree_path.name, checkout_ref[:12])
+        else:
+            if not run_git_command(
+                ["checkout", "--detach", "--force", checkout_ref],
+                tree_path,
+                "checkout",
+            ):
+                return False
+            if not run_git_command(["clean", "-fd"], tree_path, "clean"):
+                return False
+        # The mtime marks the worktree as in use for prune_stale_worktrees.
+        os.utime(tree_path)
 
-        logger.info("Repo checked out to %s (%s)", target_ref, checkout_ref[:12])
+        logger.info(
+            "Worktree %s checked out to %s (%s)",
+            tree_path.name,
+            target_ref,
+            checkout_ref[:12],
+        )
         return True
 
 
@@ -547,6 +733,43 @@ def safe_invoke_env_summary(env: dict[str, str]) -> str:
     return " ".join(parts)
 
 
+def invoke_child_env(deploy_env: str, deploy_ref: str | None = None) -> dict[str, str]:
+    """Environment for a child running repo code for ``deploy_env``: env isolation,
+    the exact deploy ref and a resolved Vault token."""
+    env_vars = {
+        **os.environ,
+        **deploy_env_overrides(deploy_env),
+    }
+    if deploy_ref:
+        if not EXACT_COMMIT_RE.fullmatch(deploy_ref):
+            raise ValueError("deploy_ref must be an exact 40-character commit SHA")
+        env_vars["IAC_DEPLOY_REF"] = deploy_ref.lower()
+    if vault_root_token := resolve_vault_root_token(env_vars):
+        env_vars["VAULT_ROOT_TOKEN"] = vault_root_token
+    return env_vars
+
+
+_worker_pool = WorkerPool()
+atexit.register(_worker_pool.close)
+
+
+def prewarm_worker(repo_path: Path, deploy_env: str, head: str) -> None:
+    """Start (or recycle) the env's warm worker for the checkout at ``head``.
+
+    The worker imports the checkout's libs in the background while the sync
+    plans; run_invoke_task then forks tasks from it. Best effort: without a
+    worker, tasks start cold interpreters.
+    """
+    if not SYNC_WORKER_POOL:
+        return
+    try:
+        _worker_pool.prewarm(
+            repo_path, head, {**os.environ, **deploy_env_overrides(deploy_env)}
+        )
+    except (OSError, ValueError) as exc:
+        logger.warning("Could not start warm worker (%s); tasks start cold", exc)
+
+
 def run_invoke_task(
     task_name: str,
     repo_path: Path,
@@ -558,18 +781,28 @@ def run_invoke_task(
         f"Running: invoke {task_name} (env={deploy_env}, timeout={DEPLOY_TIMEOUT}s)"
     )
 
-    env_vars = {
-        **os.environ,
-        **deploy_env_overrides(deploy_env),
-    }
-    if deploy_ref:
-        if not EXACT_COMMIT_RE.fullmatch(deploy_ref):
-            raise ValueError("deploy_ref must be an exact 40-character commit SHA")
-        env_vars["IAC_DEPLOY_REF"] = deploy_ref.lower()
-    if vault_root_token := resolve_vault_root_token(env_vars):
-        env_vars["VAULT_ROOT_TOKEN"] = vault_root_token
+    env_vars = invoke_child_env(deploy_env, deploy_ref)
     logger.info("Invoke child env: %s", safe_invoke_env_summary(env_vars))
 
+    worker = _worker_pool.get(repo_path, deploy_ref.lower() if deploy_ref else None)
+    if worker is not None:
+        try:
+            result = worker.run(
+                [task_name], env_vars, DEPLOY_TIMEOUT, WORKER_START_TIMEOUT
+            )
+        except WorkerPoolError as exc:
+            logger.warning("Warm worker unavailable (%s); starting a cold child", exc)
+        else:
+            if result["stderr"].startswith("Timeout after"):
+                logger.error(f"Task {task_name} timed out after {DEPLOY_TIMEOUT}s")
+            if result["startup_seconds"] is not None:
+                logger.info(
+                    "Task %s started in %.3fs (warm worker)",
+                    task_name,
+                    result["startup_seconds"],
+                )
+            return {"task": task_name, **result}
+
     try:
         result = subprocess.run(
             [sys.executable, "-P", "-c", INVOKE_BOOTSTRAP, task_name],
@@ -595,6 +828,109 @@ def run_invoke_task(
         }
 
 
+def plan_sync(
+    services: list[str], repo_path: Path, deploy_env: str, deploy_ref: str
+) -> dict[str, dict] | None:
+    """Ask libs.deploy.sync_planner, in ONE child process, which services need a deploy.
+
+    Returns ``{service: {"action": "deploy" | "skip", "reason": ...}}``, or None
+    when planning is disabled or fails; the caller then spawns every sync task,
+    whose own config-hash gate still decides.
+    """
+    if not SYNC_PLANNER or not services:
+        return None
+    started = time.monotonic()
+    try:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-P",
+                "-c",
+                PLANNER_BOOTSTRAP,
+                "--ref",
+                deploy_ref,
+                *services,
+            ],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            env=invoke_child_env(deploy_env, deploy_ref),
+            timeout=SYNC_PLANNER_TIMEOUT,
+        )
+    except (OSError, subprocess.SubprocessError, ValueError) as exc:
+        logger.warning("Sync planner unavailable (%s); running every sync task", exc)
+        return None
+    lines = result.stdout.strip().splitlines()
+    try:
+        if result.returncode != 0 or not lines:
+            raise ValueError(
+                f"exit {result.returncode}: {_tail_text(result.stderr, 500)}"
+            )
+        plan = json.loads(lines[-1])["services"]
+        if not isinstance(plan, dict):
+            raise TypeError("plan services is not an object")
+    except (ValueError, KeyError, TypeError) as exc:
+        logger.warning("Sync planner failed (%s); running every sync task", exc)
+        return None
+    to_deploy = sorted(s for s, entry in plan.items() if entry.get("action") != "skip")
+    logger.info(
+        "Sync plan in %.1fs: %d to deploy, %d no-op",
+        time.monotonic() - started,
+        len(to_deploy),
+        len(plan) - len(to_deploy),
+    )
+    for service in sorted(plan):
+        logger.info(
+            "Plan: %s -> %s (%s)",
+            service,
+            plan[service].get("action"),
+            plan[service].get("reason"),
+        )
+    return plan
+
+
+def inspect_checkout(
+    repo_path: Path,
+    deploy_env: str,
+    services: set[str],
+    changed_files: list[str] | None = None,
+) -> dict | None:
+    """Ask libs.deploy.sync_selection, in a child running in ``repo_path``, what
+    that checkout deploys.
+
+    Returns ``{"tasks", "fanout", "dependencies"}`` computed from the worktree's
+    own libs/ and manifest (each env deploys its own commit; the shared clone may
+    be at another one), or None when the child fails.
+    """
+    request = {"services": sorted(services), "changed_files": changed_files}
+    try:
+        result = subprocess.run(
+            [sys.executable, "-P", "-c", SELECTION_BOOTSTRAP],
+            cwd=repo_path,
+            input=json.dumps(request),
+            capture_output=True,
+            text=True,
+            env={**os.environ, **deploy_env_overrides(deploy_env)},
+            timeout=SYNC_SELECTION_TIMEOUT,
+        )
+    except (OSError, subprocess.SubprocessError) as exc:
+        logger.error("Service discovery unavailable in %s (%s)", repo_path, exc)
+        return None
+    lines = result.stdout.strip().splitlines()
+    try:
+        if result.returncode != 0 or not lines:
+            raise ValueError(
+                f"exit {result.returncode}: {_tail_text(result.stderr, 500)}"
+            )
+        checkout = json.loads(lines[-1])
+        if not isinstance(checkout.get("tasks"), dict):
+            raise TypeError("checkout tasks is not an object")
+    except (ValueError, AttributeError, TypeError) as exc:
+        logger.error("Service discovery failed in %s (%s)", repo_path, exc)
+        return None
+    return checkout
+
+
 def get_changed_services_from_files(changed_files: list[str]) -> set[str]:
     """Map changed files to affected services via the deploy dependency graph.
 
@@ -603,6 +939,9 @@ def get_changed_services_from_files(changed_files: list[str]) -> set[str]:
     tooling such as libs/ and tools/ fans out to NOTHING — this replaces the old
     `libs/ -> __all__` catch-all that redeployed every service on any
     shared-tooling change (the over-fan-out behind the recurring mass redeploys).
+
+    Answered by the runner's own checkout, for the webhook's push pre-selection;
+    a sync fans out in its env worktree (inspect_checkout).
     """
     try:
         from libs.deploy_dependencies import match_changed_services
@@ -631,49 +970,175 @@ def _own_dir_services(changed_files: list[str]) -> set[str]:
     return services
 
 
-def _log_fanout_decision(changed_files: list[str], services: set[str]) -> None:
+def _log_fanout_decision(changed_files: list[str], fanout: dict) -> None:
     """Log WHY each service was selected and which changed files fanned out to
     nothing, so a no-op deploy is debuggable (correctly-skipped vs under-deployed).
-    """
-    try:
-        from libs.deploy_dependencies import explain_fanout
 
-        decision = explain_fanout(changed_files)
-    except Exception as exc:  # logging is best-effort; never fail the sync
-        logger.warning("fan-out explain unavailable (%s)", exc)
-        return
+    ``fanout`` is the worktree's explain_fanout() as returned by inspect_checkout.
+    """
+    selected: dict[str, str] = fanout.get("selected") or {}
+    dropped: list[str] = fanout.get("dropped") or []
     logger.info(
         "Fan-out: %d changed file(s) -> %d service(s): %s",
         len(changed_files),
-        len(decision.selected),
-        services,
+        len(selected),
+        set(selected),
     )
-    for service, reason in sorted(decision.selected.items()):
+    for service, reason in sorted(selected.items()):
         logger.info("  selected %s: %s", service, reason)
-    if decision.dropped:
+    if dropped:
         # Expected for pure tooling/shared changes; surfaced so an UNEXPECTED
         # drop (a service that should have been baked in) is visible in the log.
         logger.info(
             "  %d changed file(s) fanned out to nothing (tooling/shared): %s",
-            len(decision.dropped),
-            ", ".join(sorted(decision.dropped)),
+            len(dropped),
+            ", ".join(sorted(dropped)),
         )
 
 
+def build_sync_graph(
+    services: set[str], declared: dict[str, list[str]] | None = None
+) -> dict[str, dict[str, bool]]:
+    """service -> {prerequisite: blocking} for one sync.
+
+    Declared manifest dependencies (libs.deploy_dependencies) are blocking: a
+    service is not attempted when a service whose files it bakes in failed.
+    "Platform before apps" is ordering only — an app still deploys after a failed
+    platform service, as it did in the serial loop — and is left out wherever it
+    would contradict a declared edge (alerting waits for the apps' deploy.py).
+    ``declared`` is the env worktree's view (inspect_checkout); edges to services
+    outside ``services`` are ignored.
+    """
+    graph: dict[str, dict[str, bool]] = {service: {} for service in services}
+    if declared is None:
+        try:
+            from libs.deploy_dependencies import declared_service_dependencies
+
+            declared = declared_service_dependencies(services)
+        except Exception as exc:  # checked-out libs/ not importable yet
+            logger.warning(
+                "deploy_dependencies unavailable (%s); layer ordering only", exc
+            )
+            declared = {}
+    for service, prerequisites in declared.items():
+        if service not in graph:
+            continue
+        for prerequisite in prerequisites:
+            if prerequisite in graph:
+                graph[service][prerequisite] = True
+
+    platform = sorted(
+        service for service in services if service.startswith("platform/")
+    )
+    for service in sorted(services):
+        if service.split("/", 1)[0] not in _APP_LAYERS:
+            continue
+        for prerequisite in platform:
+            if not _waits_for(graph, prerequisite, service):
+                graph[service].setdefault(prerequisite, False)
+    return graph
+
+
+def _waits_for(graph: dict[str, dict[str, bool]], service: str, target: str) -> bool:
+    """True when ``service`` transitively waits for ``target``."""
+    stack = [service]
+    seen: set[str] = set()
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        if node in seen:
+            continue
+        seen.add(node)
+        stack.extend(graph.get(node, {}))
+    return False
+
+
+def run_sync_graph(
+    graph: dict[str, dict[str, bool]],
+    task_map: dict[str, "str | None"],
+    run_service: Callable[[str], ServiceSyncResult],
+    on_result: Callable[[ServiceSyncResult], None],
+    max_workers: int = SYNC_MAX_WORKERS,
+) -> None:
+    """Run every service in ``graph`` with up to ``max_workers`` in flight.
+
+    A service starts once all its prerequisites finished. One whose blocking
+    prerequisite failed is reported failed without running, and that cascades
+    down its chain. ``on_result`` sees each result as it completes, on the
+    calling thread. A cyclic graph falls back to the old serial, unordered run.
+    """
+    if any(
+        _waits_for(graph, prerequisite, service)
+        for service, prerequisites in graph.items()
+        for prerequisite in prerequisites
+    ):
+        logger.error("Sync dependency graph has a cycle; running services serially")
+        graph = {service: {} for service in graph}
+        max_workers = 1
+    max_workers = max(1, max_workers)
+
+    pending = dict(graph)
+    outcome: dict[str, bool] = {}
+    running: dict = {}
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="sync"
+    ) as executor:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for service in sorted(pending):
+                    prerequisites = pending[service]
+                    failed = sorted(
+                        prerequisite
+                        for prerequisite, blocking in prerequisites.items()
+                        if blocking and outcome.get(prerequisite) is False
+                    )
+                    if failed:
+                        del pending[service]
+                        outcome[service] = False
+                        on_result(
+                            ServiceSyncResult(
+                                service=service,
+                                task=task_map.get(service),
+                                success=False,
+                                stderr=(
+                                    f"{DEPENDENCY_FAILED_MARKER} {', '.join(failed)} "
+                                    "failed in this sync"
+                                ),
+                            )
+                        )
+                        progressed = True
+                    elif len(running) < max_workers and all(
+                        prerequisite in outcome for prerequisite in prerequisites
+                    ):
+                        del pending[service]
+                        running[executor.submit(run_service, service)] = service
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                service = running.pop(future)
+                result = future.result()
+                outcome[service] = result.success
+                on_result(result)
+
+
 def sync_services(
     services: set[str], ref: str | None = None, deploy_env: str = "staging"
 ) -> SyncResult:
-    """Sync the specified services with deployment lock."""
+    """Sync the specified services under the env's deployment lock."""
     requested_services = sorted(services)
-    with file_lock(DEPLOYMENT_LOCK_FILE, "deployment"):
+    with file_lock(deployment_lock_file(deploy_env), f"{deploy_env} deployment"):
         logger.info(
             f"Starting sync for services: {services} (env={deploy_env}, ref={ref})"
         )
 
-        repo_path = WORKSPACE / REPO_NAME
+        repo_path = worktree_path(deploy_env)
         current_head = resolve_checkout_head(repo_path) if repo_path.exists() else None
 
-        if not update_repo(ref=ref):
+        if not update_repo(ref=ref, deploy_env=deploy_env):
             logger.error("Failed to update repo, aborting sync")
             return SyncResult(
                 env=deploy_env,
@@ -699,49 +1164,103 @@ def sync_services(
                     error="Checked-out HEAD does not match requested exact ref",
                 )
 
+        changed_files = None
+        if (
+            not services
+            and current_head
+            and resolved_head
+            and current_head != resolved_head
+        ):
+            # If services set is empty, determine changes dynamically via git diff
+            res_diff = subprocess.run(
+                ["git", "diff", "--name-only", current_head, resolved_head],
+                cwd=repo_path,
+                capture_output=True,
+                text=True,
+                timeout=120,
+            )
+            if res_diff.returncode == 0:
+                changed_files = res_diff.stdout.splitlines()
+
+        # Discovery, fan-out and deploy order come from the commit this env deploys.
+        checkout = inspect_checkout(repo_path, deploy_env, services, changed_files)
+        if checkout is None:
+            return SyncResult(
+                env=deploy_env,
+                ref=ref,
+                requested_services=requested_services,
+                error="Service discovery failed in the env worktree",
+            )
+
         if "__all__" in services:
-            services = set(_all_services())
+            services = set(_all_services(checkout["tasks"]))
             logger.info("Syncing all services due to libs/ change")
         elif not services:
-            # If services set is empty, determine changes dynamically via git diff
-            if current_head and resolved_head and current_head != resolved_head:
-                res_diff = subprocess.run(
-                    ["git", "diff", "--name-only", current_head, resolved_head],
-                    cwd=repo_path,
-                    capture_output=True,
-                    text=True,
-                    timeout=120,
-                )
-                if res_diff.returncode == 0:
-                    changed_files = res_diff.stdout.splitlines()
-                    services = get_changed_services_from_files(changed_files)
-                    _log_fanout_decision(changed_files, services)
-                    if "__all__" in services:
-                        services = set(_all_services())
+            if changed_files is not None and checkout.get("fanout") is not None:
+                services = set(checkout["fanout"].get("selected") or {})
+                _log_fanout_decision(changed_files, checkout["fanout"])
+                if "__all__" in services:
+                    services = set(_all_services(checkout["tasks"]))
 
             if not services:
                 # If still empty (fresh clone or no detected changes), fallback to all
-                services = set(_all_services())
+                services = set(_all_services(checkout["tasks"]))
                 logger.info("No changes detected or fresh clone; syncing all services")
 
-        results: list[ServiceSyncResult] = []
-        task_map = (
-            _service_task_map()
+        if resolved_head:
+            prewarm_worker(repo_path, deploy_env, resolved_head)
+        task_map = _service_task_map(
+            checkout["tasks"]
         )  # discovered once; reused for every service below
-        for service in sorted(services):
-            task_name = task_map.get(service)
+        plan = (
+            plan_sync(
+                sorted(service for service in services if task_map.get(service)),
+                repo_path,
+                deploy_env,
+                resolved_head,
+            )
+            if resolved_head
+            else None
+        ) or {}
+        graph = build_sync_graph(services, checkout.get("dependencies") or {})
+        # Services whose real sync task ran; a planned no-op that declares one of
+        # them as a (blocking) dependency still runs its own sync, since the plan
+        # predates that deploy.
+        ran: set[str] = set()
+        # Results stream in as services complete; re-sorted below for a stable payload.
+        sync_result = SyncResult(
+            env=deploy_env,
+            ref=ref,
+            requested_services=requested_services,
+        )
 
+        def run_service(service: str) -> ServiceSyncResult:
+            task_name = task_map.get(service)
             if task_name is None:
                 logger.info(f"Skipping {service} (no sync task configured)")
-                results.append(
-                    ServiceSyncResult(
-                        service=service,
-                        task=None,
-                        success=True,
-                        skipped=True,
-                    )
+                return ServiceSyncResult(
+                    service=service,
+                    task=None,
+                    success=True,
+                    skipped=True,
+                )
+
+            planned = plan.get(service) or {}
+            stale = any(
+                blocking and prerequisite in ran
+                for prerequisite, blocking in graph[service].items()
+            )
+            if planned.get("action") == "skip" and not stale:
+                logger.info(
+                    f"Skipping {service} (planned no-op: {planned.get('reason')})"
+                )
+                return ServiceSyncResult(
+                    service=service,
+                    task=task_name,
+                    success=True,
+                    skipped=True,
+                    stdout=f"Planned no-op: {planned.get('reason')}",
                 )
-                continue
 
             if resolved_head:
                 result = run_invoke_task(
@@ -749,15 +1268,21 @@ def sync_services(
                 )
             else:
                 result = run_invoke_task(task_name, repo_path, deploy_env)
-            service_result = ServiceSyncResult(
+            return ServiceSyncResult(
                 service=service,
                 task=task_name,
                 success=bool(result["success"]),
                 stdout=str(result.get("stdout", "")),
                 stderr=str(result.get("stderr", "")),
+                startup_seconds=result.get("startup_seconds"),
             )
-            results.append(service_result)
 
+        def record(service_result: ServiceSyncResult) -> None:
+            sync_result.results.append(service_result)
+            if service_result.skipped:
+                return
+            ran.add(service_result.service)
+            service = service_result.service
             if service_result.success:
                 logger.info(f"✅ {service}: sync completed")
             else:
@@ -768,19 +1293,17 @@ def sync_services(
                 logger.error(
                     "Diagnostic: service=%s task=%s kind=%s summary=%s next=%s",
                     service,
-                    task_name,
+                    service_result.task,
                     diagnostic["error_kind"],
                     diagnostic["summary"],
                     diagnostic["next_action"],
                 )
                 logger.error(_tail_text(service_result.stderr))
 
-        sync_result = SyncResult(
-            env=deploy_env,
-            ref=ref,
-            requested_services=requested_services,
-            results=results,
-        )
+        run_sync_graph(graph, task_map, run_service, record)
+        order = {service: index for index, service in enumerate(sorted(services))}
+        sync_result.results.sort(key=lambda result: order[result.service])
+
         logger.info(
             "Sync complete: "
             f"{sync_result.succeeded} succeeded, "
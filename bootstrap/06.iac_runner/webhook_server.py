@@ -3,6 +3,10 @@
 GitHub Webhook Server for IaC Runner
 
 Receives GitHub push events and triggers sync for changed services.
+
+Accepted pushes and async deploys go through the durable job queue
+(job_queue.py): one worker per env drains it, pending pushes for an env
+coalesce, and jobs interrupted by a restart resume on startup.
 """
 
 import hashlib
@@ -13,11 +17,19 @@ import os
 import re
 import shutil
 import subprocess
+import sys
 import threading
 import time
 from pathlib import Path
 from flask import Flask, request, jsonify
 
+# Sibling modules (job_queue, sync_runner) also resolve when this file is loaded
+# by path rather than run from /app.
+if str(Path(__file__).resolve().parent) not in sys.path:
+    sys.path.append(str(Path(__file__).resolve().parent))
+
+from job_queue import Job, JobQueue  # noqa: E402
+
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,6 +39,13 @@ WORKSPACE = Path("/workspace")
 GIT_REPO_URL = os.environ.get("GIT_REPO_URL")
 GIT_BRANCH = os.environ.get("GIT_BRANCH", "main")
 SECRETS_FILE = Path("/secrets/.env")
+# On the /workspace volume so queued and running jobs survive a restart.
+JOB_QUEUE_PATH = Path(
+    os.environ.get("JOB_QUEUE_PATH", "/workspace/.iac-runner-jobs.sqlite3")
+)
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+# Push-triggered syncs deploy here (sync_services' default env).
+PUSH_SYNC_ENV = "staging"
 RECENT_DEPLOY_TTL_SECONDS = int(os.environ.get("RECENT_DEPLOY_TTL_SECONDS", "600"))
 SIGNATURE_TTL_SECONDS = int(os.environ.get("SIGNATURE_TTL_SECONDS", "300"))
 MAX_REQUEST_BODY_BYTES = int(os.environ.get("MAX_REQUEST_BODY_BYTES", "65536"))
@@ -59,6 +78,12 @@ DeploymentKey = tuple[str, str, tuple[str, ...]]
 _in_flight_deploys: set[DeploymentKey] = set()
 _recent_deploys: dict[DeploymentKey, tuple[float, dict]] = {}
 _seen_nonces: dict[str, float] = {}
+_job_queue: JobQueue | None = None
+_job_queue_lock = threading.Lock()
+# Envs with a live queue worker; guarded by _workers_lock together with the
+# worker's "queue empty -> exit" step so an enqueue never strands a job.
+_workers: set[str] = set()
+_workers_lock = threading.Lock()
 _nonce_lock = threading.Lock()
 if hasattr(app, "config"):
     app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BODY_BYTES
@@ -176,14 +201,127 @@ def parse_bool(value) -> bool:
     raise ValueError("wait must be a boolean")
 
 
-def run_sync(services: set[str]):
-    from sync_runner import sync_services
+def job_queue() -> JobQueue:
+    """The process's job queue; in memory (logged) when /workspace is absent."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            path: Path | str = JOB_QUEUE_PATH
+            if not JOB_QUEUE_PATH.parent.is_dir():
+                logger.warning(
+                    "%s does not exist; deploy jobs will not survive a restart",
+                    JOB_QUEUE_PATH.parent,
+                )
+                path = ":memory:"
+            _job_queue = JobQueue(path)
+        return _job_queue
+
 
-    thread = threading.Thread(target=sync_services, args=(services,))
+def _ensure_worker(env: str) -> None:
+    with _workers_lock:
+        if env in _workers:
+            return
+        _workers.add(env)
+    thread = threading.Thread(target=_drain_queue, args=(env,))
     thread.daemon = True
     thread.start()
 
 
+def _drain_queue(env: str) -> None:
+    """Run the env's queued jobs one at a time, then exit.
+
+    A failing job is logged and still marked finished, and the env is always
+    released on exit, so one error never stalls the env's queue.
+    """
+    released = False
+    try:
+        queue = job_queue()
+        while True:
+            with _workers_lock:
+                job = queue.claim(env)
+                if job is None:
+                    _workers.discard(env)
+                    released = True
+                    return
+            try:
+                _run_job(job)
+            except Exception:
+                logger.exception("Job %s (%s, env=%s) failed", job.id, job.kind, env)
+                try:
+                    queue.finish(job.id)
+                except Exception:
+                    logger.exception("Could not mark job %s finished", job.id)
+    except Exception:
+        logger.exception("Job queue drainer for env=%s stopped", env)
+    finally:
+        # Released above together with the empty claim; discarding again here
+        # could drop a worker started since then.
+        if not released:
+            with _workers_lock:
+                _workers.discard(env)
+
+
+def _run_job(job: Job) -> None:
+    if job.kind == "deploy":
+        if job.services is not None:
+            _run_deployment(job.env, job.ref, job.triggered_by, job.services)
+        else:
+            _run_deployment(job.env, job.ref, job.triggered_by)
+        key = _deployment_key(job.env, job.ref, job.services)
+        with _deploy_state_lock:
+            stored = _recent_deploys.get(key)
+        job_queue().finish(job.id, stored[1] if stored else None)
+        return
+
+    from sync_runner import sync_services
+
+    logger.info(
+        "Push sync job %s: env=%s ref=%s services=%s (%d coalesced)",
+        job.id,
+        job.env,
+        job.ref or GIT_BRANCH,
+        job.services,
+        job.coalesced,
+    )
+    try:
+        sync_services(set(job.services or []), ref=job.ref, deploy_env=job.env)
+    except Exception:
+        logger.exception("Push sync job %s failed", job.id)
+    job_queue().finish(job.id)
+
+
+def run_sync(
+    services: set[str], ref: str | None = None, triggered_by: str = "push"
+) -> tuple[Job, bool]:
+    """Queue a push sync; returns the job and whether it joined a pending one."""
+    job, coalesced = job_queue().enqueue_push(
+        PUSH_SYNC_ENV, ref, sorted(services), triggered_by
+    )
+    _ensure_worker(PUSH_SYNC_ENV)
+    return job, coalesced
+
+
+def resume_jobs() -> None:
+    """Restart-safe startup: requeue interrupted jobs, restore recent deploy
+    results for /deploy/status, drop old finished jobs, start workers."""
+    queue = job_queue()
+    now, now_monotonic = time.time(), time.monotonic()
+    queue.prune(now - JOB_RETENTION_SECONDS)
+    envs: set[str] = set()
+    with _deploy_state_lock:
+        for job in queue.finished_since(now - RECENT_DEPLOY_TTL_SECONDS):
+            if job.response is not None:
+                key = _deployment_key(job.env, job.ref, job.services)
+                completed_at = now_monotonic - (now - job.finished_at)
+                _recent_deploys[key] = (completed_at, job.response)
+        for job in queue.resume():
+            if job.kind == "deploy":
+                _in_flight_deploys.add(_deployment_key(job.env, job.ref, job.services))
+            envs.add(job.env)
+    for env in sorted(envs):
+        _ensure_worker(env)
+
+
 def _normalize_services(services: list[str] | None) -> tuple[str, ...]:
     """Canonical service-set identity; omitted services means the all-services operation."""
     if services is None:
@@ -199,9 +337,9 @@ def _deployment_key(
 
 def _deployment_id(key: DeploymentKey) -> str:
     service_identity = ",".join(key[2])
-    return hashlib.sha256(
-        f"{key[0]}:{key[1]}:{service_identity}".encode()
-    ).hexdigest()[:16]
+    return hashlib.sha256(f"{key[0]}:{key[1]}:{service_identity}".encode()).hexdigest()[
+        :16
+    ]
 
 
 def _recent_result(key: DeploymentKey) -> dict | None:
@@ -246,7 +384,9 @@ def _completed_response(
 ) -> dict:
     key = _deployment_key(env, ref, services)
     result_payload = (
-        result.to_public_dict() if hasattr(result, "to_public_dict") else result.to_dict()
+        result.to_public_dict()
+        if hasattr(result, "to_public_dict")
+        else result.to_dict()
     )
     return {
         "status": "completed" if result.success else "failed",
@@ -259,7 +399,9 @@ def _completed_response(
     }
 
 
-def _run_deployment(env: str, ref: str, triggered_by: str, services: list[str] | None = None) -> None:
+def _run_deployment(
+    env: str, ref: str, triggered_by: str, services: list[str] | None = None
+) -> None:
     from sync_runner import sync_services_by_version
 
     key = _deployment_key(env, ref, services)
@@ -308,9 +450,7 @@ def op_service_account_works() -> bool:
             return bool(_op_health_cache["ok"])
     ok = False
     try:
-        result = subprocess.run(
-            ["op", "whoami"], capture_output=True, timeout=10
-        )
+        result = subprocess.run(["op", "whoami"], capture_output=True, timeout=10)
         ok = result.returncode == 0
     except (OSError, subprocess.SubprocessError):
         ok = False
@@ -344,7 +484,11 @@ def health():
     status_code = 200 if all_healthy else 503
 
     return jsonify(
-        {"status": "healthy" if all_healthy else "degraded", "checks": checks}
+        {
+            "status": "healthy" if all_healthy else "degraded",
+            "checks": checks,
+            "queue": job_queue().stats(),
+        }
     ), status_code
 
 
@@ -370,13 +514,16 @@ def webhook():
     if not services:
         return jsonify({"status": "no_changes", "message": "No service files changed"})
 
-    run_sync(services)
+    # Sync exactly the pushed commit, so a coalesced job deploys the newest push.
+    job, coalesced = run_sync(services, ref=validate_deploy_ref(payload.get("after")))
 
     return jsonify(
         {
             "status": "accepted",
             "services": list(services),
             "commit": payload.get("after", "")[:8],
+            "job_id": job.id,
+            "coalesced": coalesced,
         }
     )
 
@@ -404,9 +551,16 @@ def manual_sync():
     if not services:
         return jsonify({"error": "No services specified"}), 400
 
-    run_sync(services)
+    job, coalesced = run_sync(services, triggered_by="manual-sync")
 
-    return jsonify({"status": "accepted", "services": list(services)})
+    return jsonify(
+        {
+            "status": "accepted",
+            "services": list(services),
+            "job_id": job.id,
+            "coalesced": coalesced,
+        }
+    )
 
 
 def _keys_for_legacy_status(env: str, ref: str) -> list[DeploymentKey]:
@@ -443,10 +597,14 @@ def version_deploy():
 
     services = payload.get("services")
     if services is not None:
-        if not isinstance(services, list) or not all(isinstance(s, str) for s in services):
+        if not isinstance(services, list) or not all(
+            isinstance(s, str) for s in services
+        ):
             return jsonify({"error": "services must be a list of strings"}), 400
         if not services or any(not service.strip() for service in services):
-            return jsonify({"error": "services must be a non-empty list of non-empty strings"}), 400
+            return jsonify(
+                {"error": "services must be a non-empty list of non-empty strings"}
+            ), 400
 
     logger.info(f"Deployment: {ref} to {env} by {triggered_by}")
 
@@ -485,15 +643,14 @@ def version_deploy():
             ), 202
         _in_flight_deploys.add(key)
 
-    if services is not None:
-        thread = threading.Thread(target=_run_deployment, args=(env, ref, triggered_by, services))
-    else:
-        thread = threading.Thread(target=_run_deployment, args=(env, ref, triggered_by))
-    thread.daemon = True
-    thread.start()
+    job_queue().enqueue_deploy(env, ref, services, triggered_by)
+    _ensure_worker(env)
 
     return jsonify(
-        {**_in_progress_response(env, ref, triggered_by, services=services), "wait": False}
+        {
+            **_in_progress_response(env, ref, triggered_by, services=services),
+            "wait": False,
+        }
     ), 202
 
 
@@ -516,14 +673,21 @@ def deployment_status():
 
     services = payload.get("services")
     if services is not None:
-        if not isinstance(services, list) or not all(isinstance(s, str) for s in services):
+        if not isinstance(services, list) or not all(
+            isinstance(s, str) for s in services
+        ):
             return jsonify({"error": "services must be a list of strings"}), 400
         if not services or any(not service.strip() for service in services):
-            return jsonify({"error": "services must be a non-empty list of non-empty strings"}), 400
+            return jsonify(
+                {"error": "services must be a non-empty list of non-empty strings"}
+            ), 400
     if deployment_id is not None and (
-        not isinstance(deployment_id, str) or not DEPLOYMENT_ID_RE.fullmatch(deployment_id)
+        not isinstance(deployment_id, str)
+        or not DEPLOYMENT_ID_RE.fullmatch(deployment_id)
     ):
-        return jsonify({"error": "deployment_id must be 16 lowercase hex characters"}), 400
+        return jsonify(
+            {"error": "deployment_id must be 16 lowercase hex characters"}
+        ), 400
 
     with _deploy_state_lock:
         if services is not None:
@@ -534,7 +698,9 @@ def deployment_status():
                 return jsonify(
                     {
                         "error": "Ambiguous deployment; deployment_id and services are required",
-                        "candidate_deployment_ids": [_deployment_id(item) for item in candidates],
+                        "candidate_deployment_ids": [
+                            _deployment_id(item) for item in candidates
+                        ],
                     }
                 ), 409
             key = candidates[0] if candidates else _deployment_key(env, ref)
@@ -552,9 +718,7 @@ def deployment_status():
             return jsonify(recent), 200
         if key in _in_flight_deploys:
             return jsonify(
-                _in_progress_response(
-                    env, ref, triggered_by, services=list(key[2])
-                )
+                _in_progress_response(env, ref, triggered_by, services=list(key[2]))
             ), 200
 
     return jsonify(
@@ -567,6 +731,9 @@ def deployment_status():
     ), 404
 
 
+resume_jobs()
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("WEBHOOK_PORT", 8080))
     app.run(host="0.0.0.0", port=port)
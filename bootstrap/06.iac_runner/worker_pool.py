@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Warm worker pool for the IaC Runner's invoke sync tasks.
+
+A cold ``invoke <svc>.sync`` child re-pays interpreter startup, ``tools.loader``
+task discovery and the httpx/yaml/rich/infra2_sdk imports for every service. A
+``WarmWorker`` is a forkserver for one checkout at one commit: a long-lived
+process started in the env's worktree that imports all of that once, then
+forks a fresh child per task. Each child gets:
+
+- its own environment (the task env replaces the worker's wholesale) and a new
+  session, so a timeout kills the task's whole process group;
+- stdout/stderr redirected to files the runner reads back, as with
+  ``subprocess.run(capture_output=True)``;
+- the exit status of ``invoke``, with ``SystemExit`` semantics.
+
+Modules are imported from the checkout, so a worker serves exactly one commit:
+``WorkerPool.prewarm`` recycles an env's worker when its worktree moves.
+
+Protocol: the runner writes one JSON request per line on the worker's stdin;
+the worker answers ``ready`` once, then ``forked``/``started``/``exit`` per task
+on its original stdout. What the preload prints to stdout (``tools.loader``
+reports each namespace it loads) is captured once and prefixed to every task's
+stdout, where a cold child would have printed it.
+"""
+
+import itertools
+import json
+import logging
+import os
+import select
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Imported once per worker; a module missing from the checkout or the image is
+# skipped and the task imports (or fails on) it as a cold child would.
+PRELOAD_MODULES = (
+    "invoke",
+    "httpx",
+    "yaml",
+    "rich.console",
+    "dotenv",
+    "infra2_sdk",
+    "libs.env",
+    "libs.dokploy",
+    "libs.deploy.deployer",
+    "tools.loader",
+)
+# Grace period for a killed task to be reaped before its result is returned.
+KILL_GRACE_SECONDS = 10
+
+
+class WorkerPoolError(RuntimeError):
+    """The warm worker could not take the task; nothing was run."""
+
+
+@dataclass
+class _Pending:
+    done: threading.Event = field(default_factory=threading.Event)
+    pid: int | None = None
+    returncode: int | None = None
+    startup_seconds: float | None = None
+
+
+class WarmWorker:
+    """One forkserver process for ``repo_path`` checked out at ``head``."""
+
+    def __init__(self, repo_path: Path, head: str, env: dict[str, str]):
+        self.repo_path = Path(repo_path)
+        self.head = head
+        self.preload_seconds: float | None = None
+        self.preload_stdout = ""
+        self._env = env
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending: dict[int, _Pending] = {}
+        self._scratch = Path(tempfile.mkdtemp(prefix="iac-worker-"))
+        self._proc: subprocess.Popen | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> None:
+        """Spawn the worker; preloading continues in the background."""
+        with open(self._scratch / "worker.log", "wb") as log:
+            self._proc = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-P",
+                    str(Path(__file__).resolve()),
+                    "--serve",
+                    str(self._scratch / "preload.out"),
+                ],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=log,
+                env=self._env,
+            )
+        threading.Thread(
+            target=self._read_events, name="warm-worker", daemon=True
+        ).start()
+
+    def _read_events(self) -> None:
+        proc = self._proc
+        for line in proc.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("event") == "ready":
+                self.preload_seconds = event.get("preload_seconds")
+                self.preload_stdout = self._read_output(self._scratch / "preload.out")
+                self._ready.set()
+                continue
+            pending = self._pending.get(event.get("id"))
+            if pending is None:
+                continue
+            if event["event"] == "forked":
+                pending.pid = event["pid"]
+            elif event["event"] == "started":
+                pending.startup_seconds = event["startup_seconds"]
+            elif event["event"] == "exit":
+                pending.returncode = event["returncode"]
+                pending.done.set()
+        # Worker gone: release everyone still waiting on it.
+        self._ready.set()
+        for pending in list(self._pending.values()):
+            pending.done.set()
+
+    def worker_log(self) -> str:
+        try:
+            return (self._scratch / "worker.log").read_text(errors="replace")
+        except OSError:
+            return ""
+
+    def run(
+        self, args: list[str], env: dict[str, str], timeout: float, start_timeout: float
+    ) -> dict:
+        """Run ``invoke <args>`` in a forked child. Result keys match a cold run,
+        plus ``returncode`` and ``startup_seconds`` (request -> task start)."""
+        if not self._ready.wait(start_timeout) or not self.alive:
+            raise WorkerPoolError(
+                f"warm worker not ready: {self.worker_log()[-500:] or 'no output'}"
+            )
+        request_id = next(self._ids)
+        pending = self._pending[request_id] = _Pending()
+        stdout_path = self._scratch / f"{request_id}.out"
+        stderr_path = self._scratch / f"{request_id}.err"
+        request = {
+            "id": request_id,
+            "args": args,
+            "env": env,
+            "stdout": str(stdout_path),
+            "stderr": str(stderr_path),
+            "sent_at": time.time(),
+        }
+        try:
+            with self._lock:
+                self._proc.stdin.write(json.dumps(request).encode() + b"\n")
+                self._proc.stdin.flush()
+        except (OSError, ValueError) as exc:
+            del self._pending[request_id]
+            raise WorkerPoolError(f"warm worker rejected the task: {exc}") from exc
+
+        timed_out = not pending.done.wait(timeout)
+        if timed_out and pending.pid:
+            try:
+                os.killpg(pending.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            pending.done.wait(KILL_GRACE_SECONDS)
+        del self._pending[request_id]
+        stdout, stderr = (
+            self._read_output(stdout_path),
+            self._read_output(stderr_path),
+        )
+        stdout = self.preload_stdout + stdout
+        if timed_out:
+            stdout, stderr = "", f"Timeout after {timeout:g}s"
+        elif pending.returncode is None:
+            stderr += "\nWarm worker exited before the task finished"
+        return {
+            "success": pending.returncode == 0 and not timed_out,
+            "returncode": pending.returncode,
+            "stdout": stdout,
+            "stderr": stderr,
+            "startup_seconds": pending.startup_seconds,
+        }
+
+    @staticmethod
+    def _read_output(path: Path) -> str:
+        try:
+            return path.read_text(errors="replace")
+        except OSError:
+            return ""
+        finally:
+            path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Stop the worker (EOF on stdin); it kills tasks still running."""
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=KILL_GRACE_SECONDS)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+                proc.wait()
+        shutil.rmtree(self._scratch, ignore_errors=True)
+
+
+class WorkerPool:
+    """At most one warm worker per checkout path, always at its current head."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._workers: dict[Path, WarmWorker] = {}
+
+    def prewarm(self, repo_path: Path, head: str, env: dict[str, str]) -> WarmWorker:
+        """Start the worker for ``repo_path`` at ``head``, recycling one that
+        serves another commit (its imports are stale) or has died."""
+        key = Path(repo_path)
+        with self._lock:
+            worker = self._workers.get(key)
+            if worker is not None and worker.head == head and worker.alive:
+                return worker
+            if worker is not None:
+                logger.info(
+                    "Recycling warm worker for %s (%s -> %s)",
+                    key.name,
+                    (worker.head or "?")[:12],
+                    head[:12],
+                )
+                worker.close()
+            worker = self._workers[key] = WarmWorker(key, head, env)
+            worker.start()
+            return worker
+
+    def get(self, repo_path: Path, head: str | None) -> WarmWorker | None:
+        """The live worker for ``repo_path`` if it serves ``head``."""
+        with self._lock:
+            worker = self._workers.get(Path(repo_path))
+        if worker is None or not head or worker.head != head or not worker.alive:
+            return None
+        return worker
+
+    def close(self) -> None:
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
+
+
+# -- worker process -----------------------------------------------------------
+
+
+def _send(fd: int, event: dict) -> None:
+    # One write per line stays atomic on the pipe, so forked children can
+    # report on the same fd as the worker.
+    os.write(fd, json.dumps(event).encode() + b"\n")
+
+
+def _preload() -> dict[str, str]:
+    import importlib
+
+    failed = {}
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as exc:  # noqa: BLE001 - the task reports it, as a cold run would
+            failed[name] = f"{type(exc).__name__}: {exc}"
+    return failed
+
+
+def _reset_process_state() -> None:
+    """Drop state a preload may have derived from the worker's own env."""
+    common = sys.modules.get("libs.common")
+    if common is not None:
+        common._env_cache = None
+    secrets = sys.modules.get("libs.env")
+    if secrets is not None:
+        secrets._SESSION = None
+    if "tools.loader" in sys.modules:
+        # tools.loader applies the checkout's dotenv files on import; redo it
+        # for the task env.
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        load_dotenv(".env.local", override=True)
+
+
+def _exit_code(code: object) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run_task(request: dict, proto: int) -> None:
+    """Forked child: become the task, then exit. Never returns."""
+    code = 1
+    try:
+        os.setsid()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        for fd, path in ((1, request["stdout"]), (2, request["stderr"])):
+            target = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.dup2(target, fd)
+            os.close(target)
+        os.environ.clear()
+        os.environ.update(request["env"])
+        _reset_process_state()
+        _send(
+            proto,
+            {
+                "event": "started",
+                "id": request["id"],
+                "startup_seconds": round(time.time() - request["sent_at"], 4),
+            },
+        )
+        os.close(proto)
+        import runpy
+
+        sys.argv = ["invoke", *request["args"]]
+        runpy.run_module("invoke", run_name="__main__", alter_sys=True)
+        code = 0
+    except SystemExit as exc:
+        code = _exit_code(exc.code)
+    except BaseException:  # noqa: BLE001 - report like an uncaught error in a cold run
+        import traceback
+
+        traceback.print_exc()
+        code = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:  # noqa: BLE001
+                pass
+        os._exit(code)
+
+
+def serve(preload_output: str) -> None:
+    """Worker main loop: single-threaded, so forking it is safe."""
+    import platform  # noqa: F401 - stdlib, before the checkout's platform/ package
+
+    sys.path.insert(0, ".")
+    # Keep the protocol on a private fd. Preload stdout goes to its own file
+    # for the runner; anything the worker prints later goes to the log.
+    proto = os.dup(1)
+    target = os.open(preload_output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.dup2(target, 1)
+    os.close(target)
+    started = time.monotonic()
+    failed = _preload()
+    sys.stdout.flush()
+    os.dup2(2, 1)
+    _send(
+        proto,
+        {
+            "event": "ready",
+            "preload_seconds": round(time.monotonic() - started, 4),
+            "failed_preloads": failed,
+        },
+    )
+
+    children: dict[int, int] = {}  # pid -> request id
+    buffer = b""
+    stdin_open = True
+    while stdin_open or children:
+        readable = []
+        if stdin_open:
+            readable, _, _ = select.select([0], [], [], 0.05 if children else None)
+        else:
+            time.sleep(0.05)
+        if readable:
+            chunk = os.read(0, 65536)
+            if not chunk:
+                stdin_open = False
+                for pid in children:
+                    try:
+                        os.killpg(pid, signal.SIGKILL)
+                    except OSError:
+                        pass
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                request = json.loads(line)
+                sys.stdout.flush()
+                sys.stderr.flush()
+                pid = os.fork()
+                if pid == 0:
+                    _run_task(request, proto)
+                children[pid] = request["id"]
+                _send(proto, {"event": "forked", "id": request["id"], "pid": pid})
+        while children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            request_id = children.pop(pid, None)
+            if request_id is not None:
+                _send(
+                    proto,
+                    {
+                        "event": "exit",
+                        "id": request_id,
+                        "returncode": os.waitstatus_to_exitcode(status),
+                    },
+                )
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--serve"]:
+    serve(sys.argv[2])
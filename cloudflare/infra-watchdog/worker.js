@@ -767,6 +767,8 @@ async function recordLedger(env, results, nowMs) {
       entry.lastDomain = result.failure_domain || entry.lastDomain || "";
     }
     entry.severity = result.severity || entry.severity || "";
+    // Lets the ledger analytics roll signals up per service without a registry join.
+    entry.serviceId = result.service_id || entry.serviceId || "";
     signals[id] = entry;
   }
   await saveState(env, key, {
@@ -15,7 +15,8 @@ Storage contract (owned by the Worker):
 - Hot window: Cloudflare KV key ``ledger:YYYY-MM-DD`` for the last
   ``LEDGER_RETENTION_DAYS`` days.
 - Cold archive: Cloudflare R2 object ``watchdog-ledger/YYYY-MM-DD.json`` written
-  once when the day rolls over.
+  once when the day rolls over. Multi-week history over the archive lives in
+  ``libs.ledger_analytics``.
 """
 
 from __future__ import annotations
@@ -92,7 +93,8 @@ def summarize_ledger(ledger: Mapping[str, Any]) -> dict[str, Any]:
     perfect = [signal for signal in per_signal if signal["fail"] == 0]
     return {
         "as_of": ledger.get("as_of", "latest"),
-        "window_days": _coerce_count(ledger.get("window_days")) or len(list(_iter_days(ledger))),
+        "window_days": _coerce_count(ledger.get("window_days"))
+        or len(list(_iter_days(ledger))),
         "total_runs": total_runs,
         "signal_count": len(per_signal),
         "perfect_count": len(perfect),
@@ -129,4 +131,24 @@ def build_report_message(summary: Mapping[str, Any]) -> str:
             )
     else:
         lines.append("All monitored signals held 100% availability this window. ✅")
+    history = summary.get("history")
+    if history and history.get("windows"):
+        lines.append(f"History (SLO {history['slo_pct']}%, through {history['end']}):")
+        for window in history["windows"]:
+            lines.append(
+                f"  {window['window_days']}d: {window['overall_uptime_pct']}% | "
+                f"{window['perfect_count']}/{window['signal_count']} signals at 100% | "
+                f"{window['days_with_data']} days of data"
+            )
+            if window["worst_burn"]:
+                burn = ", ".join(
+                    f"{signal_id} {rate}x" for rate, signal_id in window["worst_burn"]
+                )
+                lines.append(f"    Error-budget burn: {burn}")
+            if window["services"]:
+                services = ", ".join(
+                    f"{row['service']} {row['uptime_pct']}%"
+                    for row in window["services"]
+                )
+                lines.append(f"    Services below 100%: {services}")
     return "\n".join(lines)
@@ -0,0 +1,260 @@
+"""Content-defined chunking and a content-addressed chunk store for backups.
+
+Incremental backups (``tools/backup_runner.py --incremental``) split every file
+under a ``data_path`` into content-defined chunks, store each chunk once under its
+sha256, and record a per-run *index* (file tree + ordered chunk ids). A daily run
+only uploads chunks the store has never seen, and an unchanged file -- same size and
+mtime as in the previous index, outside the racy window -- is not even re-read.
+
+Chunk boundaries are content-defined: an insert near the start of a large file
+shifts only the chunks around the edit rather than every fixed-size block after
+it. ``restore_index`` reassembles a tree from an index, verifying every chunk's
+digest on the way.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import stat
+import time
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator
+
+INDEX_VERSION = 1
+MIN_CHUNK_BYTES = 256 * 1024
+AVG_CHUNK_BYTES = 1024 * 1024
+MAX_CHUNK_BYTES = 4 * 1024 * 1024
+RACY_WINDOW_NS = 2_000_000_000
+# Bytes read per call. A cut depends only on the MAX_CHUNK_BYTES after a chunk's
+# start, so reads of any size give the same boundaries as one whole-file scan.
+_READ_BYTES = 16 * MAX_CHUNK_BYTES
+# Boundary rule, FastCDC-style normalized: every byte maps to one of 16 symbols and
+# a chunk ends after the first _STRICT_RUN (p = 2**-20) past MIN_CHUNK_BYTES, or
+# after the first _LOOSE_RUN (p = 2**-16) past AVG_CHUNK_BYTES. Both steps are
+# bytes.translate/bytes.find, so the scan runs in C (a few s/GiB) without a
+# compiled dependency. The symbol table is fixed: changing it moves every boundary.
+_BYTE_ORDER = sorted(
+    range(256), key=lambda byte: hashlib.sha256(b"backup-chunks%d" % byte).digest()
+)
+_SYMBOLS = bytes(_BYTE_ORDER.index(byte) % 16 for byte in range(256))
+_STRICT_RUN = bytes([1, 7, 3, 12, 9])
+_LOOSE_RUN = _STRICT_RUN[:4]
+_SCAN_STEP_BYTES = 256 * 1024
+
+
+class BackupChunkError(RuntimeError):
+    """Raised when a chunk is missing or does not match its content address."""
+
+
+def _cut_point(buffer: bytes, start: int) -> int:
+    """End of the chunk starting at ``start``; ``buffer`` holds at least
+    MAX_CHUNK_BYTES after it, or the rest of the file."""
+    end = min(len(buffer), start + MAX_CHUNK_BYTES)
+    if end - start <= MIN_CHUNK_BYTES:
+        return end
+    # A run ending exactly at MIN_CHUNK_BYTES may begin before it.
+    base = start + MIN_CHUNK_BYTES - len(_STRICT_RUN)
+    normal = min(end, start + AVG_CHUNK_BYTES)
+    found = buffer[base:normal].translate(_SYMBOLS).find(_STRICT_RUN)
+    if found >= 0:
+        return base + found + len(_STRICT_RUN)
+    # Past AVG_CHUNK_BYTES the loose run usually comes within a few hundred KiB;
+    # translate step by step instead of up to MAX_CHUNK_BYTES at once.
+    overlap = len(_LOOSE_RUN) - 1
+    base = normal - overlap
+    while base + overlap < end:
+        stop = min(end, base + _SCAN_STEP_BYTES)
+        found = buffer[base:stop].translate(_SYMBOLS).find(_LOOSE_RUN)
+        if found >= 0:
+            return base + found + len(_LOOSE_RUN)
+        base = stop - overlap
+    return end
+
+
+def iter_chunks(handle: BinaryIO) -> Iterator[bytes]:
+    """Yield content-defined chunks of ``handle`` until EOF."""
+    buffer = b""
+    start = 0
+    eof = False
+    while True:
+        if not eof and len(buffer) - start < MAX_CHUNK_BYTES:
+            data = handle.read(_READ_BYTES)
+            if data:
+                buffer = buffer[start:] + data
+                start = 0
+                continue
+            eof = True
+        if start >= len(buffer):
+            return
+        cut = _cut_point(buffer, start)
+        yield buffer[start:cut]
+        start = cut
+
+
+class ChunkStore:
+    """Directory of zlib-compressed chunks at ``<root>/<sha[:2]>/<sha>``."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path(self, chunk_id: str) -> Path:
+        return self.root / chunk_id[:2] / chunk_id
+
+    def has(self, chunk_id: str) -> bool:
+        return self.path(chunk_id).exists()
+
+    def put(self, chunk_id: str, data: bytes) -> int:
+        """Store ``data`` (idempotent); return the stored, compressed size."""
+        target = self.path(chunk_id)
+        if target.exists():
+            return 0
+        payload = zlib.compress(data, 6)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{chunk_id}.{os.getpid()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, target)
+        return len(payload)
+
+    def get(self, chunk_id: str) -> bytes:
+        try:
+            data = zlib.decompress(self.path(chunk_id).read_bytes())
+        except FileNotFoundError as exc:
+            raise BackupChunkError(f"backup chunk is missing: {chunk_id}") from exc
+        except zlib.error as exc:
+            raise BackupChunkError(f"backup chunk is corrupt: {chunk_id}") from exc
+        if hashlib.sha256(data).hexdigest() != chunk_id:
+            raise BackupChunkError(f"backup chunk digest mismatch: {chunk_id}")
+        return data
+
+
+def build_index(
+    source: Path,
+    store: ChunkStore,
+    *,
+    created_at: int,
+    previous: dict[str, Any] | None = None,
+    known_chunks: Iterable[str] = (),
+) -> tuple[dict[str, Any], dict[str, int]]:
+    """Chunk ``source`` into ``store`` and return ``(index, stats)``.
+
+    ``known_chunks`` are ids already present at the destination (e.g. the remote
+    store); they are neither re-stored locally nor counted as new. A regular file
+    whose size and ``mtime_ns`` match ``previous`` reuses that entry's chunk list
+    without being read.
+    """
+    known = set(known_chunks)
+    previous_files = {
+        item["path"]: item
+        for item in (previous or {}).get("files", [])
+        if item.get("type") == "file"
+    }
+    previous_at = int((previous or {}).get("indexed_at_ns") or 0)
+    indexed_at_ns = time.time_ns()
+    stats = {
+        "logical_bytes": 0,
+        "chunks_total": 0,
+        "chunks_new": 0,
+        "new_bytes": 0,
+        "stored_bytes": 0,
+        "files_reused": 0,
+    }
+    files: list[dict[str, Any]] = []
+    for path in _walk(source):
+        relative = path.relative_to(source).as_posix()
+        st = path.lstat()
+        item: dict[str, Any] = {"path": relative, "mode": stat.S_IMODE(st.st_mode)}
+        if stat.S_ISDIR(st.st_mode):
+            item["type"] = "dir"
+        elif stat.S_ISLNK(st.st_mode):
+            item["type"] = "symlink"
+            item["target"] = os.readlink(path)
+        elif stat.S_ISREG(st.st_mode):
+            item.update(type="file", size=st.st_size, mtime_ns=st.st_mtime_ns)
+            prior = previous_files.get(relative)
+            if (
+                prior
+                and prior.get("size") == st.st_size
+                and prior.get("mtime_ns") == st.st_mtime_ns
+                and st.st_mtime_ns < previous_at - RACY_WINDOW_NS
+                and all(chunk in known or store.has(chunk) for chunk in prior["chunks"])
+            ):
+                item["chunks"] = list(prior["chunks"])
+                stats["files_reused"] += 1
+            else:
+                item["chunks"] = []
+                with path.open("rb") as handle:
+                    for data in iter_chunks(handle):
+                        chunk_id = hashlib.sha256(data).hexdigest()
+                        item["chunks"].append(chunk_id)
+                        if chunk_id not in known and not store.has(chunk_id):
+                            stats["chunks_new"] += 1
+                            stats["new_bytes"] += len(data)
+                            stats["stored_bytes"] += store.put(chunk_id, data)
+                        known.add(chunk_id)
+            stats["logical_bytes"] += st.st_size
+            stats["chunks_total"] += len(item["chunks"])
+        else:
+            continue  # sockets/fifos/devices are not backup content
+        files.append(item)
+    index = {
+        "version": INDEX_VERSION,
+        "created_at": created_at,
+        "indexed_at_ns": indexed_at_ns,
+        "files": files,
+    }
+    return index, stats
+
+
+def index_chunk_ids(index: dict[str, Any]) -> set[str]:
+    return {
+        chunk
+        for item in index.get("files", [])
+        if item.get("type") == "file"
+        for chunk in item.get("chunks", [])
+    }
+
+
+def restore_index(index: dict[str, Any], store: ChunkStore, destination: Path) -> Path:
+    """Recreate the tree described by ``index`` under ``destination``."""
+    if index.get("version") != INDEX_VERSION:
+        raise BackupChunkError(
+            f"unsupported backup index version: {index.get('version')}"
+        )
+    destination.mkdir(parents=True, exist_ok=True)
+    root = destination.resolve()
+    directories: list[tuple[Path, int]] = []
+    for item in index.get("files", []):
+        target = (destination / item["path"]).resolve()
+        if target != root and root not in target.parents:
+            raise BackupChunkError(
+                f"backup index path escapes restore root: {item['path']}"
+            )
+        kind = item.get("type")
+        if kind == "dir":
+            target.mkdir(parents=True, exist_ok=True)
+            directories.append((target, item["mode"]))
+        elif kind == "symlink":
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.symlink(item["target"], target)
+        elif kind == "file":
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with target.open("wb") as handle:
+                for chunk_id in item["chunks"]:
+                    handle.write(store.get(chunk_id))
+            os.chmod(target, item["mode"])
+            os.utime(target, ns=(item["mtime_ns"], item["mtime_ns"]))
+    # Modes last: a read-only directory would refuse the files restored into it.
+    for directory, mode in reversed(directories):
+        os.chmod(directory, mode)
+    return destination
+
+
+def _walk(source: Path) -> Iterator[Path]:
+    """Every path under ``source`` in a stable order, without following symlinks."""
+    for root, dirs, names in os.walk(source):
+        dirs.sort()
+        base = Path(root)
+        for name in sorted(dirs + names):
+            yield base / name
@@ -8,13 +8,22 @@ basic database invariants.
 
 from __future__ import annotations
 
+import contextlib
 import gzip
+import hashlib
+import json
 import shutil
 import subprocess
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterator
 
+from libs.backup_chunks import (
+    BackupChunkError,
+    ChunkStore,
+    index_chunk_ids,
+    restore_index,
+)
 from libs.backup_verification import (
     BackupEntry,
     _parse_timestamp,
@@ -26,6 +35,11 @@ class BackupRestoreError(RuntimeError):
     """Raised when a restore rehearsal cannot run safely."""
 
 
+# Manifest ``codec`` -> how the rehearsal decompresses the dump. Rows without a
+# codec (tools/host_backup.sh) are gzip.
+REHEARSAL_CODECS = ("gzip", "zstd")
+
+
 @dataclass(frozen=True)
 class RestoreRehearsalPlan:
     service_id: str
@@ -35,6 +49,7 @@ class RestoreRehearsalPlan:
     pg_user: str
     database: str
     invariant_sql: tuple[str, ...]
+    codec: str = "gzip"
 
     def to_dict(self) -> dict[str, Any]:
         return asdict(self)
@@ -95,7 +110,13 @@ def materialize_artifact(
     *,
     runner=subprocess.run,
 ) -> Path:
-    """Resolve a local artifact path, downloading remote artifacts with rclone."""
+    """Resolve a local artifact path, downloading remote artifacts with rclone.
+
+    Chunked (incremental) artifacts are reassembled into a directory: the index and
+    only the chunks it references are fetched, and every chunk is digest-checked.
+    """
+    if artifact.get("format") == "chunked":
+        return _materialize_chunked(artifact, download_dir, runner=runner)
     remote_uri = str(artifact.get("remote_uri") or "")
     if remote_uri.startswith("local:"):
         return Path(remote_uri.removeprefix("local:"))
@@ -117,9 +138,66 @@ def materialize_artifact(
     return destination
 
 
+def _materialize_chunked(
+    artifact: dict[str, Any], download_dir: Path, *, runner
+) -> Path:
+    index_uri = str(artifact.get("remote_uri") or "")
+    store_uri = str(artifact.get("chunk_store_uri") or "")
+    if not store_uri:
+        raise BackupRestoreError("chunked backup artifact has no chunk_store_uri")
+    download_dir.mkdir(parents=True, exist_ok=True)
+    if index_uri.startswith("local:"):
+        index_path = Path(index_uri.removeprefix("local:"))
+    else:
+        index_path = download_dir / index_uri.rsplit("/", 1)[-1]
+        _rclone(runner, ["copyto", index_uri, str(index_path)], index_uri)
+    index_bytes = index_path.read_bytes()
+    if hashlib.sha256(index_bytes).hexdigest() != artifact.get("sha256"):
+        raise BackupRestoreError(f"backup index checksum mismatch: {index_uri}")
+    index = json.loads(index_bytes)
+
+    if store_uri.startswith("local:"):
+        store = ChunkStore(Path(store_uri.removeprefix("local:")))
+    else:
+        store = ChunkStore(download_dir / "chunks")
+        wanted = sorted(
+            chunk for chunk in index_chunk_ids(index) if not store.has(chunk)
+        )
+        if wanted:
+            files_from = download_dir / "chunks.files-from"
+            files_from.write_text(
+                "".join(f"{chunk[:2]}/{chunk}\n" for chunk in wanted), encoding="utf-8"
+            )
+            _rclone(
+                runner,
+                ["copy", store_uri, str(store.root), "--files-from", str(files_from)],
+                store_uri,
+            )
+
+    destination = planned_artifact_path(artifact, download_dir)
+    if destination.exists():
+        shutil.rmtree(destination)
+    try:
+        return restore_index(index, store, destination)
+    except BackupChunkError as exc:
+        raise BackupRestoreError(str(exc)) from exc
+
+
+def _rclone(runner, args: list[str], uri: str) -> None:
+    result = runner(["rclone", *args], text=True, capture_output=True, check=False)
+    if result.returncode != 0:
+        raise BackupRestoreError(
+            result.stderr.strip() or f"rclone download failed: {uri}"
+        )
+
+
 def planned_artifact_path(artifact: dict[str, Any], download_dir: Path) -> Path:
     """Return where an artifact would be read from or downloaded to."""
     remote_uri = str(artifact.get("remote_uri") or "")
+    if artifact.get("format") == "chunked":
+        # Reassembled tree, named after the index (``<ts>.index.json`` -> ``<ts>``).
+        name = remote_uri.rsplit("/", 1)[-1].removesuffix(".index.json")
+        return download_dir / f"restored-{name}"
     if remote_uri.startswith("local:"):
         return Path(remote_uri.removeprefix("local:"))
     if ":" not in remote_uri:
@@ -145,6 +223,18 @@ def build_postgres_rehearsal_plan(
             f"restore rehearsal currently supports postgres backups, got {entry.method}"
         )
     assert_rehearsal_target(target_container)
+    if artifact.get("format") == "chunked":
+        raise BackupRestoreError(
+            "restore rehearsal replays a compressed pg dump; chunked (incremental) "
+            "artifacts restore to a data directory tree, so rehearse from a "
+            "non-incremental backup"
+        )
+    codec = str(artifact.get("codec") or "gzip")
+    if codec not in REHEARSAL_CODECS:
+        raise BackupRestoreError(
+            f"restore rehearsal cannot decompress {codec!r} artifacts "
+            f"(supported: {', '.join(REHEARSAL_CODECS)})"
+        )
     return RestoreRehearsalPlan(
         service_id=entry.service_id,
         source_uri=str(artifact.get("remote_uri") or ""),
@@ -153,20 +243,52 @@ def build_postgres_rehearsal_plan(
         pg_user=pg_user,
         database=database,
         invariant_sql=invariant_sql,
+        codec=codec,
     )
 
 
+@contextlib.contextmanager
+def _open_dump(archive_path: Path, codec: str) -> Iterator[BinaryIO]:
+    """The decompressed dump as a stream; a failing decompressor is an error."""
+    if codec == "gzip":
+        with gzip.open(archive_path, "rb") as dump:
+            yield dump
+        return
+    try:
+        proc = subprocess.Popen(
+            ["zstd", "-q", "-dc", str(archive_path)], stdout=subprocess.PIPE
+        )
+    except FileNotFoundError as exc:
+        raise BackupRestoreError("zstd artifacts need the zstd binary on PATH") from exc
+    assert proc.stdout is not None
+    try:
+        with proc.stdout:
+            yield proc.stdout
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        rc = proc.wait()
+    if rc != 0:
+        raise BackupRestoreError(f"zstd -d failed with exit code {rc}: {archive_path}")
+
+
 def run_postgres_restore_rehearsal(
     plan: RestoreRehearsalPlan,
     *,
     popen=subprocess.Popen,
     runner=subprocess.run,
 ) -> dict[str, Any]:
-    """Restore a gzipped pg dump into the target and run invariant checks."""
+    """Restore a compressed pg dump (the plan's codec) into the target and run
+    invariant checks."""
     assert_rehearsal_target(plan.target_container)
     archive_path = Path(plan.archive_path)
     if not archive_path.exists():
         raise BackupRestoreError(f"backup archive is missing: {archive_path}")
+    if archive_path.is_dir():
+        raise BackupRestoreError(
+            f"backup archive is a directory, not a dump: {archive_path}"
+        )
 
     restore_cmd = [
         "docker",
@@ -180,7 +302,7 @@ def run_postgres_restore_rehearsal(
         "ON_ERROR_STOP=1",
         plan.database,
     ]
-    with gzip.open(archive_path, "rb") as dump:
+    with _open_dump(archive_path, plan.codec) as dump:
         proc = popen(restore_cmd, stdin=subprocess.PIPE)
         assert proc.stdin is not None
         with proc.stdin:
@@ -4,6 +4,9 @@ The ``tools/`` package keeps only the CLI front doors (``deploy_v2.py`` /
 ``deploy_v2_canary.py``); their backends live here as pure importable libraries:
 
 - :mod:`libs.deploy.deployer` — the Invoke-task platform/app Deployer.
+- :mod:`libs.deploy.config_hash_cache` — stat-validated file digests behind its config hash.
+- :mod:`libs.deploy.sync_planner` — the iac-runner's fleet-level "which syncs are no-ops" plan.
+- :mod:`libs.deploy.sync_selection` — one checkout's services, fan-out and deploy order, for the iac-runner.
 - :mod:`libs.deploy.preview`  — the multi-alias preview lifecycle (``up`` / ``down``).
 - :mod:`libs.deploy.promote`  — the fixed-compose staging/prod promote backend.
 """
@@ -0,0 +1,251 @@
+"""Incremental, content-addressed cache for Deployer config-hash inputs.
+
+``Deployer.compute_local_config_hash`` runs for every selected service on every
+iac-runner push. Uncached, each run re-walks build contexts, re-parses Dockerfiles
+for COPY sources and re-reads/re-hashes every artifact byte. This cache keeps:
+
+- per-file sha256 keyed by ``(path, size, mtime_ns, inode)``;
+- a ``git blob id -> sha256`` map, so a tracked file that is clean against the git
+  index resolves without being read even when its stat changed (fresh clone);
+- per-service artifact manifests: the discovered file list plus the stat signature
+  of every path discovery looked at (Dockerfiles, walked directories, missing
+  sources), so an unchanged service skips discovery entirely.
+
+The cache only changes *how* a file's sha256 is obtained; digests feed the same
+``config_hash_from_digests`` as ``config_hash_from_items``, so the hash is
+bit-identical. Entries whose mtime falls within ``RACY_WINDOW_NS`` of the moment
+they were recorded are never trusted (git's racy-clean rule): a same-size rewrite
+inside one timestamp tick would otherwise look unchanged.
+
+The on-disk file is opt-in via ``DEPLOY_CONFIG_HASH_CACHE`` (the iac-runner points
+it into its persistent workspace); without it the cache is process-local.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import stat
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable
+
+CACHE_VERSION = 1
+RACY_WINDOW_NS = 2_000_000_000
+_GIT_TIMEOUT_SECONDS = 30
+# Regular-file modes only: a symlink's blob is its target path, not the bytes a
+# read through the link returns, and a gitlink has no worktree content at all.
+_GIT_FILE_MODES = {"100644", "100755"}
+
+Signature = list  # ["f" | "d", size, mtime_ns, inode]
+
+
+def _signature(path: Path) -> Signature | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if stat.S_ISDIR(st.st_mode):
+        return ["d", 0, st.st_mtime_ns, st.st_ino]
+    return ["f", st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _settled(signature: Signature | None, recorded_ns: int) -> bool:
+    """True when ``signature`` is old enough to trust a record taken at ``recorded_ns``."""
+    return signature is None or signature[2] < recorded_ns - RACY_WINDOW_NS
+
+
+def _clean_git_blob_ids(repo_root: Path) -> dict[str, str]:
+    """Absolute path -> blob id for tracked files whose worktree copy matches the index.
+
+    Best effort: outside a git checkout, or if git fails, the map is empty and every
+    stat miss falls back to reading the file.
+    """
+    if not (repo_root / ".git").exists():
+        return {}
+    try:
+        staged = subprocess.run(
+            ["git", "-C", str(repo_root), "ls-files", "-s", "-z"],
+            capture_output=True,
+            check=True,
+            timeout=_GIT_TIMEOUT_SECONDS,
+        ).stdout
+        modified = subprocess.run(
+            ["git", "-C", str(repo_root), "diff-files", "--name-only", "-z"],
+            capture_output=True,
+            check=True,
+            timeout=_GIT_TIMEOUT_SECONDS,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return {}
+
+    dirty = set(modified.decode(errors="surrogateescape").split("\0"))
+    blobs: dict[str, str] = {}
+    for record in staged.decode(errors="surrogateescape").split("\0"):
+        meta, _, name = record.partition("\t")
+        fields = meta.split()
+        if len(fields) != 3 or fields[0] not in _GIT_FILE_MODES or fields[2] != "0":
+            continue
+        if name in dirty:
+            continue
+        blobs[str(repo_root / name)] = fields[1]
+    return blobs
+
+
+class ConfigHashCache:
+    """Stat-validated digests and artifact manifests, optionally persisted as JSON."""
+
+    def __init__(self, path: Path | None, repo_root: Path):
+        self.path = path
+        self.repo_root = repo_root
+        self._files: dict[str, dict] = {}
+        self._blobs: dict[str, str] = {}
+        self._manifests: dict[str, dict] = {}
+        self._git_blobs: dict[str, str] | None = None
+        self._git_blobs_at = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+        self._files = dict(data.get("files") or {})
+        self._blobs = dict(data.get("blobs") or {})
+        self._manifests = dict(data.get("manifests") or {})
+
+    def save(self) -> None:
+        """Atomically persist the cache; a no-op when process-local or unchanged."""
+        if self.path is None or not self._dirty:
+            return
+        # Deleted files, removed worktrees and orphaned blob ids would otherwise
+        # accumulate forever in a long-lived runner's workspace.
+        self._files = {
+            key: entry for key, entry in self._files.items() if os.path.exists(key)
+        }
+        self._manifests = {
+            key: entry for key, entry in self._manifests.items() if os.path.exists(key)
+        }
+        referenced = {
+            self._files[name]["sha256"]
+            for entry in self._manifests.values()
+            for name in entry["files"]
+            if name in self._files
+        }
+        self._blobs = {
+            blob: digest for blob, digest in self._blobs.items() if digest in referenced
+        }
+        payload = {
+            "version": CACHE_VERSION,
+            "files": self._files,
+            "blobs": self._blobs,
+            "manifests": self._manifests,
+        }
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(payload, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            # A read-only or full cache volume only costs the next run its speed-up.
+            tmp.unlink(missing_ok=True)
+            return
+        self._dirty = False
+
+    def _git_blob_ids(self) -> dict[str, str]:
+        if self._git_blobs is None:
+            self._git_blobs_at = time.time_ns()
+            self._git_blobs = _clean_git_blob_ids(self.repo_root)
+        return self._git_blobs
+
+    def file_sha256(self, path: Path) -> str:
+        """sha256 hex digest of ``path``'s bytes, read only when stat and git both miss."""
+        key = str(path)
+        signature = _signature(path)
+        entry = self._files.get(key)
+        if (
+            signature is not None
+            and entry
+            and entry.get("sig") == signature
+            and _settled(signature, entry["at"])
+        ):
+            return entry["sha256"]
+
+        # git's answer is a snapshot: a file written after it was taken must be read.
+        blob = self._git_blob_ids().get(key)
+        if not _settled(signature, self._git_blobs_at):
+            blob = None
+        digest = self._blobs.get(blob) if blob else None
+        if digest is None:
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            if blob:
+                self._blobs[blob] = digest
+        if signature is not None:
+            self._files[key] = {
+                "sig": signature,
+                "at": time.time_ns(),
+                "sha256": digest,
+            }
+        self._dirty = True
+        return digest
+
+    def artifact_files(
+        self,
+        compose_path: str,
+        compose_content: str,
+        discover: Callable[[set[Path]], list[Path]],
+    ) -> list[Path]:
+        """Artifact files for a compose, re-running ``discover`` only when an input moved.
+
+        ``discover`` receives a set it must fill with every path it inspected; their stat
+        signatures are what a later call checks instead of walking again.
+        """
+        key = str(Path(compose_path).resolve())
+        compose_sha256 = hashlib.sha256(compose_content.encode()).hexdigest()
+        entry = self._manifests.get(key)
+        if (
+            entry
+            and entry.get("compose_sha256") == compose_sha256
+            and all(
+                _signature(Path(probed)) == signature
+                and _settled(signature, entry["at"])
+                for probed, signature in entry["probes"].items()
+            )
+        ):
+            return [Path(name) for name in entry["files"]]
+
+        recorded_ns = time.time_ns()
+        probed: set[Path] = set()
+        files = discover(probed)
+        self._manifests[key] = {
+            "compose_sha256": compose_sha256,
+            "at": recorded_ns,
+            "files": [str(path) for path in files],
+            "probes": {str(path): _signature(path) for path in sorted(probed)},
+        }
+        self._dirty = True
+        return files
+
+
+_CACHE: ConfigHashCache | None = None
+
+
+def default_cache_path() -> Path | None:
+    raw = (os.getenv("DEPLOY_CONFIG_HASH_CACHE") or "").strip()
+    return Path(raw).expanduser() if raw else None
+
+
+def get_config_hash_cache(repo_root: Path) -> ConfigHashCache:
+    """Process-wide cache, reloaded when ``DEPLOY_CONFIG_HASH_CACHE`` changes."""
+    global _CACHE
+    path = default_cache_path()
+    if _CACHE is None or _CACHE.path != path or _CACHE.repo_root != repo_root:
+        _CACHE = ConfigHashCache(path, repo_root)
+    return _CACHE
@@ -17,6 +17,7 @@ import time
 from invoke import task
 
 from libs.common import get_env, validate_env, service_domain
+from libs.deploy.config_hash_cache import get_config_hash_cache
 from libs.console import (
     header,
     success,
@@ -26,7 +27,13 @@ from libs.console import (
     env_vars,
     run_with_status,
 )
-from libs.env import VaultSecrets, generate_password, get_secrets, verify_vault_token
+from libs.env import (
+    VaultSecrets,
+    generate_password,
+    get_secrets,
+    secrets_session,
+    verify_vault_token,
+)
 from libs.service_facets import (
     BackupFacet,
     Exemption,
@@ -161,14 +168,21 @@ def _compute_config_hash(
     return hashlib.sha256(combined.encode()).hexdigest()[:12]
 
 
-def _iter_path_files(path: Path) -> list[Path]:
+def _iter_path_files(path: Path, probed: set[Path] | None = None) -> list[Path]:
+    """Files under ``path``; ``probed`` collects every path/directory looked at, which is
+    what the config-hash cache re-stats to know the walk's answer is still current."""
+    if probed is not None:
+        probed.add(path)
     if path.is_file():
         return [path]
     if not path.is_dir():
         return []
+    children = list(path.rglob("*"))
+    if probed is not None:
+        probed.update(child for child in children if child.is_dir())
     return sorted(
         child
-        for child in path.rglob("*")
+        for child in children
         if child.is_file()
         and "__pycache__" not in child.parts
         and not child.name.endswith((".pyc", ".pyo"))
@@ -192,7 +206,11 @@ def _resolve_build_relative(context_dir: Path, source: str) -> Path | None:
     return (context_dir / source).resolve()
 
 
-def _dockerfile_copy_sources(dockerfile: Path, context_dir: Path) -> list[Path]:
+def _dockerfile_copy_sources(
+    dockerfile: Path, context_dir: Path, probed: set[Path] | None = None
+) -> list[Path]:
+    if probed is not None:
+        probed.add(dockerfile)
     if not dockerfile.exists():
         return []
 
@@ -225,12 +243,14 @@ def _dockerfile_copy_sources(dockerfile: Path, context_dir: Path) -> list[Path]:
         for source in parsed_sources:
             resolved = _resolve_build_relative(context_dir, source)
             if resolved:
-                sources.extend(_iter_path_files(resolved))
+                sources.extend(_iter_path_files(resolved, probed))
 
     return sources
 
 
-def _compose_artifact_files(compose_path: str, compose_content: str) -> list[Path]:
+def _compose_artifact_files(
+    compose_path: str, compose_content: str, probed: set[Path] | None = None
+) -> list[Path]:
     try:
         import yaml
     except ModuleNotFoundError:
@@ -271,9 +291,11 @@ def _compose_artifact_files(compose_path: str, compose_content: str) -> list[Pat
                 dockerfile = None
 
             if dockerfile:
-                files.extend(_iter_path_files(dockerfile))
+                files.extend(_iter_path_files(dockerfile, probed))
                 if context_dir:
-                    files.extend(_dockerfile_copy_sources(dockerfile, context_dir))
+                    files.extend(
+                        _dockerfile_copy_sources(dockerfile, context_dir, probed)
+                    )
 
         volumes = service.get("volumes", [])
         if isinstance(volumes, list):
@@ -290,7 +312,7 @@ def _compose_artifact_files(compose_path: str, compose_content: str) -> list[Pat
                     continue
                 resolved = _resolve_compose_relative(compose_dir, source)
                 if resolved:
-                    files.extend(_iter_path_files(resolved))
+                    files.extend(_iter_path_files(resolved, probed))
 
     return sorted(set(files))
 
@@ -323,8 +345,24 @@ def config_hash_from_items(
     the files were gathered from disk (the deploy path) or from a git ref (the drift
     reconciler) — there is no second, divergent implementation to disagree with the deploy.
     """
-    art = [f"{lbl}:{hashlib.sha256(c).hexdigest()}" for lbl, c in artifact_items]
-    deps = [f"dep:{lbl}:{hashlib.sha256(c).hexdigest()}" for lbl, c in dep_items]
+    return config_hash_from_digests(
+        compose_content,
+        env_vars,
+        [(lbl, hashlib.sha256(c).hexdigest()) for lbl, c in artifact_items],
+        [(lbl, hashlib.sha256(c).hexdigest()) for lbl, c in dep_items],
+    )
+
+
+def config_hash_from_digests(
+    compose_content: str,
+    env_vars: dict[str, str],
+    artifact_digests: list[tuple[str, str]],
+    dep_digests: list[tuple[str, str]],
+) -> str:
+    """:func:`config_hash_from_items` with each file's sha256 hex digest already taken —
+    the form the config-hash cache feeds, so cached and uncached hashes are one code path."""
+    art = [f"{lbl}:{digest}" for lbl, digest in artifact_digests]
+    deps = [f"dep:{lbl}:{digest}" for lbl, digest in dep_digests]
     payload = "\n".join(art)
     if deps:
         payload = f"{payload}\n" + "\n".join(deps)
@@ -345,35 +383,38 @@ def _dependency_items_from_disk(compose_path: str) -> list[tuple[str, bytes]]:
     """(repo-relative label, content) for a service's DECLARED extra build/config dependencies,
     sorted by path. Empty unless the service lists `depends_on` globs in deploy-dependencies.yaml
     (a no-op for services that only depend on their own directory)."""
-    import glob as _glob
-    from libs.deploy_dependencies import (
-        extra_dependency_globs,
-        service_key_from_path,
-    )
+    return [
+        (_repo_rel(path), path.read_bytes())
+        for path in _dependency_files_from_disk(compose_path)
+    ]
+
+
+def _dependency_files_from_disk(compose_path: str) -> list[Path]:
+    """Resolved files matched by the service's declared dependency globs, sorted.
+
+    Matches come from :func:`libs.deploy_dependencies.dependency_files`, an index of
+    every service's glob matches built from one walk per glob base directory."""
+    from libs.deploy_dependencies import dependency_files, service_key_from_path
 
     key = service_key_from_path(compose_path)
     if not key:
         return []
-    globs = extra_dependency_globs(key)
-    if not globs:
-        return []
 
     matched: set[Path] = set()
-    for pattern in globs:
-        for hit in _glob.glob(str(_REPO_ROOT / pattern), recursive=True):
-            p = Path(hit)
-            # Exclude transient __pycache__/.pyc/.pyo (mirrors _iter_path_files). The iac-runner
-            # deploys from a CLEAN git checkout that has none, so its hash already ignores them;
-            # without this exclusion a dev machine (which has compiled .pyc) computes a DIFFERENT
-            # hash than the iac-runner for any dep-baking service — non-reproducible by accident.
-            if (
-                p.is_file()
-                and "__pycache__" not in p.parts
-                and not p.name.endswith((".pyc", ".pyo"))
-            ):
-                matched.add(p.resolve())
-
-    return [(_repo_rel(path), path.read_bytes()) for path in sorted(matched)]
+    for rel in dependency_files(key, _REPO_ROOT):
+        p = _REPO_ROOT / rel
+        # Exclude transient __pycache__/.pyc/.pyo (mirrors _iter_path_files). The iac-runner
+        # deploys from a CLEAN git checkout that has none, so its hash already ignores them;
+        # without this exclusion a dev machine (which has compiled .pyc) computes a DIFFERENT
+        # hash than the iac-runner for any dep-baking service — non-reproducible by accident.
+        if (
+            p.is_file()
+            and "__pycache__" not in p.parts
+            and not p.name.endswith((".pyc", ".pyo"))
+        ):
+            matched.add(p.resolve())
+
+    return sorted(matched)
 
 
 def _parse_env_text(env_text: str) -> dict[str, str]:
@@ -387,6 +428,57 @@ def _parse_env_text(env_text: str) -> dict[str, str]:
     return env
 
 
+# Deployer.get_remote_config_identity field -> compose env key carrying it.
+_CONFIG_IDENTITY_KEYS = {
+    "runtime_hash": "IAC_CONFIG_HASH",
+    "source_hash": "IAC_SOURCE_CONFIG_HASH",
+    "deploy_ref": "IAC_DEPLOY_REF",
+    "identity_schema": "INFRA_IDENTITY_SCHEMA",
+    "managed_by": "INFRA_MANAGED_BY",
+    "service_id": "INFRA_SERVICE_ID",
+    "environment": "INFRA_ENVIRONMENT",
+}
+
+
+def _config_identity_from_env(env_str: str) -> dict[str, str | None]:
+    wanted = set(_CONFIG_IDENTITY_KEYS.values())
+    values: dict[str, str] = {}
+    for line in env_str.split("\n"):
+        key, separator, value = line.partition("=")
+        if separator and key in wanted:
+            values[key] = value.strip()
+    return {field: values.get(key) for field, key in _CONFIG_IDENTITY_KEYS.items()}
+
+
+def config_identity_current(
+    remote_identity: dict[str, str | None],
+    local_hash: str,
+    source_hash: str,
+    expected_deploy_identity: dict[str, str],
+) -> bool:
+    """Whether the deployed compose already carries this exact config identity.
+
+    The one skip rule shared by ``Deployer.sync`` and the fleet sync planner
+    (libs.deploy.sync_planner): runtime hash, versioned source hash at an exact
+    deployed ref, and the INFRA_* service identity must all match.
+    """
+    remote_ref = remote_identity.get("deploy_ref") or ""
+    return (
+        remote_identity.get("runtime_hash") == local_hash
+        and remote_identity.get("source_hash") == source_hash
+        and bool(EXACT_COMMIT_RE.fullmatch(remote_ref))
+        and all(
+            remote_identity.get(remote_key) == expected_deploy_identity[env_key]
+            for remote_key, env_key in (
+                ("identity_schema", "INFRA_IDENTITY_SCHEMA"),
+                ("managed_by", "INFRA_MANAGED_BY"),
+                ("service_id", "INFRA_SERVICE_ID"),
+                ("environment", "INFRA_ENVIRONMENT"),
+            )
+        )
+    )
+
+
 def _preserve_runtime_env(env_str: str, existing_env: str | None) -> str:
     desired = _parse_env_text(env_str)
     existing = _parse_env_text(existing_env or "")
@@ -445,6 +537,10 @@ class Deployer:
     # Keys supplied by a runtime secret backend must affect deployment
     # idempotence, but cannot be reconstructed from a release in read-only CI.
     runtime_only_config_keys: frozenset[str] = frozenset()
+    # Other services (same project/env) whose Vault paths this service's sync
+    # reads, e.g. ("postgres", "redis"). sync() prefetches them together with
+    # the service's own path in one concurrent batch over the shared session.
+    secret_dependencies: tuple[str, ...] = ()
 
     # --- Service facets (#541 convergence): the Deployer subclass is the SINGLE
     # declaration point for per-service operational facts; libs.service_registry
@@ -514,7 +610,9 @@ class Deployer:
         return {k: v for k, v in base.items() if v is not None}
 
     @classmethod
-    def compose_env_overrides(cls, *, env: str, domain: str, env_suffix: str) -> dict[str, str]:
+    def compose_env_overrides(
+        cls, *, env: str, domain: str, env_suffix: str
+    ) -> dict[str, str]:
         """Extra compose env vars a fixed-app deploy (libs.deploy.promote.deploy) should
         merge in beyond its own shared, hardcoded assembly (IMAGE_TAG, INTERNAL_DOMAIN,
         identity.deploy_env(), openpanel_env(), otel_env(), ...). Default: none.
@@ -578,6 +676,29 @@ class Deployer:
             project=project, service=cls.service, env=env or e.get("ENV", "production")
         )
 
+    @classmethod
+    def prefetch_secrets(cls, env: str | None = None) -> dict[str, dict[str, str]]:
+        """Warm the secrets session with every Vault path sync will read.
+
+        Best effort: a path that cannot be read is skipped here and surfaces
+        through the normal read in ensure_runtime_secrets/pre_compose.
+        """
+        return secrets_session().prefetch(cls.secret_paths(env))
+
+    @classmethod
+    def secret_paths(cls, env: str | None = None) -> list[str]:
+        """Vault paths sync reads: the service's own plus its secret_dependencies."""
+        e = cls.env()
+        project = cls.project_name(e)
+        env_name = env or e.get("ENV", "production")
+        paths = []
+        for service in (cls.service, *cls.secret_dependencies):
+            try:
+                paths.append(get_secrets(project, service, env_name).path)
+            except ValueError:
+                continue
+        return paths
+
     @classmethod
     def ensure_runtime_secrets(
         cls, c: "Context" | None = None, *, env: str | None = None
@@ -978,34 +1099,47 @@ class Deployer:
         *,
         min_started_at: float | None = None,
     ) -> bool:
-        deadline = time.monotonic() + max(0, timeout_seconds)
-        while True:
-            deployments = cls._get_compose_deployments(client, compose_id)
-            current_ids = cls._deployment_ids(deployments)
-            new_ids = current_ids - previous_ids
-            if new_ids and isinstance(deployments, list):
-                for deployment in deployments:
-                    deployment_id = str(
-                        deployment.get("deploymentId") or deployment.get("id") or ""
-                    )
-                    if deployment_id not in new_ids:
-                        continue
-                    if min_started_at is not None and cls._started_before_trigger(
-                        deployment, min_started_at
-                    ):
-                        # infra2#525: a "new" record whose own timestamp predates when
-                        # WE called deploy/redeploy_compose cannot be the record our
-                        # call produced — it belongs to a different, unrelated
-                        # trigger. Skip it rather than reporting its status as ours.
-                        continue
-                    status = str(deployment.get("status") or "").lower()
-                    if status == "error":
-                        raise RuntimeError("Dokploy deployment record entered error")
-                    if status in {"running", "done", "success", "successful"}:
-                        return True
-            if time.monotonic() >= deadline:
+        from libs.deploy.rollout import deployment_watcher
+
+        def settle(deployments: list[dict], timed_out: bool) -> bool | None:
+            if timed_out:
                 return False
-            time.sleep(max(1, interval_seconds))
+            new_ids = cls._deployment_ids(deployments) - previous_ids
+            for deployment in deployments if new_ids else []:
+                deployment_id = str(
+                    deployment.get("deploymentId") or deployment.get("id") or ""
+                )
+                if deployment_id not in new_ids:
+                    continue
+                if min_started_at is not None and cls._started_before_trigger(
+                    deployment, min_started_at
+                ):
+                    # infra2#525: a "new" record whose own timestamp predates when
+                    # WE called deploy/redeploy_compose cannot be the record our
+                    # call produced — it belongs to a different, unrelated
+                    # trigger. Skip it rather than reporting its status as ours.
+                    continue
+                status = str(deployment.get("status") or "").lower()
+                if status == "error":
+                    raise RuntimeError("Dokploy deployment record entered error")
+                if status in {"running", "done", "success", "successful"}:
+                    return True
+            return None
+
+        # Concurrent syncs on one client share a single poll per compose per tick.
+        watcher = deployment_watcher(
+            client,
+            lambda cid: cls._get_compose_deployments(client, cid),
+            fetch_key="deployer",
+        )
+        return watcher.wait(
+            watcher.watch(
+                compose_id,
+                settle,
+                timeout_seconds=timeout_seconds,
+                interval_seconds=max(1, interval_seconds),
+            )
+        )
 
     @classmethod
     def post_compose(cls, c: "Context", shared_tasks: Any) -> bool:
@@ -1019,8 +1153,14 @@ class Deployer:
         return False
 
     @classmethod
-    def get_remote_config_identity(cls) -> dict[str, str | None]:
-        """Read the config identity stored in Dokploy's effective compose env."""
+    def get_remote_config_identity(
+        cls, compose_id: str | None = None
+    ) -> dict[str, str | None]:
+        """Read the config identity stored in Dokploy's effective compose env.
+
+        With ``compose_id`` (pinned by the sync that just deployed it) this is one
+        ``compose.one`` read; without it the compose is resolved by name first.
+        """
         from libs.dokploy import get_dokploy
 
         e = cls.env()
@@ -1030,49 +1170,18 @@ class Deployer:
         host = f"cloud.{domain}" if domain else None
 
         client = get_dokploy(host=host)
-        existing = client.find_compose_by_name(
-            cls.service, project_name, env_name=env_name
-        )
-
-        if not existing:
-            return {
-                "runtime_hash": None,
-                "source_hash": None,
-                "deploy_ref": None,
-                "identity_schema": None,
-                "managed_by": None,
-                "service_id": None,
-                "environment": None,
-            }
-
-        env_str = existing.get("env", "")
-        values: dict[str, str] = {}
-        for line in env_str.split("\n"):
-            key, separator, value = line.partition("=")
-            if separator and key in {
-                "IAC_CONFIG_HASH",
-                "IAC_SOURCE_CONFIG_HASH",
-                "IAC_DEPLOY_REF",
-                "INFRA_IDENTITY_SCHEMA",
-                "INFRA_MANAGED_BY",
-                "INFRA_SERVICE_ID",
-                "INFRA_ENVIRONMENT",
-            }:
-                values[key] = value.strip()
-        return {
-            "runtime_hash": values.get("IAC_CONFIG_HASH"),
-            "source_hash": values.get("IAC_SOURCE_CONFIG_HASH"),
-            "deploy_ref": values.get("IAC_DEPLOY_REF"),
-            "identity_schema": values.get("INFRA_IDENTITY_SCHEMA"),
-            "managed_by": values.get("INFRA_MANAGED_BY"),
-            "service_id": values.get("INFRA_SERVICE_ID"),
-            "environment": values.get("INFRA_ENVIRONMENT"),
-        }
+        if compose_id:
+            existing = client.get_compose(compose_id)
+        else:
+            existing = client.find_compose_by_name(
+                cls.service, project_name, env_name=env_name
+            )
+        return _config_identity_from_env((existing or {}).get("env") or "")
 
     @classmethod
-    def get_remote_config_hash(cls) -> str | None:
+    def get_remote_config_hash(cls, compose_id: str | None = None) -> str | None:
         """Backward-compatible accessor for the runtime idempotence hash."""
-        return cls.get_remote_config_identity()["runtime_hash"]
+        return cls.get_remote_config_identity(compose_id)["runtime_hash"]
 
     @classmethod
     def _resolve_record_timeout(cls, timeout_seconds: int | None = None) -> int:
@@ -1108,7 +1217,12 @@ class Deployer:
         )
 
     @classmethod
-    def _await_effective_config_hash(cls, expected_hash: str) -> str | None:
+    def _await_effective_config_hash(
+        cls,
+        expected_hash: str,
+        compose_id: str | None = None,
+        stats: dict | None = None,
+    ) -> str | None:
         """Poll Dokploy's effective IAC_CONFIG_HASH until it matches `expected_hash`
         or the deployment timeout elapses, returning the last value read.
 
@@ -1125,20 +1239,44 @@ class Deployer:
         retried until the deadline; only if no clean read ever lands in the whole
         window is the last error surfaced. The timeout/interval honor the same env
         overrides as the deploy-record wait.
+
+        ``compose_id`` pins the compose the sync just deployed, so each poll is a
+        single ``compose.one`` read instead of a by-name lookup; the identity from
+        the last clean read is then left in ``stats["identity"]`` for the caller's
+        identity check. ``stats`` also receives ``polls`` and ``settle_seconds``.
         """
-        deadline = time.monotonic() + cls._resolve_record_timeout()
+        started = time.monotonic()
+        deadline = started + cls._resolve_record_timeout()
         interval = max(1, cls._resolve_record_interval())
         last_value: str | None = None
         last_error: Exception | None = None
+        polls = 0
+
+        def record(now: float) -> None:
+            if stats is not None:
+                stats["polls"] = polls
+                stats["settle_seconds"] = round(now - started, 3)
+
         while True:
+            polls += 1
             try:
-                last_value = cls.get_remote_config_hash()
+                if compose_id:
+                    identity = cls.get_remote_config_identity(compose_id)
+                    if stats is not None:
+                        stats["identity"] = identity
+                    last_value = identity["runtime_hash"]
+                else:
+                    last_value = cls.get_remote_config_hash()
                 last_error = None
             except Exception as exc:  # transient Dokploy read; tolerate within window
                 last_error = exc
             if last_value == expected_hash:
+                if stats is not None:
+                    record(time.monotonic())
                 return last_value
-            if time.monotonic() >= deadline:
+            now = time.monotonic()
+            if now >= deadline:
+                record(now)
                 if last_value is None and last_error is not None:
                     raise last_error
                 return last_value
@@ -1209,14 +1347,31 @@ class Deployer:
         cross-service dependencies are folded in so a change to a shared artifact this service
         bakes in (a contract, pinned config) flips its hash — keeping the iac-runner fan-out and
         the hash gate in agreement.
+
+        File digests come from :mod:`libs.deploy.config_hash_cache`, so an unchanged service
+        costs stat calls only; the result is bit-identical to :func:`config_hash_from_items`
+        over the same files.
         """
         compose_content = cls.get_compose_content(c)
-        return config_hash_from_items(
+        cache = get_config_hash_cache(_REPO_ROOT)
+        artifact_files = cache.artifact_files(
+            cls.compose_path,
+            compose_content,
+            lambda probed: _compose_artifact_files(
+                cls.compose_path, compose_content, probed
+            ),
+        )
+        config_hash = config_hash_from_digests(
             compose_content,
             env_vars,
-            _artifact_items_from_disk(cls.compose_path, compose_content),
-            _dependency_items_from_disk(cls.compose_path),
+            [(_repo_rel(path), cache.file_sha256(path)) for path in artifact_files],
+            [
+                (_repo_rel(path), cache.file_sha256(path))
+                for path in _dependency_files_from_disk(cls.compose_path)
+            ],
         )
+        cache.save()
+        return config_hash
 
     @classmethod
     def verify_vault_app_token(cls) -> dict:
@@ -1315,6 +1470,7 @@ class Deployer:
                 "details": f"Could not verify VAULT_APP_TOKEN: {exc}",
             }
 
+        cls.prefetch_secrets()
         if not cls.ensure_runtime_secrets(c):
             return {
                 "action": "failed",
@@ -1411,25 +1567,9 @@ class Deployer:
         info(f"Local config hash: {local_hash}")
         info(f"Remote config hash: {remote_hash or 'not found'}")
 
-        remote_ref = remote_identity["deploy_ref"] or ""
         expected_deploy_identity = runtime_identity.deploy_env()
-        remote_source_identity_valid = remote_identity[
-            "source_hash"
-        ] == source_hash and bool(EXACT_COMMIT_RE.fullmatch(remote_ref))
-        remote_service_identity_valid = all(
-            remote_identity.get(remote_key) == expected_deploy_identity[env_key]
-            for remote_key, env_key in (
-                ("identity_schema", "INFRA_IDENTITY_SCHEMA"),
-                ("managed_by", "INFRA_MANAGED_BY"),
-                ("service_id", "INFRA_SERVICE_ID"),
-                ("environment", "INFRA_ENVIRONMENT"),
-            )
-        )
-        if (
-            not force
-            and local_hash == remote_hash
-            and remote_source_identity_valid
-            and remote_service_identity_valid
+        if not force and config_identity_current(
+            remote_identity, local_hash, source_hash, expected_deploy_identity
         ):
             success(f"{cls.service}: config unchanged, skipping deploy")
             return {
@@ -1458,7 +1598,7 @@ class Deployer:
         env_vars_dict["IAC_CONFIG_HASH"] = local_hash
         env_vars_dict["IAC_SOURCE_CONFIG_HASH"] = source_hash
         env_vars_dict["IAC_DEPLOY_REF"] = deploy_ref
-        env_vars_dict.update(runtime_identity.deploy_env())
+        env_vars_dict.update(expected_deploy_identity)
         if cls.telemetry_service_name:
             telemetry_identity = ServiceIdentity.build(
                 service_id,
@@ -1489,8 +1629,15 @@ class Deployer:
         # hash can briefly lag the deploy call by a few seconds. Poll until it
         # advances rather than false-failing on that settling delay; still fails
         # closed if it never advances within the window.
+        #
+        # compose_id is pinned from the deploy call, so each poll reads compose.one
+        # directly instead of re-resolving the compose by name.
+        verification: dict = {}
         try:
-            effective_hash = cls._await_effective_config_hash(local_hash)
+            effective_hash = cls._await_effective_config_hash(
+                local_hash, compose_id or None, verification
+            )
+            pinned_identity = verification.pop("identity", None)
         except Exception as exc:  # noqa: BLE001 - verification must not crash the task.
             error(f"Post-deploy verification could not read effective config: {exc}")
             return {
@@ -1509,10 +1656,11 @@ class Deployer:
                     f"(expected {local_hash}, got {effective_hash or 'none'}); "
                     "runtime may still be running prior config"
                 ),
+                "verification": verification,
             }
 
         try:
-            effective_identity = cls.get_remote_config_identity()
+            effective_identity = pinned_identity or cls.get_remote_config_identity()
         except Exception as exc:  # noqa: BLE001 - identity proof is fail-closed.
             error(f"Post-deploy identity verification failed: {exc}")
             return {
@@ -1568,6 +1716,7 @@ class Deployer:
         return {
             "action": "updated" if remote_hash else "created",
             "details": f"composeId: {compose_id}",
+            "verification": verification,
         }
 
     @classmethod
@@ -1637,7 +1786,10 @@ def make_tasks(deployer_cls: type[Deployer], shared_tasks: Any) -> dict:
         the deliberate fail-closed skip when the remote hash is unreadable — stays
         a success (exit 0): that safety net is preserved unchanged.
         """
-        result = deployer_cls.sync(c, force=force)
+        from libs.dokploy import dokploy_session
+
+        with dokploy_session():
+            result = deployer_cls.sync(c, force=force)
         if isinstance(result, dict) and result.get("action") == "failed":
             from invoke.exceptions import Exit
 
@@ -25,6 +25,7 @@ from libs.common import infra_domain
 from libs.compose_lock import compose_write_lock
 from libs.console import warning
 from libs.deploy_env_config import app_compose_env_config, otel_env
+from libs.deploy.rollout import deployment_watcher
 from libs.deploy_queue import deployment_start_epoch
 from tools.deploy_failure_snapshot import emit_failure_snapshot
 from tools.openpanel_clients import openpanel_env
@@ -103,13 +104,13 @@ def wait_for_rollout(
     documented risk — see libs/compose_lock.py for the complementary in-process lock
     that keeps our OWN callers from ever producing that overlap.
     """
-    deadline = _now() + max(0, timeout)
-    while True:
-        new = [
-            d
-            for d in (client.get_compose_deployments(compose_id) or [])
-            if _dep_id(d) and _dep_id(d) not in before_ids
-        ]
+
+    def settle(deployments: list[dict], timed_out: bool) -> dict | None:
+        if timed_out:
+            raise TimeoutError(
+                f"deploy rollout did not finish within {timeout}s (compose {compose_id})"
+            )
+        new = [d for d in deployments if _dep_id(d) and _dep_id(d) not in before_ids]
         if min_started_at is not None:
             new = [d for d in new if not _started_before(d, min_started_at)]
         for d in new:
@@ -120,11 +121,19 @@ def wait_for_rollout(
                 )
             if status in {"done", "success", "successful"}:
                 return d
-        if _now() >= deadline:
-            raise TimeoutError(
-                f"deploy rollout did not finish within {timeout}s (compose {compose_id})"
-            )
-        _sleep(max(1, interval))
+        return None
+
+    # One shared allByCompose poll per compose per tick across every concurrent
+    # rollout on this client (libs.deploy.rollout.DeploymentWatcher).
+    watcher = deployment_watcher(client, _sleep=_sleep, _now=_now)
+    return watcher.wait(
+        watcher.watch(
+            compose_id,
+            settle,
+            timeout_seconds=timeout,
+            interval_seconds=max(1, interval),
+        )
+    )
 
 
 def _env_value(env_str: str, key: str) -> str | None:
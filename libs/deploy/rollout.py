@@ -23,22 +23,40 @@ caller keeps its exact behaviour while sharing the loop:
                           False: return a ``timeout`` result (deployer, canary).
 
 It returns a rich :class:`RolloutResult`; each caller maps that to its own return
-type (bool / dict / CanaryStep). **This PR adds the poller + tests only — it does
-NOT rewire the three callers.** Migrating them (and whether the deploy strategy
-host is ``libs/deploy`` or the app framework — the open (a)/(b) decision) is the
-discussion this draft exists for.
+type (bool / dict / CanaryStep).
+
+Polling itself lives in :class:`DeploymentWatcher`: every in-flight rollout on one
+Dokploy client registers a *settle* callback for its compose, and a single loop
+fetches ``deployment.allByCompose`` once per compose per tick and hands the records
+to every waiter on that compose. There is no background thread -- whichever waiter
+is blocked in :meth:`DeploymentWatcher.wait` drives the loop (leader/follower), so
+concurrent deploys and batch reconciles share polls instead of duplicating them.
+The per-compose interval is adaptive: fast right after the trigger, backing off
+while nothing changes, and snapping back to fast when a record's status moves.
+``promote.wait_for_rollout`` and ``Deployer._wait_for_new_deployment_record`` wait
+through :func:`deployment_watcher`; their own success/error rules are their settle
+callbacks.
 """
 
 from __future__ import annotations
 
+import threading
 import time
+import weakref
 from collections.abc import Callable
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from typing import Any
 
 # Dokploy deployment statuses we treat as "the rollout is progressing/succeeded".
 _RUNNING_OR_DONE = {"running", "done", "success", "successful"}
 _TERMINAL_GOOD = {"done", "success", "successful"}
+# Adaptive poll cadence: the first re-poll after a trigger comes this fast, then each
+# quiet poll stretches the gap by BACKOFF_FACTOR up to the caller's interval.
+MIN_POLL_INTERVAL_SECONDS = 1.0
+BACKOFF_FACTOR = 1.5
+# How often a follower re-checks whether it should take over driving the loop.
+_FOLLOWER_WAIT_SECONDS = 0.5
 
 
 class RolloutError(RuntimeError):
@@ -77,6 +95,230 @@ def _newest(deployments: list[dict[str, Any]], ids: set[str]) -> dict[str, Any]:
     )
 
 
+# settle(deployments, timed_out) -> a result to resolve the waiter with, or None to keep
+# waiting. With timed_out=True it must return a result (or raise).
+Settle = Callable[[list[dict[str, Any]], bool], Any]
+
+
+@dataclass
+class _Watch:
+    compose_id: str
+    settle: Settle
+    deadline: float
+    max_interval: float
+    future: Future = field(default_factory=Future)
+    attempts: int = 0
+
+
+@dataclass
+class _ComposePoll:
+    interval: float
+    next_at: float | None = None  # None: due on the next tick
+    fingerprint: tuple = ()
+    last_frame: list[dict[str, Any]] = field(default_factory=list)
+
+
+class DeploymentWatcher:
+    """Multiplex many rollout waits over one deployment-record polling loop.
+
+    ``fetch(compose_id)`` returns a compose's deployment records. Each
+    :meth:`watch` registers a settle callback and returns a ``Future``;
+    :meth:`wait` blocks on it, driving the shared loop while no other waiter is.
+    Every tick fetches each *due* compose exactly once, however many waiters it has.
+    ``_sleep``/``_now`` are injectable like the pollers this replaces, and ``_now``
+    is read once per tick, so single-waiter timing matches the old loops exactly.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], list[dict[str, Any]]],
+        *,
+        min_interval: float = MIN_POLL_INTERVAL_SECONDS,
+        backoff: float = BACKOFF_FACTOR,
+        _sleep: Callable[[float], None] = time.sleep,
+        _now: Callable[[], float] = time.monotonic,
+    ):
+        self._fetch = fetch
+        self._min_interval = min_interval
+        self._backoff = backoff
+        self._sleep = _sleep
+        self._now = _now
+        self._cond = threading.Condition()
+        self._watches: list[_Watch] = []
+        self._polls: dict[str, _ComposePoll] = {}
+        self._clock: float | None = None  # _now() as of the last tick
+        self._driving = False
+        self.fetches = 0
+
+    def watch(
+        self,
+        compose_id: str,
+        settle: Settle,
+        *,
+        timeout_seconds: float,
+        interval_seconds: float,
+    ) -> Future:
+        """Register a waiter; its compose is polled on the next tick."""
+        watch = _Watch(
+            compose_id=compose_id,
+            settle=settle,
+            deadline=self._now() + max(0, timeout_seconds),
+            max_interval=max(self._min_interval, float(interval_seconds)),
+        )
+        with self._cond:
+            self._watches.append(watch)
+            poll = self._polls.setdefault(
+                compose_id, _ComposePoll(interval=self._min_interval)
+            )
+            poll.next_at = None
+        return watch.future
+
+    def wait(self, future: Future) -> Any:
+        """Block until ``future`` resolves, polling for every waiter while leading."""
+        with self._cond:
+            while not future.done() and self._driving:
+                self._cond.wait(_FOLLOWER_WAIT_SECONDS)
+            if future.done():
+                return future.result()
+            self._driving = True
+        try:
+            while not future.done():
+                delay = self._tick()
+                if not future.done() and delay is not None:
+                    self._sleep(delay)
+        finally:
+            with self._cond:
+                self._driving = False
+                self._cond.notify_all()
+        return future.result()
+
+    def _tick(self) -> float | None:
+        """Poll every due compose once; return the delay until the next one is due."""
+        with self._cond:
+            active = [w for w in self._watches if not w.future.done()]
+            due = {
+                w.compose_id
+                for w in active
+                if self._polls[w.compose_id].next_at is None
+                or self._clock is None
+                or self._polls[w.compose_id].next_at <= self._clock
+            }
+        frames: dict[str, list[dict[str, Any]]] = {}
+        for compose_id in sorted(due):
+            self.fetches += 1
+            try:
+                frames[compose_id] = self._fetch(compose_id) or []
+                self._polls[compose_id].last_frame = frames[compose_id]
+            except Exception as exc:  # noqa: BLE001 - surfaced to each waiter
+                for w in active:
+                    if w.compose_id == compose_id:
+                        w.future.set_exception(exc)
+        for w in active:
+            if w.future.done() or w.compose_id not in frames:
+                continue
+            w.attempts += 1
+            self._resolve(w, frames[w.compose_id], timed_out=False)
+
+        with self._cond:
+            self._watches = [w for w in self._watches if not w.future.done()]
+            self._cond.notify_all()
+            if not self._watches:
+                self._polls.clear()
+                return None
+            now = self._now()
+            self._clock = now
+            for w in self._watches:
+                if now >= w.deadline:
+                    frame = self._polls[w.compose_id].last_frame
+                    self._resolve(w, frame, timed_out=True)
+            self._watches = [w for w in self._watches if not w.future.done()]
+            live = {w.compose_id for w in self._watches}
+            for compose_id in list(self._polls):
+                if compose_id not in live:
+                    del self._polls[compose_id]
+            for compose_id in due & live:
+                self._reschedule(compose_id, frames.get(compose_id), now)
+            self._cond.notify_all()
+            if not self._watches:
+                return None
+            # Deadlines are checked after a poll (as the old loops did), so the next
+            # wake-up is simply the next due poll.
+            self._clock = min(
+                poll.next_at if poll.next_at is not None else now
+                for poll in self._polls.values()
+            )
+            return max(0.0, self._clock - now)
+
+    def _reschedule(
+        self, compose_id: str, frame: list[dict[str, Any]] | None, now: float
+    ) -> None:
+        poll = self._polls[compose_id]
+        cap = min(w.max_interval for w in self._watches if w.compose_id == compose_id)
+        fingerprint = tuple(
+            sorted(
+                (_deployment_id(d), str(d.get("status") or ""))
+                for d in (frame or [])
+                if isinstance(d, dict)
+            )
+        )
+        if poll.next_at is not None and fingerprint != poll.fingerprint:
+            poll.interval = self._min_interval  # something moved: look again soon
+        elif poll.next_at is not None:
+            poll.interval = min(cap, poll.interval * self._backoff)
+        poll.interval = min(poll.interval, cap)
+        poll.fingerprint = fingerprint
+        poll.next_at = now + poll.interval
+
+    @staticmethod
+    def _resolve(w: _Watch, frame: list[dict[str, Any]], *, timed_out: bool) -> None:
+        try:
+            result = w.settle(frame, timed_out)
+        except BaseException as exc:  # noqa: BLE001 - delivered through the future
+            w.future.set_exception(exc)
+            return
+        if result is not None:
+            w.future.set_result(result)
+        elif timed_out:
+            w.future.set_exception(
+                TimeoutError(f"no settle result for compose {w.compose_id} at deadline")
+            )
+
+
+_WATCHERS: "weakref.WeakKeyDictionary[Any, dict[str, DeploymentWatcher]]" = (
+    weakref.WeakKeyDictionary()
+)
+_WATCHERS_LOCK = threading.Lock()
+
+
+def deployment_watcher(
+    client: Any,
+    fetch: Callable[[str], list[dict[str, Any]]] | None = None,
+    *,
+    fetch_key: str = "allByCompose",
+    _sleep: Callable[[float], None] = time.sleep,
+    _now: Callable[[], float] = time.monotonic,
+) -> DeploymentWatcher:
+    """The watcher shared by every rollout wait on ``client`` with the same fetch.
+
+    ``fetch`` defaults to ``client.get_compose_deployments``; a caller with its own
+    fetch semantics names them with ``fetch_key`` so it only shares with like
+    callers. Waits with an injected clock/sleep (tests) get a private watcher so they
+    never share timing with real waiters.
+    """
+    fetch = fetch or client.get_compose_deployments
+    if _sleep is not time.sleep or _now is not time.monotonic:
+        return DeploymentWatcher(fetch, _sleep=_sleep, _now=_now)
+    with _WATCHERS_LOCK:
+        try:
+            per_client = _WATCHERS.setdefault(client, {})
+        except TypeError:  # client cannot be weakly referenced: do not share
+            return DeploymentWatcher(fetch)
+        watcher = per_client.get(fetch_key)
+        if watcher is None:
+            watcher = per_client[fetch_key] = DeploymentWatcher(fetch)
+    return watcher
+
+
 def wait_for_deployment(
     get_deployments: Callable[[], list[dict[str, Any]]],
     before_ids: set[str],
@@ -95,14 +337,17 @@ def wait_for_deployment(
     (the caller injects how to fetch them, so this stays client-agnostic). See the
     module docstring for how the three flags reproduce each existing poller.
     """
-    deadline = _now() + max(0, timeout_seconds)
     attempts = 0
-    while True:
-        attempts += 1
-        deployments = get_deployments() or []
+
+    def settle(
+        deployments: list[dict[str, Any]], timed_out: bool
+    ) -> RolloutResult | None:
+        nonlocal attempts
+        if not timed_out:
+            attempts += 1
         current_ids = {_deployment_id(d) for d in deployments if _deployment_id(d)}
         new_ids = current_ids - before_ids
-        if new_ids:
+        if new_ids and not timed_out:
             latest = _newest(deployments, new_ids)
             status = str(latest.get("status") or "").lower()
             ids = tuple(sorted(new_ids))
@@ -118,15 +363,30 @@ def wait_for_deployment(
                 return RolloutResult(
                     "done" if terminal else "running", latest, ids, attempts
                 )
-        if _now() >= deadline:
-            if raise_on_timeout:
-                raise TimeoutError(
-                    "no new deployment reached a terminal status in the window"
-                )
-            return RolloutResult(
-                "timeout",
-                _newest(deployments, new_ids) if new_ids else {},
-                tuple(sorted(new_ids)),
-                attempts,
+        if not timed_out:
+            return None
+        if raise_on_timeout:
+            raise TimeoutError(
+                "no new deployment reached a terminal status in the window"
             )
-        _sleep(interval_seconds)
+        return RolloutResult(
+            "timeout",
+            _newest(deployments, new_ids) if new_ids else {},
+            tuple(sorted(new_ids)),
+            attempts,
+        )
+
+    watcher = DeploymentWatcher(
+        lambda _compose_id: get_deployments(),
+        min_interval=interval_seconds,
+        _sleep=_sleep,
+        _now=_now,
+    )
+    return watcher.wait(
+        watcher.watch(
+            "",
+            settle,
+            timeout_seconds=timeout_seconds,
+            interval_seconds=interval_seconds,
+        )
+    )
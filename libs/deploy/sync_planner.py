@@ -0,0 +1,275 @@
+"""Fleet-level sync planner: which selected services actually need a deploy.
+
+The iac-runner runs ``invoke <svc>.sync`` per selected service, and only deep
+inside ``Deployer.sync`` (vault token preflight, runtime-secret ensure, two
+config-hash passes, a remote identity read) does a service find out it is
+unchanged. The planner answers that question for every candidate in ONE
+process, before any sync task is spawned:
+
+- local runtime and source config hashes through the same Deployer hooks sync
+  uses (file digests shared through :mod:`libs.deploy.config_hash_cache`);
+- every remote identity from one ``project.all`` topology read plus one bounded
+  ``compose.one`` fan-out (``get_composes_many``);
+- the skip rule shared with sync, :func:`libs.deploy.deployer.config_identity_current`.
+
+A service is planned ``skip`` only when its sync would provably skip too. Anything
+the planner cannot prove — no compose yet, unreadable remote, a runtime secret
+sync would still have to generate, a legacy VAULT_APP_TOKEN sync must verify, a
+Deployer customizing ``sync`` or its secret/token preflight, any error — is
+planned ``deploy`` and left to the real sync task, which keeps every one of its
+own gates. Read-only: nothing is written to Vault or Dokploy.
+
+CLI (run by bootstrap/06.iac_runner/sync_runner.py from the checkout, with the
+same env as the sync tasks); the JSON plan is the last stdout line::
+
+    python -m libs.deploy.sync_planner --ref <40-char sha> platform/redis ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+from libs.common import validate_env
+from libs.deploy.deployer import (
+    EXACT_COMMIT_RE,
+    SOURCE_CONFIG_HASH_VERSION,
+    Deployer,
+    _config_identity_from_env,
+    config_identity_current,
+    load_deployer_class,
+)
+from libs.env import VaultSecrets, secrets_session
+
+if TYPE_CHECKING:
+    from invoke import Context
+
+__all__ = ["DEPLOY", "SKIP", "PlannedService", "plan_services", "main"]
+
+DEPLOY = "deploy"
+SKIP = "skip"
+
+
+@dataclass(frozen=True)
+class PlannedService:
+    service: str
+    action: str  # DEPLOY | SKIP
+    reason: str
+
+
+def _deploy(service: str, reason: str) -> PlannedService:
+    return PlannedService(service, DEPLOY, reason)
+
+
+# Sync steps a Deployer may customize in ways the planner cannot reproduce
+# read-only (e.g. extra generated secrets); such services always run their sync.
+_OPAQUE_HOOKS = ("sync", "ensure_runtime_secrets", "verify_vault_app_token")
+
+
+def _opaque_hook(dep: type[Deployer]) -> str | None:
+    for name in _OPAQUE_HOOKS:
+        if getattr(dep, name).__func__ is not getattr(Deployer, name).__func__:
+            return name
+    return None
+
+
+def _needs_token_check(env_str: str) -> bool:
+    """Mirror of Deployer.verify_vault_app_token: a legacy static token on a
+    non-AppRole compose is something only sync can judge."""
+    if "VAULT_ROLE_ID=" in env_str and "VAULT_SECRET_ID=" in env_str:
+        return False
+    return any(line.startswith("VAULT_APP_TOKEN=") for line in env_str.split("\n"))
+
+
+def _missing_runtime_secret(dep: type[Deployer]) -> str | None:
+    """The declared secret_key sync would generate, if it is not in Vault yet."""
+    if not dep.secret_key:
+        return None
+    try:
+        value = dep.secrets_backend().get(dep.secret_key)
+    except VaultSecrets.VaultSecretNotFoundError:
+        value = None
+    return None if value else dep.secret_key
+
+
+def _local_identity(
+    dep: type[Deployer], c: "Context", e: dict, deploy_ref: str
+) -> tuple[str, str, dict[str, str]]:
+    """(runtime hash, versioned source hash, expected INFRA_* identity) exactly
+    as Deployer.sync computes them."""
+    from libs.deploy_dependencies import service_key_from_path
+    from libs.service_identity import ServiceIdentity
+
+    env_vars = dep.config_env_with_vault_addr(dep.compose_env_base(e), e)
+    source_env_vars = dep.config_env_with_vault_addr(dep.source_config_env_base(e), e)
+    local_hash = dep.compute_local_config_hash(c, env_vars)
+    source_hash = (
+        f"{SOURCE_CONFIG_HASH_VERSION}:"
+        f"{dep.compute_local_config_hash(c, source_env_vars)}"
+    )
+    service_id = service_key_from_path(dep.compose_path)
+    if not service_id:
+        raise ValueError(f"could not derive service identity from {dep.compose_path}")
+    identity = ServiceIdentity.build(
+        service_id,
+        e.get("ENV", "production"),
+        component=dep.service,
+        service_name=dep.telemetry_service_name or dep.service,
+        version=deploy_ref,
+        iac_ref=deploy_ref,
+    )
+    return local_hash, source_hash, identity.deploy_env()
+
+
+def _drift_reason(
+    remote: dict[str, str | None], local_hash: str, source_hash: str
+) -> str:
+    if remote["runtime_hash"] != local_hash:
+        return f"runtime config changed ({remote['runtime_hash'] or 'none'} -> {local_hash})"
+    if remote["source_hash"] != source_hash:
+        return f"source config changed ({remote['source_hash'] or 'none'} -> {source_hash})"
+    if not EXACT_COMMIT_RE.fullmatch(remote["deploy_ref"] or ""):
+        return "deployed ref is not an exact commit"
+    return "service identity labels are missing or stale"
+
+
+def _remote_composes(
+    deployers: dict[str, type[Deployer]], e: dict
+) -> dict[str, dict | Exception | None]:
+    """service_id -> full compose (None: not deployed) from one topology read
+    and one ``compose.one`` fan-out. Topology errors propagate."""
+    from libs.dokploy import get_dokploy
+
+    domain = e.get("INTERNAL_DOMAIN")
+    client = get_dokploy(host=f"cloud.{domain}" if domain else None)
+    topology = client.topology()
+    env_name = e.get("ENV", "production")
+    compose_ids: dict[str, str | None] = {}
+    for service_id, dep in deployers.items():
+        compose = topology.find_compose(dep.service, dep.project_name(e), env_name)
+        if compose is not None:
+            compose_ids[service_id] = compose.get("composeId")
+    fetched = client.get_composes_many(
+        {compose_id for compose_id in compose_ids.values() if compose_id}
+    )
+    out: dict[str, dict | Exception | None] = {}
+    for service_id in deployers:
+        if service_id not in compose_ids:
+            out[service_id] = None
+        elif not compose_ids[service_id]:
+            out[service_id] = RuntimeError("matched compose has no composeId")
+        else:
+            out[service_id] = fetched.get(compose_ids[service_id])
+    return out
+
+
+def _plan_one(
+    service_id: str,
+    dep: type[Deployer],
+    c: "Context",
+    e: dict,
+    deploy_ref: str,
+    compose: dict | Exception | None,
+) -> PlannedService:
+    if compose is None:
+        return _deploy(service_id, "no compose in Dokploy yet")
+    if isinstance(compose, Exception):
+        return _deploy(service_id, f"remote identity unreadable: {compose}")
+    env_str = compose.get("env") or ""
+    if _needs_token_check(env_str):
+        return _deploy(service_id, "legacy VAULT_APP_TOKEN needs sync's preflight")
+    try:
+        if missing := _missing_runtime_secret(dep):
+            return _deploy(service_id, f"runtime secret {missing!r} not in Vault yet")
+        local_hash, source_hash, expected = _local_identity(dep, c, e, deploy_ref)
+    except Exception as exc:  # noqa: BLE001 - unprovable means "let sync decide"
+        return _deploy(service_id, f"local identity unavailable: {exc}")
+    remote = _config_identity_from_env(env_str)
+    if config_identity_current(remote, local_hash, source_hash, expected):
+        return PlannedService(
+            service_id, SKIP, "runtime and source config identities match"
+        )
+    return _deploy(service_id, _drift_reason(remote, local_hash, source_hash))
+
+
+def plan_services(
+    services: list[str], deploy_ref: str, c: "Context" | None = None
+) -> dict[str, PlannedService]:
+    """Plan every service in ``services`` for the process env (DEPLOY_ENV etc.)."""
+    if c is None:
+        from invoke import Context
+
+        c = Context()
+    deploy_ref = (deploy_ref or "").strip().lower()
+    plan: dict[str, PlannedService] = {}
+    candidates: dict[str, type[Deployer]] = {}
+    for service_id in sorted(set(services)):
+        try:
+            dep = load_deployer_class(service_id)
+        except Exception as exc:  # noqa: BLE001
+            plan[service_id] = _deploy(service_id, f"deploy.py failed to load: {exc}")
+            continue
+        if dep is None:
+            plan[service_id] = _deploy(service_id, "no Deployer class")
+        elif hook := _opaque_hook(dep):
+            plan[service_id] = _deploy(service_id, f"Deployer overrides {hook}")
+        elif dep.prod_only and dep.env().get("ENV", "production") != "production":
+            plan[service_id] = PlannedService(
+                service_id, SKIP, "prod-only service; not deployed to this env"
+            )
+        else:
+            candidates[service_id] = dep
+    if not candidates:
+        return plan
+
+    def deploy_all(reason: str) -> dict[str, PlannedService]:
+        plan.update({sid: _deploy(sid, reason) for sid in candidates})
+        return plan
+
+    if not EXACT_COMMIT_RE.fullmatch(deploy_ref):
+        return deploy_all("deploy ref is not an exact commit")
+    if missing := validate_env():
+        return deploy_all(f"missing env: {', '.join(missing)}")
+
+    e = Deployer.env()
+    # One concurrent Vault batch for every path the secret checks and env hooks read.
+    secrets_session().prefetch(
+        sorted({path for dep in candidates.values() for path in dep.secret_paths()})
+    )
+    try:
+        remote = _remote_composes(candidates, e)
+    except Exception as exc:  # noqa: BLE001
+        return deploy_all(f"remote identities unreadable: {exc}")
+    for service_id, dep in candidates.items():
+        plan[service_id] = _plan_one(
+            service_id, dep, c, e, deploy_ref, remote[service_id]
+        )
+    return plan
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--ref", required=True, help="exact checked-out commit SHA")
+    parser.add_argument("services", nargs="+", help="service ids, e.g. platform/redis")
+    args = parser.parse_args(argv)
+
+    from libs.dokploy import dokploy_session
+
+    with dokploy_session():
+        plan = plan_services(args.services, args.ref)
+    print(
+        json.dumps(
+            {
+                "ref": args.ref.lower(),
+                "services": {sid: asdict(item) for sid, item in sorted(plan.items())},
+            }
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
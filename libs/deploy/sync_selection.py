@@ -0,0 +1,72 @@
+"""What one checkout deploys: its services, its fan-out and its deploy order.
+
+The iac-runner keeps one shared clone but deploys every env from that env's own
+worktree, each at its own commit. Service discovery, the changed-file fan-out and
+the declared dependency graph all depend on the tree being deployed, so the runner
+asks this module, run from the env's worktree, instead of importing ``libs/`` from
+the clone (which may be at a newer or older commit).
+
+CLI (run by bootstrap/06.iac_runner/sync_runner.py with cwd = the env worktree);
+reads ``{"services": [...], "changed_files": [...] | null}`` on stdin and prints
+the JSON description as the last stdout line::
+
+    echo '{"services": [], "changed_files": ["platform/02.redis/compose.yaml"]}' \\
+        | python -m libs.deploy.sync_selection
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+
+from libs import deploy_dependencies
+from libs.deploy.deployer import discover_services
+
+__all__ = ["describe_checkout", "main"]
+
+ALL_SERVICES = "__all__"
+
+
+def describe_checkout(
+    services: list[str], changed_files: list[str] | None = None
+) -> dict:
+    """Discovery, fan-out and declared dependencies of this checkout.
+
+    ``tasks`` is discover_services(); ``fanout`` explains ``changed_files`` (None
+    when no files were given); ``dependencies`` covers every discovered, requested
+    or fanned-out service. Declared edges only relate the two services they name,
+    so the caller restricts them to whatever it selects.
+    """
+    tasks = discover_services()
+    candidates = set(tasks) | set(services)
+    fanout = None
+    if changed_files is not None:
+        decision = deploy_dependencies.explain_fanout(changed_files)
+        fanout = {"selected": decision.selected, "dropped": sorted(decision.dropped)}
+        candidates |= set(decision.selected)
+    candidates.discard(ALL_SERVICES)
+    dependencies = deploy_dependencies.declared_service_dependencies(candidates)
+    return {
+        "tasks": dict(sorted(tasks.items())),
+        "fanout": fanout,
+        "dependencies": {
+            service: sorted(prerequisites)
+            for service, prerequisites in sorted(dependencies.items())
+        },
+    }
+
+
+def main() -> int:
+    request = json.load(sys.stdin)
+    print(
+        json.dumps(
+            describe_checkout(
+                list(request.get("services") or []), request.get("changed_files")
+            )
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,14 +13,25 @@ consumers (they reconnect); only declare a dependency a service literally embeds
 Deploy tooling such as `libs/` and `tools/` is depended on by no service at
 runtime (the runner re-checks-out new code), so it fans out to nothing — this
 replaces the old `libs/ -> __all__` catch-all that redeployed everything.
+
+Matching is compiled: `FanoutMatcher` indexes every manifest glob by its literal
+prefix in a character trie, so each changed file is tested only against globs
+whose prefix it starts with, in one pass over the files. The parsed manifest,
+its compiled matcher and the on-disk dependency file index
+(`dependency_files`) are cached and rebuilt when the manifest or a walked
+directory changes.
 """
 
 from __future__ import annotations
 
 import fnmatch
+import os
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from libs.git_objects import GlobPattern
+
 _ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_MANIFEST = _ROOT / "docs" / "ssot" / "deploy-dependencies.yaml"
 
@@ -52,26 +63,129 @@ def service_key_from_path(file_path: str) -> str | None:
     return None
 
 
+# Manifest path -> (stat identity, parsed manifest, compiled matcher or None).
+_MANIFESTS: dict[Path, tuple[tuple[int, int], dict[str, list[str]], object]] = {}
+
+
+def _stat_identity(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cached_manifest(path: Path | str) -> tuple[tuple[int, int], dict, object] | None:
+    p = Path(path)
+    identity = _stat_identity(p)
+    if identity is None:
+        _MANIFESTS.pop(p, None)
+        return None
+    cached = _MANIFESTS.get(p)
+    if cached is None or cached[0] != identity:
+        import yaml
+
+        raw = yaml.safe_load(p.read_text(encoding="utf-8")) or {}
+        services = raw.get("services") or {}
+        result: dict[str, list[str]] = {}
+        for key, spec in services.items():
+            deps = (spec or {}).get("depends_on") or []
+            result[key] = [str(g) for g in deps]
+        cached = _MANIFESTS[p] = (identity, result, None)
+    return cached
+
+
 def load_dependency_manifest(
     path: Path | str = DEFAULT_MANIFEST,
 ) -> dict[str, list[str]]:
     """Return {service_key: [extra dependency globs]} from the manifest.
 
     The own-directory dependency is implicit and NOT listed here. Missing file or
-    empty manifest -> no extra dependencies for anyone.
+    empty manifest -> no extra dependencies for anyone. The file is parsed once
+    per version (mtime and size); each call returns its own copy.
     """
-    import yaml
-
-    p = Path(path)
-    if not p.exists():
+    cached = _cached_manifest(path)
+    if cached is None:
         return {}
-    raw = yaml.safe_load(p.read_text(encoding="utf-8")) or {}
-    services = raw.get("services") or {}
-    result: dict[str, list[str]] = {}
-    for key, spec in services.items():
-        deps = (spec or {}).get("depends_on") or []
-        result[key] = [str(g) for g in deps]
-    return result
+    return {key: list(globs) for key, globs in cached[1].items()}
+
+
+def compiled_matcher(path: Path | str = DEFAULT_MANIFEST) -> "FanoutMatcher":
+    """The :class:`FanoutMatcher` for the manifest at ``path``, compiled once
+    per manifest version."""
+    cached = _cached_manifest(path)
+    if cached is None:
+        return FanoutMatcher({})
+    identity, manifest, matcher = cached
+    if matcher is None:
+        matcher = FanoutMatcher(manifest)
+        _MANIFESTS[Path(path)] = (identity, manifest, matcher)
+    return matcher
+
+
+# Trie key holding the globs whose literal prefix ends at that node.
+_GLOBS = ""
+
+
+class FanoutMatcher:
+    """Manifest globs compiled for fan-out.
+
+    Globs keep ``fnmatch`` semantics (``*`` also matches ``/``, as the
+    manifest has always been read) and are indexed by their literal prefix
+    in a character trie: a file is only tested against globs whose prefix
+    it starts with, so matching a file set is one pass over the files.
+    """
+
+    def __init__(self, manifest: dict[str, list[str]]):
+        self.manifest = {key: list(globs) for key, globs in manifest.items()}
+        self._trie: dict = {}
+        for service_key, globs in self.manifest.items():
+            for pattern in globs:
+                node = self._trie
+                for ch in re.split(r"[*?\[]", pattern, maxsplit=1)[0]:
+                    node = node.setdefault(ch, {})
+                node.setdefault(_GLOBS, []).append(
+                    (service_key, re.compile(fnmatch.translate(pattern)))
+                )
+
+    def services_for(self, file_path: str) -> set[str]:
+        """Services with a declared glob matching ``file_path``."""
+        hits: set[str] = set()
+        node = self._trie
+        for ch in file_path:
+            for service_key, regex in node.get(_GLOBS, ()):
+                if service_key not in hits and regex.match(file_path):
+                    hits.add(service_key)
+            node = node.get(ch)
+            if node is None:
+                return hits
+        for service_key, regex in node.get(_GLOBS, ()):
+            if service_key not in hits and regex.match(file_path):
+                hits.add(service_key)
+        return hits
+
+    def explain(self, changed_files) -> "FanoutDecision":
+        """See :func:`explain_fanout`."""
+        files = list(changed_files)
+        selected: dict[str, str] = {}
+        first_hit: dict[str, str] = {}
+        dropped: list[str] = []
+        for file_path in files:
+            key = service_key_from_path(file_path)
+            if key:
+                selected.setdefault(key, f"own-dir ({file_path})")
+            services = self.services_for(file_path)
+            for service_key in services:
+                first_hit.setdefault(service_key, file_path)
+            if not key and not services:
+                dropped.append(file_path)
+        # Declared reasons follow manifest order, after every own-dir reason.
+        for service_key in self.manifest:
+            if service_key in first_hit:
+                selected.setdefault(
+                    service_key, f"declared dep ({first_hit[service_key]})"
+                )
+        return FanoutDecision(selected=selected, dropped=dropped)
 
 
 def extra_dependency_globs(
@@ -91,19 +205,68 @@ def match_changed_services(
     of its declared extra dependency globs. Tooling-only paths (libs/, tools/)
     match no service and therefore never fan out.
     """
-    files = list(changed_files)
-    if manifest is None:
-        manifest = load_dependency_manifest()
+    matcher = compiled_matcher() if manifest is None else FanoutMatcher(manifest)
+    return set(matcher.explain(changed_files).selected)
+
+
+# Parent directories whose NN.<svc> children own a service directory; the inverse
+# of service_key_from_path's layouts.
+_SERVICE_PARENTS = (
+    "platform",
+    "finance_report/finance_report",
+    "truealpha/truealpha",
+    "bootstrap",
+)
+
+
+def service_directories(root: Path = _ROOT) -> dict[str, Path]:
+    """{service_key: own directory} for every service directory under ``root``."""
+    dirs: dict[str, Path] = {}
+    for parent_rel in _SERVICE_PARENTS:
+        parent = root / parent_rel
+        if not parent.is_dir():
+            continue
+        for child in sorted(parent.iterdir()):
+            if not child.is_dir():
+                continue
+            key = service_key_from_path(f"{parent_rel}/{child.name}/")
+            if key:
+                dirs.setdefault(key, child)
+    return dirs
+
+
+def declared_service_dependencies(
+    services,
+    manifest: dict[str, list[str]] | None = None,
+    root: Path = _ROOT,
+) -> dict[str, set[str]]:
+    """{service: other selected services whose own files match its declared globs}.
+
+    The deploy-order view of the manifest: a service that bakes in another service's
+    files (alerting renders every deploy.py's ProbeFacets) deploys after it. Only
+    services in ``services`` appear, on either side.
+    """
+    selected = set(services)
+    matcher = compiled_matcher() if manifest is None else FanoutMatcher(manifest)
+    dirs = service_directories(root)
+    own_files: dict[str, list[str]] = {}
+    for key in selected:
+        directory = dirs.get(key)
+        if directory is None:
+            continue
+        own_files[key] = [
+            path.relative_to(root).as_posix()
+            for path in directory.rglob("*")
+            if path.is_file()
+        ]
 
-    affected: set[str] = set()
-    for file_path in files:
-        key = service_key_from_path(file_path)
-        if key:
-            affected.add(key)
-    for service_key, globs in manifest.items():
-        if any(fnmatch.fnmatch(f, g) for g in globs for f in files):
-            affected.add(service_key)
-    return affected
+    dependencies: dict[str, set[str]] = {}
+    for other, files in own_files.items():
+        for file_path in files:
+            for service in matcher.services_for(file_path) & selected:
+                if service != other:
+                    dependencies.setdefault(service, set()).add(other)
+    return dict(sorted(dependencies.items()))
 
 
 def autodeploy_violations(composes, allowlist: set[str] | None = None) -> list[str]:
@@ -148,25 +311,8 @@ def explain_fanout(
     Reasons are stable strings: "own-dir (<file>)" or "declared dep (<file>)".
     Own-dir selection wins over a declared-dep reason for the same service.
     """
-    files = list(changed_files)
-    if manifest is None:
-        manifest = load_dependency_manifest()
-
-    selected: dict[str, str] = {}
-    matched: set[str] = set()
-    for file_path in files:
-        key = service_key_from_path(file_path)
-        if key:
-            selected.setdefault(key, f"own-dir ({file_path})")
-            matched.add(file_path)
-    for service_key, globs in manifest.items():
-        hits = [f for f in files if any(fnmatch.fnmatch(f, g) for g in globs)]
-        if hits:
-            selected.setdefault(service_key, f"declared dep ({hits[0]})")
-            matched.update(hits)
-
-    dropped = [f for f in files if f not in matched]
-    return FanoutDecision(selected=selected, dropped=dropped)
+    matcher = compiled_matcher() if manifest is None else FanoutMatcher(manifest)
+    return matcher.explain(changed_files)
 
 
 def dockerfile_baked_shared_trees(dockerfile_text: str) -> set[str]:
@@ -208,13 +354,100 @@ def fanout_coverage_violations(
     fan a change in that tree out to it — a change would silently leave the
     service running stale baked-in code. Returns sorted "service_key: tree".
     """
-    if manifest is None:
-        manifest = load_dependency_manifest()
+    matcher = compiled_matcher() if manifest is None else FanoutMatcher(manifest)
     violations: list[str] = []
     for service_key, text in service_dockerfiles.items():
-        globs = manifest.get(service_key, [])
         for tree in dockerfile_baked_shared_trees(text):
             probe = f"{tree}/__changed_probe__"
-            if not any(fnmatch.fnmatch(probe, g) for g in globs):
+            if service_key not in matcher.services_for(probe):
                 violations.append(f"{service_key}: {tree}")
     return sorted(violations)
+
+
+# --- Dependency file index ---------------------------------------------------
+
+
+class _DependencyIndex:
+    """Files on disk matched by each service's declared globs (``glob.glob``
+    rules), from one walk of each distinct glob base directory. Stays valid
+    while the manifest and every walked directory keep their mtimes."""
+
+    def __init__(self, root: Path, manifest_path: Path):
+        self.root = root
+        self.manifest_identity = _stat_identity(manifest_path)
+        manifest = load_dependency_manifest(manifest_path)
+        patterns = {
+            key: [GlobPattern(glob) for glob in globs]
+            for key, globs in manifest.items()
+            if globs
+        }
+        self.dir_mtimes: dict[str, int | None] = {}
+        files_by_base: dict[str, list[str]] = {}
+        for compiled in {p.base: p for ps in patterns.values() for p in ps}.values():
+            if not compiled.is_literal and compiled.base not in files_by_base:
+                files_by_base[compiled.base] = self._walk(compiled.base)
+        self.files: dict[str, list[str]] = {}
+        for key, compiled_globs in patterns.items():
+            matched: set[str] = set()
+            for compiled in compiled_globs:
+                if compiled.is_literal:
+                    self._watch(str(Path(compiled.base).parent))
+                    if (root / compiled.base).is_file():
+                        matched.add(compiled.base)
+                    continue
+                prefix = len(compiled.base) + 1 if compiled.base else 0
+                matched.update(
+                    rel
+                    for rel in files_by_base[compiled.base]
+                    if compiled.match(rel[prefix:].split("/"))
+                )
+            self.files[key] = sorted(matched)
+
+    def _watch(self, rel_dir: str) -> None:
+        path = self.root / rel_dir
+        try:
+            self.dir_mtimes[rel_dir] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self.dir_mtimes[rel_dir] = None
+
+    def _walk(self, base: str) -> list[str]:
+        found: list[str] = []
+        self._watch(base)
+        # followlinks mirrors glob.glob, which descends symlinked directories.
+        for dirpath, dirnames, filenames in os.walk(self.root / base, followlinks=True):
+            rel_dir = Path(dirpath).relative_to(self.root).as_posix()
+            rel_dir = "" if rel_dir == "." else rel_dir
+            self._watch(rel_dir)
+            found.extend(f"{rel_dir}/{name}" if rel_dir else name for name in filenames)
+        return found
+
+    def is_fresh(self, manifest_path: Path) -> bool:
+        if _stat_identity(manifest_path) != self.manifest_identity:
+            return False
+        for rel_dir, mtime in self.dir_mtimes.items():
+            try:
+                current = (self.root / rel_dir).stat().st_mtime_ns
+            except FileNotFoundError:
+                current = None
+            if current != mtime:
+                return False
+        return True
+
+
+_INDEXES: dict[tuple[Path, Path], _DependencyIndex] = {}
+
+
+def dependency_files(
+    service_key: str,
+    root: Path = _ROOT,
+    manifest_path: Path | str = DEFAULT_MANIFEST,
+) -> list[str]:
+    """Repo-relative files under ``root`` matching ``service_key``'s declared
+    globs with ``glob.glob(..., recursive=True)`` rules (directories excluded),
+    sorted. Served from a per-root index of every service's matches, rebuilt
+    only when the manifest or a directory it walked changes."""
+    key = (Path(root), Path(manifest_path))
+    index = _INDEXES.get(key)
+    if index is None or not index.is_fresh(key[1]):
+        index = _INDEXES[key] = _DependencyIndex(*key)
+    return list(index.files.get(service_key, []))
@@ -88,10 +88,15 @@ def _make_client():
 
 
 def _list_composes(client):
-    """Typed compose deployments with identity resolved at topology ingestion."""
+    """Typed compose deployments with identity resolved at topology ingestion.
+
+    Every compose's deployments are fetched in one bounded-concurrency fan-out
+    (``get_deployments_many``), so a sweep costs about its slowest call rather
+    than the sum over the fleet.
+    """
     from libs.service_registry import service_id_for_dokploy
 
-    out = []
+    composes = []
     for project in client.list_projects():
         project_name = project.get("name", "")
         for env in project.get("environments", []):
@@ -101,28 +106,32 @@ def _list_composes(client):
                 if not compose_id:
                     continue
                 name = compose.get("name") or compose.get("appName") or compose_id
-                try:
-                    deployments = client.get_compose_deployments(compose_id)
-                except Exception as exc:  # one compose must not abort the sweep
-                    logger.warning("deployments fetch failed for %s: %s", name, exc)
-                    deployments = []
-                service_id = service_id_for_dokploy(project_name, name) or ""
-                if not service_id:
-                    logger.warning(
-                        "unregistered Dokploy compose identity: project=%s env=%s compose=%s",
-                        project_name,
-                        environment,
-                        name,
-                    )
-                out.append(
-                    ComposeDeployments(
-                        compose_id=compose_id,
-                        compose_name=name,
-                        service_id=service_id,
-                        environment=environment,
-                        deployments=tuple(deployments),
-                    )
-                )
+                composes.append((project_name, environment, compose_id, name))
+
+    fetched = client.get_deployments_many([c[2] for c in composes])
+    out = []
+    for project_name, environment, compose_id, name in composes:
+        deployments = fetched.get(compose_id, [])
+        if isinstance(deployments, Exception):  # one compose must not abort the sweep
+            logger.warning("deployments fetch failed for %s: %s", name, deployments)
+            deployments = []
+        service_id = service_id_for_dokploy(project_name, name) or ""
+        if not service_id:
+            logger.warning(
+                "unregistered Dokploy compose identity: project=%s env=%s compose=%s",
+                project_name,
+                environment,
+                name,
+            )
+        out.append(
+            ComposeDeployments(
+                compose_id=compose_id,
+                compose_name=name,
+                service_id=service_id,
+                environment=environment,
+                deployments=tuple(deployments),
+            )
+        )
     return out
 
 
@@ -237,7 +246,8 @@ class DeployQueueGuard(ResidentWatcher):
     Per sweep it reloads secrets and rebuilds the Dokploy client (cheap) so the
     sidecar idles rather than crashlooping, and PICKS UP a DOKPLOY_API_KEY that
     Vault renders after the container started — the standalone sidecar's exact
-    loop-iteration behavior.
+    loop-iteration behavior. The client's pooled connection is closed when the
+    sweep ends.
     """
 
     name = "deploy-queue-guard"
@@ -248,7 +258,9 @@ class DeployQueueGuard(ResidentWatcher):
         self.interval_seconds = int(
             env.get("DEPLOY_GUARD_INTERVAL_SECONDS", "") or DEFAULT_INTERVAL
         )
-        self.ceiling = int(env.get("DEPLOY_GUARD_CEILING_SECONDS", "") or DEFAULT_CEILING)
+        self.ceiling = int(
+            env.get("DEPLOY_GUARD_CEILING_SECONDS", "") or DEFAULT_CEILING
+        )
         self.grace = int(env.get("DEPLOY_GUARD_GRACE_SECONDS", "") or DEFAULT_GRACE)
         self.remediate = (env.get("DEPLOY_GUARD_REMEDIATE") or "0").strip().lower() in {
             "1",
@@ -261,10 +273,15 @@ class DeployQueueGuard(ResidentWatcher):
     def _sweep(self) -> None:
         _load_env_file(self.env_path)
         client = _make_client()  # raises when DOKPLOY_API_KEY is still unset
-        run_once(
-            client,
-            ceiling=self.ceiling,
-            remediate=self.remediate,
-            grace=self.grace,
-            alerted=self.alerted,
-        )
+        try:
+            run_once(
+                client,
+                ceiling=self.ceiling,
+                remediate=self.remediate,
+                grace=self.grace,
+                alerted=self.alerted,
+            )
+        finally:
+            # One pooled connection per sweep; release it rather than idling a
+            # keep-alive socket until the next sweep rebuilds the client.
+            client.close()
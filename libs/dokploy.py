@@ -6,14 +6,37 @@ Requires DOKPLOY_API_KEY in environment (generate from /settings/profile).
 """
 
 from __future__ import annotations
+import asyncio
+import contextlib
+import contextvars
+import importlib.util
 import os
+import threading
 import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator
 import httpx
 from dotenv import load_dotenv
 from libs.common import normalize_env_name as _common_normalize_env_name
 
 load_dotenv()
 
+# One pooled connection per client: a Deployer.sync or a deploy-queue-guard sweep
+# issues dozens of calls, and a fresh httpx.Client per call paid a TCP + TLS
+# handshake through dokploy-traefik every time.
+DEFAULT_TIMEOUT_SECONDS = 30.0
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=10, max_keepalive_connections=5, keepalive_expiry=30.0
+)
+# How long one `project.all` download answers topology lookups. Short on purpose:
+# it only has to span one sync/sweep, and any create/delete/update through this
+# client drops it immediately.
+DEFAULT_TOPOLOGY_TTL_SECONDS = 30.0
+# POST actions that can change what `project.all` returns.
+_TOPOLOGY_MUTATING_ACTIONS = ("create", "delete", "update", "remove")
+# In-flight calls per bulk fan-out (get_composes_many / get_deployments_many).
+DEFAULT_FANOUT_CONCURRENCY = 8
+
 
 def _normalize_env_name(env_name: str | None) -> str | None:
     if not env_name:
@@ -21,10 +44,153 @@ def _normalize_env_name(env_name: str | None) -> str | None:
     return _common_normalize_env_name(env_name)
 
 
-class DokployClient:
-    """Client for Dokploy REST API"""
+def _http2_available() -> bool:
+    """httpx only speaks HTTP/2 when the optional ``h2`` package is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _endpoint_key(endpoint: str) -> str:
+    """``compose.one?composeId=x`` -> ``compose.one`` (timing counters key)."""
+    return endpoint.split("?", 1)[0]
+
+
+def _mutates_topology(method: str, endpoint: str) -> bool:
+    """True for a POST like ``compose.create`` / ``environment.delete``."""
+    if method.upper() == "GET":
+        return False
+    action = _endpoint_key(endpoint).partition(".")[2]
+    return action.startswith(_TOPOLOGY_MUTATING_ACTIONS)
+
+
+@dataclass
+class RequestTiming:
+    """Per-endpoint call counters for one DokployClient."""
+
+    calls: int = 0
+    retries: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+
+@dataclass(frozen=True)
+class TopologySnapshot:
+    """One `project.all` download, indexed for the lookups deploys chain together.
+
+    Indexes keep the FIRST match in `project.all` order, which is what the linear
+    scans they replace returned.
+    """
+
+    projects: list[dict]
+    fetched_at: float
+    projects_by_name: dict[str, dict]
+    # (project name, normalized env name) -> environment
+    environments: dict[tuple[str, str | None], dict]
+    # compose name -> [(project name, normalized env name, compose)] in tree order
+    composes_by_name: dict[str, list[tuple[str, str | None, dict]]]
+    # composeId -> (project name, normalized env name, compose)
+    composes_by_id: dict[str, tuple[str, str | None, dict]]
+
+    @classmethod
+    def build(cls, projects: list[dict], fetched_at: float) -> "TopologySnapshot":
+        projects_by_name: dict[str, dict] = {}
+        environments: dict[tuple[str, str | None], dict] = {}
+        composes_by_name: dict[str, list[tuple[str, str | None, dict]]] = {}
+        composes_by_id: dict[str, tuple[str, str | None, dict]] = {}
+        for project in projects:
+            project_name = project.get("name")
+            projects_by_name.setdefault(project_name, project)
+            for env in project.get("environments", []):
+                env_name = _normalize_env_name(env.get("name"))
+                environments.setdefault((project_name, env_name), env)
+                for compose in env.get("compose", []):
+                    entry = (project_name, env_name, compose)
+                    composes_by_name.setdefault(compose.get("name"), []).append(entry)
+                    compose_id = compose.get("composeId")
+                    if compose_id:
+                        composes_by_id.setdefault(compose_id, entry)
+        return cls(
+            projects=projects,
+            fetched_at=fetched_at,
+            projects_by_name=projects_by_name,
+            environments=environments,
+            composes_by_name=composes_by_name,
+            composes_by_id=composes_by_id,
+        )
+
+    def find_compose(
+        self,
+        name: str,
+        project_name: str | None = None,
+        env_name: str | None = None,
+    ) -> dict | None:
+        """Return the truncated `project.all` compose entry matching the filters."""
+        target_env = _normalize_env_name(env_name)
+        for project, env, compose in self.composes_by_name.get(name, ()):
+            if project_name and project != project_name:
+                continue
+            if target_env and env != target_env:
+                continue
+            return compose
+        return None
+
+    def environment_id(
+        self, project_name: str, env_name: str | None = None
+    ) -> str | None:
+        """Environment ID by name; omitted/production falls back to the default env."""
+        target = _normalize_env_name(env_name)
+        project = self.projects_by_name.get(project_name)
+        if project is None:
+            return None
+        if target:
+            env = self.environments.get((project_name, target))
+            if env is not None:
+                return env.get("environmentId")
+            # For production, allow fallback to default environment to avoid breaking existing setups.
+            if target != "production":
+                return None
+        for env in project.get("environments", []):
+            if env.get("isDefault"):
+                return env.get("environmentId")
+        environments = project.get("environments", [])
+        if environments:
+            return environments[0].get("environmentId")
+        return None
+
+    def github_provider_id(self) -> str | None:
+        """`githubId` of the first compose already bound to GitHub, if any."""
+        for _project, _env, comp in self.iter_composes():
+            if comp.get("githubId"):
+                return comp.get("githubId")
+        return None
+
+    def iter_composes(self) -> Iterator[tuple[str, str | None, dict]]:
+        for project in self.projects:
+            for env in project.get("environments", []):
+                env_name = _normalize_env_name(env.get("name"))
+                for compose in env.get("compose", []):
+                    yield project.get("name"), env_name, compose
+
+
+class _DokployClientBase:
+    """Configuration, counters, topology cache and retry rules shared by the sync
+    ``DokployClient`` and its asyncio flavour ``AsyncDokployClient``."""
 
-    def __init__(self, base_url: str | None = None, api_key: str | None = None):
+    def __init__(
+        self,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        *,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        limits: httpx.Limits | None = None,
+        http2: bool | None = None,
+        topology_ttl: float = DEFAULT_TOPOLOGY_TTL_SECONDS,
+    ):
         internal_domain = os.getenv("INTERNAL_DOMAIN", "localhost")
         self.base_url = (
             base_url
@@ -49,6 +215,59 @@ class DokployClient:
                 "DOKPLOY_API_KEY not set. Generate from Dokploy /settings/profile or store in 1Password"
             )
 
+        self.timeout = timeout
+        self.limits = limits or DEFAULT_LIMITS
+        self.http2 = _http2_available() if http2 is None else http2
+        self.request_stats: dict[str, RequestTiming] = {}
+        self.topology_ttl = topology_ttl
+        self._topology: TopologySnapshot | None = None
+        self._lock = threading.Lock()
+
+    def _fresh_topology(self) -> TopologySnapshot | None:
+        """The cached snapshot while it is younger than ``topology_ttl``."""
+        with self._lock:
+            snapshot = self._topology
+        if (
+            snapshot is not None
+            and time.monotonic() - snapshot.fetched_at < self.topology_ttl
+        ):
+            return snapshot
+        return None
+
+    def _store_topology(self, projects: list[dict] | None) -> TopologySnapshot:
+        snapshot = TopologySnapshot.build(projects or [], time.monotonic())
+        with self._lock:
+            self._topology = snapshot
+        return snapshot
+
+    def invalidate_topology(self) -> None:
+        """Drop the cached snapshot; the next topology lookup re-downloads it."""
+        with self._lock:
+            self._topology = None
+
+    def _timing(self, endpoint: str) -> RequestTiming:
+        key = _endpoint_key(endpoint)
+        with self._lock:
+            return self.request_stats.setdefault(key, RequestTiming())
+
+    def _record(self, timing: RequestTiming, started: float) -> None:
+        with self._lock:
+            timing.record(time.monotonic() - started)
+
+    def timing_summary(self) -> dict[str, dict[str, float | int]]:
+        """Per-endpoint call counts and latency, e.g. for a sweep's closing log line."""
+        with self._lock:
+            return {
+                key: {
+                    "calls": timing.calls,
+                    "retries": timing.retries,
+                    "errors": timing.errors,
+                    "total_seconds": round(timing.total_seconds, 3),
+                    "max_seconds": round(timing.max_seconds, 3),
+                }
+                for key, timing in sorted(self.request_stats.items())
+            }
+
     # Gateway blips (the dokploy-traefik in front of the API returns these when the backend
     # is briefly unresponsive). Safe to retry on a GET — and on a POST the caller marks
     # ``idempotent`` (a set-desired-state write like ``compose.update``, where re-applying
@@ -57,6 +276,209 @@ class DokployClient:
     # (create/deploy/delete) the backend may still have acted, so those are never retried.
     _TRANSIENT_STATUS = (502, 503, 504)
 
+    def _prepare(
+        self, method: str, endpoint: str, kwargs: dict, idempotent: bool
+    ) -> tuple[str, dict, bool, RequestTiming]:
+        """Resolve url/headers/retryability for one call; drops stale topology."""
+        headers = {
+            "accept": "application/json",
+            "content-type": "application/json",
+            "x-api-key": self.api_key,
+            **kwargs.pop("headers", {}),
+        }
+        url = f"{self.base_url}/{endpoint}"
+        retryable = method.upper() == "GET" or idempotent
+        if _mutates_topology(method, endpoint):
+            self.invalidate_topology()
+        return url, headers, retryable, self._timing(endpoint)
+
+    def _should_retry(
+        self,
+        exc: httpx.HTTPError,
+        *,
+        retryable: bool,
+        attempt: int,
+        retries: int,
+        timing: RequestTiming,
+    ) -> bool:
+        """Apply the transient-error retry rule above and count the outcome."""
+        transient = isinstance(exc, httpx.RequestError) or (
+            isinstance(exc, httpx.HTTPStatusError)
+            and exc.response.status_code in self._TRANSIENT_STATUS
+        )
+        with self._lock:
+            if retryable and transient and attempt < retries:
+                timing.retries += 1
+                return True
+            timing.errors += 1
+        return False
+
+    @staticmethod
+    def _wrap_error(exc: httpx.HTTPError, method: str, url: str) -> httpx.HTTPError:
+        """Re-raise with method + endpoint context (see libs/README.md)."""
+        if isinstance(exc, httpx.HTTPStatusError):
+            return httpx.HTTPStatusError(
+                f"Dokploy API request failed for {method} {url}: "
+                f"status code {exc.response.status_code} {exc.response.reason_phrase}",
+                request=exc.request,
+                response=exc.response,
+            )
+        return httpx.RequestError(
+            f"Error while performing Dokploy API request {method} {url}: {exc}",
+            request=exc.request,
+        )
+
+
+def _refetchable_compose_id(compose: dict, name: str) -> str:
+    """composeId of a truncated `project.all` compose, for the compose.one re-fetch.
+
+    `project.all` returns a TRUNCATED compose (no `env` / source fields), so
+    find_compose_by_name re-fetches the full object via compose.one; callers that
+    read env — e.g. get_remote_config_hash's IAC_CONFIG_HASH post-deploy check —
+    then see real values instead of a spurious "none". get_compose errors
+    propagate: silently falling back to the truncated object would reintroduce
+    the "hash reads as none" bug and hide real API/auth failures from callers
+    that handle them. A matched compose with no composeId can't be re-fetched, so
+    it fails closed for the same reason.
+    """
+    compose_id = compose.get("composeId")
+    if not compose_id:
+        raise RuntimeError(
+            f"Dokploy compose {name!r} matched but has no "
+            "composeId; cannot fetch its full env."
+        )
+    return compose_id
+
+
+def _compose_create_payload(
+    environment_id: str,
+    name: str,
+    *,
+    compose_file: str,
+    env: str,
+    compose_type: str,
+    app_name: str | None,
+    source_type: str,
+    **kwargs,
+) -> dict:
+    payload = {
+        "name": name,
+        "environmentId": environment_id,
+        "composeType": compose_type,
+        "sourceType": source_type,
+        **kwargs,
+    }
+    if compose_file:
+        payload["composeFile"] = compose_file
+    if app_name:
+        payload["appName"] = app_name
+    if env:
+        payload["env"] = env
+    return payload
+
+
+def _compose_update_payload(
+    compose_id: str,
+    *,
+    compose_file: str | None,
+    env: str | None,
+    source_type: str | None,
+    **kwargs,
+) -> dict:
+    payload = {"composeId": compose_id}
+    if compose_file is not None:
+        payload["composeFile"] = compose_file
+    if env is not None:
+        payload["env"] = env
+    if source_type is not None:
+        payload["sourceType"] = source_type
+
+    # Merge extra args (e.g. repository, branch, githubId)
+    payload.update(kwargs)
+    return payload
+
+
+def _deployments_from_payload(deployments: object) -> list[dict]:
+    """Normalize the deployment list shapes different Dokploy versions return."""
+    if isinstance(deployments, list):
+        return [item for item in deployments if isinstance(item, dict)]
+    if isinstance(deployments, dict):
+        for key in ("deployments", "data", "items"):
+            items = deployments.get(key)
+            if isinstance(items, list):
+                return [item for item in items if isinstance(item, dict)]
+    return []
+
+
+class DokployClient(_DokployClientBase):
+    """Client for Dokploy REST API.
+
+    Owns one pooled keep-alive ``httpx.Client`` (HTTP/2 when ``h2`` is installed),
+    created lazily on the first request and shared by every call until
+    ``close()``. The bulk ``*_many`` reads likewise share one asyncio twin, run on
+    a private event-loop thread. Use it as a context manager in long sweeps so
+    the connections are released deterministically.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._http: httpx.Client | None = None
+        self._aio_loop: asyncio.AbstractEventLoop | None = None
+        self._aio_thread: threading.Thread | None = None
+        self._aio_client: AsyncDokployClient | None = None
+
+    def _http_client(self) -> httpx.Client:
+        """Return the pooled transport, building it on first use."""
+        with self._lock:
+            if self._http is None:
+                self._http = httpx.Client(
+                    timeout=self.timeout, limits=self.limits, http2=self.http2
+                )
+            return self._http
+
+    def close(self) -> None:
+        """Release the pooled connections; a later request transparently reopens them."""
+        with self._lock:
+            http, self._http = self._http, None
+            loop, self._aio_loop = self._aio_loop, None
+            thread, self._aio_thread = self._aio_thread, None
+            aclient, self._aio_client = self._aio_client, None
+        if http is not None:
+            http.close()
+        if loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(aclient.aclose(), loop).result(
+                    self.timeout
+                )
+            finally:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+
+    def __enter__(self) -> "DokployClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def topology(self, *, refresh: bool = False) -> TopologySnapshot:
+        """Return the cached `project.all` snapshot, re-fetching once it is stale."""
+        snapshot = None if refresh else self._fresh_topology()
+        if snapshot is None:
+            snapshot = self._store_topology(self.list_projects())
+        return snapshot
+
+    def aio(self) -> "AsyncDokployClient":
+        """An asyncio twin with the same endpoint, credentials and pool settings."""
+        return AsyncDokployClient(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=self.http2,
+            topology_ttl=self.topology_ttl,
+        )
+
     def _request(
         self,
         method: str,
@@ -73,46 +495,102 @@ class DokployClient:
         from a churning control plane, see #252) are retried with backoff when the request
         is safe to repeat: any GET, or a POST the caller marks ``idempotent``. A flaky
         control plane should self-heal rather than hard-fail the caller.
+
+        Every attempt goes over the client's pooled connection and is counted in
+        ``request_stats`` under the endpoint name (query string stripped). A POST
+        that creates/deletes/updates anything drops the topology snapshot before it
+        is sent, so later lookups never see the pre-write tree.
         """
-        headers = {
-            "accept": "application/json",
-            "content-type": "application/json",
-            "x-api-key": self.api_key,
-            **kwargs.pop("headers", {}),
-        }
-        url = f"{self.base_url}/{endpoint}"
-        retryable = method.upper() == "GET" or idempotent
+        url, headers, retryable, timing = self._prepare(
+            method, endpoint, kwargs, idempotent
+        )
         attempt = 0
         while True:
+            started = time.monotonic()
             try:
-                with httpx.Client(timeout=30.0) as client:
-                    resp = client.request(method, url, headers=headers, **kwargs)
+                try:
+                    resp = self._http_client().request(
+                        method, url, headers=headers, **kwargs
+                    )
                     resp.raise_for_status()
+                finally:
+                    self._record(timing, started)
                 return resp.json() if resp.content else {}
-            except httpx.HTTPStatusError as exc:
-                if (
-                    retryable
-                    and exc.response.status_code in self._TRANSIENT_STATUS
-                    and attempt < _retries
+            except httpx.HTTPError as exc:
+                if self._should_retry(
+                    exc,
+                    retryable=retryable,
+                    attempt=attempt,
+                    retries=_retries,
+                    timing=timing,
                 ):
                     attempt += 1
                     _sleep(2**attempt)
                     continue
-                raise httpx.HTTPStatusError(
-                    f"Dokploy API request failed for {method} {url}: "
-                    f"status code {exc.response.status_code} {exc.response.reason_phrase}",
-                    request=exc.request,
-                    response=exc.response,
-                ) from exc
-            except httpx.RequestError as exc:
-                if retryable and attempt < _retries:
-                    attempt += 1
-                    _sleep(2**attempt)
-                    continue
-                raise httpx.RequestError(
-                    f"Error while performing Dokploy API request {method} {url}: {exc}",
-                    request=exc.request,
-                ) from exc
+                raise self._wrap_error(exc, method, url) from exc
+
+    # Bulk reads: fan out over the asyncio twin, bounded by ``concurrency``, so a
+    # fleet sweep costs roughly its slowest call instead of the sum of all calls.
+    def get_composes_many(
+        self,
+        compose_ids: Iterable[str],
+        *,
+        concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    ) -> dict[str, dict | Exception]:
+        """``compose.one`` for every id; a per-id failure is returned, not raised."""
+        return self._fan_out("get_composes_many", compose_ids, concurrency)
+
+    def get_deployments_many(
+        self,
+        compose_ids: Iterable[str],
+        *,
+        concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    ) -> dict[str, list[dict] | Exception]:
+        """``get_compose_deployments`` for every id; per-id failures are returned."""
+        return self._fan_out("get_deployments_many", compose_ids, concurrency)
+
+    def _aio_runner(self) -> tuple[asyncio.AbstractEventLoop, "AsyncDokployClient"]:
+        """The private event loop (on its own daemon thread) and the pooled asyncio
+        twin bound to it, started on first use. A loop of our own keeps the bulk
+        reads usable from callers that already run one, where ``asyncio.run``
+        would refuse."""
+        with self._lock:
+            if self._aio_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="dokploy-fan-out", daemon=True
+                )
+                thread.start()
+                self._aio_loop, self._aio_thread = loop, thread
+                self._aio_client = self.aio()
+            return self._aio_loop, self._aio_client
+
+    def _fan_out(
+        self, method_name: str, compose_ids: Iterable[str], concurrency: int
+    ) -> dict:
+        loop, aclient = self._aio_runner()
+
+        async def run() -> dict:
+            try:
+                return await getattr(aclient, method_name)(
+                    compose_ids, concurrency=concurrency
+                )
+            finally:
+                self._merge_timings(aclient)
+
+        return asyncio.run_coroutine_threadsafe(run(), loop).result()
+
+    def _merge_timings(self, other: _DokployClientBase) -> None:
+        """Move ``other``'s counters into ours (the twin starts over at zero)."""
+        with self._lock, other._lock:
+            for key, theirs in other.request_stats.items():
+                ours = self.request_stats.setdefault(key, RequestTiming())
+                ours.calls += theirs.calls
+                ours.retries += theirs.retries
+                ours.errors += theirs.errors
+                ours.total_seconds += theirs.total_seconds
+                ours.max_seconds = max(ours.max_seconds, theirs.max_seconds)
+            other.request_stats.clear()
 
     # Project endpoints
     def list_projects(self) -> list[dict]:
@@ -127,11 +605,10 @@ class DokployClient:
 
     def list_environments(self, project_name: str) -> list[dict]:
         """List environments for a project by name."""
-        projects = self.list_projects()
-        for project in projects:
-            if project.get("name") == project_name:
-                return project.get("environments", [])
-        return []
+        project = self.topology().projects_by_name.get(project_name)
+        if project is None:
+            return []
+        return project.get("environments", [])
 
     def create_environment(
         self, project_id: str, name: str, description: str = ""
@@ -153,18 +630,16 @@ class DokployClient:
         if not target:
             raise ValueError("env_name is required")
 
-        projects = self.list_projects()
-        for project in projects:
-            if project.get("name") != project_name:
-                continue
-            for env in project.get("environments", []):
-                if _normalize_env_name(env.get("name")) == target:
-                    return env, False
-            env_desc = description or f"{target} env"
-            created = self.create_environment(project["projectId"], target, env_desc)
-            return created, True
-
-        raise ValueError(f"Project '{project_name}' not found in Dokploy")
+        snapshot = self.topology()
+        project = snapshot.projects_by_name.get(project_name)
+        if project is None:
+            raise ValueError(f"Project '{project_name}' not found in Dokploy")
+        env = snapshot.environments.get((project_name, target))
+        if env is not None:
+            return env, False
+        env_desc = description or f"{target} env"
+        created = self.create_environment(project["projectId"], target, env_desc)
+        return created, True
 
     # Compose endpoints
     def create_compose(
@@ -179,19 +654,16 @@ class DokployClient:
         **kwargs,
     ) -> dict:
         """Create a new compose application in an environment"""
-        payload = {
-            "name": name,
-            "environmentId": environment_id,
-            "composeType": compose_type,
-            "sourceType": source_type,
+        payload = _compose_create_payload(
+            environment_id,
+            name,
+            compose_file=compose_file,
+            env=env,
+            compose_type=compose_type,
+            app_name=app_name,
+            source_type=source_type,
             **kwargs,
-        }
-        if compose_file:
-            payload["composeFile"] = compose_file
-        if app_name:
-            payload["appName"] = app_name
-        if env:
-            payload["env"] = env
+        )
 
         # NOTE: Dokploy's compose.create reliably persists only name / environmentId /
         # composeType / sourceType / appName, and it assigns its own appName (name + a
@@ -213,16 +685,13 @@ class DokployClient:
         **kwargs,
     ) -> dict:
         """Update compose application"""
-        payload = {"composeId": compose_id}
-        if compose_file is not None:
-            payload["composeFile"] = compose_file
-        if env is not None:
-            payload["env"] = env
-        if source_type is not None:
-            payload["sourceType"] = source_type
-
-        # Merge extra args (e.g. repository, branch, githubId)
-        payload.update(kwargs)
+        payload = _compose_update_payload(
+            compose_id,
+            compose_file=compose_file,
+            env=env,
+            source_type=source_type,
+            **kwargs,
+        )
 
         # compose.update sets the compose row to a fixed desired state, so a retry after a
         # read-timeout re-applies the same payload — safe to retry on a churning control
@@ -279,60 +748,16 @@ class DokployClient:
         env_name: str | None = None,
     ) -> dict | None:
         """Find compose by name across all projects/environments."""
-        target_env = _normalize_env_name(env_name)
-        projects = self.list_projects()
-        for project in projects:
-            if project_name and project["name"] != project_name:
-                continue
-            for env in project.get("environments", []):
-                if target_env and _normalize_env_name(env.get("name")) != target_env:
-                    continue
-                for compose in env.get("compose", []):
-                    if compose.get("name") == name:
-                        # `project.all` returns a TRUNCATED compose (no `env` /
-                        # source fields). Re-fetch the full object via compose.one
-                        # so callers that read env — e.g. get_remote_config_hash's
-                        # IAC_CONFIG_HASH post-deploy check — see real values
-                        # instead of a spurious "none". Let get_compose errors
-                        # propagate: silently falling back to the truncated object
-                        # would reintroduce the "hash reads as none" bug and hide
-                        # real API/auth failures from callers that handle them.
-                        compose_id = compose.get("composeId")
-                        if not compose_id:
-                            # Same hazard, fail closed: a matched compose with no
-                            # composeId can't be re-fetched, so returning the
-                            # truncated object would read IAC_CONFIG_HASH as "none"
-                            # and reintroduce the exact bug this re-fetch fixes.
-                            raise RuntimeError(
-                                f"Dokploy compose {name!r} matched but has no "
-                                "composeId; cannot fetch its full env."
-                            )
-                        return self.get_compose(compose_id)
-        return None
+        compose = self.topology().find_compose(name, project_name, env_name)
+        if compose is None:
+            return None
+        return self.get_compose(_refetchable_compose_id(compose, name))
 
     def get_environment_id(
         self, project_name: str, env_name: str | None = None, require: bool = False
     ) -> str | None:
         """Get environment ID by name (falls back to default when env_name is omitted or production)."""
-        target = _normalize_env_name(env_name)
-        projects = self.list_projects()
-        for project in projects:
-            if project["name"] != project_name:
-                continue
-            if target:
-                for env in project.get("environments", []):
-                    if _normalize_env_name(env.get("name")) == target:
-                        return env.get("environmentId")
-                # For production, allow fallback to default environment to avoid breaking existing setups.
-                if target != "production":
-                    return None
-            for env in project.get("environments", []):
-                if env.get("isDefault"):
-                    return env.get("environmentId")
-            environments = project.get("environments", [])
-            if environments:
-                return environments[0].get("environmentId")
-        return None
+        return self.topology().environment_id(project_name, env_name)
 
     def get_compose_deployments(self, compose_id: str) -> list[dict]:
         """Get list of deployments for a compose application."""
@@ -342,14 +767,7 @@ class DokployClient:
             )
         except Exception:  # noqa: BLE001 - older Dokploy versions may not expose this endpoint.
             deployments = self.get_compose(compose_id).get("deployments")
-        if isinstance(deployments, list):
-            return [item for item in deployments if isinstance(item, dict)]
-        if isinstance(deployments, dict):
-            for key in ("deployments", "data", "items"):
-                items = deployments.get(key)
-                if isinstance(items, list):
-                    return [item for item in items if isinstance(item, dict)]
-        return []
+        return _deployments_from_payload(deployments)
 
     def get_latest_deployment(self, compose_id: str) -> dict | None:
         """Get the most recent deployment for a compose application"""
@@ -377,23 +795,17 @@ class DokployClient:
 
         # Fallback: scan projects/environments/composes, optionally narrowed by hints.
         target_env = _normalize_env_name(env_name) if env_name else None
-        projects = self.list_projects()
-        for project in projects:
-            # If a project_name hint is provided, skip other projects.
-            if project_name and project.get("name") != project_name:
+        for project, env, compose in self.topology().iter_composes():
+            # If a project_name / env_name hint is provided, skip the rest.
+            if project_name and project != project_name:
                 continue
-
-            for env in project.get("environments", []):
-                # If an env_name hint is provided, skip non-matching environments.
-                if target_env and _normalize_env_name(env.get("name")) != target_env:
-                    continue
-
-                for compose in env.get("compose", []):
-                    # Fetch detailed deployments for each compose
-                    details = self.get_compose(compose["composeId"])
-                    for depl in details.get("deployments", []):
-                        if depl.get("deploymentId") == deployment_id:
-                            return depl.get("logPath")
+            if target_env and env != target_env:
+                continue
+            # Fetch detailed deployments for each compose
+            details = self.get_compose(compose["composeId"])
+            for depl in details.get("deployments", []):
+                if depl.get("deploymentId") == deployment_id:
+                    return depl.get("logPath")
         return None
 
     # Domain endpoints
@@ -568,28 +980,369 @@ class DokployClient:
 
         # Method 2: fall back to a compose that is already bound to GitHub.
         try:
-            projects = self.list_projects()
-            for proj in projects:
-                for env in proj.get("environments", []):
-                    for comp in env.get("compose", []):
-                        if comp.get("githubId"):
-                            return comp.get("githubId")
+            github_id = self.topology().github_provider_id()
+            if github_id:
+                return github_id
         except Exception:
             pass
 
         return None
 
 
+class AsyncDokployClient(_DokployClientBase):
+    """asyncio flavour of ``DokployClient`` for fleet sweeps.
+
+    Same endpoints, topology snapshot and retry/idempotency rules (shared via
+    ``_DokployClientBase``), over one pooled ``httpx.AsyncClient``. The bulk
+    ``get_composes_many`` / ``get_deployments_many`` fan out up to
+    ``concurrency`` calls at once. Composite helpers that serialize writes with a
+    thread lock (``update_compose_env``, ``ensure_domains``) stay on the sync
+    client.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._http: httpx.AsyncClient | None = None
+
+    def _http_client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, http2=self.http2
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        http, self._http = self._http, None
+        if http is not None:
+            await http.aclose()
+
+    async def __aenter__(self) -> "AsyncDokployClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        _retries: int = 2,
+        _sleep=asyncio.sleep,
+        idempotent: bool = False,
+        **kwargs,
+    ) -> dict | list:
+        """Async ``DokployClient._request``: same retry, counter and invalidation rules."""
+        url, headers, retryable, timing = self._prepare(
+            method, endpoint, kwargs, idempotent
+        )
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                try:
+                    resp = await self._http_client().request(
+                        method, url, headers=headers, **kwargs
+                    )
+                    resp.raise_for_status()
+                finally:
+                    self._record(timing, started)
+                return resp.json() if resp.content else {}
+            except httpx.HTTPError as exc:
+                if self._should_retry(
+                    exc,
+                    retryable=retryable,
+                    attempt=attempt,
+                    retries=_retries,
+                    timing=timing,
+                ):
+                    attempt += 1
+                    await _sleep(2**attempt)
+                    continue
+                raise self._wrap_error(exc, method, url) from exc
+
+    async def topology(self, *, refresh: bool = False) -> TopologySnapshot:
+        snapshot = None if refresh else self._fresh_topology()
+        if snapshot is None:
+            snapshot = self._store_topology(await self.list_projects())
+        return snapshot
+
+    # Project / environment endpoints
+    async def list_projects(self) -> list[dict]:
+        return await self._request("GET", "project.all")
+
+    async def create_project(self, name: str, description: str = "") -> dict:
+        return await self._request(
+            "POST", "project.create", json={"name": name, "description": description}
+        )
+
+    async def list_environments(self, project_name: str) -> list[dict]:
+        project = (await self.topology()).projects_by_name.get(project_name)
+        if project is None:
+            return []
+        return project.get("environments", [])
+
+    async def create_environment(
+        self, project_id: str, name: str, description: str = ""
+    ) -> dict:
+        payload = {"projectId": project_id, "name": name}
+        if description:
+            payload["description"] = description
+        return await self._request("POST", "environment.create", json=payload)
+
+    async def ensure_environment(
+        self, project_name: str, env_name: str, description: str = ""
+    ) -> tuple[dict, bool]:
+        target = _normalize_env_name(env_name)
+        if not target:
+            raise ValueError("env_name is required")
+        snapshot = await self.topology()
+        project = snapshot.projects_by_name.get(project_name)
+        if project is None:
+            raise ValueError(f"Project '{project_name}' not found in Dokploy")
+        env = snapshot.environments.get((project_name, target))
+        if env is not None:
+            return env, False
+        env_desc = description or f"{target} env"
+        created = await self.create_environment(project["projectId"], target, env_desc)
+        return created, True
+
+    async def get_environment_id(
+        self, project_name: str, env_name: str | None = None, require: bool = False
+    ) -> str | None:
+        return (await self.topology()).environment_id(project_name, env_name)
+
+    # Compose endpoints
+    async def create_compose(
+        self,
+        environment_id: str,
+        name: str,
+        compose_file: str = "",
+        env: str = "",
+        compose_type: str = "docker-compose",
+        app_name: str | None = None,
+        source_type: str = "raw",
+        **kwargs,
+    ) -> dict:
+        # Same persistence caveats as DokployClient.create_compose.
+        payload = _compose_create_payload(
+            environment_id,
+            name,
+            compose_file=compose_file,
+            env=env,
+            compose_type=compose_type,
+            app_name=app_name,
+            source_type=source_type,
+            **kwargs,
+        )
+        return await self._request("POST", "compose.create", json=payload)
+
+    async def update_compose(
+        self,
+        compose_id: str,
+        compose_file: str | None = None,
+        env: str | None = None,
+        source_type: str | None = None,
+        **kwargs,
+    ) -> dict:
+        payload = _compose_update_payload(
+            compose_id,
+            compose_file=compose_file,
+            env=env,
+            source_type=source_type,
+            **kwargs,
+        )
+        return await self._request(
+            "POST", "compose.update", json=payload, idempotent=True
+        )
+
+    async def deploy_compose(self, compose_id: str) -> dict:
+        return await self._request(
+            "POST", "compose.deploy", json={"composeId": compose_id}
+        )
+
+    async def redeploy_compose(self, compose_id: str) -> dict:
+        return await self._request(
+            "POST", "compose.redeploy", json={"composeId": compose_id}
+        )
+
+    async def delete_compose(
+        self, compose_id: str, *, delete_volumes: bool = False
+    ) -> dict:
+        return await self._request(
+            "POST",
+            "compose.delete",
+            json={"composeId": compose_id, "deleteVolumes": delete_volumes},
+        )
+
+    async def cancel_compose_deployment(self, compose_id: str) -> dict:
+        return await self._request(
+            "POST", "compose.cancelDeployment", json={"composeId": compose_id}
+        )
+
+    async def kill_compose_build(self, compose_id: str) -> dict:
+        return await self._request(
+            "POST", "compose.killBuild", json={"composeId": compose_id}
+        )
+
+    async def clean_compose_queues(self, compose_id: str) -> dict:
+        return await self._request(
+            "POST", "compose.cleanQueues", json={"composeId": compose_id}
+        )
+
+    async def get_compose(self, compose_id: str) -> dict:
+        return await self._request("GET", f"compose.one?composeId={compose_id}")
+
+    async def get_compose_env(self, compose_id: str) -> str:
+        return (await self.get_compose(compose_id)).get("env") or ""
+
+    async def find_compose_by_name(
+        self,
+        name: str,
+        project_name: str | None = None,
+        env_name: str | None = None,
+    ) -> dict | None:
+        compose = (await self.topology()).find_compose(name, project_name, env_name)
+        if compose is None:
+            return None
+        return await self.get_compose(_refetchable_compose_id(compose, name))
+
+    async def get_compose_deployments(self, compose_id: str) -> list[dict]:
+        try:
+            deployments = await self._request(
+                "GET", f"deployment.allByCompose?composeId={compose_id}"
+            )
+        except Exception:  # noqa: BLE001 - older Dokploy versions may not expose this endpoint.
+            deployments = (await self.get_compose(compose_id)).get("deployments")
+        return _deployments_from_payload(deployments)
+
+    async def get_latest_deployment(self, compose_id: str) -> dict | None:
+        deployments = await self.get_compose_deployments(compose_id)
+        return deployments[0] if deployments else None
+
+    # Domain / git provider endpoints
+    async def create_domain(
+        self,
+        compose_id: str,
+        host: str,
+        port: int,
+        https: bool = True,
+        path: str = "/",
+        service_name: str | None = None,
+    ) -> dict:
+        payload = {
+            "composeId": compose_id,
+            "host": host,
+            "port": port,
+            "https": https,
+            "path": path,
+        }
+        if service_name:
+            payload["serviceName"] = service_name
+        return await self._request("POST", "domain.create", json=payload)
+
+    async def list_git_providers(self) -> list[dict]:
+        return await self._request("GET", "github.githubProviders")
+
+    async def get_github_provider_id(self) -> str | None:
+        try:
+            for p in await self.list_git_providers():
+                github_id = p.get("githubId")
+                if github_id:
+                    return github_id
+        except Exception:
+            pass
+        try:
+            return (await self.topology()).github_provider_id()
+        except Exception:
+            return None
+
+    # Bulk fan-out
+    async def get_composes_many(
+        self,
+        compose_ids: Iterable[str],
+        *,
+        concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    ) -> dict[str, dict | Exception]:
+        """``compose.one`` for every id, at most ``concurrency`` in flight."""
+        return await self._gather(compose_ids, self.get_compose, concurrency)
+
+    async def get_deployments_many(
+        self,
+        compose_ids: Iterable[str],
+        *,
+        concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    ) -> dict[str, list[dict] | Exception]:
+        """``get_compose_deployments`` for every id, at most ``concurrency`` in flight."""
+        return await self._gather(
+            compose_ids, self.get_compose_deployments, concurrency
+        )
+
+    @staticmethod
+    async def _gather(compose_ids: Iterable[str], fetch, concurrency: int) -> dict:
+        """Run ``fetch`` per unique id; results keep input order and one failing id
+        yields its exception instead of aborting the whole sweep."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(compose_id: str):
+            async with semaphore:
+                try:
+                    return compose_id, await fetch(compose_id)
+                except Exception as exc:  # noqa: BLE001 - per-id failure is data.
+                    return compose_id, exc
+
+        ids = list(dict.fromkeys(compose_ids))
+        return dict(await asyncio.gather(*(one(compose_id) for compose_id in ids)))
+
+
+# base_url (None = default) -> client, populated only inside dokploy_session().
+_session_clients: contextvars.ContextVar[dict[str | None, DokployClient] | None] = (
+    contextvars.ContextVar("dokploy_session_clients", default=None)
+)
+
+
 def get_dokploy(host: str | None = None) -> DokployClient:
     """Get configured Dokploy client
 
+    Inside ``dokploy_session()`` every call for the same host returns the same
+    client, so its pooled connection is reused across helpers that each ask for
+    their own client.
+
     Args:
         host: Optional host override (e.g. 'cloud.example.com')
     """
     base_url = None
     if host:
         base_url = f"https://{host}/api"
-    return DokployClient(base_url=base_url)
+    clients = _session_clients.get()
+    if clients is None:
+        return DokployClient(base_url=base_url)
+    client = clients.get(base_url)
+    if client is None:
+        client = clients[base_url] = DokployClient(base_url=base_url)
+    return client
+
+
+@contextlib.contextmanager
+def dokploy_session() -> Iterator[None]:
+    """Share one pooled DokployClient per host for the duration of the block.
+
+    Deployer.sync resolves ``get_dokploy()`` from several helpers (environment
+    lookup, remote identity read, deploy, post-deploy verification); without a
+    session each of those opened its own connection. Clients are closed on exit.
+    Nested sessions reuse the outer one.
+    """
+    if _session_clients.get() is not None:
+        yield
+        return
+    clients: dict[str | None, DokployClient] = {}
+    token = _session_clients.set(clients)
+    try:
+        yield
+    finally:
+        _session_clients.reset(token)
+        for client in clients.values():
+            client.close()
 
 
 # Convenience functions
@@ -602,20 +1355,17 @@ def ensure_project(
 ) -> tuple[str, str | None]:
     """Ensure project exists, return (projectId, environmentId)."""
     client = get_dokploy(host=host)
-    projects = client.list_projects()
+    project = client.topology().projects_by_name.get(name)
     normalized_env = _normalize_env_name(env_name)
 
-    for project in projects:
-        if project["name"] == name:
-            env_id = client.get_environment_id(
-                name, normalized_env, require=require_env
+    if project is not None:
+        env_id = client.get_environment_id(name, normalized_env, require=require_env)
+        if (normalized_env or require_env) and not env_id:
+            raise ValueError(
+                f"Environment '{normalized_env}' not found in Dokploy project '{name}'. "
+                "Create it in Dokploy UI before deploying."
             )
-            if (normalized_env or require_env) and not env_id:
-                raise ValueError(
-                    f"Environment '{normalized_env}' not found in Dokploy project '{name}'. "
-                    "Create it in Dokploy UI before deploying."
-                )
-            return project["projectId"], env_id
+        return project["projectId"], env_id
 
     result = client.create_project(name, description)
     # API returns {'project': {...}, 'environment': {...}}
@@ -9,6 +9,10 @@ Three credential types:
 Two backends:
 - OpSecrets: 1Password (uses OP_SERVICE_ACCOUNT_TOKEN)
 - VaultSecrets: HashiCorp Vault (uses VAULT_ROOT_TOKEN)
+
+Both share one process-wide SecretsSession: a pooled Vault connection plus a
+TTL cache of KV reads and 1Password items, so the many short-lived
+get_secrets() instances a deploy creates do not re-handshake or re-shell.
 """
 
 from __future__ import annotations
@@ -18,7 +22,11 @@ import secrets
 import string
 import subprocess
 import sys
-from typing import Literal, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Callable, Literal, Optional
 
 import httpx
 
@@ -30,9 +38,18 @@ CredentialType = Literal["bootstrap", "root_vars", "app_vars"]
 # drifting — some said /Token, some /Root Token); rotate the item here, not in N places.
 VAULT_ROOT_TOKEN_OP_REF = "op://Infra2/dexluuvzg5paff3cltmtnlnosm/Root Token"
 
+# Seconds a KV read / 1Password item stays cached process-wide ("0" disables).
+# A Vault response's lease_duration, when set, caps it further.
+SECRETS_CACHE_TTL_ENV = "INFRA2_SECRETS_CACHE_TTL"
+DEFAULT_SECRETS_CACHE_TTL = 60.0
+PREFETCH_CONCURRENCY = 8
+
 __all__ = [
     "OpSecrets",
     "VaultSecrets",
+    "SecretsSession",
+    "secrets_session",
+    "reset_secrets_session",
     "get_secrets",
     "generate_password",
     "verify_vault_token",
@@ -63,6 +80,145 @@ def _validate_scope_value(
     return trimmed
 
 
+def _cache_ttl_from_env() -> float:
+    raw = os.getenv(SECRETS_CACHE_TTL_ENV, "").strip()
+    if not raw:
+        return DEFAULT_SECRETS_CACHE_TTL
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return DEFAULT_SECRETS_CACHE_TTL
+
+
+class SecretsSession:
+    """Process-wide secrets state shared by every OpSecrets/VaultSecrets.
+
+    - one pooled ``httpx.Client`` per (Vault address, TLS verify) pair;
+    - a TTL cache of Vault KV reads (keyed by address, token and path) and
+      1Password items, with writes through either backend invalidating their key;
+    - ``prefetch`` to read all paths a sync will need concurrently up front;
+    - ``stats`` hit/miss counters.
+    """
+
+    def __init__(
+        self,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = _cache_ttl_from_env() if ttl is None else ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stack = ExitStack()
+        self._clients: dict[tuple[str, bool], httpx.Client] = {}
+        self._entries: dict[tuple, tuple[float, dict[str, str]]] = {}
+        self.stats = {"hits": 0, "misses": 0, "vault_reads": 0, "op_reads": 0}
+
+    def client(self, addr: str, verify: bool) -> httpx.Client:
+        """The pooled client for ``addr`` (closed by ``close``)."""
+        with self._lock:
+            client = self._clients.get((addr, verify))
+            if client is None:
+                client = self._stack.enter_context(
+                    httpx.Client(verify=verify, timeout=10.0)
+                )
+                self._clients[addr, verify] = client
+            return client
+
+    def count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def lookup(self, key: tuple) -> dict[str, str] | None:
+        """A live cached value for ``key``, counting the hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self.stats["hits"] += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.stats["misses"] += 1
+            return None
+
+    def store(self, key: tuple, value: dict[str, str], ttl: float | None = None):
+        """Cache ``value``; ``ttl`` (e.g. a lease duration) can only shorten it."""
+        lifetime = self.ttl if ttl is None else min(self.ttl, ttl)
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + lifetime, value)
+
+    def invalidate(self, key: tuple) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        """Drop the cache and close pooled connections."""
+        with self._lock:
+            self._entries.clear()
+            self._clients.clear()
+            stack, self._stack = self._stack, ExitStack()
+        stack.close()
+
+    def prefetch(
+        self,
+        paths: list[str],
+        token: str | None = None,
+        addr: str | None = None,
+    ) -> dict[str, dict[str, str]]:
+        """Read several Vault KV paths concurrently over the pooled connection.
+
+        Vault KV has no multi-path read endpoint, so the batch is a bounded set
+        of parallel GETs. Returns the data of every path that loaded; a path
+        that fails is left out (its real read later raises the usual error).
+        """
+        readers = [VaultSecrets(path, token=token, addr=addr) for path in paths]
+        readers = [reader for reader in readers if reader.token]
+
+        def load(reader: VaultSecrets) -> dict[str, str] | None:
+            try:
+                return reader._load()
+            except VaultSecrets.VaultError:
+                return None
+
+        if not readers:
+            return {}
+        with ThreadPoolExecutor(
+            max_workers=min(PREFETCH_CONCURRENCY, len(readers))
+        ) as pool:
+            results = list(pool.map(load, readers))
+        return {
+            reader.path: dict(data)
+            for reader, data in zip(readers, results)
+            if data is not None
+        }
+
+
+_SESSION: SecretsSession | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def secrets_session() -> SecretsSession:
+    """The process-wide SecretsSession (created on first use)."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = SecretsSession()
+        return _SESSION
+
+
+def reset_secrets_session() -> None:
+    """Close the current session; the next secrets access starts a fresh one."""
+    global _SESSION
+    with _SESSION_LOCK:
+        session, _SESSION = _SESSION, None
+    if session is not None:
+        session.close()
+
+
 class OpSecrets:
     """1Password secrets for bootstrap phase.
 
@@ -74,13 +230,27 @@ class OpSecrets:
 
     def __init__(self, item: str = INIT_ITEM):
         self.item = item
-        self._cache: dict | None = None
 
-    def _load(self) -> dict[str, str]:
-        """Load all fields from 1Password item"""
-        if self._cache is not None:
-            return self._cache
+    @property
+    def _cache_key(self) -> tuple:
+        return ("op", self.VAULT, self.item)
 
+    def _load(self) -> dict[str, str]:
+        """Load all fields from 1Password item (memoized across instances)"""
+        session = secrets_session()
+        cached = session.lookup(self._cache_key)
+        if cached is not None:
+            return cached
+
+        session.count("op_reads")
+        fields = self._fetch()
+        if fields is None:
+            # A failed `op` call is not cached: the next lookup retries.
+            return {}
+        session.store(self._cache_key, fields)
+        return fields
+
+    def _fetch(self) -> dict[str, str] | None:
         try:
             result = subprocess.run(
                 [
@@ -96,21 +266,20 @@ class OpSecrets:
                 check=True,
             )
             item = json.loads(result.stdout)
-            self._cache = {
+            return {
                 f["label"]: f.get("value", "")
                 for f in item.get("fields", [])
                 if f.get("label")
                 and f.get("label") not in ["notesPlain", "password", "username"]
             }
         except FileNotFoundError:
-            self._cache = {}
+            return None
         except subprocess.CalledProcessError as e:
             print(f"OpSecrets: failed to load {self.item}: {e}", file=sys.stderr)
-            self._cache = {}
+            return None
         except json.JSONDecodeError as e:
             print(f"OpSecrets: invalid JSON from {self.item}: {e}", file=sys.stderr)
-            self._cache = {}
-        return self._cache
+            return None
 
     def get(self, key: str) -> Optional[str]:
         """Get a single field value"""
@@ -118,7 +287,7 @@ class OpSecrets:
 
     def get_all(self) -> dict[str, str]:
         """Get all fields"""
-        return self._load()
+        return dict(self._load())
 
     def set(self, key: str, value: str) -> bool:
         """Set a field value"""
@@ -135,7 +304,7 @@ class OpSecrets:
                 capture_output=True,
                 check=True,
             )
-            self._cache = None  # Invalidate cache
+            secrets_session().invalidate(self._cache_key)
             return True
         except subprocess.CalledProcessError as e:
             print(f"OpSecrets: failed to set {key}: {e}", file=sys.stderr)
@@ -184,7 +353,10 @@ class VaultSecrets:
             "true",
             "yes",
         )
-        self._cache: dict | None = None
+
+    @property
+    def _cache_key(self) -> tuple:
+        return ("vault", self.addr, self.token, self.path)
 
     @staticmethod
     def _get_addr() -> str:
@@ -195,11 +367,11 @@ class VaultSecrets:
             return f"https://vault.{domain}"
         return "https://vault.localhost"
 
-    def _load(self) -> dict[str, str]:
-        """Load secrets from Vault"""
-        if self._cache is not None:
-            return self._cache
+    def _load(self, fresh: bool = False) -> dict[str, str]:
+        """Load secrets from Vault (cached process-wide, see SecretsSession).
 
+        ``fresh`` skips the cached value and reads Vault (refreshing the cache).
+        """
         if not self.token:
             raise self.VaultAuthError(
                 "\n❌ VAULT_ROOT_TOKEN not set\n"
@@ -208,47 +380,56 @@ class VaultSecrets:
                 "(item: bootstrap/vault/Root Token)"
             )
 
+        session = secrets_session()
+        cached = None if fresh else session.lookup(self._cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            with httpx.Client(verify=self.verify_ssl, timeout=10.0) as client:
-                resp = client.get(
-                    f"{self.addr}/v1/secret/data/{self.path}",
-                    headers={"X-Vault-Token": self.token},
-                )
+            client = session.client(self.addr, self.verify_ssl)
+            session.count("vault_reads")
+            resp = client.get(
+                f"{self.addr}/v1/secret/data/{self.path}",
+                headers={"X-Vault-Token": self.token},
+            )
 
-                if resp.status_code == 200:
-                    data = resp.json().get("data", {}).get("data", {})
-                    if not data:
-                        raise self.VaultSecretNotFoundError(
-                            f"\n❌ Secret path exists but has no data: {self.path}\n"
-                            f"Fix: vault kv put secret/{self.path} key=value"
-                        )
-                    self._cache = data
-                    return self._cache
-                elif resp.status_code == 404:
+            if resp.status_code == 200:
+                body = resp.json()
+                data = body.get("data", {}).get("data", {})
+                if not data:
                     raise self.VaultSecretNotFoundError(
-                        f"\n❌ Secret not found: {self.path}\n"
-                        f"Fix: vault kv put secret/{self.path} key=value\n"
-                        f"Or check path exists: vault kv list secret/{'/'.join(self.path.split('/')[:-1])}"
-                    )
-                elif resp.status_code == 403:
-                    raise self.VaultAuthError(
-                        f"\n❌ Permission denied accessing: {self.path}\n"
-                        f"The AppRole token lacks read permission to this path.\n"
-                        f"Check token: vault token lookup\n"
-                        f"Fix: update the service's AppRole policy/creds (invoke vault.setup-approle)"
-                    )
-                elif resp.status_code == 503:
-                    raise self.VaultConnectionError(
-                        f"\n❌ Vault is sealed or unavailable\n"
-                        f"Check: curl {self.addr}/v1/sys/health\n"
-                        f"Fix: vault operator unseal (or check unsealer logs)"
-                    )
-                else:
-                    raise self.VaultError(
-                        f"\n❌ Vault returned unexpected status {resp.status_code}\n"
-                        f"Path: {self.path}\n"
-                        f"Response: {resp.text[:200]}"
+                        f"\n❌ Secret path exists but has no data: {self.path}\n"
+                        f"Fix: vault kv put secret/{self.path} key=value"
                     )
+                # KV v2 reports lease_duration 0; a leased backend caps the TTL.
+                lease = body.get("lease_duration") or 0
+                session.store(self._cache_key, data, ttl=lease or None)
+                return data
+            elif resp.status_code == 404:
+                raise self.VaultSecretNotFoundError(
+                    f"\n❌ Secret not found: {self.path}\n"
+                    f"Fix: vault kv put secret/{self.path} key=value\n"
+                    f"Or check path exists: vault kv list secret/{'/'.join(self.path.split('/')[:-1])}"
+                )
+            elif resp.status_code == 403:
+                raise self.VaultAuthError(
+                    f"\n❌ Permission denied accessing: {self.path}\n"
+                    f"The AppRole token lacks read permission to this path.\n"
+                    f"Check token: vault token lookup\n"
+                    f"Fix: update the service's AppRole policy/creds (invoke vault.setup-approle)"
+                )
+            elif resp.status_code == 503:
+                raise self.VaultConnectionError(
+                    f"\n❌ Vault is sealed or unavailable\n"
+                    f"Check: curl {self.addr}/v1/sys/health\n"
+                    f"Fix: vault operator unseal (or check unsealer logs)"
+                )
+            else:
+                raise self.VaultError(
+                    f"\n❌ Vault returned unexpected status {resp.status_code}\n"
+                    f"Path: {self.path}\n"
+                    f"Response: {resp.text[:200]}"
+                )
 
         except httpx.ConnectError as e:
             raise self.VaultConnectionError(
@@ -269,7 +450,7 @@ class VaultSecrets:
 
     def get_all(self) -> dict[str, str]:
         """Get all secrets"""
-        return self._load()
+        return dict(self._load())
 
     def set(self, key: str, value: str) -> bool:
         """Set a secret (merge with existing)"""
@@ -278,38 +459,41 @@ class VaultSecrets:
                 "\n❌ VAULT_ROOT_TOKEN not set - cannot write secrets"
             )
 
+        # Merge into what Vault holds now, not a cached read: the cache may
+        # predate a write from another process or token.
         try:
-            existing = self._load().copy()
+            existing = self._load(fresh=True).copy()
         except self.VaultSecretNotFoundError:
             existing = {}
         existing[key] = value
 
         try:
-            with httpx.Client(verify=self.verify_ssl, timeout=10.0) as client:
-                resp = client.post(
-                    f"{self.addr}/v1/secret/data/{self.path}",
-                    headers={"X-Vault-Token": self.token},
-                    json={"data": existing},
+            session = secrets_session()
+            client = session.client(self.addr, self.verify_ssl)
+            resp = client.post(
+                f"{self.addr}/v1/secret/data/{self.path}",
+                headers={"X-Vault-Token": self.token},
+                json={"data": existing},
+            )
+            if resp.status_code in (200, 204):
+                session.invalidate(self._cache_key)
+                return True
+            elif resp.status_code == 403:
+                raise self.VaultAuthError(
+                    f"\n❌ Permission denied writing to: {self.path}\n"
+                    f"Token lacks write permission.\n"
+                    f"Check token: vault token lookup"
+                )
+            elif resp.status_code == 503:
+                raise self.VaultConnectionError(
+                    "\n❌ Vault is sealed or unavailable\nCannot write secrets."
+                )
+            else:
+                raise self.VaultError(
+                    f"\n❌ Vault write failed with status {resp.status_code}\n"
+                    f"Path: {self.path}\n"
+                    f"Response: {resp.text[:200]}"
                 )
-                if resp.status_code in (200, 204):
-                    self._cache = None
-                    return True
-                elif resp.status_code == 403:
-                    raise self.VaultAuthError(
-                        f"\n❌ Permission denied writing to: {self.path}\n"
-                        f"Token lacks write permission.\n"
-                        f"Check token: vault token lookup"
-                    )
-                elif resp.status_code == 503:
-                    raise self.VaultConnectionError(
-                        "\n❌ Vault is sealed or unavailable\nCannot write secrets."
-                    )
-                else:
-                    raise self.VaultError(
-                        f"\n❌ Vault write failed with status {resp.status_code}\n"
-                        f"Path: {self.path}\n"
-                        f"Response: {resp.text[:200]}"
-                    )
         except httpx.ConnectError as e:
             raise self.VaultConnectionError(
                 f"\n❌ Cannot connect to Vault: {e}\nCheck: VAULT_ADDR={self.addr}"
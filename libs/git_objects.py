@@ -0,0 +1,356 @@
+"""Persistent git object reader for scanning many refs without a worktree.
+
+Config-drift and reconcile tooling read the same files at several refs (the
+release tag, each service's deployed ref, the previous tag). Spawning git per
+ref and per service makes a fleet scan pay process start-up and pack lookup
+over and over. ``GitObjectReader`` keeps ONE long-lived ``git cat-file
+--batch`` process and caches what it learns:
+
+- ref -> commit id and commit -> root tree;
+- tree objects by id, so path lookups and glob walks share subtrees that are
+  identical across refs;
+- blob contents by blob id, so a file that is identical across services or
+  refs is read once.
+
+Globs resolve against the tree at a ref (``glob``) with ``glob.glob``'s rules
+(``**`` spans directories, wildcards skip dot-names), and ``changed_paths``
+diffs two refs by comparing tree ids, descending only into subtrees that
+differ. Read-only: nothing here writes to the repository.
+"""
+
+from __future__ import annotations
+
+import atexit
+import fnmatch
+import re
+import subprocess
+import threading
+from pathlib import Path
+
+# Regular files only, mirroring the disk enumerations' ``is_file()`` check on a
+# clean checkout (a gitlink has no content; a symlink's blob is its target).
+FILE_MODES = {"100644", "100755"}
+TREE_MODE = "40000"
+
+
+class GitObjectError(RuntimeError):
+    """The cat-file process died or answered out of protocol."""
+
+
+def _glob_segment_regex(segment: str) -> re.Pattern:
+    regex = fnmatch.translate(segment)
+    if not segment.startswith("."):
+        # glob.glob never lets a wildcard match a leading dot.
+        regex = r"(?!\.)" + regex
+    return re.compile(regex)
+
+
+class GlobPattern:
+    """A ``glob.glob(..., recursive=True)`` pattern over repo-relative paths:
+    the literal directory prefix (``base``) plus per-segment matchers for the
+    rest, so a caller walks only ``base`` and tests each path below it."""
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        segments = [s for s in pattern.strip("/").split("/") if s]
+        literal: list[str] = []
+        for segment in segments:
+            if any(ch in segment for ch in "*?["):
+                break
+            literal.append(segment)
+        self.base = "/".join(literal)
+        # None stands for "**": zero or more non-hidden directories/files.
+        self._matchers = [
+            None if s == "**" else _glob_segment_regex(s)
+            for s in segments[len(literal) :]
+        ]
+
+    @property
+    def is_literal(self) -> bool:
+        """No wildcard: the pattern names exactly one path, ``base``."""
+        return not self._matchers
+
+    def match(self, rel_parts: list[str]) -> bool:
+        """Whether the path ``base/<rel_parts...>`` matches."""
+        return self._match(rel_parts, self._matchers)
+
+    @classmethod
+    def _match(cls, parts: list[str], matchers: list) -> bool:
+        if not matchers:
+            return not parts
+        head, tail = matchers[0], matchers[1:]
+        if head is None:
+            if cls._match(parts, tail):
+                return True
+            return (
+                bool(parts)
+                and not parts[0].startswith(".")
+                and cls._match(parts[1:], matchers)
+            )
+        return (
+            bool(parts) and bool(head.match(parts[0])) and cls._match(parts[1:], tail)
+        )
+
+
+class GitObjectReader:
+    """One ``git cat-file --batch`` process plus id-keyed object caches."""
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = Path(repo_root)
+        self._proc: subprocess.Popen | None = None
+        self._lock = threading.RLock()
+        self._commits: dict[str, str | None] = {}
+        self._commit_info: dict[str, tuple[str, list[str]]] = {}
+        self._trees: dict[str, list[tuple[str, str, str]]] = {}
+        self._blobs: dict[str, bytes] = {}
+        self.stats = {"requests": 0, "blob_hits": 0, "tree_hits": 0}
+
+    # -- process -----------------------------------------------------------
+
+    def _process(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.repo_root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._proc
+
+    def close(self) -> None:
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+        finally:
+            proc.stdout.close()
+
+    def __enter__(self) -> "GitObjectReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _request(self, spec: str) -> tuple[str, str, bytes] | None:
+        """(object id, type, content) for an object spec, or None if missing."""
+        if "\n" in spec:
+            raise ValueError(f"object spec must be one line: {spec!r}")
+        with self._lock:
+            proc = self._process()
+            self.stats["requests"] += 1
+            try:
+                proc.stdin.write(spec.encode() + b"\n")
+                proc.stdin.flush()
+                header = proc.stdout.readline()
+            except OSError as exc:
+                self._proc = None
+                raise GitObjectError(f"git cat-file --batch failed: {exc}") from exc
+            if not header:
+                self._proc = None
+                raise GitObjectError("git cat-file --batch exited unexpectedly")
+            fields = header.decode().split()
+            if fields[-1] in ("missing", "ambiguous"):
+                return None
+            oid, kind, size = fields[0], fields[1], int(fields[2])
+            content = proc.stdout.read(size + 1)[:size]
+            return oid, kind, content
+
+    # -- objects -------------------------------------------------------------
+
+    def commit(self, ref: str) -> str | None:
+        """The commit id ``ref`` resolves to, or None if it does not."""
+        if ref not in self._commits:
+            found = self._request(f"{ref}^{{commit}}")
+            if found is not None:
+                oid, _kind, content = found
+                self._commit_info.setdefault(oid, self._parse_commit(content))
+            self._commits[ref] = found[0] if found else None
+        return self._commits[ref]
+
+    @staticmethod
+    def _parse_commit(content: bytes) -> tuple[str, list[str]]:
+        tree, parents = "", []
+        for line in content.split(b"\n"):
+            if not line:
+                break  # end of headers
+            key, _, value = line.decode().partition(" ")
+            if key == "tree":
+                tree = value
+            elif key == "parent":
+                parents.append(value)
+        return tree, parents
+
+    def parents(self, ref: str) -> list[str]:
+        commit = self.commit(ref)
+        return list(self._commit_info[commit][1]) if commit else []
+
+    def tree(self, tree_id: str) -> list[tuple[str, str, str]]:
+        """Entries ``(mode, name, object id)`` of a tree object, cached by id."""
+        entries = self._trees.get(tree_id)
+        if entries is not None:
+            self.stats["tree_hits"] += 1
+            return entries
+        found = self._request(tree_id)
+        if found is None or found[1] != "tree":
+            raise GitObjectError(f"{tree_id} is not a tree")
+        oid_len = len(tree_id) // 2
+        content, entries, pos = found[2], [], 0
+        while pos < len(content):
+            space = content.index(b" ", pos)
+            nul = content.index(b"\0", space)
+            mode = content[pos:space].decode()
+            name = content[space + 1 : nul].decode(errors="surrogateescape")
+            oid = content[nul + 1 : nul + 1 + oid_len].hex()
+            entries.append((mode, name, oid))
+            pos = nul + 1 + oid_len
+        self._trees[tree_id] = entries
+        return entries
+
+    def _subtree(self, ref: str, directory: str) -> str | None:
+        commit = self.commit(ref)
+        if commit is None:
+            return None
+        tree_id = self._commit_info[commit][0]
+        for part in [p for p in directory.split("/") if p]:
+            match = next(
+                (e for e in self.tree(tree_id) if e[1] == part and e[0] == TREE_MODE),
+                None,
+            )
+            if match is None:
+                return None
+            tree_id = match[2]
+        return tree_id
+
+    def entry(self, ref: str, path: str) -> tuple[str, str] | None:
+        """``(mode, object id)`` of ``path`` at ``ref``, or None if absent."""
+        directory, _, name = path.strip("/").rpartition("/")
+        tree_id = self._subtree(ref, directory)
+        if tree_id is None:
+            return None
+        for mode, entry_name, oid in self.tree(tree_id):
+            if entry_name == name:
+                return mode, oid
+        return None
+
+    def blob(self, blob_id: str) -> bytes:
+        """Content of a blob, read from git at most once per process."""
+        content = self._blobs.get(blob_id)
+        if content is not None:
+            self.stats["blob_hits"] += 1
+            return content
+        found = self._request(blob_id)
+        if found is None or found[1] != "blob":
+            raise GitObjectError(f"{blob_id} is not a blob")
+        self._blobs[blob_id] = found[2]
+        return found[2]
+
+    def read(self, ref: str, path: str) -> bytes | None:
+        """Content of the regular file ``path`` at ``ref``, or None if absent."""
+        found = self.entry(ref, path)
+        if found is None or found[0] not in FILE_MODES:
+            return None
+        return self.blob(found[1])
+
+    def contents_at_ref(self, ref: str, paths: list[str]) -> dict[str, bytes]:
+        """{path: content} for the ``paths`` that exist at ``ref``."""
+        out: dict[str, bytes] = {}
+        for path in paths:
+            content = self.read(ref, path)
+            if content is not None:
+                out[path] = content
+        return out
+
+    # -- walks ---------------------------------------------------------------
+
+    def files(self, ref: str, directory: str = "") -> list[str]:
+        """Repo-relative paths of every regular file under ``directory``."""
+        tree_id = self._subtree(ref, directory)
+        if tree_id is None:
+            return []
+        prefix = f"{directory.strip('/')}/" if directory.strip("/") else ""
+        return [prefix + rel for rel in self._walk(tree_id)]
+
+    def _walk(self, tree_id: str) -> list[str]:
+        out: list[str] = []
+        for mode, name, oid in self.tree(tree_id):
+            if mode == TREE_MODE:
+                out.extend(f"{name}/{rel}" for rel in self._walk(oid))
+            elif mode in FILE_MODES:
+                out.append(name)
+        return out
+
+    def glob(self, ref: str, pattern: str) -> list[str]:
+        """Regular files at ``ref`` matching ``pattern`` (``glob.glob`` rules,
+        ``recursive=True``), sorted. Only the subtree below the pattern's
+        literal prefix is walked."""
+        compiled = GlobPattern(pattern)
+        base = compiled.base
+        if compiled.is_literal:
+            return [base] if self.read(ref, base) is not None else []
+        prefix_len = len(base) + 1 if base else 0
+        return sorted(
+            path
+            for path in self.files(ref, base)
+            if compiled.match(path[prefix_len:].split("/"))
+        )
+
+    def changed_paths(self, before: str, after: str) -> list[str]:
+        """Paths whose blob differs between two refs (added, removed or
+        modified), descending only into subtrees whose ids differ."""
+        old, new = self._subtree(before, ""), self._subtree(after, "")
+        if new is None:
+            raise GitObjectError(f"cannot resolve {after!r} to a commit")
+        if old is None:
+            raise GitObjectError(f"cannot resolve {before!r} to a commit")
+        return sorted(self._diff(old, new, ""))
+
+    def _entries(self, tree_id: str | None) -> list[tuple[str, str, str]]:
+        return self.tree(tree_id) if tree_id else []
+
+    def _diff(self, old: str | None, new: str | None, prefix: str) -> list[str]:
+        if old == new:
+            return []
+        before = {name: (mode, oid) for mode, name, oid in self._entries(old)}
+        after = {name: (mode, oid) for mode, name, oid in self._entries(new)}
+        out: list[str] = []
+        for name in sorted(before.keys() | after.keys()):
+            a, b = before.get(name), after.get(name)
+            if a == b:
+                continue
+            path = f"{prefix}{name}"
+            old_tree = a[1] if a and a[0] == TREE_MODE else None
+            new_tree = b[1] if b and b[0] == TREE_MODE else None
+            if old_tree or new_tree:
+                out.extend(self._diff(old_tree, new_tree, f"{path}/"))
+            if (a and a[0] != TREE_MODE) or (b and b[0] != TREE_MODE):
+                out.append(path)
+        return out
+
+
+_READERS: dict[Path, GitObjectReader] = {}
+_READERS_LOCK = threading.Lock()
+
+
+def shared_reader(repo_root: Path) -> GitObjectReader:
+    """The process-wide reader for ``repo_root`` (closed at interpreter exit)."""
+    key = Path(repo_root).resolve()
+    with _READERS_LOCK:
+        reader = _READERS.get(key)
+        if reader is None:
+            reader = _READERS[key] = GitObjectReader(key)
+        return reader
+
+
+@atexit.register
+def _close_readers() -> None:
+    with _READERS_LOCK:
+        readers = list(_READERS.values())
+        _READERS.clear()
+    for reader in readers:
+        reader.close()
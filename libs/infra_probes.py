@@ -7,7 +7,9 @@ import os
 import shlex
 import socket
 import subprocess
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import asdict, dataclass
 from typing import Callable
 from urllib.error import HTTPError, URLError
@@ -23,6 +25,15 @@ HTTP_PROBE_HEADERS = {
     "Accept": "text/html,application/json,text/plain,*/*",
 }
 PROBE_CLIENT_BLOCKED_MARKERS = ("error code: 1010",)
+# Concurrent probe execution: a cycle costs its slowest probe, not the sum of every
+# probe's timeout. The global cap bounds threads; per-kind caps bound connections a
+# cycle opens against one backend (a postgres/s3 probe is a real login/head_bucket).
+# The deadline keeps a cycle inside INFRA_PROBE_INTERVAL_SECONDS (default 60s) even
+# when a probe ignores its own timeout; unfinished probes report as failed.
+DEFAULT_PROBE_CONCURRENCY = 8
+DEFAULT_PROBE_KIND_LIMITS = {"postgres": 2, "s3": 2}
+DEFAULT_PROBE_CYCLE_DEADLINE_SECONDS = 45.0
+DEADLINE_EXCEEDED = "DeadlineExceeded"
 
 
 @dataclass(frozen=True)
@@ -54,6 +65,13 @@ class ProbeResult:
         return data
 
 
+# Probes still running when their cycle's deadline fired. The resident runner
+# skips those specs until the old probe returns, so a backend that hangs holds at
+# most one blocked thread per spec instead of leaking one more every cycle.
+_in_flight: dict[ProbeSpec, Future] = {}
+_in_flight_lock = threading.Lock()
+
+
 def parse_probe_specs(raw: str) -> list[ProbeSpec]:
     """Parse newline-separated probe specs.
 
@@ -135,8 +153,112 @@ def run_probe(
     )
 
 
-def run_probes(specs: list[ProbeSpec]) -> list[ProbeResult]:
-    return [run_probe(spec) for spec in specs]
+def parse_kind_limits(raw: str) -> dict[str, int]:
+    """Parse ``postgres=2,s3=1`` into per-kind concurrency caps."""
+    limits: dict[str, int] = {}
+    for item in raw.split(","):
+        kind, separator, value = item.partition("=")
+        if not item.strip():
+            continue
+        if not separator or not kind.strip():
+            raise ValueError(f"Invalid probe kind limit: {item.strip()!r}")
+        limits[kind.strip()] = max(1, int(value))
+    return limits
+
+
+def run_probes(
+    specs: list[ProbeSpec],
+    *,
+    max_workers: int | None = None,
+    kind_limits: dict[str, int] | None = None,
+    deadline_seconds: float | None = None,
+    **probe_kwargs,
+) -> list[ProbeResult]:
+    """Run every probe concurrently and return results in ``specs`` order.
+
+    Order is part of the contract: the runner's cascade suppression and failure
+    dedup read results positionally exactly as they did when probes ran one by
+    one. Defaults come from INFRA_PROBE_CONCURRENCY, INFRA_PROBE_KIND_LIMITS
+    (``kind=n,...``, merged over DEFAULT_PROBE_KIND_LIMITS) and
+    INFRA_PROBE_CYCLE_DEADLINE_SECONDS. A probe still running at the deadline is
+    reported failed with ``observed=DeadlineExceeded``; its thread is not joined,
+    so the cycle returns on time, and later cycles report that spec the same way
+    without starting another probe until the stuck one returns.
+    """
+    if not specs:
+        return []
+    if max_workers is None:
+        max_workers = int(
+            os.getenv("INFRA_PROBE_CONCURRENCY", str(DEFAULT_PROBE_CONCURRENCY))
+        )
+    if kind_limits is None:
+        kind_limits = {
+            **DEFAULT_PROBE_KIND_LIMITS,
+            **parse_kind_limits(os.getenv("INFRA_PROBE_KIND_LIMITS", "")),
+        }
+    if deadline_seconds is None:
+        deadline_seconds = float(
+            os.getenv(
+                "INFRA_PROBE_CYCLE_DEADLINE_SECONDS",
+                str(DEFAULT_PROBE_CYCLE_DEADLINE_SECONDS),
+            )
+        )
+    gates = {
+        kind: threading.BoundedSemaphore(limit) for kind, limit in kind_limits.items()
+    }
+
+    def gated(spec: ProbeSpec) -> ProbeResult:
+        gate = gates.get(spec.kind)
+        if gate is None:
+            return run_probe(spec, **probe_kwargs)
+        with gate:
+            return run_probe(spec, **probe_kwargs)
+
+    with _in_flight_lock:
+        for spec, future in list(_in_flight.items()):
+            if future.done():
+                del _in_flight[spec]
+        still_running = {spec for spec in specs if spec in _in_flight}
+    runnable = [spec for spec in specs if spec not in still_running]
+
+    started = time.monotonic()
+    futures: dict[ProbeSpec, Future] = {}
+    if runnable:
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(runnable))),
+            thread_name_prefix="infra-probe",
+        )
+        try:
+            for spec in runnable:
+                if spec not in futures:
+                    futures[spec] = executor.submit(gated, spec)
+            wait(futures.values(), timeout=deadline_seconds)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        with _in_flight_lock:
+            _in_flight.update(
+                (spec, future) for spec, future in futures.items() if not future.done()
+            )
+    elapsed_ms = int((time.monotonic() - started) * 1000)
+
+    def result_for(spec: ProbeSpec) -> ProbeResult:
+        future = futures.get(spec)
+        if future is not None and future.done() and not future.cancelled():
+            return future.result()
+        summary = (
+            "previous probe is still running past its cycle deadline; not re-run"
+            if future is None
+            else f"probe did not finish within the {deadline_seconds:g}s cycle deadline"
+        )
+        return ProbeResult(
+            spec=spec,
+            ok=False,
+            summary=summary,
+            observed=DEADLINE_EXCEEDED,
+            elapsed_ms=elapsed_ms,
+        )
+
+    return [result_for(spec) for spec in specs]
 
 
 def failed_results(results: list[ProbeResult]) -> list[ProbeResult]:
@@ -0,0 +1,480 @@
+"""Multi-week availability analytics over the watchdog ledger's R2 cold archive.
+
+``libs.availability_ledger`` summarizes one ``/ledger`` payload (the 21-day KV
+hot window). This module materializes every archived day
+(``watchdog-ledger/YYYY-MM-DD.json``) into a :class:`LedgerMatrix`: one packed
+``array`` column of ok/fail counts per day, indexed by signal, plus running
+prefix sums. Any window is then two prefix-sum lookups per signal, so windowed
+summaries, error-budget burn rates and per-service rollups over months of
+history cost a few C-level column operations rather than a walk over every
+day's JSON.
+
+Archived days are final (the Worker writes each once after the day rolls over),
+so the materialized matrix is cached on disk and a later run only downloads the
+days it has not seen. The same uptime rules as ``summarize_ledger`` apply:
+malformed days or counts are ignored or coerced to zero, never trusted.
+"""
+
+from __future__ import annotations
+
+import base64
+import bisect
+import json
+import os
+import subprocess
+import tempfile
+from array import array
+from collections.abc import Iterable, Mapping
+from datetime import date, timedelta
+from operator import add, sub
+from pathlib import Path
+from typing import Any, Callable
+
+from libs.availability_ledger import (
+    R2_LEDGER_PREFIX,
+    WORST_SIGNALS_SHOWN,
+    _coerce_count,
+    _uptime_pct,
+)
+
+CACHE_VERSION = 1
+# Counts per signal per day stay far below 2**32 (one cron run every 30 minutes).
+_TYPECODE = "I"
+HISTORY_WINDOWS_DAYS = (28, 90)
+DEFAULT_SLO_PCT = 99.9
+UNREGISTERED_SERVICE = "infra/unregistered"
+
+
+def _zeros(size: int) -> array:
+    return array(_TYPECODE, bytes(size * array(_TYPECODE).itemsize))
+
+
+def _padded(column: array, size: int) -> array:
+    """``column`` extended with zeros for signals first seen on a later day."""
+    if len(column) >= size:
+        return column
+    return column + _zeros(size - len(column))
+
+
+class LedgerMatrix:
+    """Per-day, per-signal ok/fail counts in packed columns, ordered by date."""
+
+    def __init__(self) -> None:
+        self.signals: list[str] = []
+        self.severity: list[str] = []
+        self.service: list[str] = []
+        self.dates: list[str] = []
+        self.runs = array(_TYPECODE)
+        self.ok: list[array] = []
+        self.fail: list[array] = []
+        # Per day: signal index -> failure domain recorded that day.
+        self.domains: list[dict[int, str]] = []
+        self._index: dict[str, int] = {}
+        self._prefix: tuple[list[array], list[array], list[int]] | None = None
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def _signal_index(self, signal_id: str) -> int:
+        index = self._index.get(signal_id)
+        if index is None:
+            index = self._index[signal_id] = len(self.signals)
+            self.signals.append(signal_id)
+            self.severity.append("")
+            self.service.append("")
+        return index
+
+    def add_day(self, record: Mapping[str, Any]) -> bool:
+        """Materialize one ledger day, replacing an existing column for its date.
+
+        Returns False (and stores nothing) for a record without a usable date.
+        """
+        day = record.get("date")
+        if not isinstance(day, str) or not day:
+            return False
+        ok: dict[int, int] = {}
+        fail: dict[int, int] = {}
+        domains: dict[int, str] = {}
+        day_signals = record.get("signals")
+        if isinstance(day_signals, Mapping):
+            for signal_id, counts in day_signals.items():
+                if not isinstance(counts, Mapping):
+                    continue
+                index = self._signal_index(str(signal_id))
+                ok[index] = _coerce_count(counts.get("ok"))
+                fail[index] = _coerce_count(counts.get("fail"))
+                if counts.get("lastDomain"):
+                    domains[index] = str(counts["lastDomain"])
+                # Registry facts: the newest day that states one wins.
+                newest = self._is_newest(day)
+                if counts.get("severity") and (newest or not self.severity[index]):
+                    self.severity[index] = str(counts["severity"])
+                if counts.get("serviceId") and (newest or not self.service[index]):
+                    self.service[index] = str(counts["serviceId"])
+        size = len(self.signals)
+        ok_column, fail_column = _zeros(size), _zeros(size)
+        for index, count in ok.items():
+            ok_column[index] = count
+        for index, count in fail.items():
+            fail_column[index] = count
+
+        position = bisect.bisect_left(self.dates, day)
+        if position < len(self.dates) and self.dates[position] == day:
+            self.runs[position] = _coerce_count(record.get("runs"))
+            self.ok[position] = ok_column
+            self.fail[position] = fail_column
+            self.domains[position] = domains
+        else:
+            self.dates.insert(position, day)
+            self.runs.insert(position, _coerce_count(record.get("runs")))
+            self.ok.insert(position, ok_column)
+            self.fail.insert(position, fail_column)
+            self.domains.insert(position, domains)
+        self._prefix = None
+        return True
+
+    def add_days(self, records: Iterable[Any]) -> int:
+        return sum(
+            1
+            for record in records
+            if isinstance(record, Mapping) and self.add_day(record)
+        )
+
+    def _is_newest(self, day: str) -> bool:
+        return not self.dates or day >= self.dates[-1]
+
+    def _prefix_sums(self) -> tuple[list[array], list[array], list[int]]:
+        """Running totals: entry ``k`` holds the sum of the first ``k`` days."""
+        if self._prefix is None:
+            size = len(self.signals)
+            ok_sums = [_zeros(size)]
+            fail_sums = [_zeros(size)]
+            run_sums = [0]
+            for ok_column, fail_column, runs in zip(self.ok, self.fail, self.runs):
+                ok_column = _padded(ok_column, size)
+                fail_column = _padded(fail_column, size)
+                ok_sums.append(array(_TYPECODE, map(add, ok_sums[-1], ok_column)))
+                fail_sums.append(array(_TYPECODE, map(add, fail_sums[-1], fail_column)))
+                run_sums.append(run_sums[-1] + runs)
+            self._prefix = (ok_sums, fail_sums, run_sums)
+        return self._prefix
+
+    def _span(self, start: str | None, end: str | None) -> tuple[int, int]:
+        low = 0 if start is None else bisect.bisect_left(self.dates, start)
+        high = len(self.dates) if end is None else bisect.bisect_right(self.dates, end)
+        return low, max(low, high)
+
+    def totals(
+        self, start: str | None = None, end: str | None = None
+    ) -> tuple[list[int], list[int], int]:
+        """Per-signal ok and fail sums plus total runs for days in ``[start, end]``."""
+        ok_sums, fail_sums, run_sums = self._prefix_sums()
+        low, high = self._span(start, end)
+        return (
+            list(map(sub, ok_sums[high], ok_sums[low])),
+            list(map(sub, fail_sums[high], fail_sums[low])),
+            run_sums[high] - run_sums[low],
+        )
+
+    def last_domains(
+        self, start: str | None = None, end: str | None = None
+    ) -> list[str]:
+        """Most recent failure domain per signal inside the window."""
+        low, high = self._span(start, end)
+        found = [""] * len(self.signals)
+        for position in range(low, high):
+            for index, domain in self.domains[position].items():
+                found[index] = domain
+        return found
+
+    def summarize(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        *,
+        as_of: str | None = None,
+    ) -> dict[str, Any]:
+        """``summarize_ledger``-shaped summary of the days in ``[start, end]``."""
+        ok, fail, runs = self.totals(start, end)
+        domains = self.last_domains(start, end)
+        low, high = self._span(start, end)
+        per_signal = [
+            {
+                "id": signal_id,
+                "uptime_pct": _uptime_pct(ok[index], ok[index] + fail[index]),
+                "ok": ok[index],
+                "fail": fail[index],
+                "severity": self.severity[index],
+                "last_domain": domains[index],
+            }
+            for index, signal_id in enumerate(self.signals)
+            if ok[index] + fail[index]
+        ]
+        per_signal.sort(key=lambda item: (item["uptime_pct"], -item["fail"]))
+        total_ok = sum(ok)
+        return {
+            "as_of": as_of or (self.dates[high - 1] if high > low else "latest"),
+            "window_days": _calendar_days(start, end, self.dates[low:high]),
+            "total_runs": runs,
+            "signal_count": len(per_signal),
+            "perfect_count": sum(1 for item in per_signal if item["fail"] == 0),
+            "overall_uptime_pct": _uptime_pct(total_ok, total_ok + sum(fail)),
+            "signals": per_signal,
+        }
+
+    def burn_rates(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        *,
+        slo_pct: float = DEFAULT_SLO_PCT,
+    ) -> dict[str, float]:
+        """Error-budget burn rate per signal: failure ratio / allowed failure ratio.
+
+        1.0 spends the budget exactly over the window; signals without checks in
+        the window are omitted.
+        """
+        budget = max(1e-9, 1.0 - slo_pct / 100.0)
+        ok, fail, _runs = self.totals(start, end)
+        return {
+            signal_id: round(fail[index] / (ok[index] + fail[index]) / budget, 3)
+            for index, signal_id in enumerate(self.signals)
+            if ok[index] + fail[index]
+        }
+
+    def rolling_burn_rate(
+        self, signal_id: str, window_days: int, *, slo_pct: float = DEFAULT_SLO_PCT
+    ) -> list[tuple[str, float | None]]:
+        """Trailing ``window_days`` burn rate of one signal, at every stored day."""
+        index = self._index.get(signal_id)
+        if index is None:
+            return []
+        budget = max(1e-9, 1.0 - slo_pct / 100.0)
+        ok_sums, fail_sums, _runs = self._prefix_sums()
+        series: list[tuple[str, float | None]] = []
+        for position, day in enumerate(self.dates):
+            low = bisect.bisect_left(self.dates, _shift(day, 1 - window_days))
+            ok = ok_sums[position + 1][index] - ok_sums[low][index]
+            fail = fail_sums[position + 1][index] - fail_sums[low][index]
+            checks = ok + fail
+            series.append((day, round(fail / checks / budget, 3) if checks else None))
+        return series
+
+    def rollup(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        *,
+        group: Callable[[str], str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Availability per service (the Worker's ``serviceId``), worst first.
+
+        ``group`` maps a signal id to its rollup key instead.
+        """
+        ok, fail, _runs = self.totals(start, end)
+        groups: dict[str, list[int]] = {}
+        for index, signal_id in enumerate(self.signals):
+            if not ok[index] + fail[index]:
+                continue
+            key = (
+                group(signal_id)
+                if group is not None
+                else self.service[index] or UNREGISTERED_SERVICE
+            )
+            entry = groups.setdefault(key, [0, 0, 0])
+            entry[0] += ok[index]
+            entry[1] += fail[index]
+            entry[2] += 1
+        rows = [
+            {
+                "service": key,
+                "uptime_pct": _uptime_pct(entry[0], entry[0] + entry[1]),
+                "ok": entry[0],
+                "fail": entry[1],
+                "signal_count": entry[2],
+            }
+            for key, entry in groups.items()
+        ]
+        rows.sort(key=lambda item: (item["uptime_pct"], -item["fail"], item["service"]))
+        return rows
+
+    def to_payload(self) -> dict[str, Any]:
+        size = len(self.signals)
+
+        def pack(column: array) -> str:
+            return base64.b64encode(_padded(column, size).tobytes()).decode("ascii")
+
+        return {
+            "version": CACHE_VERSION,
+            "typecode": _TYPECODE,
+            "itemsize": array(_TYPECODE).itemsize,
+            "signals": self.signals,
+            "severity": self.severity,
+            "service": self.service,
+            "dates": self.dates,
+            "runs": list(self.runs),
+            "ok": [pack(column) for column in self.ok],
+            "fail": [pack(column) for column in self.fail],
+            "domains": [
+                {str(index): domain for index, domain in day.items()}
+                for day in self.domains
+            ],
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> LedgerMatrix | None:
+        """Rebuild a cached matrix; None when the cache is from another format."""
+        if (
+            payload.get("version") != CACHE_VERSION
+            or payload.get("typecode") != _TYPECODE
+            or payload.get("itemsize") != array(_TYPECODE).itemsize
+        ):
+            return None
+
+        def unpack(raw: str) -> array:
+            column = array(_TYPECODE)
+            column.frombytes(base64.b64decode(raw))
+            return column
+
+        matrix = cls()
+        try:
+            matrix.signals = list(payload["signals"])
+            matrix.severity = list(payload["severity"])
+            matrix.service = list(payload["service"])
+            matrix.dates = list(payload["dates"])
+            matrix.runs = array(_TYPECODE, payload["runs"])
+            matrix.ok = [unpack(raw) for raw in payload["ok"]]
+            matrix.fail = [unpack(raw) for raw in payload["fail"]]
+            matrix.domains = [
+                {int(index): domain for index, domain in day.items()}
+                for day in payload["domains"]
+            ]
+        except (KeyError, TypeError, ValueError):
+            return None
+        columns = (matrix.runs, matrix.ok, matrix.fail, matrix.domains)
+        if any(len(column) != len(matrix.dates) for column in columns):
+            return None
+        matrix._index = {
+            signal_id: index for index, signal_id in enumerate(matrix.signals)
+        }
+        return matrix
+
+
+def load_matrix(path: Path | None) -> LedgerMatrix:
+    """The cached matrix at ``path``, or an empty one when absent/unreadable."""
+    if path is None:
+        return LedgerMatrix()
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return LedgerMatrix()
+    matrix = LedgerMatrix.from_payload(payload) if isinstance(payload, dict) else None
+    return matrix or LedgerMatrix()
+
+
+def save_matrix(matrix: LedgerMatrix, path: Path) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(matrix.to_payload()), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        # A read-only cache location only costs the next run a re-download.
+        tmp.unlink(missing_ok=True)
+
+
+def sync_archive(
+    matrix: LedgerMatrix,
+    remote: str,
+    *,
+    runner: Callable[..., subprocess.CompletedProcess] = subprocess.run,
+) -> int:
+    """Add every archived day the matrix does not hold yet; return how many.
+
+    ``remote`` is an rclone remote (e.g. ``r2:infra2``). One ``lsf`` lists the
+    archive and one ``copy --files-from`` downloads only the missing days.
+    """
+    prefix = f"{remote.rstrip('/')}/{R2_LEDGER_PREFIX}"
+    listing = runner(
+        ["rclone", "lsf", "--files-only", prefix],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    held = set(matrix.dates)
+    missing = sorted(
+        name
+        for name in (line.strip() for line in listing.splitlines())
+        if name.endswith(".json") and name[: -len(".json")] not in held
+    )
+    if not missing:
+        return 0
+    with tempfile.TemporaryDirectory(prefix="ledger-archive-") as tmp:
+        runner(
+            ["rclone", "copy", prefix, tmp, "--files-from-raw", "-"],
+            check=True,
+            capture_output=True,
+            text=True,
+            input="\n".join(missing) + "\n",
+        )
+        records = []
+        for name in missing:
+            try:
+                text = (Path(tmp) / name).read_text(encoding="utf-8")
+                records.append(json.loads(text))
+            except (OSError, ValueError):
+                continue  # a corrupt or vanished object is skipped, never trusted
+    return matrix.add_days(records)
+
+
+def history_summary(
+    matrix: LedgerMatrix,
+    *,
+    end: str | None = None,
+    windows_days: Iterable[int] = HISTORY_WINDOWS_DAYS,
+    slo_pct: float = DEFAULT_SLO_PCT,
+) -> dict[str, Any]:
+    """Trailing-window availability, burn rates and service rollups for the report."""
+    end = end or (matrix.dates[-1] if matrix.dates else None)
+    rows = []
+    for days in windows_days:
+        start = _shift(end, 1 - days) if end else None
+        summary = matrix.summarize(start, end)
+        burn = matrix.burn_rates(start, end, slo_pct=slo_pct)
+        rows.append(
+            {
+                "window_days": days,
+                "days_with_data": _days_with_data(matrix, start, end),
+                "overall_uptime_pct": summary["overall_uptime_pct"],
+                "perfect_count": summary["perfect_count"],
+                "signal_count": summary["signal_count"],
+                "worst_burn": sorted(
+                    ((rate, signal_id) for signal_id, rate in burn.items() if rate > 0),
+                    reverse=True,
+                )[:WORST_SIGNALS_SHOWN],
+                "services": [
+                    row for row in matrix.rollup(start, end) if row["fail"] > 0
+                ][:WORST_SIGNALS_SHOWN],
+            }
+        )
+    return {"end": end, "slo_pct": slo_pct, "windows": rows}
+
+
+def _days_with_data(matrix: LedgerMatrix, start: str | None, end: str | None) -> int:
+    low, high = matrix._span(start, end)
+    return high - low
+
+
+def _shift(day: str, offset: int) -> str:
+    return (date.fromisoformat(day) + timedelta(days=offset)).isoformat()
+
+
+def _calendar_days(start: str | None, end: str | None, present: list[str]) -> int:
+    first = start or (present[0] if present else None)
+    last = end or (present[-1] if present else None)
+    if not first or not last:
+        return len(present)
+    try:
+        return (date.fromisoformat(last) - date.fromisoformat(first)).days + 1
+    except ValueError:
+        return len(present)
@@ -0,0 +1,220 @@
+"""Docker Registry v2 readiness client with pooled connections and cached tokens.
+
+``tools/deploy_v2.py`` waits for every image a service declares before any Dokploy
+mutation. Uncached, each poll of each repository paid three round-trips (anonymous
+GET -> 401 challenge -> token fetch -> retried GET) on a fresh connection. This
+client keeps one pooled ``httpx.Client``, caches bearer tokens per
+``(registry, scope)`` until they expire, and -- for repositories announced with
+:meth:`RegistryClient.expect` -- answers the first challenge from a registry with a
+single multi-scope token covering all of them. A steady-state check is then one
+``HEAD`` per image.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Iterable
+
+import httpx
+
+IMAGE_MANIFEST_ACCEPT = ", ".join(
+    [
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    ]
+)
+DEFAULT_TIMEOUT_SECONDS = 10.0
+# The token spec's default lifetime when a token response omits ``expires_in``.
+DEFAULT_TOKEN_TTL_SECONDS = 60.0
+# Refresh this long before the registry's stated expiry so a HEAD never races it.
+TOKEN_EXPIRY_MARGIN_SECONDS = 10.0
+
+
+class RegistryUnavailable(RuntimeError):
+    """The registry answered 429/5xx; ``retry_after`` is its Retry-After, if any."""
+
+    def __init__(self, message: str, *, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def registry_image_parts(image: str) -> tuple[str, str]:
+    registry, sep, repository = image.partition("/")
+    if not sep or not registry or not repository:
+        raise ValueError(
+            f"image repository must include registry and repository path, got {image!r}"
+        )
+    return registry, repository
+
+
+def parse_bearer_authenticate(header: str) -> dict[str, str]:
+    scheme, _, rest = header.partition(" ")
+    if scheme.lower() != "bearer":
+        raise RuntimeError("registry did not return a Bearer authentication challenge")
+    params: dict[str, str] = {}
+    for item in rest.split(","):
+        key, sep, value = item.strip().partition("=")
+        if sep:
+            params[key] = value.strip().strip('"')
+    return params
+
+
+def _pull_scope(repository: str) -> str:
+    return f"repository:{repository}:pull"
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    try:
+        return max(0.0, float(response.headers.get("retry-after", "")))
+    except ValueError:
+        return None
+
+
+class RegistryClient:
+    """Thread-safe manifest existence checks against Docker Registry v2 endpoints."""
+
+    def __init__(
+        self,
+        *,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        client: httpx.Client | None = None,
+    ):
+        self._client = client or httpx.Client(timeout=timeout, follow_redirects=True)
+        self._owns_client = client is None
+        self._lock = threading.Lock()
+        # (registry, scope) -> (token, monotonic expiry)
+        self._tokens: dict[tuple[str, str], tuple[str, float]] = {}
+        # registry -> pull scopes to request alongside the next challenged one
+        self._expected: dict[str, set[str]] = {}
+        # One token fetch per registry at a time; concurrent 401s wait and reuse it.
+        self._fetch_locks: dict[str, threading.Lock] = {}
+
+    def close(self) -> None:
+        if self._owns_client:
+            self._client.close()
+
+    def __enter__(self) -> RegistryClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _cached_token(self, registry: str, scope: str) -> str | None:
+        with self._lock:
+            cached = self._tokens.get((registry, scope))
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        return None
+
+    def _fetch_token(
+        self, registry: str, challenge: dict[str, str], scope: str, *, bundle: bool
+    ) -> str:
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(registry, threading.Lock())
+        with fetch_lock:
+            token = self._cached_token(registry, scope)
+            if token is not None:
+                return token  # fetched by a concurrent check while this one waited
+            realm = challenge.get("realm")
+            if not realm:
+                raise RuntimeError(
+                    "registry Bearer challenge did not include a token realm"
+                )
+            scopes = {challenge.get("scope") or scope, scope}
+            if bundle:
+                with self._lock:
+                    scopes |= self._expected.get(registry, set())
+            params: list[tuple[str, str]] = []
+            if challenge.get("service"):
+                params.append(("service", challenge["service"]))
+            params += [("scope", item) for item in sorted(scopes)]
+            response = self._client.get(realm, params=params)
+            response.raise_for_status()
+            payload = response.json()
+            token = payload.get("token") or payload.get("access_token")
+            if not token:
+                raise RuntimeError("registry token response did not include a token")
+            ttl = float(payload.get("expires_in") or DEFAULT_TOKEN_TTL_SECONDS)
+            expires = time.monotonic() + max(0.0, ttl - TOKEN_EXPIRY_MARGIN_SECONDS)
+            with self._lock:
+                for item in scopes:
+                    self._tokens[(registry, item)] = (str(token), expires)
+            return str(token)
+
+    def expect(self, images: Iterable[str]) -> None:
+        """Announce repositories about to be checked so one token can cover them all.
+
+        No I/O: the scopes ride along on the next token fetch for their registry. A
+        registry that will not grant a multi-scope token just challenges again on the
+        uncovered repository, which then gets its own token.
+        """
+        with self._lock:
+            for image in images:
+                registry, repository = registry_image_parts(image)
+                self._expected.setdefault(registry, set()).add(_pull_scope(repository))
+
+    def manifest_exists(self, image: str, image_ref: str) -> bool:
+        """Return whether ``image:image_ref`` exists, via one ``HEAD`` when warm.
+
+        A 401 triggers the standard challenge: fetch a token for the challenged scope
+        (plus the registry's expected scopes on a first fetch), cache it, retry once.
+        """
+        registry, repository = registry_image_parts(image)
+        scope = _pull_scope(repository)
+        url = f"https://{registry}/v2/{repository}/manifests/{image_ref}"
+
+        def request(token: str | None) -> httpx.Response:
+            headers = {"Accept": IMAGE_MANIFEST_ACCEPT}
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+            return self._client.head(url, headers=headers)
+
+        sent = self._cached_token(registry, scope)
+        response = request(sent)
+        if response.status_code == 401:
+            challenge = parse_bearer_authenticate(
+                response.headers.get("www-authenticate", "")
+            )
+            if sent is not None:
+                # A cached token was rejected (e.g. a bundle the registry only
+                # partly granted): drop it and ask for this scope alone.
+                with self._lock:
+                    if self._tokens.get((registry, scope), ("",))[0] == sent:
+                        del self._tokens[(registry, scope)]
+            token = self._fetch_token(registry, challenge, scope, bundle=sent is None)
+            response = request(token)
+        if 200 <= response.status_code < 300:
+            return True
+        if response.status_code == 404:
+            return False
+        if response.status_code in (401, 403):
+            raise RuntimeError(
+                f"registry refused manifest check for {image}:{image_ref} "
+                f"(status {response.status_code})"
+            )
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RegistryUnavailable(
+                f"registry manifest check for {image}:{image_ref} is temporarily "
+                f"unavailable (status {response.status_code})",
+                retry_after=_retry_after(response),
+            )
+        raise RuntimeError(
+            f"registry manifest check for {image}:{image_ref} returned status "
+            f"{response.status_code}"
+        )
+
+
+_SHARED: RegistryClient | None = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_registry_client() -> RegistryClient:
+    """Process-wide client, so tokens and connections outlive one readiness wait."""
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = RegistryClient()
+        return _SHARED
@@ -10,6 +10,10 @@ This module reads the Deployer attributes ONCE (via AST, no import side effects)
 and exposes `get_*`-style accessors so every downstream config can be DERIVED
 from, or audited against, the registry instead of hand-maintained.
 
+Reads are memoized in a process-level :class:`RegistryIndex` (re-parsed only when
+a deploy.py changes) that also precomputes the container-base, Dokploy-coordinate
+and component-alias lookups; ``SERVICE_REGISTRY_INDEX`` persists it for CLI tools.
+
 `_LAYERS` below is the single source of truth for the layer name -> path mapping.
 `libs.deploy.deployer.discover_services` imports it directly (no second copy) so
 `all_services()` is an exact superset-free match of the deploy fan-out list.
@@ -18,7 +22,10 @@ from, or audited against, the registry instead of hand-maintained.
 from __future__ import annotations
 
 import ast
-from dataclasses import dataclass
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, fields
 from pathlib import Path
 
 from libs.service_facets import (
@@ -112,9 +119,9 @@ class ServiceMeta:
         return any(e.check_id == check_id for e in self.exemptions)
 
 
-def service_attrs() -> dict[str, ServiceMeta]:
-    """Map service_id -> ServiceMeta for every service with a deploy.py."""
-    result: dict[str, ServiceMeta] = {}
+def _deploy_files() -> list[tuple[str, str, Path]]:
+    """(service_id, layer, deploy.py) for every registered service, in scan order."""
+    found: list[tuple[str, str, Path]] = []
     for layer, layer_path in _LAYERS.items():
         if not layer_path.exists():
             continue
@@ -127,11 +134,167 @@ def service_attrs() -> dict[str, ServiceMeta]:
             deploy_file = service_dir / "deploy.py"
             if not deploy_file.exists():
                 continue
-            service_name_dir = parts[1]
-            result[f"{layer}/{service_name_dir}"] = _meta_from_deploy_file(
-                deploy_file, service_id=f"{layer}/{service_name_dir}", layer=layer
+            found.append((f"{layer}/{parts[1]}", layer, deploy_file))
+    return found
+
+
+def service_attrs() -> dict[str, ServiceMeta]:
+    """Map service_id -> ServiceMeta for every service with a deploy.py.
+
+    Served from the process-level :class:`RegistryIndex`; a fresh dict per call so
+    callers may mutate their copy.
+    """
+    return dict(registry_index().attrs)
+
+
+# Process-level registry index. The deploy.py files are re-stat'ed on every access
+# (cheap) and re-parsed only when one was added, removed or modified; with
+# SERVICE_REGISTRY_INDEX set, the built index is also persisted there as JSON so a
+# fresh CLI process skips the AST pass entirely while the fingerprint matches.
+REGISTRY_INDEX_VERSION = 1
+_FACET_FIELDS: dict[str, type] = {
+    "probes": ProbeFacet,
+    "public_routes": PublicRouteFacet,
+    "signals": SignalFacet,
+    "backups": BackupFacet,
+    "secrets": SecretsFacet,
+    "exemptions": Exemption,
+}
+_index_lock = threading.Lock()
+_index: RegistryIndex | None = None
+
+
+@dataclass(frozen=True)
+class RegistryIndex:
+    """``service_attrs()`` plus the lookup tables its hot helpers need, built once."""
+
+    fingerprint: tuple[tuple[str, int, int], ...]
+    attrs: dict[str, ServiceMeta]
+    # ``{layer}-{service|service_name}`` -> meta (probe_container_bases)
+    container_bases: dict[str, ServiceMeta]
+    # (project, service) -> service_id, only where the pair is unambiguous
+    dokploy_ids: dict[tuple[str, str], str]
+    # normalized component alias (service, ``_`` -> ``-``) -> candidate service_ids
+    component_ids: dict[str, tuple[str, ...]]
+
+    @classmethod
+    def build(
+        cls,
+        attrs: dict[str, ServiceMeta],
+        fingerprint: tuple[tuple[str, int, int], ...] = (),
+    ) -> "RegistryIndex":
+        container_bases: dict[str, ServiceMeta] = {}
+        dokploy_matches: dict[tuple[str, str], list[str]] = {}
+        component_ids: dict[str, list[str]] = {}
+        for meta in attrs.values():
+            for name in (meta.service, meta.service_name):
+                if name:
+                    container_bases[f"{meta.layer}-{name}"] = meta
+            dokploy_matches.setdefault((meta.project, meta.service), []).append(
+                meta.service_id
             )
-    return result
+            component_ids.setdefault(meta.service.replace("_", "-"), []).append(
+                meta.service_id
+            )
+        return cls(
+            fingerprint=fingerprint,
+            attrs=attrs,
+            container_bases=container_bases,
+            dokploy_ids={
+                key: ids[0] for key, ids in dokploy_matches.items() if len(ids) == 1
+            },
+            component_ids={key: tuple(ids) for key, ids in component_ids.items()},
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "version": REGISTRY_INDEX_VERSION,
+                "fingerprint": [list(item) for item in self.fingerprint],
+                # Insertion order is the scan order service_attrs() callers see.
+                "attrs": {sid: asdict(meta) for sid, meta in self.attrs.items()},
+            }
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "RegistryIndex | None":
+        """The serialized index, or None if it is unreadable or another version."""
+        try:
+            data = json.loads(text)
+            if data.get("version") != REGISTRY_INDEX_VERSION:
+                return None
+            fingerprint = tuple(tuple(item) for item in data["fingerprint"])
+            attrs = {sid: _meta_from_dict(raw) for sid, raw in data["attrs"].items()}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+        return cls.build(attrs, fingerprint)
+
+
+def _tuples(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _meta_from_dict(raw: dict) -> ServiceMeta:
+    known = {f.name for f in fields(ServiceMeta)}
+    values = {key: value for key, value in raw.items() if key in known}
+    for name, facet_cls in _FACET_FIELDS.items():
+        values[name] = tuple(
+            facet_cls(**{key: _tuples(value) for key, value in facet.items()})
+            for facet in values.get(name) or ()
+        )
+    return ServiceMeta(**values)
+
+
+def _fingerprint(
+    deploy_files: list[tuple[str, str, Path]],
+) -> tuple[tuple[str, int, int], ...]:
+    stamps = []
+    for _service_id, _layer, deploy_file in deploy_files:
+        st = deploy_file.stat()
+        stamps.append((str(deploy_file), st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+def registry_index() -> RegistryIndex:
+    """The process-level index, rebuilt only when a deploy.py fingerprint moved."""
+    global _index
+    deploy_files = _deploy_files()
+    fingerprint = _fingerprint(deploy_files)
+    with _index_lock:
+        if _index is not None and _index.fingerprint == fingerprint:
+            return _index
+        cache_path = (os.getenv("SERVICE_REGISTRY_INDEX") or "").strip()
+        index = None
+        if cache_path and Path(cache_path).exists():
+            try:
+                index = RegistryIndex.from_json(Path(cache_path).read_text("utf-8"))
+            except OSError:
+                index = None
+            if index is not None and index.fingerprint != fingerprint:
+                index = None
+        if index is None:
+            attrs = {
+                service_id: _meta_from_deploy_file(
+                    deploy_file, service_id=service_id, layer=layer
+                )
+                for service_id, layer, deploy_file in deploy_files
+            }
+            index = RegistryIndex.build(attrs, fingerprint)
+            if cache_path:
+                _write_index(Path(cache_path), index)
+        _index = index
+        return index
+
+
+def _write_index(path: Path, index: RegistryIndex) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(index.to_json(), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        # The on-disk form is an optimization; the in-process index still serves.
+        tmp.unlink(missing_ok=True)
 
 
 def _meta_from_deploy_file(
@@ -155,9 +318,7 @@ def _meta_from_deploy_file(
         project=_class_attr(tree, "project") or "platform",
         compose_path=_class_attr(tree, "compose_path"),
         data_path=_class_attr(tree, "data_path"),
-        not_yet_in_production=bool(
-            _class_attr(tree, "not_yet_in_production") or False
-        ),
+        not_yet_in_production=bool(_class_attr(tree, "not_yet_in_production") or False),
         probes=_facet_seq(tree, "probes", ProbeFacet, where),
         public_routes=_facet_seq(tree, "public_routes", PublicRouteFacet, where),
         signals=_facet_seq(tree, "signals", SignalFacet, where),
@@ -197,7 +358,7 @@ def bootstrap_facet_attrs() -> dict[str, ServiceMeta]:
 
 def all_services() -> list[str]:
     """Every service_id, sorted. Equals libs.deploy.deployer.discover_services keys."""
-    return sorted(service_attrs())
+    return sorted(registry_index().attrs)
 
 
 def services_in_env(env: str) -> list[str]:
@@ -205,25 +366,29 @@ def services_in_env(env: str) -> list[str]:
     is_prod = env == PRODUCTION
     return sorted(
         meta.service_id
-        for meta in service_attrs().values()
+        for meta in registry_index().attrs.values()
         if is_prod or not meta.prod_only
     )
 
 
 def shared_services() -> set[str]:
     """Service_ids that run as a single shared (prod) instance for all envs."""
-    return {m.service_id for m in service_attrs().values() if m.prod_only}
+    return {m.service_id for m in registry_index().attrs.values() if m.prod_only}
 
 
 def subdomains() -> dict[str, str]:
     """Service_id -> public subdomain, only for services that declare one."""
-    return {m.service_id: m.subdomain for m in service_attrs().values() if m.subdomain}
+    return {
+        m.service_id: m.subdomain
+        for m in registry_index().attrs.values()
+        if m.subdomain
+    }
 
 
 def domain_for_service(service_id: str) -> str | None:
     """The service's dedicated domain override, or None if it uses the shared
     INTERNAL_DOMAIN a caller passes in (every service until truealpha/app)."""
-    meta = service_attrs().get(service_id)
+    meta = registry_index().attrs.get(service_id)
     return meta.domain if meta else None
 
 
@@ -238,7 +403,7 @@ def service_identity(
     """Build the canonical cross-plane identity from registry-owned facts."""
     from libs.service_identity import ServiceIdentity
 
-    meta = service_attrs().get(service_id)
+    meta = registry_index().attrs.get(service_id)
     if meta is None:
         raise ValueError(f"unknown registered service_id: {service_id}")
     return ServiceIdentity.build(
@@ -257,12 +422,7 @@ def service_id_for_component(component: str, *, signal: str = "") -> str:
     if normalized in _EXTERNAL_COMPONENT_IDS:
         return _EXTERNAL_COMPONENT_IDS[normalized]
 
-    attrs = service_attrs()
-    candidates = [
-        meta.service_id
-        for meta in attrs.values()
-        if meta.service.replace("_", "-") == normalized
-    ]
+    candidates = list(registry_index().component_ids.get(normalized, ()))
     if len(candidates) == 1:
         return candidates[0]
 
@@ -289,12 +449,7 @@ def service_id_for_dokploy(project: str, compose_name: str) -> str | None:
     if canonical_project == "bootstrap":
         return _BOOTSTRAP_COMPOSE_IDS.get(canonical_compose)
 
-    matches = [
-        meta.service_id
-        for meta in service_attrs().values()
-        if meta.project == canonical_project and meta.service == canonical_compose
-    ]
-    return matches[0] if len(matches) == 1 else None
+    return registry_index().dokploy_ids.get((canonical_project, canonical_compose))
 
 
 def probe_container_bases() -> dict[str, ServiceMeta]:
@@ -303,12 +458,7 @@ def probe_container_bases() -> dict[str, ServiceMeta]:
     EXACT-match index; to resolve a real probe/route/DNS host (which may be a longer
     sub-container name) use :func:`resolve_container_host`, not a bare ``.get`` on this dict.
     """
-    bases: dict[str, ServiceMeta] = {}
-    for meta in service_attrs().values():
-        for name in (meta.service, meta.service_name):
-            if name:
-                bases[f"{meta.layer}-{name}"] = meta
-    return bases
+    return dict(registry_index().container_bases)
 
 
 def resolve_container_host(host: str) -> ServiceMeta | None:
@@ -327,7 +477,7 @@ def resolve_container_host(host: str) -> ServiceMeta | None:
     base = base.replace("finance-report-", "finance_report-")
     for suffix in ("-staging", "-preview"):
         base = base.replace(suffix, "")
-    bases = probe_container_bases()
+    bases = registry_index().container_bases
     if base in bases:
         return bases[base]
     candidates = [name for name in bases if base.startswith(f"{name}-")]
@@ -0,0 +1,15 @@
+"""Shared fixtures for libs/tests."""
+
+import pytest
+
+from libs.env import reset_secrets_session
+
+
+@pytest.fixture(autouse=True)
+def _fresh_secrets_session():
+    """Each test gets its own process-wide secrets session: cached Vault reads,
+    1Password items and pooled (possibly mocked) clients must not leak across
+    tests."""
+    reset_secrets_session()
+    yield
+    reset_secrets_session()
@@ -2,11 +2,22 @@
 
 from __future__ import annotations
 
+import dataclasses
+import gzip
 import importlib.util
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import tarfile
+import zlib
 from pathlib import Path
 
 import pytest
 
+from libs import backup_chunks
 from libs.backup_verification import (
     BackupEntry,
     BackupManifestError,
@@ -25,6 +36,7 @@ from libs.backup_restore import (
     latest_artifact_for_service,
     materialize_artifact,
     planned_artifact_path,
+    run_postgres_restore_rehearsal,
 )
 
 
@@ -174,6 +186,336 @@ def test_backup_runner_creates_archive_and_checksum(tmp_path) -> None:
     assert len(digest) == 64
 
 
+def _archive_source(tmp_path: Path) -> BackupEntry:
+    source = tmp_path / "source"
+    (source / "nested").mkdir(parents=True)
+    (source / "data.txt").write_text("important " * 4096, encoding="utf-8")
+    (source / "nested" / "more.txt").write_text("nested", encoding="utf-8")
+    return BackupEntry(
+        service_id="test/service",
+        data_path=str(source),
+        method="filesystem_archive",
+        restore_command="restore",
+        remote="r2",
+        retention_days=30,
+        rpo_hours=24,
+    )
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_backup_runner_streams_archive_and_records_throughput(tmp_path, codec) -> None:
+    """One streaming pass yields the manifest row: the digest is of the bytes on
+    disk, the tarball restores the source layout, and ratio/throughput are set."""
+    if codec == "zstd" and shutil.which("zstd") is None:
+        pytest.skip("zstd binary not installed")
+    backup_runner = _load_backup_runner()
+    entry = _archive_source(tmp_path)
+
+    artifact = backup_runner._backup_entry(
+        entry,
+        output_dir=tmp_path / "out",
+        timestamp=1_800_000_000,
+        remote=None,
+        codec=codec,
+    )
+
+    archive = Path(artifact["remote_uri"].removeprefix("local:"))
+    assert archive.name == f"1800000000{backup_runner.ARCHIVE_SUFFIXES[codec]}"
+    assert artifact["sha256"] == backup_runner._sha256(archive)
+    assert artifact["size_bytes"] == archive.stat().st_size
+    assert artifact["codec"] == codec
+    assert artifact["compression_ratio"] > 1
+    assert artifact["throughput_bytes_per_second"] > 0
+    restored = tmp_path / "restored"
+    restored.mkdir()
+    if codec == "gzip":
+        with tarfile.open(archive, "r:gz") as tar:
+            tar.extractall(restored)
+    else:
+        subprocess.run(
+            f"zstd -dc {archive} | tar -x -C {restored}", shell=True, check=True
+        )
+    assert (restored / "nested" / "more.txt").read_text(encoding="utf-8") == "nested"
+
+
+def test_backup_runner_upload_streams_into_rclone_rcat(tmp_path, monkeypatch) -> None:
+    """Uploads pipe the archive into `rclone rcat` without staging it locally."""
+    backup_runner = _load_backup_runner()
+    entry = _archive_source(tmp_path)
+    received = tmp_path / "received.tar.gz"
+    calls = []
+    real_popen = subprocess.Popen
+
+    def fake_popen(args, **kwargs):
+        calls.append(args)
+        return real_popen(["sh", "-c", f"cat > {received}"], **kwargs)
+
+    monkeypatch.setattr(backup_runner.subprocess, "Popen", fake_popen)
+
+    artifact = backup_runner._backup_entry(
+        entry,
+        output_dir=tmp_path / "out",
+        timestamp=1_800_000_000,
+        remote="r2:infra2",
+    )
+
+    assert calls == [["rclone", "rcat", "r2:infra2/test/service/1800000000.tar.gz"]]
+    assert artifact["remote_uri"] == "r2:infra2/test/service/1800000000.tar.gz"
+    assert artifact["sha256"] == backup_runner._sha256(received)
+    assert not list((tmp_path / "out").rglob("*.tar.gz"))
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_backup_runner_upload_aborts_rclone_when_source_read_fails(
+    tmp_path, monkeypatch, codec
+) -> None:
+    """A read error mid-stream kills rclone before it sees EOF, so no truncated
+    but well-formed archive is committed, and the error reaches the caller."""
+    if codec == "zstd" and shutil.which("zstd") is None:
+        pytest.skip("zstd binary not installed")
+    backup_runner = _load_backup_runner()
+    entry = _archive_source(tmp_path)
+    committed = tmp_path / "committed"
+    procs = []
+    real_popen = subprocess.Popen
+    real_addfile = tarfile.TarFile.addfile
+
+    def fake_popen(args, **kwargs):
+        if args[0] != "rclone":
+            return real_popen(args, **kwargs)
+        rclone = ["sh", "-c", f"cat >/dev/null && touch {committed}"]
+        procs.append(real_popen(rclone, **kwargs))
+        return procs[-1]
+
+    def failing_addfile(self, tarinfo, fileobj=None, **kwargs):
+        if tarinfo.name.endswith("more.txt"):
+            raise OSError("Input/output error")
+        return real_addfile(self, tarinfo, fileobj, **kwargs)
+
+    monkeypatch.setattr(backup_runner.subprocess, "Popen", fake_popen)
+    monkeypatch.setattr(tarfile.TarFile, "addfile", failing_addfile)
+
+    with pytest.raises(OSError, match="Input/output error"):
+        backup_runner._backup_entry(
+            entry,
+            output_dir=tmp_path / "out",
+            timestamp=1_800_000_000,
+            remote="r2:infra2",
+            codec=codec,
+        )
+
+    assert procs[0].returncode == -9  # killed and reaped, not left running
+    assert not committed.exists()
+
+
+def test_chunk_boundaries_do_not_depend_on_read_size(monkeypatch) -> None:
+    data = random.Random(3).randbytes(12 * 1024 * 1024)
+
+    def chunk_sizes() -> list[int]:
+        return [len(chunk) for chunk in backup_chunks.iter_chunks(io.BytesIO(data))]
+
+    whole = chunk_sizes()
+    monkeypatch.setattr(backup_chunks, "_READ_BYTES", 300_000)
+    assert chunk_sizes() == whole
+    assert sum(whole) == len(data)
+    assert all(
+        backup_chunks.MIN_CHUNK_BYTES <= size <= backup_chunks.MAX_CHUNK_BYTES
+        for size in whole[:-1]
+    )
+
+
+def test_incremental_backup_uploads_only_changed_chunks_and_restores(
+    tmp_path, monkeypatch
+) -> None:
+    """An unchanged rerun stores no new chunks; an edit near the start of a large
+    file re-stores only the chunks around it; the index restores the exact tree."""
+    backup_runner = _load_backup_runner()
+    entry = _archive_source(tmp_path)
+    source = Path(entry.data_path)
+    big = source / "big.bin"
+    big.write_bytes(random.Random(7).randbytes(6 * 1024 * 1024))
+    (source / "link").symlink_to("data.txt")
+    # Out of the racy window, so the rerun may trust size+mtime.
+    for path in source.rglob("*"):
+        if not path.is_symlink():
+            os.utime(path, (1_700_000_000, 1_700_000_000))
+
+    def run(timestamp: int) -> dict:
+        return backup_runner._backup_entry_chunked(
+            entry, output_dir=tmp_path / "out", timestamp=timestamp, remote=None
+        )
+
+    first = run(1_800_000_000)
+    second = run(1_800_000_100)
+    assert first["format"] == "chunked" and first["chunks_new"] > 0
+    assert second["chunks_new"] == 0
+    assert second["files_reused"] == 3
+
+    big.write_bytes(b"edit" + big.read_bytes())
+    third = run(1_800_000_200)
+    assert 0 < third["chunks_new"] < third["chunks_total"] / 2
+
+    restored = materialize_artifact(third, tmp_path / "download")
+    assert restored == planned_artifact_path(third, tmp_path / "download")
+    assert (restored / "big.bin").read_bytes() == big.read_bytes()
+    assert (restored / "nested" / "more.txt").read_text(encoding="utf-8") == "nested"
+    assert os.readlink(restored / "link") == "data.txt"
+
+
+def test_incremental_remote_upload_stages_at_most_one_batch(
+    tmp_path, monkeypatch
+) -> None:
+    """Remote incremental runs move staged chunks to the store batch by batch, so
+    local disk never holds a full second copy; the index is published last."""
+    backup_runner = _load_backup_runner()
+    entry = _archive_source(tmp_path)
+    (Path(entry.data_path) / "big.bin").write_bytes(
+        random.Random(3).randbytes(12 * 1024 * 1024)
+    )
+    remote_store = tmp_path / "remote" / "chunks"
+    calls: list[str] = []
+    staged_sizes: list[int] = []
+
+    def fake_rclone(args, *, bwlimit_bytes=0):  # noqa: ANN001
+        calls.append(args[0])
+        if args[0] == "move":
+            staged = [path for path in Path(args[1]).rglob("*") if path.is_file()]
+            staged_sizes.append(sum(path.stat().st_size for path in staged))
+            for path in staged:
+                target = remote_store / path.relative_to(args[1])
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(path, target)
+
+    monkeypatch.setattr(backup_runner, "_rclone", fake_rclone)
+    monkeypatch.setattr(backup_runner, "_remote_chunk_ids", lambda _uri: set())
+    batch = 3 * 1024 * 1024
+
+    artifact = backup_runner._backup_entry_chunked(
+        entry,
+        output_dir=tmp_path / "out",
+        timestamp=1_800_000_000,
+        remote="r2:infra2",
+        batch_bytes=batch,
+    )
+
+    assert calls[-1] == "copyto" and calls.count("move") >= 3
+    assert max(staged_sizes) < batch + backup_chunks.MAX_CHUNK_BYTES
+    assert sum(staged_sizes) == artifact["uploaded_bytes"]
+    local_index = tmp_path / "out" / "test_service" / "1800000000.index.json"
+    index = json.loads(local_index.read_text(encoding="utf-8"))
+    store = backup_chunks.ChunkStore(remote_store)
+    assert all(store.has(chunk) for chunk in backup_chunks.index_chunk_ids(index))
+
+
+def test_chunked_artifact_is_refused_by_the_postgres_rehearsal(
+    tmp_path, monkeypatch
+) -> None:
+    """An `--incremental` backup materializes to a directory tree, which the pg
+    dump rehearsal cannot replay: it is refused with BackupRestoreError (before
+    any download when run through the tool), never an IsADirectoryError."""
+    backup_runner = _load_backup_runner()
+    entry = dataclasses.replace(
+        _archive_source(tmp_path),
+        service_id="finance_report/postgres",
+        method="pg_dump_plus_data_archive",
+    )
+    artifact = backup_runner._backup_entry_chunked(
+        entry, output_dir=tmp_path / "out", timestamp=1_800_000_000, remote=None
+    )
+    restored = materialize_artifact(artifact, tmp_path / "download")
+    assert restored.is_dir()
+    target = "finance_report-postgres-restore-rehearsal"
+
+    with pytest.raises(BackupRestoreError, match="chunked"):
+        build_postgres_rehearsal_plan(
+            entry=entry,
+            artifact=artifact,
+            archive_path=restored,
+            target_container=target,
+        )
+    plan = build_postgres_rehearsal_plan(
+        entry=entry,
+        artifact={**artifact, "format": None, "codec": None},
+        archive_path=restored,
+        target_container=target,
+    )
+    with pytest.raises(BackupRestoreError, match="is a directory"):
+        run_postgres_restore_rehearsal(plan)
+
+    tool = _load_backup_restore_rehearsal_tool()
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text('{"artifacts":[]}', encoding="utf-8")
+    monkeypatch.setattr(tool, "load_backup_inventory", lambda: [entry])
+    monkeypatch.setattr(
+        tool, "assert_manifest_is_rehearsable", lambda *_args, **_kwargs: artifact
+    )
+
+    def fail_download(*_args, **_kwargs):
+        raise AssertionError("a refused artifact must not be downloaded")
+
+    monkeypatch.setattr(tool, "materialize_artifact", fail_download)
+    with pytest.raises(BackupRestoreError, match="chunked"):
+        tool.main(
+            [
+                "--manifest",
+                str(manifest_path),
+                "--service-id",
+                entry.service_id,
+                "--target-container",
+                target,
+                "--download-dir",
+                str(tmp_path / "tool-download"),
+            ]
+        )
+
+
+def test_chunked_restore_fetches_only_indexed_chunks_and_verifies_them(
+    tmp_path,
+) -> None:
+    """Remote chunked artifacts download the index, then exactly its chunks in one
+    rclone call; a chunk whose bytes do not match its id fails the restore."""
+    backup_runner = _load_backup_runner()
+    entry = _archive_source(tmp_path)
+    artifact = backup_runner._backup_entry_chunked(
+        entry, output_dir=tmp_path / "out", timestamp=1_800_000_000, remote=None
+    )
+    local_index = Path(artifact["remote_uri"].removeprefix("local:"))
+    local_store = Path(artifact["chunk_store_uri"].removeprefix("local:"))
+    remote = dict(
+        artifact,
+        remote_uri="r2:infra2/test/service/1800000000.index.json",
+        chunk_store_uri="r2:infra2/test/service/chunks",
+    )
+    calls: list[list[str]] = []
+
+    class Result:
+        returncode = 0
+        stderr = ""
+
+    def fake_run(cmd, **_kwargs):  # noqa: ANN001
+        calls.append(cmd)
+        if cmd[1] == "copyto":
+            shutil.copyfile(local_index, cmd[3])
+        else:
+            wanted = Path(cmd[cmd.index("--files-from") + 1]).read_text().split()
+            for name in wanted:
+                (Path(cmd[3]) / name).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(local_store / name, Path(cmd[3]) / name)
+        return Result()
+
+    restored = materialize_artifact(remote, tmp_path / "download", runner=fake_run)
+
+    assert [cmd[1] for cmd in calls] == ["copyto", "copy"]
+    assert (restored / "data.txt").read_text(encoding="utf-8") == "important " * 4096
+
+    chunk = next((tmp_path / "download" / "chunks").rglob("*"))
+    while chunk.is_dir():
+        chunk = next(chunk.iterdir())
+    chunk.write_bytes(zlib.compress(b"tampered"))
+    with pytest.raises(BackupRestoreError, match="digest mismatch"):
+        materialize_artifact(remote, tmp_path / "download", runner=fake_run)
+
+
 def test_backup_verification_cli_uses_current_time_not_manifest_verified_at(
     tmp_path, monkeypatch
 ) -> None:
@@ -313,6 +655,61 @@ def test_backup_restore_rehearsal_refuses_live_looking_targets(tmp_path) -> None
     assert "SELECT count(*) >= 1 FROM pg_database" in plan.invariant_sql
 
 
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_backup_restore_rehearsal_decompresses_with_the_recorded_codec(
+    tmp_path, codec
+) -> None:
+    """The manifest row's codec picks the decompressor, so a `--codec zstd`
+    backup restores like a gzip one; an unknown codec is refused up front."""
+    if codec == "zstd" and shutil.which("zstd") is None:
+        pytest.skip("zstd binary not installed")
+    entry = BackupEntry(
+        service_id="finance_report/postgres",
+        data_path="/data/finance_report/postgres",
+        method="pg_dump_plus_data_archive",
+        restore_command="restore",
+        remote="r2",
+        retention_days=30,
+        rpo_hours=24,
+    )
+    dump = b"CREATE TABLE t (id int);\n" * 1000
+    archive = tmp_path / f"dump.sql.{'gz' if codec == 'gzip' else 'zst'}"
+    if codec == "gzip":
+        archive.write_bytes(gzip.compress(dump))
+    else:
+        subprocess.run(["zstd", "-q", "-o", str(archive)], input=dump, check=True)
+    artifact = {"method": "pg_dumpall", "codec": codec}
+    plan = build_postgres_rehearsal_plan(
+        entry=entry,
+        artifact=artifact,
+        archive_path=archive,
+        target_container="finance_report-postgres-restore-rehearsal",
+    )
+    received = tmp_path / "received.sql"
+
+    def fake_popen(_cmd, **kwargs):  # noqa: ANN001
+        return subprocess.Popen(["sh", "-c", f"cat > {received}"], **kwargs)
+
+    class Result:
+        returncode = 0
+        stderr = ""
+
+    result = run_postgres_restore_rehearsal(
+        plan, popen=fake_popen, runner=lambda *_a, **_k: Result()
+    )
+
+    assert plan.codec == codec
+    assert result["status"] == "pass"
+    assert received.read_bytes() == dump
+    with pytest.raises(BackupRestoreError, match="cannot decompress 'lz4'"):
+        build_postgres_rehearsal_plan(
+            entry=entry,
+            artifact={**artifact, "codec": "lz4"},
+            archive_path=archive,
+            target_container="finance_report-postgres-restore-rehearsal",
+        )
+
+
 def test_backup_restore_rehearsal_selects_latest_artifact() -> None:
     """Infra-011.17 / #945: rehearsal uses the latest artifact for a service."""
     artifact = latest_artifact_for_service(
@@ -5,14 +5,23 @@ declared deps must select exactly the right services, and the autoDeploy audit
 must flag non-allowlisted Dokploy-native triggers.
 """
 
+import fnmatch
+import glob
+import os
+
 from libs.deploy_dependencies import (
+    FanoutMatcher,
     autodeploy_violations,
+    compiled_matcher,
+    declared_service_dependencies,
+    dependency_files,
     dockerfile_baked_shared_trees,
     explain_fanout,
     fanout_coverage_violations,
     load_dependency_manifest,
     match_changed_services,
     service_key_from_path,
+    service_directories,
 )
 
 
@@ -111,6 +120,33 @@ def test_shipped_manifest_fans_libs_and_tools_to_alerting():
     )
 
 
+def test_declared_service_dependencies_orders_by_matched_service_files(tmp_path):
+    (tmp_path / "platform" / "01.postgres").mkdir(parents=True)
+    (tmp_path / "platform" / "01.postgres" / "deploy.py").write_text("")
+    (tmp_path / "platform" / "12.alerting").mkdir()
+    (tmp_path / "platform" / "12.alerting" / "deploy.py").write_text("")
+    (tmp_path / "platform" / "02.redis").mkdir()
+    manifest = {"platform/alerting": ["platform/*/deploy.py"]}
+
+    assert sorted(service_directories(tmp_path)) == [
+        "platform/alerting",
+        "platform/postgres",
+        "platform/redis",
+    ]
+    assert declared_service_dependencies(
+        {"platform/alerting", "platform/postgres", "platform/redis"},
+        manifest=manifest,
+        root=tmp_path,
+    ) == {"platform/alerting": {"platform/postgres"}}
+    # Only selected services participate.
+    assert (
+        declared_service_dependencies(
+            {"platform/alerting"}, manifest=manifest, root=tmp_path
+        )
+        == {}
+    )
+
+
 def test_autodeploy_violations():
     composes = [
         {"name": "openpanel", "autoDeploy": True},  # iac-managed -> violation
@@ -152,6 +188,112 @@ def test_explain_fanout_agrees_with_match_changed_services():
     ) == match_changed_services(files, manifest=manifest)
 
 
+def _reference_fanout(files, manifest):
+    """The original quadratic fan-out: every (glob x file) pair via fnmatch."""
+    selected, matched = {}, set()
+    for f in files:
+        key = service_key_from_path(f)
+        if key:
+            selected.setdefault(key, f"own-dir ({f})")
+            matched.add(f)
+    for service_key, globs in manifest.items():
+        hits = [f for f in files if any(fnmatch.fnmatch(f, g) for g in globs)]
+        if hits:
+            selected.setdefault(service_key, f"declared dep ({hits[0]})")
+            matched.update(hits)
+    return selected, [f for f in files if f not in matched]
+
+
+def test_compiled_matcher_matches_fnmatch_reference():
+    manifest = {
+        "platform/alerting": ["libs/**", "tools/*.py", "platform/*/deploy.py"],
+        "platform/portal": ["docs/ssot/*.md", "web/[ab]?/index.html"],
+        "platform/signoz": ["*.toml", "libs/deploy/*"],
+        "platform/minio": [],
+    }
+    files = [
+        "docs/ssot/ops.pipeline.md",
+        "libs/deploy/deployer.py",
+        "platform/01.postgres/deploy.py",
+        "platform/01.postgres/sub/deploy.py",  # fnmatch's * spans "/"
+        "pyproject.toml",
+        "tools/nested/x.py",
+        "web/a1/index.html",
+        "web/c1/index.html",
+        "README.md",
+        "libs/deploy/deployer.py",
+    ]
+
+    decision = FanoutMatcher(manifest).explain(files)
+
+    assert (decision.selected, decision.dropped) == _reference_fanout(files, manifest)
+    assert list(decision.selected) == list(_reference_fanout(files, manifest)[0])
+    assert FanoutMatcher(manifest).services_for("libs/deploy/x") == {
+        "platform/alerting",
+        "platform/signoz",
+    }
+
+
+def test_manifest_and_matcher_are_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "deploy-dependencies.yaml"
+    path.write_text("services:\n  platform/alerting:\n    depends_on: [libs/**]\n")
+
+    matcher = compiled_matcher(path)
+    assert compiled_matcher(path) is matcher
+    manifest = load_dependency_manifest(path)
+    manifest["platform/alerting"].append("mutated/**")
+    assert load_dependency_manifest(path) == {"platform/alerting": ["libs/**"]}
+
+    path.write_text("services:\n  platform/portal:\n    depends_on: [web/**]\n")
+    os.utime(path, ns=(0, 10**9))
+    assert compiled_matcher(path) is not matcher
+    assert compiled_matcher(path).services_for("web/x") == {"platform/portal"}
+    path.unlink()
+    assert load_dependency_manifest(path) == {}
+
+
+def test_dependency_files_index_matches_glob_and_tracks_new_files(tmp_path):
+    for rel in (
+        "libs/a.py",
+        "libs/sub/b.py",
+        "libs/.hidden/c.py",
+        "libs/.d.py",
+        "tools/t.py",
+        "tools/deep/u.py",
+        "platform/01.pg/deploy.py",
+        "VERSION",
+    ):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text(rel)
+    globs = ["libs/**", "tools/*.py", "*/01.pg/deploy.py", "VERSION", "missing/**"]
+    manifest = tmp_path / "deps.yaml"
+    manifest.write_text(
+        "services:\n  platform/alerting:\n    depends_on: "
+        + "["
+        + ", ".join(f'"{g}"' for g in globs)
+        + "]\n"
+    )
+
+    def expected():
+        hits = {
+            os.path.relpath(hit, tmp_path)
+            for pattern in globs
+            for hit in glob.glob(str(tmp_path / pattern), recursive=True)
+            if os.path.isfile(hit)
+        }
+        return sorted(hits)
+
+    assert dependency_files("platform/alerting", tmp_path, manifest) == expected()
+    assert "libs/.d.py" not in expected()
+    assert dependency_files("platform/portal", tmp_path, manifest) == []
+
+    (tmp_path / "libs/sub/new.py").write_text("")
+    (tmp_path / "missing").mkdir()
+    (tmp_path / "missing/m.py").write_text("")
+    assert dependency_files("platform/alerting", tmp_path, manifest) == expected()
+    assert "libs/sub/new.py" in expected()
+
+
 def test_dockerfile_baked_shared_trees():
     dockerfile = (
         "FROM python:3.11-slim\n"
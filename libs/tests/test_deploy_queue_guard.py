@@ -97,6 +97,10 @@ class _FakeClient:
         self.killed: list[str] = []
         self.cancelled: list[str] = []
         self.cleaned: list[str] = []
+        self.closed = False
+
+    def close(self):
+        self.closed = True
 
     def list_projects(self):
         return self._projects
@@ -106,6 +110,16 @@ class _FakeClient:
             raise RuntimeError("dokploy 500")
         return self._deployments.get(compose_id, [])
 
+    def get_deployments_many(self, compose_ids):
+        self.fanouts = getattr(self, "fanouts", []) + [list(compose_ids)]
+        out = {}
+        for compose_id in compose_ids:
+            try:
+                out[compose_id] = self.get_compose_deployments(compose_id)
+            except RuntimeError as exc:
+                out[compose_id] = exc
+        return out
+
     def kill_compose_build(self, compose_id):
         self.killed.append(compose_id)
 
@@ -144,6 +158,7 @@ def test_list_composes_isolates_per_compose_failure() -> None:
     ]
     assert out[0].deployments == ()  # failed fetch degrades to empty
     assert out[1].deployments == ({"status": "running"},)
+    assert client.fanouts == [["c1", "c2"]]  # one bulk fetch, not one per compose
 
 
 # ---------------------------------------------------------------------------
@@ -325,6 +340,7 @@ def test_watcher_sweep_alerts_on_stuck(monkeypatch, tmp_path: Path) -> None:
     assert len(alerts) == 1
     assert alerts[0]["commonLabels"]["alertname"] == "DeployQueueStuck"
     assert client.killed == []  # observe-only by default
+    assert client.closed is True  # the sweep releases its pooled connection
 
 
 def test_watcher_env_triad_maps_into_config_for_continuity() -> None:
@@ -211,7 +211,9 @@ def test_iac_ref_on_main_accepts_reachable(status):
 @pytest.mark.parametrize("status", ["ahead", "diverged"])
 def test_iac_ref_off_main_refused(status):
     with pytest.raises(ValueError, match="not on infra2 main"):
-        assert_iac_ref_on_main("v1.2.3", "prod", token="", transport=_cmp_transport(status))
+        assert_iac_ref_on_main(
+            "v1.2.3", "prod", token="", transport=_cmp_transport(status)
+        )
 
 
 def test_iac_ref_on_main_exempt_for_preview():
@@ -643,7 +645,16 @@ def test_cli_dokploy_host_falls_back_to_the_known_org_domain_without_internal_do
     rec, _json = cli
     monkeypatch.delenv("INTERNAL_DOMAIN", raising=False)
     rc = dv2.main(
-        ["--type", "staging", "--version-ref", "main", "--iac-ref", "main", "--domain", "zp.io"]
+        [
+            "--type",
+            "staging",
+            "--version-ref",
+            "main",
+            "--iac-ref",
+            "main",
+            "--domain",
+            "zp.io",
+        ]
     )
     assert rc == 0
     assert rec["client"] == "client@cloud.zitian.party"
@@ -773,7 +784,9 @@ def test_cli_down_tears_down_the_selected_preview_alias(monkeypatch, capsys):
     rec = {}
 
     def fake_down(kind, value, *, domain, client, service):
-        rec.update(kind=kind, value=value, domain=domain, client=client, service=service)
+        rec.update(
+            kind=kind, value=value, domain=domain, client=client, service=service
+        )
         return _fake_down_result(kind, value, domain=domain, client=client)
 
     import libs.dokploy as dk
@@ -1072,10 +1085,35 @@ def test_wait_for_image_dependencies_retries_until_all_artifacts_exist(monkeypat
 
     dv2._wait_for_image_dependencies(spec, "abcdef0", timeout=30, poll_seconds=1)
 
-    assert attempts == {"backend": 2, "frontend": 2}
+    # A published image is not re-checked on later rounds.
+    assert attempts == {"backend": 1, "frontend": 2}
     assert sleeps == [1]
 
 
+def test_wait_for_image_dependencies_backs_off_on_registry_errors(monkeypatch):
+    spec = dv2.service_spec("finance_report/app")
+    rounds = {"n": 0}
+    sleeps = []
+
+    def exists(image, image_ref):
+        if image.endswith("-backend"):
+            return True
+        rounds["n"] += 1
+        if rounds["n"] == 1:
+            raise dv2.RegistryUnavailable("429", retry_after=7)
+        if rounds["n"] == 2:
+            raise RuntimeError("registry manifest check is temporarily unavailable")
+        return rounds["n"] >= 4
+
+    monkeypatch.setattr(dv2, "_image_manifest_exists", exists)
+    monkeypatch.setattr(dv2.time, "sleep", lambda seconds: sleeps.append(seconds))
+
+    dv2._wait_for_image_dependencies(spec, "abcdef0", timeout=300, poll_seconds=1)
+
+    # Retry-After wins over the doubled interval; a plain "missing" round resets.
+    assert sleeps == [7, 14, 1]
+
+
 def test_wait_for_image_dependencies_reports_missing_artifact(monkeypatch):
     spec = dv2.service_spec("finance_report/app")
 
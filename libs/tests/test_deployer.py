@@ -366,6 +366,135 @@ services:
     assert files == sorted({dockerfile, app_dir / "main.py", config_file})
 
 
+def _age_tree(root: Path, seconds: int = 60) -> None:
+    """Backdate mtimes so config-hash cache entries are past the racy window."""
+    import os
+    import time
+
+    old_ns = time.time_ns() - seconds * 1_000_000_000
+    for path in [root, *root.rglob("*")]:
+        os.utime(path, ns=(old_ns, old_ns))
+
+
+def _cached_hash_service(tmp_path: Path):
+    from libs.deploy.deployer import Deployer
+
+    app_dir = tmp_path / "app"
+    app_dir.mkdir()
+    (app_dir / "main.py").write_text("print('v1')\n", encoding="utf-8")
+    (tmp_path / "Dockerfile").write_text(
+        "FROM python:3.11-slim\nCOPY app /app\n", encoding="utf-8"
+    )
+    compose = tmp_path / "compose.yaml"
+    compose.write_text("services:\n  app:\n    build: .\n", encoding="utf-8")
+
+    class CachedDeployer(Deployer):
+        compose_path = str(compose)
+
+    return CachedDeployer
+
+
+def test_cached_config_hash_is_bit_identical_and_stat_only_when_unchanged(
+    tmp_path, monkeypatch
+) -> None:
+    import libs.deploy.config_hash_cache as config_hash_cache
+    import libs.deploy.deployer as deployer
+
+    monkeypatch.setenv("DEPLOY_CONFIG_HASH_CACHE", str(tmp_path / "cache.json"))
+    monkeypatch.setattr(config_hash_cache, "_CACHE", None)
+    service_dir = tmp_path / "svc"
+    service_dir.mkdir()
+    service = _cached_hash_service(service_dir)
+    compose_content = Path(service.compose_path).read_text(encoding="utf-8")
+    env = {"ENV": "staging"}
+    _age_tree(service_dir)
+
+    expected = deployer.config_hash_from_items(
+        compose_content,
+        env,
+        deployer._artifact_items_from_disk(service.compose_path, compose_content),
+        [],
+    )
+    assert service.compute_local_config_hash(MagicMock(), env) == expected
+    assert (tmp_path / "cache.json").exists()
+
+    # A fresh process reuses the on-disk cache: no walk, no Dockerfile parse, no read.
+    monkeypatch.setattr(config_hash_cache, "_CACHE", None)
+    monkeypatch.setattr(
+        deployer,
+        "_compose_artifact_files",
+        lambda *_args: pytest.fail("unchanged service must not be re-walked"),
+    )
+    monkeypatch.setattr(
+        Path, "read_bytes", lambda _self: pytest.fail("unchanged file must not be read")
+    )
+
+    assert service.compute_local_config_hash(MagicMock(), env) == expected
+
+
+def test_cached_config_hash_sees_same_size_rewrites_and_new_context_files(
+    tmp_path, monkeypatch
+) -> None:
+    import libs.deploy.config_hash_cache as config_hash_cache
+
+    monkeypatch.setenv("DEPLOY_CONFIG_HASH_CACHE", str(tmp_path / "cache.json"))
+    monkeypatch.setattr(config_hash_cache, "_CACHE", None)
+    service_dir = tmp_path / "svc"
+    service_dir.mkdir()
+    service = _cached_hash_service(service_dir)
+    env = {"ENV": "staging"}
+    _age_tree(service_dir)
+    warm = service.compute_local_config_hash(MagicMock(), env)
+
+    # Same size, inside the racy window: must be re-read, not trusted by stat.
+    (service_dir / "app" / "main.py").write_text("print('v2')\n", encoding="utf-8")
+    rewritten = service.compute_local_config_hash(MagicMock(), env)
+    assert rewritten != warm
+
+    _age_tree(service_dir)
+    assert service.compute_local_config_hash(MagicMock(), env) == rewritten
+    (service_dir / "app" / "extra.py").write_text("x = 1\n", encoding="utf-8")
+    assert service.compute_local_config_hash(MagicMock(), env) != rewritten
+
+
+def test_config_hash_cache_save_drops_removed_worktrees_and_orphaned_blobs(
+    tmp_path,
+) -> None:
+    import json
+    import shutil
+    import time
+
+    from libs.deploy.config_hash_cache import ConfigHashCache
+
+    cache_path = tmp_path / "cache.json"
+    cache = ConfigHashCache(cache_path, tmp_path)
+    cache._git_blobs = {}
+    cache._git_blobs_at = time.time_ns()
+    for worktree in ("kept", "removed"):
+        root = tmp_path / worktree
+        root.mkdir()
+        artifact = root / "main.py"
+        artifact.write_text(f"print({worktree!r})\n", encoding="utf-8")
+        (root / "compose.yaml").write_text("services: {}\n", encoding="utf-8")
+        _age_tree(root)
+        cache._git_blobs[str(artifact)] = f"blob-{worktree}"
+        cache.artifact_files(
+            str(root / "compose.yaml"), "services: {}\n", lambda _probed: [artifact]
+        )
+        cache.file_sha256(artifact)
+    assert set(cache._blobs) == {"blob-kept", "blob-removed"}
+
+    shutil.rmtree(tmp_path / "removed")
+    cache.save()
+
+    saved = json.loads(cache_path.read_text(encoding="utf-8"))
+    assert list(saved["manifests"]) == [
+        str((tmp_path / "kept" / "compose.yaml").resolve())
+    ]
+    assert list(saved["blobs"]) == ["blob-kept"]
+    assert list(saved["files"]) == [str(tmp_path / "kept" / "main.py")]
+
+
 def test_compose_artifact_files_ignores_invalid_yaml(tmp_path) -> None:
     from libs.deploy.deployer import _compose_artifact_files
 
@@ -742,6 +871,100 @@ class TestDeployerVaultTokenPreflight:
         assert "AppRole" in status["details"]
 
 
+def _deploying_sync(monkeypatch, deployed_environment: str):
+    """Run a staging redis sync through composing and the post-deploy identity
+    check; Dokploy then reports ``deployed_environment`` as INFRA_ENVIRONMENT."""
+    import libs.deploy.deployer as deployer
+    from libs.deploy.deployer import SOURCE_CONFIG_HASH_VERSION, Deployer
+
+    deploy_ref = "b" * 40
+    composed: list[dict[str, str]] = []
+
+    class RedisDeployer(Deployer):
+        service = "redis"
+        compose_path = "platform/02.redis/compose.yaml"
+        data_path = ""
+        secret_key = ""
+
+        @classmethod
+        def env(cls):
+            return {
+                "ENV": "staging",
+                "ENV_SUFFIX": "-staging",
+                "INTERNAL_DOMAIN": "example.test",
+            }
+
+        @classmethod
+        def compute_local_config_hash(cls, c, env_vars):
+            return "hash"
+
+        @classmethod
+        def get_remote_config_identity(cls, compose_id=None):
+            if compose_id is None:
+                return dict.fromkeys(
+                    (
+                        "runtime_hash",
+                        "source_hash",
+                        "deploy_ref",
+                        "identity_schema",
+                        "managed_by",
+                        "service_id",
+                        "environment",
+                    )
+                )
+            deployed = composed[-1]
+            return {
+                "runtime_hash": deployed["IAC_CONFIG_HASH"],
+                "source_hash": deployed["IAC_SOURCE_CONFIG_HASH"],
+                "deploy_ref": deployed["IAC_DEPLOY_REF"],
+                "identity_schema": deployed["INFRA_IDENTITY_SCHEMA"],
+                "managed_by": deployed["INFRA_MANAGED_BY"],
+                "service_id": deployed["INFRA_SERVICE_ID"],
+                "environment": deployed_environment,
+            }
+
+        @classmethod
+        def composing(cls, c, env_vars):
+            composed.append(dict(env_vars))
+            return "compose-1"
+
+    monkeypatch.setenv("IAC_DEPLOY_REF", deploy_ref)
+    monkeypatch.setattr(deployer, "validate_env", lambda: [])
+    monkeypatch.setattr(
+        RedisDeployer,
+        "verify_vault_app_token",
+        classmethod(lambda cls: {"valid": True, "details": "No VAULT_APP_TOKEN found"}),
+    )
+    monkeypatch.setattr(RedisDeployer, "prefetch_secrets", classmethod(lambda cls: {}))
+    monkeypatch.setattr(
+        RedisDeployer, "ensure_runtime_secrets", classmethod(lambda cls, c: True)
+    )
+    monkeypatch.setattr(
+        RedisDeployer, "_prepare_dirs", classmethod(lambda cls, c: True)
+    )
+
+    result = RedisDeployer.sync(MagicMock())
+    assert len(composed) == 1
+    assert composed[0]["IAC_SOURCE_CONFIG_HASH"] == f"{SOURCE_CONFIG_HASH_VERSION}:hash"
+    assert composed[0]["INFRA_ENVIRONMENT"] == "staging"
+    return result
+
+
+def test_sync_deploys_and_verifies_the_effective_identity(monkeypatch) -> None:
+    result = _deploying_sync(monkeypatch, "staging")
+
+    assert result["action"] == "created"
+    assert result["details"] == "composeId: compose-1"
+    assert result["verification"]["polls"] == 1
+
+
+def test_sync_fails_when_the_deployed_identity_is_stale(monkeypatch) -> None:
+    result = _deploying_sync(monkeypatch, "production")
+
+    assert result["action"] == "failed"
+    assert "INFRA_ENVIRONMENT expected staging, got production" in result["details"]
+
+
 def test_minio_sync_secret_hook_repairs_root_user(monkeypatch) -> None:
     """Infra-011: sync must ensure all MinIO template fields, not only password."""
     module = _load_deploy_module("platform/03.minio/deploy.py", "minio_deploy_test")
@@ -867,6 +1090,34 @@ def test_secrets_backend_env_override_takes_precedence_over_process_env(
     assert captured == {"project": "acme", "service": "widget", "env": "staging"}
 
 
+def test_prefetch_secrets_reads_own_and_dependency_paths_in_one_batch(
+    monkeypatch,
+) -> None:
+    from libs.deploy.deployer import Deployer
+    from libs.env import secrets_session
+
+    class DummyDeployer(Deployer):
+        service = "widget"
+        project = "acme"
+        secret_dependencies = ("postgres", "redis", "not-a-service")
+
+        @classmethod
+        def env(cls):
+            return {"ENV": "staging"}
+
+    batches = []
+    monkeypatch.setattr(
+        secrets_session(), "prefetch", lambda paths: batches.append(paths) or {}
+    )
+
+    DummyDeployer.prefetch_secrets()
+
+    # Unaddressable names (get_secrets rejects '-') are skipped, not fatal.
+    assert batches == [
+        ["acme/staging/widget", "acme/staging/postgres", "acme/staging/redis"]
+    ]
+
+
 def test_secrets_backend_falls_back_to_process_env_when_no_override(
     monkeypatch,
 ) -> None:
@@ -1124,6 +1375,44 @@ def test_await_effective_config_hash_times_out_when_unadvanced(monkeypatch):
     assert D._await_effective_config_hash("expected") == "stale"
 
 
+def test_await_effective_config_hash_polls_pinned_compose_id(monkeypatch):
+    """With the deployed composeId pinned, each poll is one compose.one read (no
+    by-name lookup); poll count, settle latency and the matching identity are
+    reported back to sync."""
+    import libs.deploy.deployer as deployer
+    import libs.dokploy as dokploy
+    from libs.deploy.deployer import Deployer
+
+    class D(Deployer):
+        service = "x"
+        compose_path = "x/compose.yaml"
+        data_path = "/data/x"
+
+    envs = iter(["IAC_CONFIG_HASH=stale", "IAC_CONFIG_HASH=expected\nIAC_DEPLOY_REF=r"])
+    reads: list[str] = []
+
+    class Client:
+        def get_compose(self, compose_id):
+            reads.append(compose_id)
+            return {"composeId": compose_id, "env": next(envs)}
+
+        def find_compose_by_name(self, *_args, **_kwargs):
+            raise AssertionError("pinned polls must not resolve the compose by name")
+
+    monkeypatch.setattr(dokploy, "get_dokploy", lambda **_kwargs: Client())
+    monkeypatch.setattr(D, "env", classmethod(lambda cls: {"ENV": "staging"}))
+    monkeypatch.setattr(deployer.time, "sleep", lambda _s: None)
+    clock = iter([10.0, 10.5, 12.25])
+    monkeypatch.setattr(deployer.time, "monotonic", lambda: next(clock))
+
+    stats: dict = {}
+    assert D._await_effective_config_hash("expected", "cmp-1", stats) == "expected"
+    assert reads == ["cmp-1", "cmp-1"]
+    assert stats["polls"] == 2
+    assert stats["settle_seconds"] == 2.25
+    assert stats["identity"]["deploy_ref"] == "r"
+
+
 def test_approle_preflight_passes_for_non_approle_compose(tmp_path):
     from libs.deploy.deployer import Deployer
 
@@ -1,5 +1,6 @@
 """Unit tests for libs/dokploy.py."""
 
+import asyncio
 import os
 import threading
 import time
@@ -37,6 +38,10 @@ class FakeHttpClient:
         self.response = response or FakeResponse({"ok": True})
         self.request_error = request_error
         self.calls = []
+        self.closed = False
+
+    def close(self):
+        self.closed = True
 
     def __enter__(self):
         return self
@@ -60,8 +65,9 @@ def _status_error(code: int) -> httpx.HTTPStatusError:
 class _SequencedHttpClient:
     """Returns the next queued FakeResponse per request() call (drives retry tests).
 
-    The patched ``httpx.Client(...)`` factory hands back this same instance on every
-    ``with`` block, so calls accumulate across _request's retry attempts.
+    The patched ``httpx.Client(...)`` factory hands back this same instance (and the
+    client keeps it pooled anyway), so calls accumulate across _request's retry
+    attempts.
     """
 
     def __init__(self, responses):
@@ -150,7 +156,7 @@ class TestDokployClient:
         self, monkeypatch, dokploy_env
     ):
         fake = FakeHttpClient(FakeResponse(content=b""))
-        monkeypatch.setattr(dokploy.httpx, "Client", lambda timeout: fake)
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
         client = DokployClient(base_url="https://cloud.example.test/api")
 
         result = client._request("GET", "project.all", headers={"x-extra": "1"})
@@ -172,7 +178,7 @@ class TestDokployClient:
                 )
             )
         )
-        monkeypatch.setattr(dokploy.httpx, "Client", lambda timeout: fake)
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
         client = DokployClient(base_url="https://cloud.example.test/api")
 
         with pytest.raises(
@@ -185,7 +191,7 @@ class TestDokployClient:
         fake = FakeHttpClient(
             request_error=httpx.ConnectTimeout("timeout", request=request)
         )
-        monkeypatch.setattr(dokploy.httpx, "Client", lambda timeout: fake)
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
         client = DokployClient(base_url="https://cloud.example.test/api")
 
         with pytest.raises(
@@ -204,7 +210,7 @@ class TestDokployClient:
                 FakeResponse({"ok": True}),
             ]
         )
-        monkeypatch.setattr(dokploy.httpx, "Client", lambda timeout: fake)
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
         client = DokployClient(base_url="https://cloud.example.test/api")
 
         result = client._request("GET", "compose.one", _sleep=lambda *_: None)
@@ -215,7 +221,7 @@ class TestDokployClient:
         fake = _SequencedHttpClient(
             [FakeResponse(status_error=_status_error(503)) for _ in range(5)]
         )
-        monkeypatch.setattr(dokploy.httpx, "Client", lambda timeout: fake)
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
         client = DokployClient(base_url="https://cloud.example.test/api")
 
         with pytest.raises(httpx.HTTPStatusError, match="status code 503"):
@@ -230,7 +236,7 @@ class TestDokployClient:
                 FakeResponse({"ok": True}),
             ]
         )
-        monkeypatch.setattr(dokploy.httpx, "Client", lambda timeout: fake)
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
         client = DokployClient(base_url="https://cloud.example.test/api")
 
         with pytest.raises(httpx.HTTPStatusError, match="status code 502"):
@@ -249,7 +255,7 @@ class TestDokployClient:
                 FakeResponse({"ok": True}),
             ]
         )
-        monkeypatch.setattr(dokploy.httpx, "Client", lambda timeout: fake)
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
         client = DokployClient(base_url="https://cloud.example.test/api")
 
         result = client._request(
@@ -269,7 +275,7 @@ class TestDokployClient:
                 FakeResponse({"ok": True}),
             ]
         )
-        monkeypatch.setattr(dokploy.httpx, "Client", lambda timeout: fake)
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
         client = DokployClient(base_url="https://cloud.example.test/api")
 
         with pytest.raises(
@@ -290,7 +296,7 @@ class TestDokployClient:
                 FakeResponse({"composeId": "c1"}),
             ]
         )
-        monkeypatch.setattr(dokploy.httpx, "Client", lambda timeout: fake)
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
         monkeypatch.setattr(dokploy.time, "sleep", lambda *_: None)
         client = DokployClient(base_url="https://cloud.example.test/api")
 
@@ -667,6 +673,386 @@ class TestDokployClient:
         assert client.get_github_provider_id() == "126refcRlCoWj6pmPXElU"
 
 
+class TestPooledTransport:
+    """One long-lived pooled httpx.Client per DokployClient (no handshake per call)."""
+
+    def test_requests_share_one_pooled_client(self, monkeypatch, dokploy_env):
+        built = []
+
+        def factory(**kwargs):
+            built.append(kwargs)
+            return FakeHttpClient()
+
+        monkeypatch.setattr(dokploy.httpx, "Client", factory)
+        client = DokployClient(
+            base_url="https://cloud.example.test/api",
+            limits=httpx.Limits(max_connections=3),
+            http2=False,
+        )
+
+        client._request("GET", "project.all")
+        client._request("GET", "compose.one?composeId=c1")
+        client._request("POST", "compose.update", json={}, idempotent=True)
+
+        assert len(built) == 1
+        assert built[0]["limits"].max_connections == 3
+        assert built[0]["http2"] is False
+        assert built[0]["timeout"] == dokploy.DEFAULT_TIMEOUT_SECONDS
+
+    def test_http2_defaults_to_h2_availability(self, monkeypatch, dokploy_env):
+        monkeypatch.setattr(dokploy, "_http2_available", lambda: True)
+
+        assert DokployClient().http2 is True
+        assert DokployClient(http2=False).http2 is False
+
+    def test_close_releases_pool_and_next_request_reopens(
+        self, monkeypatch, dokploy_env
+    ):
+        built = []
+
+        def factory(**_kwargs):
+            built.append(FakeHttpClient())
+            return built[-1]
+
+        monkeypatch.setattr(dokploy.httpx, "Client", factory)
+        client = DokployClient(base_url="https://cloud.example.test/api")
+
+        client._request("GET", "project.all")
+        client.close()
+        client.close()  # idempotent
+        client._request("GET", "project.all")
+
+        assert [http.closed for http in built] == [True, False]
+
+    def test_context_manager_closes_pool(self, monkeypatch, dokploy_env):
+        fake = FakeHttpClient()
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
+
+        with DokployClient(base_url="https://cloud.example.test/api") as client:
+            client._request("GET", "project.all")
+            assert fake.closed is False
+
+        assert fake.closed is True
+
+    def test_close_without_requests_builds_nothing(self, monkeypatch, dokploy_env):
+        def factory(**_kwargs):
+            raise AssertionError("pool must be built lazily")
+
+        monkeypatch.setattr(dokploy.httpx, "Client", factory)
+
+        DokployClient().close()
+
+    def test_timing_counters_per_endpoint(self, monkeypatch, dokploy_env):
+        fake = _SequencedHttpClient(
+            [
+                FakeResponse(status_error=_status_error(502)),
+                FakeResponse({"ok": True}),
+                FakeResponse({"ok": True}),
+                FakeResponse(status_error=_status_error(500)),
+            ]
+        )
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
+        client = DokployClient(base_url="https://cloud.example.test/api")
+
+        client._request("GET", "compose.one?composeId=c1", _sleep=lambda *_: None)
+        client._request("GET", "compose.one?composeId=c2")
+        with pytest.raises(httpx.HTTPStatusError):
+            client._request("GET", "project.all")
+
+        summary = client.timing_summary()
+        assert summary["compose.one"]["calls"] == 3  # two requests, one retry
+        assert summary["compose.one"]["retries"] == 1
+        assert summary["compose.one"]["errors"] == 0
+        assert summary["project.all"]["calls"] == 1
+        assert summary["project.all"]["errors"] == 1
+
+
+_TOPOLOGY = [
+    {
+        "name": "platform",
+        "projectId": "p1",
+        "environments": [
+            {
+                "name": "production",
+                "environmentId": "env-prod",
+                "isDefault": True,
+                "compose": [{"name": "postgres", "composeId": "c-prod"}],
+            },
+            {
+                "name": "Staging",
+                "environmentId": "env-staging",
+                "compose": [
+                    {"name": "postgres", "composeId": "c-staging", "githubId": "gh-1"}
+                ],
+            },
+        ],
+    },
+    {"name": "platform", "projectId": "p-dup", "environments": []},
+]
+
+
+class TestTopologySnapshot:
+    """One TTL-bounded `project.all` download shared by every topology lookup."""
+
+    @pytest.fixture
+    def counted(self, dokploy_env):
+        client = DokployClient(base_url="https://cloud.example.test/api")
+        calls = []
+
+        def fake_request(method, endpoint, **_kwargs):
+            calls.append((method, endpoint))
+            if endpoint == "project.all":
+                return _TOPOLOGY
+            if endpoint.startswith("compose.one"):
+                return {"composeId": endpoint.rsplit("=", 1)[1], "env": ""}
+            if endpoint == "github.githubProviders":
+                return []
+            return {}
+
+        client._request = fake_request
+        return client, calls
+
+    def test_chained_lookups_download_project_all_once(self, counted):
+        client, calls = counted
+
+        assert client.get_environment_id("platform", "staging") == "env-staging"
+        assert client.ensure_environment("platform", "STAGING")[1] is False
+        assert [e["name"] for e in client.list_environments("platform")] == [
+            "production",
+            "Staging",
+        ]
+        found = client.find_compose_by_name("postgres", "platform", env_name="staging")
+        assert found["composeId"] == "c-staging"
+        assert client.get_github_provider_id() == "gh-1"
+
+        assert calls.count(("GET", "project.all")) == 1
+
+    def test_snapshot_expires_after_ttl(self, counted, monkeypatch):
+        client, calls = counted
+        now = [1000.0]
+        monkeypatch.setattr(dokploy.time, "monotonic", lambda: now[0])
+
+        client.topology()
+        now[0] += client.topology_ttl - 1
+        client.topology()
+        now[0] += 2
+        client.topology()
+
+        assert calls.count(("GET", "project.all")) == 2
+
+    def test_mutating_post_invalidates_snapshot(self, dokploy_env, monkeypatch):
+        fake = FakeHttpClient(FakeResponse(_TOPOLOGY))
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
+        client = DokployClient(base_url="https://cloud.example.test/api")
+
+        client.topology()
+        client.deploy_compose("c-prod")  # does not change the tree
+        client.topology()
+        client.create_environment("p1", "preview")
+        client.topology()
+        client.update_compose("c-prod", env="A=1")
+        client.topology()
+
+        project_all = [c for c in fake.calls if c[1].endswith("/project.all")]
+        assert len(project_all) == 3
+
+    def test_indexes_keep_first_match_in_tree_order(self):
+        snapshot = dokploy.TopologySnapshot.build(_TOPOLOGY, 0.0)
+
+        assert snapshot.projects_by_name["platform"]["projectId"] == "p1"
+        assert snapshot.find_compose("postgres")["composeId"] == "c-prod"
+        assert (
+            snapshot.find_compose("postgres", "platform", "staging")["composeId"]
+            == "c-staging"
+        )
+        assert snapshot.find_compose("postgres", "other") is None
+        assert snapshot.composes_by_id["c-staging"][:2] == ("platform", "staging")
+
+    def test_session_shares_snapshot_between_helpers(self, dokploy_env, monkeypatch):
+        fake = FakeHttpClient(FakeResponse(_TOPOLOGY))
+        monkeypatch.setattr(dokploy.httpx, "Client", lambda **_kwargs: fake)
+
+        with dokploy.dokploy_session():
+            assert ensure_project("platform", env_name="staging") == (
+                "p1",
+                "env-staging",
+            )
+            get_dokploy().get_environment_id("platform")
+
+        project_all = [c for c in fake.calls if c[1].endswith("/project.all")]
+        assert len(project_all) == 1
+
+
+class _AsyncFakeHttpClient:
+    """httpx.AsyncClient stand-in: routes by URL and tracks peak concurrency."""
+
+    def __init__(self, routes, *, delay=0.01):
+        self.routes = routes
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self.closed = False
+
+    async def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        item = self.routes(url)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    async def aclose(self):
+        self.closed = True
+
+
+class TestAsyncDokployClient:
+    """asyncio flavour + bounded fan-out for fleet sweeps."""
+
+    async def test_get_composes_many_bounds_concurrency_and_keeps_order(
+        self, monkeypatch, dokploy_env
+    ):
+        def routes(url):
+            compose_id = url.rsplit("=", 1)[1]
+            if compose_id == "bad":
+                return FakeResponse(status_error=_status_error(500))
+            return FakeResponse({"composeId": compose_id})
+
+        fake = _AsyncFakeHttpClient(routes)
+        monkeypatch.setattr(dokploy.httpx, "AsyncClient", lambda **_kwargs: fake)
+        ids = [f"c{i}" for i in range(10)] + ["bad", "c0"]
+
+        async with dokploy.AsyncDokployClient() as client:
+            result = await client.get_composes_many(ids, concurrency=3)
+
+        assert list(result) == [f"c{i}" for i in range(10)] + ["bad"]  # deduped
+        assert result["c4"] == {"composeId": "c4"}
+        assert isinstance(result["bad"], httpx.HTTPStatusError)
+        assert fake.peak == 3
+        assert fake.closed is True
+
+    async def test_async_request_shares_retry_rules(self, monkeypatch, dokploy_env):
+        responses = [
+            FakeResponse(status_error=_status_error(503)),
+            FakeResponse([{"deploymentId": "d1"}]),
+        ]
+        fake = _AsyncFakeHttpClient(lambda _url: responses.pop(0), delay=0)
+        monkeypatch.setattr(dokploy.httpx, "AsyncClient", lambda **_kwargs: fake)
+
+        async def no_sleep(_seconds):
+            return None
+
+        client = dokploy.AsyncDokployClient()
+        assert await client._request(
+            "GET", "deployment.allByCompose?composeId=c1", _sleep=no_sleep
+        ) == [{"deploymentId": "d1"}]
+        assert client.timing_summary()["deployment.allByCompose"]["retries"] == 1
+
+        fake.routes = lambda _url: FakeResponse(status_error=_status_error(502))
+        with pytest.raises(httpx.HTTPStatusError, match="status code 502"):
+            await client._request("POST", "compose.deploy", _sleep=no_sleep)
+        assert fake.calls[-1][1].endswith("/compose.deploy")
+        assert len(fake.calls) == 3  # the non-idempotent POST was not retried
+
+    async def test_async_lookups_share_one_topology_snapshot(
+        self, monkeypatch, dokploy_env
+    ):
+        def routes(url):
+            if url.endswith("/project.all"):
+                return FakeResponse(_TOPOLOGY)
+            return FakeResponse({"composeId": url.rsplit("=", 1)[1], "env": "A=1"})
+
+        fake = _AsyncFakeHttpClient(routes, delay=0)
+        monkeypatch.setattr(dokploy.httpx, "AsyncClient", lambda **_kwargs: fake)
+        client = dokploy.AsyncDokployClient()
+
+        assert await client.get_environment_id("platform", "staging") == "env-staging"
+        found = await client.find_compose_by_name("postgres", "platform", "staging")
+        assert found["env"] == "A=1"
+        assert [url for _, url in fake.calls].count(
+            "https://cloud.example.test/api/project.all"
+        ) == 1
+
+    def test_sync_bulk_runs_async_twin_and_merges_counters(
+        self, monkeypatch, dokploy_env
+    ):
+        fake = _AsyncFakeHttpClient(
+            lambda url: FakeResponse([{"deploymentId": url.rsplit("=", 1)[1]}])
+        )
+        monkeypatch.setattr(dokploy.httpx, "AsyncClient", lambda **_kwargs: fake)
+        client = DokployClient()
+
+        result = client.get_deployments_many(["a", "b", "c"], concurrency=2)
+
+        assert result == {
+            "a": [{"deploymentId": "a"}],
+            "b": [{"deploymentId": "b"}],
+            "c": [{"deploymentId": "c"}],
+        }
+        assert fake.peak == 2
+        assert client.timing_summary()["deployment.allByCompose"]["calls"] == 3
+
+    def test_sync_bulk_reuses_one_async_pool_until_close(
+        self, monkeypatch, dokploy_env
+    ):
+        built = []
+
+        def async_client(**_kwargs):
+            built.append(_AsyncFakeHttpClient(lambda url: FakeResponse({"id": url})))
+            return built[-1]
+
+        monkeypatch.setattr(dokploy.httpx, "AsyncClient", async_client)
+        with DokployClient() as client:
+            client.get_composes_many(["a", "b"])
+            client.get_deployments_many(["a"])
+            assert len(built) == 1 and built[0].closed is False
+            summary = client.timing_summary()
+            assert summary["compose.one"]["calls"] == 2  # merged once, not twice
+        assert built[0].closed is True
+        assert client._aio_thread is None
+
+    async def test_sync_bulk_works_inside_a_running_event_loop(
+        self, monkeypatch, dokploy_env
+    ):
+        fake = _AsyncFakeHttpClient(lambda url: FakeResponse({"id": url}), delay=0)
+        monkeypatch.setattr(dokploy.httpx, "AsyncClient", lambda **_kwargs: fake)
+
+        with DokployClient() as client:
+            result = client.get_composes_many(["a"])
+
+        assert list(result) == ["a"]
+        assert fake.closed is True
+
+
+class TestDokploySession:
+    """dokploy_session() shares one pooled client per host across get_dokploy()."""
+
+    def test_get_dokploy_outside_session_builds_fresh_clients(self, dokploy_env):
+        assert get_dokploy() is not get_dokploy()
+
+    def test_session_shares_client_per_host_and_closes_on_exit(self, dokploy_env):
+        with dokploy.dokploy_session():
+            default = get_dokploy()
+            assert get_dokploy() is default
+            other = get_dokploy(host="cloud.other.test")
+            assert other is not default
+            assert get_dokploy(host="cloud.other.test") is other
+            with dokploy.dokploy_session():
+                assert get_dokploy() is default  # nested session reuses the outer
+
+            closed = []
+            default.close = lambda: closed.append("default")
+            other.close = lambda: closed.append("other")
+
+        assert sorted(closed) == ["default", "other"]
+        assert get_dokploy() is not default
+
+
 class TestGetDokployFactory:
     """Test factory function"""
 
@@ -683,6 +1069,9 @@ class TestGetDokployFactory:
 
 def test_ensure_project_rejects_missing_required_environment(monkeypatch):
     class FakeClient:
+        def topology(self):
+            return dokploy.TopologySnapshot.build(self.list_projects(), 0.0)
+
         def list_projects(self):
             return [{"name": "platform", "projectId": "project-1"}]
 
@@ -697,6 +1086,9 @@ def test_ensure_project_rejects_missing_required_environment(monkeypatch):
 
 def test_ensure_project_rejects_invalid_create_response(monkeypatch):
     class FakeClient:
+        def topology(self):
+            return dokploy.TopologySnapshot.build(self.list_projects(), 0.0)
+
         def list_projects(self):
             return []
 
@@ -178,11 +178,17 @@ def test_load_deployer_is_consolidated_onto_the_shared_helper() -> None:
 
 
 class _FakeDokployClientForIdentities:
-    """Enough of DokployClient's shape for _deployed_identities: list_projects()
-    + _request() for a compose.one lookup. No real credentials/network."""
+    """Enough of DokployClient's shape for _deployed_identities: a context
+    manager with list_projects() + get_composes_many() for the compose.one
+    fan-out. No real credentials/network."""
 
-    def __init__(self) -> None:
-        pass
+    closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        type(self).closed = True
 
     def list_projects(self):
         return [
@@ -214,10 +220,9 @@ class _FakeDokployClientForIdentities:
             },
         ]
 
-    def _request(self, method: str, path: str):
-        assert method == "GET"
-        assert path == "compose.one?composeId=cid-ta-app"
-        return {"env": "IAC_CONFIG_HASH=deploy-v0.0.11-1785146688203\n"}
+    def get_composes_many(self, compose_ids):
+        assert list(compose_ids) == ["cid-ta-app"]
+        return {"cid-ta-app": {"env": "IAC_CONFIG_HASH=deploy-v0.0.11-1785146688203\n"}}
 
 
 def test_deployed_identities_includes_truealpha_and_excludes_unmanaged_projects(
@@ -229,12 +234,14 @@ def test_deployed_identities_includes_truealpha_and_excludes_unmanaged_projects(
     silently read as "not deployed" no matter what was actually live. The fix
     derives the allowlist from service_registry._LAYERS instead."""
     monkeypatch.setattr("libs.dokploy.DokployClient", _FakeDokployClientForIdentities)
+    monkeypatch.setattr(_FakeDokployClientForIdentities, "closed", False)
 
     identities = drift._deployed_identities()
 
     assert "truealpha/app" in identities
     assert identities["truealpha/app"].runtime_hash == "deploy-v0.0.11-1785146688203"
     assert not any(key.startswith("someone-elses-project/") for key in identities)
+    assert _FakeDokployClientForIdentities.closed is True
 
 
 def test_strict_blockers_fail_on_detector_and_structural_errors() -> None:
@@ -160,6 +160,190 @@ class TestVaultSecrets:
         }
 
 
+class TestSecretsSession:
+    """Test the process-wide secrets session (pooling, TTL cache, prefetch)"""
+
+    @staticmethod
+    def _vault_client(mock_client, payloads):
+        def get(url, headers):
+            path = url.split("/v1/secret/data/", 1)[1]
+            resp = MagicMock()
+            if path in payloads:
+                resp.status_code = 200
+                resp.json.return_value = payloads[path]
+            else:
+                resp.status_code = 404
+            return resp
+
+        client = MagicMock()
+        client.get.side_effect = get
+        post_resp = MagicMock()
+        post_resp.status_code = 204
+        client.post.return_value = post_resp
+        mock_client.return_value.__enter__.return_value = client
+        return client
+
+    @patch("libs.env.httpx.Client")
+    def test_vault_reads_share_one_client_and_cache(self, mock_client):
+        from libs.env import VaultSecrets, secrets_session
+
+        client = self._vault_client(
+            mock_client,
+            {"platform/production/postgres": {"data": {"data": {"a": "1"}}}},
+        )
+
+        def read():
+            return VaultSecrets(
+                path="platform/production/postgres",
+                token="token",
+                addr="https://vault.example",
+            )
+
+        assert read().get("a") == "1"
+        assert read().get_all() == {"a": "1"}
+        assert mock_client.call_count == 1
+        assert client.get.call_count == 1
+        assert secrets_session().stats["hits"] == 1
+
+        # Writes merge into a fresh read, go through the pooled client and drop
+        # the cached read.
+        assert read().set("b", "2") is True
+        assert read().get("a") == "1"
+        assert client.get.call_count == 3
+        assert mock_client.call_count == 1
+
+    @patch("libs.env.httpx.Client")
+    def test_ttl_expiry_honors_lease_duration(self, mock_client, monkeypatch):
+        import libs.env as env_mod
+
+        now = [0.0]
+        monkeypatch.setattr(
+            env_mod, "_SESSION", env_mod.SecretsSession(ttl=60, clock=lambda: now[0])
+        )
+        client = self._vault_client(
+            mock_client,
+            {
+                "kv/plain": {"data": {"data": {"k": "v"}}, "lease_duration": 0},
+                "kv/leased": {"data": {"data": {"k": "v"}}, "lease_duration": 5},
+            },
+        )
+        plain = env_mod.VaultSecrets(path="kv/plain", token="t", addr="https://v")
+        leased = env_mod.VaultSecrets(path="kv/leased", token="t", addr="https://v")
+
+        plain.get("k"), leased.get("k")
+        now[0] = 10.0
+        plain.get("k"), leased.get("k")  # leased entry expired after 5s
+        assert client.get.call_count == 3
+        now[0] = 61.0
+        plain.get("k")
+        assert client.get.call_count == 4
+
+    @patch("libs.env.httpx.Client")
+    def test_prefetch_batches_paths_and_skips_failures(self, mock_client):
+        from libs.env import VaultSecrets, secrets_session
+
+        client = self._vault_client(
+            mock_client,
+            {
+                "platform/production/postgres": {"data": {"data": {"p": "1"}}},
+                "platform/production/redis": {"data": {"data": {"r": "2"}}},
+            },
+        )
+        paths = [
+            "platform/production/postgres",
+            "platform/production/redis",
+            "platform/production/missing",
+        ]
+
+        loaded = secrets_session().prefetch(
+            paths, token="token", addr="https://vault.example"
+        )
+
+        assert loaded == {
+            "platform/production/postgres": {"p": "1"},
+            "platform/production/redis": {"r": "2"},
+        }
+        redis = VaultSecrets(
+            path="platform/production/redis",
+            token="token",
+            addr="https://vault.example",
+        )
+        assert redis.get("r") == "2"
+        assert client.get.call_count == 3
+        assert secrets_session().prefetch(paths, token=None, addr="x") == {}
+
+    @patch("libs.env.subprocess.run")
+    def test_op_items_are_memoized_across_instances(self, mock_run):
+        from libs.env import OpSecrets, secrets_session
+        import json
+
+        mock_run.return_value = MagicMock(
+            stdout=json.dumps({"fields": [{"label": "VPS_HOST", "value": "10.0.0.1"}]})
+        )
+
+        assert OpSecrets(item="init/env_vars").get("VPS_HOST") == "10.0.0.1"
+        assert OpSecrets(item="init/env_vars").get("VPS_HOST") == "10.0.0.1"
+        assert mock_run.call_count == 1
+        assert secrets_session().stats["op_reads"] == 1
+
+        assert OpSecrets(item="init/env_vars").set("VPS_HOST", "10.0.0.2") is True
+        OpSecrets(item="init/env_vars").get_all()
+        assert mock_run.call_count == 3  # edit + re-read after invalidation
+
+    @patch("libs.env.httpx.Client")
+    def test_vault_set_merges_into_a_fresh_read_not_a_stale_cache(self, mock_client):
+        from libs.env import VaultSecrets
+
+        payloads = {"platform/production/postgres": {"data": {"data": {"a": "1"}}}}
+        client = self._vault_client(mock_client, payloads)
+
+        def secrets():
+            return VaultSecrets(
+                path="platform/production/postgres",
+                token="token",
+                addr="https://vault.example",
+            )
+
+        assert secrets().get("a") == "1"  # now cached
+        # Another process writes within the cache TTL.
+        payloads["platform/production/postgres"] = {
+            "data": {"data": {"a": "1", "other": "x"}}
+        }
+
+        assert secrets().set("b", "2") is True
+        assert client.post.call_args.kwargs["json"] == {
+            "data": {"a": "1", "other": "x", "b": "2"}
+        }
+
+    @patch("libs.env.subprocess.run")
+    def test_failed_op_reads_are_not_cached(self, mock_run):
+        import json
+        import subprocess
+
+        from libs.env import OpSecrets
+
+        mock_run.side_effect = [
+            subprocess.CalledProcessError(1, "op"),
+            MagicMock(stdout=json.dumps({"fields": [{"label": "K", "value": "v"}]})),
+        ]
+
+        assert OpSecrets(item="init/env_vars").get_all() == {}
+        assert OpSecrets(item="init/env_vars").get("K") == "v"
+        assert mock_run.call_count == 2
+
+    @patch("libs.env.subprocess.run")
+    def test_zero_ttl_disables_caching(self, mock_run, monkeypatch):
+        from libs.env import OpSecrets, SECRETS_CACHE_TTL_ENV
+        import json
+
+        monkeypatch.setenv(SECRETS_CACHE_TTL_ENV, "0")
+        mock_run.return_value = MagicMock(stdout=json.dumps({"fields": []}))
+
+        OpSecrets().get_all()
+        OpSecrets().get_all()
+        assert mock_run.call_count == 2
+
+
 class TestGetSecrets:
     """Test get_secrets factory"""
 
@@ -0,0 +1,128 @@
+"""Tests for the persistent git object reader (libs/git_objects.py)."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from libs.git_objects import GitObjectError, GitObjectReader
+from tools.reconcile_iac_inputs import changed_files_from_git
+
+
+def _git(repo: Path, *args: str) -> str:
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "t",
+        "GIT_AUTHOR_EMAIL": "t@example.com",
+        "GIT_COMMITTER_NAME": "t",
+        "GIT_COMMITTER_EMAIL": "t@example.com",
+    }
+    return subprocess.run(
+        ["git", "-C", str(repo), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    ).stdout.strip()
+
+
+def _commit(repo: Path, files: dict[str, str | None], tag: str) -> None:
+    for name, content in files.items():
+        path = repo / name
+        if content is None:
+            path.unlink()
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", tag)
+    _git(repo, "tag", tag)
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    _git(tmp_path, "init", "-q")
+    _commit(
+        tmp_path,
+        {
+            "libs/a.py": "a = 1\n",
+            "libs/sub/b.py": "b = 1\n",
+            "libs/.hidden.py": "hidden\n",
+            "platform/01.pg/deploy.py": "shared\n",
+            "platform/02.redis/deploy.py": "shared\n",
+            "README.md": "readme\n",
+        },
+        "v1",
+    )
+    _commit(
+        tmp_path,
+        {"libs/a.py": "a = 2\n", "libs/sub/b.py": None, "libs/sub/c.py": "c\n"},
+        "v2",
+    )
+    return tmp_path
+
+
+def test_reads_and_globs_at_refs_through_one_process(repo: Path) -> None:
+    with GitObjectReader(repo) as reader:
+        assert reader.read("v1", "libs/a.py") == b"a = 1\n"
+        assert reader.read("v2", "libs/a.py") == b"a = 2\n"
+        assert reader.read("v2", "libs/sub/b.py") is None
+        assert reader.read("v1", "libs") is None  # a tree, not a file
+        assert reader.commit("no-such-ref") is None
+        pid = reader._proc.pid
+
+        assert reader.glob("v1", "libs/**") == ["libs/a.py", "libs/sub/b.py"]
+        assert reader.glob("v2", "libs/**/*.py") == ["libs/a.py", "libs/sub/c.py"]
+        assert reader.glob("v1", "libs/.hidden.py") == ["libs/.hidden.py"]
+        assert reader.glob("v2", "platform/*/deploy.py") == [
+            "platform/01.pg/deploy.py",
+            "platform/02.redis/deploy.py",
+        ]
+        # Identical blobs across services and refs are fetched once.
+        before = reader.stats["blob_hits"]
+        contents = reader.contents_at_ref(
+            "v2", ["platform/01.pg/deploy.py", "platform/02.redis/deploy.py", "x"]
+        )
+        reader.read("v1", "platform/01.pg/deploy.py")
+        assert contents == {
+            "platform/01.pg/deploy.py": b"shared\n",
+            "platform/02.redis/deploy.py": b"shared\n",
+        }
+        assert reader.stats["blob_hits"] - before == 2
+        assert reader._proc.pid == pid
+    assert reader._proc is None
+
+
+def test_changed_paths_diffs_trees_and_matches_git(repo: Path) -> None:
+    reader = GitObjectReader(repo)
+    try:
+        changed = reader.changed_paths("v1", "v2")
+        with pytest.raises(GitObjectError):
+            reader.changed_paths("v1", "no-such-ref")
+    finally:
+        reader.close()
+
+    assert changed == ["libs/a.py", "libs/sub/b.py", "libs/sub/c.py"]
+    assert changed == sorted(
+        _git(repo, "diff", "--name-only", "--no-renames", "v1", "v2").split()
+    )
+
+
+def test_reconcile_changed_files_use_the_reader(repo: Path) -> None:
+    assert changed_files_from_git(repo, "v1", "v2") == [
+        "libs/a.py",
+        "libs/sub/b.py",
+        "libs/sub/c.py",
+    ]
+    # No predecessor: the tagged commit against its parent; a root commit has none.
+    assert changed_files_from_git(repo, "0" * 40, "v2") == [
+        "libs/a.py",
+        "libs/sub/b.py",
+        "libs/sub/c.py",
+    ]
+    assert changed_files_from_git(repo, None, "v1") == []
+    with pytest.raises(GitObjectError):
+        changed_files_from_git(repo, None, "no-such-ref")
@@ -6,6 +6,7 @@ import hashlib
 import hmac
 import importlib.util
 import os
+import shutil
 import subprocess
 import sys
 import time
@@ -53,6 +54,13 @@ def _signed_headers(monkeypatch, payload: bytes = b"") -> dict[str, str]:
     }
 
 
+def _inspect_in_process(_repo_path, _deploy_env, services, changed_files=None):
+    """inspect_checkout without the child: this repo's libs answer for the worktree."""
+    from libs.deploy.sync_selection import describe_checkout
+
+    return describe_checkout(sorted(services), changed_files)
+
+
 def test_sync_services_returns_structured_failure_result(monkeypatch) -> None:
     """#182: sync result reports real failed service tasks."""
     sync_runner = _load_module(
@@ -64,7 +72,10 @@ def test_sync_services_returns_structured_failure_result(monkeypatch) -> None:
         yield
 
     monkeypatch.setattr(sync_runner, "file_lock", unlocked)
-    monkeypatch.setattr(sync_runner, "update_repo", lambda ref=None: True)
+    monkeypatch.setattr(
+        sync_runner, "update_repo", lambda ref=None, deploy_env="staging": True
+    )
+    monkeypatch.setattr(sync_runner, "inspect_checkout", _inspect_in_process)
 
     def fake_run(task_name, _repo_path, deploy_env):
         return {
@@ -91,6 +102,390 @@ def test_sync_services_returns_structured_failure_result(monkeypatch) -> None:
     assert any(item["stderr"] == "boom" for item in payload["results"])
 
 
+def _graph_sync_runner(monkeypatch, name: str, declared: dict[str, set[str]]):
+    import libs.deploy_dependencies as deploy_dependencies
+
+    sync_runner = _load_module(name, IAC_RUNNER / "sync_runner.py", monkeypatch)
+
+    @contextmanager
+    def unlocked(_path, _description):
+        yield
+
+    monkeypatch.setattr(sync_runner, "file_lock", unlocked)
+    monkeypatch.setattr(
+        sync_runner, "update_repo", lambda ref=None, deploy_env="staging": True
+    )
+    monkeypatch.setattr(sync_runner, "inspect_checkout", _inspect_in_process)
+    monkeypatch.setattr(
+        deploy_dependencies,
+        "declared_service_dependencies",
+        lambda services: {
+            service: deps & set(services)
+            for service, deps in declared.items()
+            if service in services
+        },
+    )
+    return sync_runner
+
+
+def test_sync_services_runs_independent_services_concurrently(monkeypatch) -> None:
+    """Independent services overlap; apps still start after the platform layer."""
+    sync_runner = _graph_sync_runner(monkeypatch, "sync_runner_parallel_test", {})
+    spans: dict[str, tuple[float, float]] = {}
+
+    def fake_run(task_name, _repo_path, deploy_env):
+        started = time.monotonic()
+        time.sleep(0.2)
+        spans[task_name] = (started, time.monotonic())
+        return {"task": task_name, "success": True, "stdout": "", "stderr": ""}
+
+    monkeypatch.setattr(sync_runner, "run_invoke_task", fake_run)
+
+    started = time.monotonic()
+    result = sync_runner.sync_services(
+        {"platform/postgres", "platform/redis", "finance_report/app"},
+        ref="main",
+        deploy_env="staging",
+    )
+    elapsed = time.monotonic() - started
+
+    assert result.success is True
+    assert [item.service for item in result.results] == [
+        "finance_report/app",
+        "platform/postgres",
+        "platform/redis",
+    ]
+    assert elapsed < 0.55
+    platform_done = max(spans["postgres.sync"][1], spans["redis.sync"][1])
+    assert spans["fr-app.sync"][0] >= platform_done
+
+
+def test_sync_services_fails_fast_along_declared_dependency_chain(monkeypatch) -> None:
+    """A failed prerequisite blocks its declared dependents; layer order does not."""
+    sync_runner = _graph_sync_runner(
+        monkeypatch,
+        "sync_runner_fail_fast_test",
+        {"platform/alerting": {"platform/postgres"}},
+    )
+    ran: list[str] = []
+
+    def fake_run(task_name, _repo_path, deploy_env):
+        ran.append(task_name)
+        failed = task_name == "postgres.sync"
+        return {
+            "task": task_name,
+            "success": not failed,
+            "stdout": "",
+            "stderr": "boom" if failed else "",
+        }
+
+    monkeypatch.setattr(sync_runner, "run_invoke_task", fake_run)
+
+    result = sync_runner.sync_services(
+        {"platform/postgres", "platform/alerting", "finance_report/app"},
+        ref="main",
+        deploy_env="staging",
+    )
+
+    assert "alerting.sync" not in ran
+    assert "fr-app.sync" in ran
+    assert result.failed == 2
+    blocked = next(
+        item for item in result.results if item.service == "platform/alerting"
+    )
+    assert blocked.task == "alerting.sync"
+    assert blocked.to_dict()["diagnostic"]["error_kind"] == "dependency_failed"
+    assert "platform/postgres" in blocked.stderr
+
+
+def test_sync_services_spawns_only_planned_deploys(monkeypatch) -> None:
+    """Planned no-ops never spawn invoke, unless a declared prerequisite deployed."""
+    sync_runner = _graph_sync_runner(
+        monkeypatch,
+        "sync_runner_planned_test",
+        {"platform/alerting": {"platform/postgres"}},
+    )
+    monkeypatch.setattr(sync_runner, "resolve_checkout_head", lambda _path: DEPLOY_SHA)
+    planned = {}
+
+    def fake_plan(services, _repo_path, deploy_env, deploy_ref):
+        planned["args"] = (services, deploy_env, deploy_ref)
+        return {
+            "platform/postgres": {
+                "action": "deploy",
+                "reason": "runtime config changed",
+            },
+            "platform/redis": {"action": "skip", "reason": "identities match"},
+            "platform/alerting": {"action": "skip", "reason": "identities match"},
+        }
+
+    ran: list[str] = []
+
+    def fake_run(task_name, _repo_path, deploy_env, deploy_ref=None):
+        ran.append(task_name)
+        return {"task": task_name, "success": True, "stdout": "", "stderr": ""}
+
+    monkeypatch.setattr(sync_runner, "plan_sync", fake_plan)
+    monkeypatch.setattr(sync_runner, "run_invoke_task", fake_run)
+
+    result = sync_runner.sync_services(
+        {"platform/postgres", "platform/redis", "platform/alerting", "bootstrap/vault"},
+        ref=DEPLOY_SHA,
+        deploy_env="staging",
+    )
+
+    assert planned["args"] == (
+        ["platform/alerting", "platform/postgres", "platform/redis"],
+        "staging",
+        DEPLOY_SHA,
+    )
+    assert sorted(ran) == ["alerting.sync", "postgres.sync"]
+    assert result.success is True
+    assert (result.succeeded, result.skipped) == (2, 2)
+    redis = next(item for item in result.results if item.service == "platform/redis")
+    assert (redis.task, redis.skipped) == ("redis.sync", True)
+    assert redis.stdout == "Planned no-op: identities match"
+
+
+def test_plan_sync_falls_back_when_the_planner_fails(monkeypatch, tmp_path) -> None:
+    sync_runner = _load_module(
+        "sync_runner_plan_sync_test", IAC_RUNNER / "sync_runner.py", monkeypatch
+    )
+    monkeypatch.setenv("VAULT_ROOT_TOKEN", "root")
+    outputs = iter(
+        [
+            types.SimpleNamespace(
+                returncode=0,
+                stdout='noise\n{"ref": "x", "services": {"platform/redis": '
+                '{"service": "platform/redis", "action": "skip", "reason": "match"}}}\n',
+                stderr="",
+            ),
+            types.SimpleNamespace(returncode=1, stdout="", stderr="Traceback"),
+            types.SimpleNamespace(returncode=0, stdout="not json\n", stderr=""),
+        ]
+    )
+    captured = {}
+
+    def fake_run(args, **kwargs):
+        captured["args"], captured["env"] = args, kwargs["env"]
+        return next(outputs)
+
+    monkeypatch.setattr(sync_runner.subprocess, "run", fake_run)
+
+    plan = sync_runner.plan_sync(["platform/redis"], tmp_path, "staging", DEPLOY_SHA)
+
+    assert plan["platform/redis"]["action"] == "skip"
+    assert captured["args"][1:4] == ["-P", "-c", sync_runner.PLANNER_BOOTSTRAP]
+    assert captured["args"][4:] == ["--ref", DEPLOY_SHA, "platform/redis"]
+    assert captured["env"]["IAC_DEPLOY_REF"] == DEPLOY_SHA
+    assert captured["env"]["DEPLOY_ENV"] == "staging"
+    for _ in range(2):
+        assert (
+            sync_runner.plan_sync(["platform/redis"], tmp_path, "staging", DEPLOY_SHA)
+            is None
+        )
+    monkeypatch.setattr(sync_runner, "SYNC_PLANNER", False)
+    assert (
+        sync_runner.plan_sync(["platform/redis"], tmp_path, "staging", DEPLOY_SHA)
+        is None
+    )
+
+
+def test_sync_graph_lets_declared_edges_override_layer_order(monkeypatch) -> None:
+    """alerting bakes in app deploy.py files, so it must not also precede the apps."""
+    sync_runner = _graph_sync_runner(
+        monkeypatch,
+        "sync_runner_graph_test",
+        {"platform/alerting": {"finance_report/app", "platform/postgres"}},
+    )
+
+    graph = sync_runner.build_sync_graph(
+        {"platform/alerting", "platform/postgres", "finance_report/app"}
+    )
+
+    assert graph["platform/alerting"] == {
+        "finance_report/app": True,
+        "platform/postgres": True,
+    }
+    assert graph["finance_report/app"] == {"platform/postgres": False}
+
+
+def _git(repo: Path, *args: str) -> str:
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "t",
+        "GIT_AUTHOR_EMAIL": "t@example.com",
+        "GIT_COMMITTER_NAME": "t",
+        "GIT_COMMITTER_EMAIL": "t@example.com",
+    }
+    return subprocess.run(
+        ["git", "-C", str(repo), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    ).stdout.strip()
+
+
+def _worktree_sync_runner(monkeypatch, tmp_path: Path, populate=None):
+    """sync_runner over a local origin with two commits (tags v1, v2).
+
+    ``populate(origin, tag)`` adds files to each commit.
+    """
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    _git(origin, "init", "-q", "-b", "main")
+    for tag in ("v1", "v2"):
+        (origin / "VERSION").write_text(tag)
+        if populate is not None:
+            populate(origin, tag)
+        _git(origin, "add", "-A")
+        _git(origin, "commit", "-q", "-m", tag)
+        _git(origin, "tag", tag)
+
+    sync_runner = _load_module(
+        "sync_runner_worktree_test", IAC_RUNNER / "sync_runner.py", monkeypatch
+    )
+    workspace = tmp_path / "workspace"
+    monkeypatch.setattr(sync_runner, "GIT_REPO_URL", str(origin))
+    monkeypatch.setattr(sync_runner, "WORKSPACE", workspace)
+    monkeypatch.setattr(sync_runner, "WORKTREE_ROOT", workspace / "worktrees")
+    monkeypatch.setattr(sync_runner, "WORKSPACE_LOCK_FILE", tmp_path / "ws.lock")
+    return sync_runner, origin
+
+
+def test_update_repo_gives_each_env_its_own_reused_worktree(
+    monkeypatch, tmp_path
+) -> None:
+    """Envs deploy from separate worktrees; an unchanged ref switches nothing."""
+    sync_runner, origin = _worktree_sync_runner(monkeypatch, tmp_path)
+
+    assert sync_runner.update_repo("v1", deploy_env="staging")
+    assert sync_runner.update_repo("v2", deploy_env="prod")
+    staging = sync_runner.worktree_path("staging")
+    production = sync_runner.worktree_path("production")
+    assert (staging / "VERSION").read_text() == "v1"
+    assert (production / "VERSION").read_text() == "v2"
+    assert staging.parent == production.parent == sync_runner.WORKTREE_ROOT
+
+    git_calls: list[list[str]] = []
+    real_run = sync_runner.subprocess.run
+
+    def recording_run(args, **kwargs):
+        git_calls.append(args)
+        return real_run(args, **kwargs)
+
+    monkeypatch.setattr(sync_runner.subprocess, "run", recording_run)
+    assert sync_runner.update_repo("v1", deploy_env="staging")
+    assert not [args for args in git_calls if "fetch" in args or "checkout" in args]
+
+    # A new commit is fetched on its own, by sha, and only staging moves to it.
+    (origin / "VERSION").write_text("v3")
+    _git(origin, "commit", "-q", "-am", "v3")
+    sha = _git(origin, "rev-parse", "HEAD")
+    git_calls.clear()
+    assert sync_runner.update_repo(sha, deploy_env="staging")
+    fetches = [args for args in git_calls if "fetch" in args]
+    assert fetches == [["git", "fetch", "--no-tags", "origin", sha]]
+    assert (staging / "VERSION").read_text() == "v3"
+    assert (production / "VERSION").read_text() == "v2"
+
+
+def test_update_repo_prunes_stale_env_worktrees(monkeypatch, tmp_path) -> None:
+    sync_runner, _origin = _worktree_sync_runner(monkeypatch, tmp_path)
+    assert sync_runner.update_repo("v1", deploy_env="staging")
+    stale = sync_runner.worktree_path("staging")
+    os.utime(stale, (0, 0))
+
+    assert sync_runner.update_repo("v2", deploy_env="production")
+
+    assert not stale.exists()
+    worktrees = _git(sync_runner.WORKSPACE / sync_runner.REPO_NAME, "worktree", "list")
+    assert str(stale) not in worktrees
+    assert sync_runner.deployment_lock_file("prod") == (
+        sync_runner.DEPLOYMENT_LOCK_FILE.with_name("deployment-production.lock")
+    )
+
+
+def _two_version_repo(origin: Path, tag: str) -> None:
+    """v1 deploys alpha and beta; v2 adds gamma and makes beta bake in alpha."""
+    if tag == "v1":
+        shutil.copytree(
+            ROOT / "libs",
+            origin / "libs",
+            ignore=shutil.ignore_patterns("tests", "__pycache__"),
+        )
+    services = {"v1": ("01.alpha", "02.beta"), "v2": ("03.gamma",)}[tag]
+    for directory in services:
+        (origin / "platform" / directory).mkdir(parents=True)
+        (origin / "platform" / directory / "deploy.py").write_text("")
+    manifest = origin / "docs/ssot/deploy-dependencies.yaml"
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    declared = {
+        "v1": {},
+        "v2": {"platform/beta": {"depends_on": ["platform/01.alpha/**"]}},
+    }
+    manifest.write_text(yaml.safe_dump({"services": declared[tag]}))
+
+
+def test_sync_derives_services_fanout_and_graph_from_the_env_worktree(
+    monkeypatch, tmp_path
+) -> None:
+    """Staging deploying v1 after prod moved the clone to v2 still sees v1's tree."""
+    sync_runner, _origin = _worktree_sync_runner(
+        monkeypatch, tmp_path, populate=_two_version_repo
+    )
+    monkeypatch.setattr(sync_runner, "SYNC_PLANNER", False)
+    monkeypatch.setattr(sync_runner, "SYNC_WORKER_POOL", False)
+    assert sync_runner.update_repo("v2", deploy_env="production")
+    assert sync_runner.update_repo("v1", deploy_env="staging")
+    clone = sync_runner.WORKSPACE / sync_runner.REPO_NAME
+    assert (clone / "VERSION").read_text() == "v2"
+
+    changed = ["platform/01.alpha/compose.yaml"]
+    staging = sync_runner.inspect_checkout(
+        sync_runner.worktree_path("staging"), "staging", set(), changed
+    )
+    production = sync_runner.inspect_checkout(
+        sync_runner.worktree_path("production"), "production", set(), changed
+    )
+    assert sorted(staging["tasks"]) == ["platform/alpha", "platform/beta"]
+    assert sorted(staging["fanout"]["selected"]) == ["platform/alpha"]
+    assert staging["dependencies"] == {}
+    assert sorted(production["tasks"]) == [
+        "platform/alpha",
+        "platform/beta",
+        "platform/gamma",
+    ]
+    assert sorted(production["fanout"]["selected"]) == [
+        "platform/alpha",
+        "platform/beta",
+    ]
+    assert production["dependencies"] == {"platform/beta": ["platform/alpha"]}
+
+    ran: list[str] = []
+
+    def fake_run(task_name, repo_path, deploy_env, deploy_ref=None):
+        ran.append(task_name)
+        return {"task": task_name, "success": True, "stdout": "", "stderr": ""}
+
+    monkeypatch.setattr(sync_runner, "run_invoke_task", fake_run)
+    result = sync_runner.sync_services({"__all__"}, ref="v1", deploy_env="staging")
+
+    assert result.success is True
+    assert sorted(ran) == ["alpha.sync", "beta.sync"]
+
+    # A worktree whose discovery cannot run fails the sync instead of guessing.
+    shutil.rmtree(sync_runner.worktree_path("staging") / "libs" / "deploy")
+    monkeypatch.setattr(
+        sync_runner, "update_repo", lambda ref=None, deploy_env="staging": True
+    )
+    ran.clear()
+    result = sync_runner.sync_services({"__all__"}, ref="v1", deploy_env="staging")
+    assert (result.success, ran) == (False, [])
+    assert result.error == "Service discovery failed in the env worktree"
+
+
 def test_sync_result_includes_actionable_failure_summary(monkeypatch) -> None:
     """#161: failed deploy responses expose one-look failure diagnostics."""
     sync_runner = _load_module(
@@ -335,7 +730,16 @@ def test_deploy_wait_string_false_keeps_async_path(monkeypatch) -> None:
     assert body["status"] == "in_progress"
     assert body["status_url"] == "/deploy/status"
     assert body["wait"] is False
-    assert started == [("staging", DEPLOY_SHA, "ci")]
+    # The deploy is queued and a staging worker started to drain it.
+    assert started == [("staging",)]
+    assert webhook_server.job_queue().stats()["depth_by_env"] == {"staging": 1}
+    job = webhook_server.job_queue().claim("staging")
+    assert (job.kind, job.env, job.ref, job.triggered_by) == (
+        "deploy",
+        "staging",
+        DEPLOY_SHA,
+        "ci",
+    )
 
 
 def test_async_deploy_status_reports_completed_result(monkeypatch) -> None:
@@ -1283,9 +1687,7 @@ def test_deployment_identity_includes_normalized_service_set(monkeypatch) -> Non
     postgres = webhook_server._deployment_key(
         "staging", DEPLOY_SHA, ["platform/postgres"]
     )
-    redis = webhook_server._deployment_key(
-        "staging", DEPLOY_SHA, ["platform/redis"]
-    )
+    redis = webhook_server._deployment_key("staging", DEPLOY_SHA, ["platform/redis"])
     batch_a = webhook_server._deployment_key(
         "staging", DEPLOY_SHA, ["platform/redis", "platform/postgres"]
     )
@@ -1294,9 +1696,13 @@ def test_deployment_identity_includes_normalized_service_set(monkeypatch) -> Non
     )
 
     assert postgres != redis
-    assert webhook_server._deployment_id(postgres) != webhook_server._deployment_id(redis)
+    assert webhook_server._deployment_id(postgres) != webhook_server._deployment_id(
+        redis
+    )
     assert batch_a == batch_b
-    assert webhook_server._deployment_id(batch_a) == webhook_server._deployment_id(batch_b)
+    assert webhook_server._deployment_id(batch_a) == webhook_server._deployment_id(
+        batch_b
+    )
 
 
 def test_status_fails_closed_when_legacy_coordinate_is_ambiguous(monkeypatch) -> None:
@@ -1327,9 +1733,7 @@ def test_status_fails_closed_when_legacy_coordinate_is_ambiguous(monkeypatch) ->
     postgres = webhook_server._deployment_key(
         "staging", DEPLOY_SHA, ["platform/postgres"]
     )
-    redis = webhook_server._deployment_key(
-        "staging", DEPLOY_SHA, ["platform/redis"]
-    )
+    redis = webhook_server._deployment_key("staging", DEPLOY_SHA, ["platform/redis"])
     webhook_server._in_flight_deploys.update({postgres, redis})
 
     body, status_code = webhook_server.deployment_status()
@@ -0,0 +1,210 @@
+"""Tests for the IaC Runner's durable deploy job queue."""
+
+from __future__ import annotations
+
+import importlib.util
+import sqlite3
+import sys
+import time
+import types
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[2]
+IAC_RUNNER = ROOT / "bootstrap/06.iac_runner"
+DEPLOY_SHA = "a" * 40
+
+
+def _load_module(name: str, path: Path, monkeypatch):
+    monkeypatch.setenv("GIT_REPO_URL", "https://github.com/wangzitian0/infra2")
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, name, module)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _job_queue_module(monkeypatch):
+    return _load_module("job_queue", IAC_RUNNER / "job_queue.py", monkeypatch)
+
+
+def test_pending_pushes_coalesce_per_env(monkeypatch) -> None:
+    job_queue = _job_queue_module(monkeypatch)
+    queue = job_queue.JobQueue(":memory:")
+
+    first, coalesced = queue.enqueue_push("staging", "1" * 40, ["platform/redis"])
+    assert coalesced is False
+    merged, coalesced = queue.enqueue_push("staging", "2" * 40, ["platform/minio"])
+    assert coalesced is True
+    assert merged.id == first.id
+    assert (merged.ref, merged.services, merged.coalesced) == (
+        "2" * 40,
+        ["platform/minio", "platform/redis"],
+        1,
+    )
+    queue.enqueue_push("staging", "3" * 40, ["__all__"])
+    assert queue.stats()["depth_by_env"] == {"staging": 1}
+
+    # A deploy queued behind the push keeps later pushes from jumping ahead of it.
+    deploy = queue.enqueue_deploy("staging", DEPLOY_SHA, None, "ci")
+    later, coalesced = queue.enqueue_push("staging", "4" * 40, ["platform/redis"])
+    assert coalesced is False
+    other_env, coalesced = queue.enqueue_push("production", None, ["platform/redis"])
+    assert coalesced is False
+
+    claimed = queue.claim("staging")
+    assert (claimed.id, claimed.services, claimed.ref) == (
+        first.id,
+        ["__all__"],
+        "3" * 40,
+    )
+    # A running push no longer absorbs new pushes.
+    assert queue.enqueue_push("staging", "5" * 40, ["x"])[0].id == later.id
+    assert [queue.claim("staging").id for _ in range(2)] == [deploy.id, later.id]
+    assert queue.claim("staging") is None
+    assert queue.claim("production").id == other_env.id
+    stats = queue.stats()
+    assert stats["depth"] == 0
+    assert stats["running"] == 4
+    assert stats["last_wait_seconds"] >= 0
+
+
+def test_jobs_survive_a_restart(monkeypatch, tmp_path) -> None:
+    job_queue = _job_queue_module(monkeypatch)
+    path = tmp_path / "jobs.sqlite3"
+    queue = job_queue.JobQueue(path)
+    done = queue.enqueue_deploy("staging", "b" * 40, ["platform/redis"], "ci")
+    queue.claim("staging")
+    queue.finish(done.id, {"status": "completed"})
+    interrupted = queue.enqueue_deploy("staging", DEPLOY_SHA, ["platform/minio"], "ci")
+    queue.claim("staging")
+    queued, _ = queue.enqueue_push("staging", None, ["platform/postgres"])
+    queue.close()
+
+    reopened = job_queue.JobQueue(path)
+    resumed = reopened.resume()
+
+    assert [(job.id, job.state) for job in resumed] == [
+        (interrupted.id, "queued"),
+        (queued.id, "queued"),
+    ]
+    assert [job.response for job in reopened.finished_since(0)] == [
+        {"status": "completed"}
+    ]
+    assert reopened.prune(time.time() + 1) == 1
+    reopened.close()
+
+
+def _webhook_server(monkeypatch, name: str, path: Path):
+    """webhook_server with a stub flask and its job queue at ``path``."""
+    fake_flask = types.ModuleType("flask")
+
+    class FakeFlask:
+        def __init__(self, _name):
+            self.config = {}
+
+        def route(self, *_args, **_kwargs):
+            return lambda func: func
+
+    fake_flask.Flask = FakeFlask
+    fake_flask.jsonify = lambda payload: payload
+    fake_flask.request = types.SimpleNamespace(headers={}, data=b"", json={})
+    monkeypatch.setitem(sys.modules, "flask", fake_flask)
+    monkeypatch.setenv("JOB_QUEUE_PATH", str(path))
+    return _load_module(name, IAC_RUNNER / "webhook_server.py", monkeypatch)
+
+
+def _wait_for_idle_workers(webhook_server) -> None:
+    deadline = time.monotonic() + 10
+    while webhook_server._workers and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_webhook_server_resumes_interrupted_deploys(monkeypatch, tmp_path) -> None:
+    """A deploy running when the server died reruns and becomes pollable again."""
+    job_queue = _job_queue_module(monkeypatch)
+    path = tmp_path / "jobs.sqlite3"
+    queue = job_queue.JobQueue(path)
+    queue.enqueue_deploy("staging", DEPLOY_SHA, ["platform/redis"], "ci")
+    queue.claim("staging")
+    queue.close()
+
+    sync_runner = _load_module(
+        "sync_runner", IAC_RUNNER / "sync_runner.py", monkeypatch
+    )
+    result = sync_runner.SyncResult(
+        env="staging",
+        ref=DEPLOY_SHA,
+        requested_services=["platform/redis"],
+        results=[
+            sync_runner.ServiceSyncResult(
+                service="platform/redis", task="redis.sync", success=True
+            )
+        ],
+    )
+    ran = []
+    monkeypatch.setattr(
+        sync_runner,
+        "sync_services_by_version",
+        lambda *args: ran.append(args) or result,
+    )
+    webhook_server = _webhook_server(
+        monkeypatch, "webhook_server_resume_under_test", path
+    )
+
+    _wait_for_idle_workers(webhook_server)
+    key = webhook_server._deployment_key("staging", DEPLOY_SHA, ["platform/redis"])
+    assert ran == [("staging", DEPLOY_SHA, "ci", ["platform/redis"])]
+    assert key not in webhook_server._in_flight_deploys
+    assert webhook_server._recent_result(key)["status"] == "completed"
+    stats = webhook_server.job_queue().stats()
+    assert (stats["depth"], stats["running"], stats["durable"]) == (0, 0, True)
+
+
+def test_a_failing_job_neither_kills_nor_wedges_the_env_drainer(
+    monkeypatch, tmp_path
+) -> None:
+    """An error after a job ran is logged, the job still ends done, the next job
+    runs, and the env is released for later pushes."""
+    sync_runner = _load_module(
+        "sync_runner", IAC_RUNNER / "sync_runner.py", monkeypatch
+    )
+    ran: list[str | None] = []
+    monkeypatch.setattr(
+        sync_runner,
+        "sync_services",
+        lambda services, ref=None, deploy_env="staging": ran.append(ref),
+    )
+    webhook_server = _webhook_server(
+        monkeypatch, "webhook_server_drain_under_test", tmp_path / "jobs.sqlite3"
+    )
+    queue = webhook_server.job_queue()
+    real_finish = queue.finish
+    failures = iter([True])
+
+    def flaky_finish(job_id, response=None):
+        if next(failures, False):
+            raise sqlite3.OperationalError("database is locked")
+        real_finish(job_id, response)
+
+    monkeypatch.setattr(queue, "finish", flaky_finish)
+    queue.enqueue_deploy("staging", DEPLOY_SHA, ["platform/redis"], "ci")
+    monkeypatch.setattr(webhook_server, "_run_deployment", lambda *args: None)
+    queue.enqueue_push("staging", "b" * 40, ["platform/redis"], "push")
+    webhook_server._ensure_worker("staging")
+    _wait_for_idle_workers(webhook_server)
+
+    assert ran == ["b" * 40]
+    assert webhook_server._workers == set()
+    stats = queue.stats()
+    assert (stats["depth"], stats["running"]) == (0, 0)
+
+    # A claim that raises still releases the env, so the next push starts a drainer.
+    def broken_claim(env):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(queue, "claim", broken_claim)
+    webhook_server._ensure_worker("staging")
+    _wait_for_idle_workers(webhook_server)
+    assert webhook_server._workers == set()
@@ -0,0 +1,131 @@
+"""Tests for the IaC Runner's warm invoke workers (bootstrap/06.iac_runner/worker_pool.py)."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[2]
+IAC_RUNNER = ROOT / "bootstrap/06.iac_runner"
+DEPLOY_SHA = "a" * 40
+TASKS = """
+import os
+import sys
+import time
+
+from invoke import task
+
+
+@task
+def hello(c):
+    print("hello", os.environ.get("DEPLOY_ENV"), os.environ.get("WORKER_ONLY"))
+    print("to stderr", file=sys.stderr)
+
+
+@task
+def fail(c):
+    sys.exit(3)
+
+
+@task
+def hang(c):
+    time.sleep(60)
+"""
+
+
+def _load_module(name: str, path: Path, monkeypatch):
+    monkeypatch.setenv("GIT_REPO_URL", "https://github.com/wangzitian0/infra2")
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, name, module)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def checkout(tmp_path) -> Path:
+    (tmp_path / "tasks.py").write_text(TASKS)
+    return tmp_path
+
+
+def test_warm_worker_forks_isolated_tasks(monkeypatch, checkout) -> None:
+    worker_pool = _load_module(
+        "worker_pool", IAC_RUNNER / "worker_pool.py", monkeypatch
+    )
+    pool = worker_pool.WorkerPool()
+    try:
+        worker = pool.prewarm(checkout, DEPLOY_SHA, {**os.environ, "WORKER_ONLY": "1"})
+        task_env = {**os.environ, "DEPLOY_ENV": "staging"}
+        task_env.pop("WORKER_ONLY", None)
+
+        result = worker.run(["hello"], task_env, timeout=60, start_timeout=120)
+        assert result["success"] is True
+        assert result["stdout"] == "hello staging None\n"
+        assert result["stderr"] == "to stderr\n"
+        assert 0 <= result["startup_seconds"] < 5
+
+        result = worker.run(["fail"], task_env, timeout=60, start_timeout=120)
+        assert (result["success"], result["returncode"]) == (False, 3)
+
+        result = worker.run(["hang"], task_env, timeout=1, start_timeout=120)
+        assert result["success"] is False
+        assert (result["stdout"], result["stderr"]) == ("", "Timeout after 1s")
+        # The worker outlives a killed task and keeps serving.
+        assert worker.run(["hello"], task_env, 60, 120)["success"] is True
+    finally:
+        pool.close()
+
+
+def test_worker_pool_recycles_on_head_change(monkeypatch, checkout) -> None:
+    worker_pool = _load_module(
+        "worker_pool", IAC_RUNNER / "worker_pool.py", monkeypatch
+    )
+    pool = worker_pool.WorkerPool()
+    try:
+        first = pool.prewarm(checkout, DEPLOY_SHA, dict(os.environ))
+        assert pool.prewarm(checkout, DEPLOY_SHA, dict(os.environ)) is first
+        assert pool.get(checkout, DEPLOY_SHA) is first
+        assert pool.get(checkout, "b" * 40) is None
+        assert pool.get(checkout, None) is None
+
+        second = pool.prewarm(checkout, "b" * 40, dict(os.environ))
+        assert second is not first and not first.alive
+        assert pool.get(checkout, DEPLOY_SHA) is None
+    finally:
+        pool.close()
+    with pytest.raises(worker_pool.WorkerPoolError):
+        second.run(["hello"], dict(os.environ), timeout=5, start_timeout=5)
+
+
+def test_run_invoke_task_warm_path_matches_cold_child(monkeypatch, checkout) -> None:
+    sync_runner = _load_module(
+        "sync_runner_worker_pool_test", IAC_RUNNER / "sync_runner.py", monkeypatch
+    )
+    monkeypatch.setenv("VAULT_ROOT_TOKEN", "root")
+    monkeypatch.setattr(sync_runner, "DEPLOY_TIMEOUT", 60)
+    pool = sync_runner.WorkerPool()
+    monkeypatch.setattr(sync_runner, "_worker_pool", pool)
+    tasks = {"hello": 0, "fail": 3}
+    try:
+        cold = {
+            name: sync_runner.run_invoke_task(name, checkout, "staging", DEPLOY_SHA)
+            for name in tasks
+        }
+        sync_runner.prewarm_worker(checkout, "staging", DEPLOY_SHA)
+        for name, returncode in tasks.items():
+            warm = sync_runner.run_invoke_task(name, checkout, "staging", DEPLOY_SHA)
+            assert warm.pop("startup_seconds") is not None
+            assert warm.pop("returncode") == returncode
+            assert warm == cold[name]
+    finally:
+        pool.close()
+
+    # Without a live worker for the checkout, the task starts cold.
+    cold = sync_runner.run_invoke_task("hello", checkout, "staging", DEPLOY_SHA)
+    assert "startup_seconds" not in cold and cold["success"] is True
@@ -5,17 +5,24 @@ from __future__ import annotations
 import importlib.util
 import json
 import subprocess
+import threading
+import time
 from pathlib import Path
 
+import pytest
+
 from infra2_sdk.runtime.probes import DependencyStatus
 from infra2_sdk.runtime.probes import ProbeResult as SdkProbeResult
 
 import libs.infra_probes as probes
 from libs.infra_probes import (
+    DEADLINE_EXCEEDED,
     build_probe_alert_payload,
     failed_results,
+    parse_kind_limits,
     parse_probe_specs,
     run_probe,
+    run_probes,
 )
 
 ROOT = Path(__file__).resolve().parents[2]
@@ -185,6 +192,139 @@ def test_s3_probe_fails_closed_without_credentials(monkeypatch) -> None:
     assert "PROBE_S3_BUCKET" in result.summary
 
 
+def test_run_probes_runs_concurrently_and_keeps_spec_order() -> None:
+    """A cycle costs its slowest probe, and results stay positional."""
+    specs = parse_probe_specs(
+        """
+        slow|http|http://slow/health|200
+        fast|http|http://fast/health|200
+        down|http|http://down/health|200
+        """
+    )
+
+    def http_get(url: str, _timeout: float) -> tuple[int, str]:
+        time.sleep(0.3 if "slow" in url else 0.05)
+        return (503, "down") if "down" in url else (200, "ok")
+
+    started = time.monotonic()
+    results = run_probes(specs, max_workers=3, kind_limits={}, http_get=http_get)
+    elapsed = time.monotonic() - started
+
+    assert [result.spec.name for result in results] == ["slow", "fast", "down"]
+    assert [result.ok for result in results] == [True, True, False]
+    assert elapsed < 0.6
+
+
+def test_run_probes_caps_concurrency_per_kind() -> None:
+    specs = parse_probe_specs(
+        "\n".join(f"db-{index}|http|http://db-{index}/health|200" for index in range(6))
+    )
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def http_get(_url: str, _timeout: float) -> tuple[int, str]:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return 200, "ok"
+
+    results = run_probes(
+        specs, max_workers=6, kind_limits={"http": 2}, http_get=http_get
+    )
+
+    assert all(result.ok for result in results)
+    assert peak == 2
+
+
+def test_run_probes_reports_unfinished_probes_as_deadline_exceeded() -> None:
+    specs = parse_probe_specs(
+        """
+        hung|http|http://hung/health|200
+        quick|http|http://quick/health|200
+        """
+    )
+    release = threading.Event()
+
+    def http_get(url: str, _timeout: float) -> tuple[int, str]:
+        if "hung" in url:
+            release.wait(5)
+        return 200, "ok"
+
+    try:
+        results = run_probes(
+            specs,
+            max_workers=2,
+            kind_limits={},
+            deadline_seconds=0.2,
+            http_get=http_get,
+        )
+    finally:
+        release.set()
+
+    assert [result.spec.name for result in results] == ["hung", "quick"]
+    assert results[0].ok is False
+    assert results[0].observed == DEADLINE_EXCEEDED
+    assert "deadline" in results[0].summary
+    assert results[1].ok is True
+
+
+def test_run_probes_does_not_restart_a_probe_still_hung_from_a_previous_cycle() -> None:
+    specs = parse_probe_specs(
+        """
+        stuck|http|http://stuck/health|200
+        steady|http|http://steady/health|200
+        """
+    )
+    release = threading.Event()
+    calls: list[str] = []
+
+    def http_get(url: str, _timeout: float) -> tuple[int, str]:
+        calls.append(url)
+        if "stuck" in url:
+            release.wait(5)
+        return 200, "ok"
+
+    def cycle() -> list:
+        return run_probes(
+            specs,
+            max_workers=2,
+            kind_limits={},
+            deadline_seconds=0.2,
+            http_get=http_get,
+        )
+
+    try:
+        first = cycle()
+        second = cycle()
+    finally:
+        release.set()
+
+    assert first[0].observed == DEADLINE_EXCEEDED
+    assert second[0].ok is False
+    assert second[0].observed == DEADLINE_EXCEEDED
+    assert "still running" in second[0].summary
+    assert second[1].ok is True
+    assert calls.count("http://stuck/health") == 1
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and cycle()[0].ok is False:
+        time.sleep(0.05)
+    assert calls.count("http://stuck/health") == 2
+
+
+def test_parse_kind_limits() -> None:
+    assert parse_kind_limits("") == {}
+    assert parse_kind_limits("postgres=1, s3=3") == {"postgres": 1, "s3": 3}
+    assert parse_kind_limits("http=0") == {"http": 1}
+    with pytest.raises(ValueError):
+        parse_kind_limits("postgres")
+
+
 def test_failed_probes_build_signoz_compatible_payload() -> None:
     spec = parse_probe_specs("vault|http|https://vault.example/v1/sys/health|200")[0]
     result = run_probe(spec, http_get=lambda *_args: (503, "sealed"))
@@ -0,0 +1,174 @@
+"""Tests for the multi-week availability analytics over the ledger cold archive."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from pathlib import Path
+
+from libs.availability_ledger import summarize_ledger
+from libs.ledger_analytics import (
+    LedgerMatrix,
+    history_summary,
+    load_matrix,
+    save_matrix,
+    sync_archive,
+)
+
+
+def _day(date: str, runs: int, signals: dict) -> dict:
+    return {"date": date, "runs": runs, "signals": signals}
+
+
+DAYS = [
+    _day(
+        "2026-06-01",
+        48,
+        {
+            "production:minio-public-route": {
+                "ok": 46,
+                "fail": 2,
+                "severity": "warning",
+                "lastDomain": "network",
+                "serviceId": "platform/minio",
+            },
+        },
+    ),
+    _day(
+        "2026-06-02",
+        48,
+        {
+            "production:minio-public-route": {"ok": 48, "fail": 0},
+            # first seen on a later day: earlier columns are implicitly zero
+            "production:vault-public-route": {
+                "ok": 47,
+                "fail": 1,
+                "lastDomain": "tls",
+                "serviceId": "platform/vault",
+            },
+        },
+    ),
+    _day(
+        "2026-06-03",
+        48,
+        {
+            "production:minio-public-route": {
+                "ok": 47,
+                "fail": 1,
+                "lastDomain": "dns",
+                "serviceId": "platform/minio",
+            },
+            "production:vault-public-route": {"ok": 48, "fail": 0},
+        },
+    ),
+]
+
+
+def test_matrix_summary_matches_summarize_ledger() -> None:
+    matrix = LedgerMatrix()
+    # Ingestion order does not matter: columns are kept in date order.
+    assert matrix.add_days(reversed(DAYS)) == 3
+    expected = summarize_ledger({"as_of": "2026-06-03", "ledger": DAYS})
+
+    summary = matrix.summarize()
+
+    assert matrix.dates == ["2026-06-01", "2026-06-02", "2026-06-03"]
+    for key in ("total_runs", "signal_count", "perfect_count", "overall_uptime_pct"):
+        assert summary[key] == expected[key]
+    assert [(s["id"], s["ok"], s["fail"]) for s in summary["signals"]] == [
+        (s["id"], s["ok"], s["fail"]) for s in expected["signals"]
+    ]
+    minio = next(s for s in summary["signals"] if "minio" in s["id"])
+    assert minio["last_domain"] == "dns"  # most recent failure domain in window
+    assert summary["window_days"] == 3
+
+
+def test_windows_burn_rates_and_service_rollup() -> None:
+    matrix = LedgerMatrix()
+    matrix.add_days(DAYS)
+
+    window = matrix.summarize("2026-06-02", "2026-06-03")
+    assert window["total_runs"] == 96
+    assert {s["id"]: s["fail"] for s in window["signals"]} == {
+        "production:minio-public-route": 1,
+        "production:vault-public-route": 1,
+    }
+
+    # 1 failure in 96 checks against a 99% SLO spends ~1.04x the budget.
+    assert matrix.burn_rates("2026-06-02", "2026-06-03", slo_pct=99.0) == {
+        "production:minio-public-route": round(1 / 96 / 0.01, 3),
+        "production:vault-public-route": round(1 / 96 / 0.01, 3),
+    }
+    rolling = matrix.rolling_burn_rate("production:vault-public-route", 1, slo_pct=99.0)
+    assert rolling == [
+        ("2026-06-01", None),
+        ("2026-06-02", round(1 / 48 / 0.01, 3)),
+        ("2026-06-03", 0.0),
+    ]
+
+    rollup = matrix.rollup()
+    assert [(row["service"], row["fail"]) for row in rollup] == [
+        ("platform/minio", 3),
+        ("platform/vault", 1),
+    ]
+
+
+def test_malformed_archive_days_are_not_trusted() -> None:
+    matrix = LedgerMatrix()
+    added = matrix.add_days(
+        [
+            "not-a-day",
+            {"runs": 10, "signals": {"x": {"ok": 10}}},  # no date
+            _day("2026-06-01", 10, {"x": {"ok": "junk", "fail": -3}, "y": "bad"}),
+        ]
+    )
+
+    assert added == 1
+    assert matrix.summarize()["overall_uptime_pct"] == 100.0
+    assert matrix.summarize()["signal_count"] == 0
+
+
+def test_cache_round_trip_and_incremental_archive_sync(tmp_path: Path) -> None:
+    archive = {f"{day['date']}.json": day for day in DAYS}
+    copied: list[list[str]] = []
+
+    def runner(command, **kwargs):
+        if command[1] == "lsf":
+            assert command[-1] == "r2:infra2/watchdog-ledger/"
+            return subprocess.CompletedProcess(command, 0, "\n".join(archive), "")
+        names = kwargs["input"].split()
+        copied.append(names)
+        for name in names:
+            (Path(command[3]) / name).write_text(json.dumps(archive[name]))
+        return subprocess.CompletedProcess(command, 0, "", "")
+
+    cache = tmp_path / "matrix.json"
+    matrix = load_matrix(cache)
+    matrix.add_day(DAYS[0])
+    assert sync_archive(matrix, "r2:infra2", runner=runner) == 2
+    save_matrix(matrix, cache)
+
+    reloaded = load_matrix(cache)
+    assert reloaded.to_payload() == matrix.to_payload()
+    assert reloaded.summarize() == matrix.summarize()
+    assert sync_archive(reloaded, "r2:infra2", runner=runner) == 0
+    assert copied == [["2026-06-02.json", "2026-06-03.json"]]
+
+
+def test_history_summary_uses_trailing_windows() -> None:
+    matrix = LedgerMatrix()
+    matrix.add_days(DAYS)
+
+    history = history_summary(matrix, windows_days=(1, 28), slo_pct=99.0)
+
+    assert history["end"] == "2026-06-03"
+    one_day, four_weeks = history["windows"]
+    assert one_day["days_with_data"] == 1
+    assert four_weeks["days_with_data"] == 3
+    assert one_day["worst_burn"] == [
+        (round(1 / 48 / 0.01, 3), "production:minio-public-route")
+    ]
+    assert [row["service"] for row in four_weeks["services"]] == [
+        "platform/minio",
+        "platform/vault",
+    ]
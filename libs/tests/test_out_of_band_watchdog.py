@@ -398,6 +398,90 @@ def test_http_checks_retry_transient_failure(monkeypatch) -> None:
     assert results[0].attempt_count == 2
 
 
+def test_http_check_retry_delay_does_not_block_other_targets(monkeypatch) -> None:
+    """A target sleeping out its retry delay must not hold up the other targets."""
+    import threading
+
+    watchdog = _load_watchdog()
+    flaky = watchdog.HttpTarget("flaky", "https://flaky.example", {200})
+    healthy = watchdog.HttpTarget("healthy", "https://healthy.example", {200})
+    healthy_checked = threading.Event()
+    flaky_attempts = {"value": 0}
+
+    class FakeResponse:
+        status = 200
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_args):
+            return False
+
+    def fake_urlopen(request, **_kwargs):
+        if request.full_url == healthy.url:
+            healthy_checked.set()
+            return FakeResponse()
+        flaky_attempts["value"] += 1
+        if flaky_attempts["value"] == 1:
+            raise watchdog.URLError("temporary dns failure")
+        return FakeResponse()
+
+    monkeypatch.setattr(watchdog, "urlopen", fake_urlopen)
+    # The flaky target's retry delay only ends once the healthy target was checked:
+    # a serial runner would time out here instead.
+    monkeypatch.setattr(
+        watchdog.time, "sleep", lambda _seconds: healthy_checked.wait(timeout=5)
+    )
+
+    results = watchdog.run_http_checks(
+        [flaky, healthy], timeout=1.0, max_attempts=2, retry_delay_seconds=60
+    )
+
+    assert healthy_checked.is_set()
+    assert [result.name for result in results] == ["flaky", "healthy"]
+    assert [result.attempt_count for result in results] == [2, 1]
+
+
+def test_ssh_checks_share_one_control_master(monkeypatch) -> None:
+    """SSH targets run as sessions over one ControlMaster, which is closed after."""
+    watchdog = _load_watchdog()
+    config = watchdog.SshConfig("infra2.example", "ops", 22, "/tmp/key")
+    targets = [
+        watchdog.SshTarget("infra2-ssh", "echo ok-1", "ok-1"),
+        watchdog.SshTarget("infra2-docker", "echo ok-2", "ok-2"),
+    ]
+    commands: list[list[str]] = []
+
+    class Completed:
+        returncode = 0
+        stderr = ""
+
+        def __init__(self, stdout: str):
+            self.stdout = stdout
+
+    def fake_run(command, **_kwargs):
+        commands.append(command)
+        return Completed(command[-1].replace("echo ", ""))
+
+    monkeypatch.setattr(watchdog.subprocess, "run", fake_run)
+
+    results = watchdog.run_ssh_checks(config, targets)
+
+    assert [result.ok for result in results] == [True, True]
+    master, *sessions, close = commands
+    assert "ControlMaster=yes" in master and "-N" in master
+    assert close[-3:] == ["-O", "exit", "ops@infra2.example"]
+    control_paths = {
+        option
+        for command in commands
+        for option in command
+        if option.startswith("ControlPath=")
+    }
+    assert len(control_paths) == 1
+    assert sorted(session[-1] for session in sessions) == ["echo ok-1", "echo ok-2"]
+    assert all("ControlMaster=no" in session for session in sessions)
+
+
 def test_main_structured_check_logs_include_attempt_count(monkeypatch) -> None:
     """Infra-012.4: structured check logs include attempt_count and timestamp."""
     watchdog = _load_watchdog()
@@ -756,6 +840,46 @@ def test_dokploy_status_check_flags_error_and_ignores_idle_done_running() -> Non
         assert "latest_deployment_errorMessage=image pull failed" in result.detail
 
 
+def test_dokploy_status_check_prefetches_error_evidence_in_one_fan_out() -> None:
+    """Errored composes' deployments come from one bulk call, not one per compose;
+    a per-compose fetch failure becomes evidence, never masks the status alert."""
+    watchdog = _load_watchdog()
+    fanouts = []
+
+    class FakeClient:
+        def list_projects(self):
+            return _dokploy_projects_fixture()
+
+        def get_deployments_many(self, compose_ids):
+            fanouts.append(list(compose_ids))
+            return {
+                "compose-prod-backend": [
+                    {"deploymentId": "d-new", "status": "error"},
+                    {"deploymentId": "d-old", "status": "done"},
+                ],
+                "compose-staging-backend": RuntimeError("dokploy 503"),
+            }
+
+        def get_latest_deployment(self, compose_id):  # pragma: no cover
+            raise AssertionError("per-compose fallback must not run")
+
+    results = watchdog.run_dokploy_status_check(
+        {"DOKPLOY_API_KEY": "secret"},
+        client_factory=lambda *, host: FakeClient(),
+    )
+
+    assert fanouts == [["compose-prod-backend", "compose-staging-backend"]]
+    details = {result.name: result.detail for result in results}
+    assert (
+        "latest_deployment_id=d-new"
+        in details["dokploy-status:finance-report/production/backend"]
+    )
+    assert (
+        "latest_deployment_error=RuntimeError: dokploy 503"
+        in details["dokploy-status:finance-report/staging/backend"]
+    )
+
+
 def test_dokploy_status_check_maps_prod_to_p1_and_staging_to_p2() -> None:
     """Infra-011.9: prod deploy errors page louder than staging/preview."""
     watchdog = _load_watchdog()
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import json
 import subprocess
+import threading
+import time
 from pathlib import Path
 
 import pytest
@@ -11,6 +13,8 @@ import yaml
 
 from tools.reconcile_iac_inputs import (
     MANIFEST_PATH,
+    ReconcilePlan,
+    _env_int,
     assert_after_on_main,
     build_deploy_commands,
     build_plan,
@@ -18,6 +22,8 @@ from tools.reconcile_iac_inputs import (
     is_zero_sha,
     main,
     run_deploy_commands,
+    summary_streamer,
+    write_summary,
 )
 
 ROOT = Path(__file__).resolve().parents[2]
@@ -148,6 +154,120 @@ def test_run_deploy_commands_stops_on_first_failure() -> None:
     assert len(calls) == 2
 
 
+def _mixed_plan() -> ReconcilePlan:
+    return ReconcilePlan(
+        changed_files=[],
+        selected={},
+        ignored={},
+        dropped=[],
+        staging_services=[
+            "finance_report/app",
+            "platform/alerting",
+            "platform/prefect",
+            "truealpha/app",
+        ],
+        prod_services=["platform/alerting"],
+    )
+
+
+def test_pinned_services_batch_and_apps_get_their_own_commands() -> None:
+    commands = build_deploy_commands(
+        _mixed_plan(), iac_ref=SHA, domain="zitian.party", timeout=600
+    )
+
+    assert [(c.deploy_type, c.service) for c in commands] == [
+        ("staging", "platform/alerting,platform/prefect"),
+        ("staging", "finance_report/app"),
+        ("staging", "truealpha/app"),
+        ("prod", "platform/alerting"),
+    ]
+
+
+def test_pipelined_run_overlaps_an_environment_and_streams_results(
+    tmp_path: Path,
+) -> None:
+    commands = build_deploy_commands(
+        _mixed_plan(), iac_ref=SHA, domain="zitian.party", timeout=600
+    )
+    active, peak, lock = [0], [0], threading.Lock()
+    seen_prod_while_staging = []
+
+    def fake_runner(argv, **_kwargs):
+        deploy_type = argv[argv.index("--type") + 1]
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            if deploy_type == "prod":
+                seen_prod_while_staging.append(active[0] > 1)
+        time.sleep(0.2)
+        with lock:
+            active[0] -= 1
+        return subprocess.CompletedProcess(argv, 0, json.dumps({"ok": True}), "")
+
+    summary = tmp_path / "summary.md"
+    streamed = []
+    stream = summary_streamer(str(summary))
+
+    def on_result(record):
+        streamed.append(record["service"])
+        stream(record)
+
+    started = time.monotonic()
+    results = run_deploy_commands(
+        commands, runner=fake_runner, concurrency=4, on_result=on_result
+    )
+    elapsed = time.monotonic() - started
+
+    # Three staging commands overlap; prod waits for staging to finish.
+    assert peak[0] == 3
+    assert seen_prod_while_staging == [False]
+    assert elapsed < 0.2 * len(commands) - 0.1
+    assert streamed == [record["service"] for record in results]
+    assert results[-1]["service"] == "platform/alerting"
+    assert all(record["wall_seconds"] >= 0.2 for record in results)
+    lines = summary.read_text(encoding="utf-8").splitlines()
+    assert len([line for line in lines if line.startswith("- `")]) == 4
+
+    write_summary(
+        plan=_mixed_plan(),
+        commands=commands,
+        results=results,
+        dry_run=False,
+        path=str(summary),
+        wall_seconds=elapsed,
+        results_streamed=True,
+    )
+    text = summary.read_text(encoding="utf-8")
+    assert "- Deploy wall time:" in text
+    # The live section already listed every result; the final summary does not
+    # repeat them.
+    assert len([line for line in text.splitlines() if line.startswith("- `")]) == 4
+
+
+def test_malformed_concurrency_env_falls_back_to_the_default(monkeypatch) -> None:
+    monkeypatch.setenv("RECONCILE_DEPLOY_CONCURRENCY", "four")
+    assert _env_int("RECONCILE_DEPLOY_CONCURRENCY", 4) == 4
+    monkeypatch.setenv("RECONCILE_DEPLOY_CONCURRENCY", "8")
+    assert _env_int("RECONCILE_DEPLOY_CONCURRENCY", 4) == 8
+
+
+def test_pipelined_run_starts_nothing_new_after_a_failure() -> None:
+    commands = build_deploy_commands(
+        _mixed_plan(), iac_ref=SHA, domain="zitian.party", timeout=600
+    )
+    calls = []
+
+    def fake_runner(argv, **_kwargs):
+        calls.append(argv[argv.index("--service") + 1])
+        code = 1 if calls[-1].startswith("platform/") else 0
+        return subprocess.CompletedProcess(argv, code, "", "")
+
+    results = run_deploy_commands(commands, runner=fake_runner, concurrency=1)
+
+    assert calls == ["platform/alerting,platform/prefect"]
+    assert [record["returncode"] for record in results] == [1]
+
+
 def test_zero_sha_detection() -> None:
     assert is_zero_sha("0" * 40)
     assert not is_zero_sha(SHA)
@@ -182,24 +302,18 @@ def test_guard_accepts_on_main_tag() -> None:
 
 def _alerting_commands():
     plan = build_plan(["platform/12.alerting/compose.yaml"])
-    return build_deploy_commands(
-        plan, iac_ref=SHA, domain="zitian.party", timeout=600
-    )
+    return build_deploy_commands(plan, iac_ref=SHA, domain="zitian.party", timeout=600)
 
 
 def test_default_applies_staging_only() -> None:
     # release decoupling: a tag push auto-applies staging (soak), never prod.
-    applied = commands_to_apply(
-        _alerting_commands(), dry_run=False, promote_prod=False
-    )
+    applied = commands_to_apply(_alerting_commands(), dry_run=False, promote_prod=False)
     assert [c.deploy_type for c in applied] == ["staging"]
 
 
 def test_promote_prod_applies_prod_only() -> None:
     # prod is a separate, explicit promotion step.
-    applied = commands_to_apply(
-        _alerting_commands(), dry_run=False, promote_prod=True
-    )
+    applied = commands_to_apply(_alerting_commands(), dry_run=False, promote_prod=True)
     assert [c.deploy_type for c in applied] == ["prod"]
 
 
@@ -0,0 +1,76 @@
+"""Tests for the Docker Registry v2 readiness client."""
+
+from __future__ import annotations
+
+import threading
+
+import httpx
+import pytest
+
+from libs.registry_client import RegistryClient, RegistryUnavailable
+
+CHALLENGE = 'Bearer realm="https://ghcr.io/token",service="ghcr.io"'
+
+
+def _registry(published: set[str], *, grant_bundles: bool = True):
+    calls: list[tuple[str, str]] = []
+    lock = threading.Lock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        with lock:
+            calls.append((request.method, request.url.path))
+        if request.url.path == "/token":
+            scopes = request.url.params.get_list("scope")
+            if not grant_bundles:
+                scopes = scopes[:1]
+            return httpx.Response(
+                200, json={"token": "|".join(scopes), "expires_in": 300}
+            )
+        repository = request.url.path.removeprefix("/v2/").rsplit("/manifests/", 1)[0]
+        token = request.headers.get("authorization", "").removeprefix("Bearer ")
+        if f"repository:{repository}:pull" not in token.split("|"):
+            return httpx.Response(
+                401,
+                headers={
+                    "www-authenticate": f'{CHALLENGE},scope="repository:{repository}:pull"'
+                },
+            )
+        return httpx.Response(200 if repository in published else 404)
+
+    client = RegistryClient(client=httpx.Client(transport=httpx.MockTransport(handler)))
+    return client, calls
+
+
+def test_expected_images_share_one_token_and_steady_state_is_one_head() -> None:
+    images = ["ghcr.io/org/app-backend", "ghcr.io/org/app-frontend"]
+    client, calls = _registry({"org/app-backend"})
+    client.expect(images)
+
+    assert [client.manifest_exists(image, "abc") for image in images] == [True, False]
+    assert [path for _, path in calls].count("/token") == 1
+
+    calls.clear()
+    assert client.manifest_exists(images[1], "abc") is False
+    assert calls == [("HEAD", "/v2/org/app-frontend/manifests/abc")]
+
+
+def test_partially_granted_bundle_falls_back_to_a_single_scope_token() -> None:
+    images = ["ghcr.io/org/a", "ghcr.io/org/b"]
+    client, calls = _registry({"org/a", "org/b"}, grant_bundles=False)
+    client.expect(images)
+
+    assert all(client.manifest_exists(image, "abc") for image in images)
+    calls.clear()
+    assert all(client.manifest_exists(image, "abc") for image in images)
+    assert [method for method, _ in calls] == ["HEAD", "HEAD"]
+
+
+def test_rate_limited_registry_surfaces_retry_after() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, headers={"retry-after": "12"})
+
+    client = RegistryClient(client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    with pytest.raises(RegistryUnavailable) as excinfo:
+        client.manifest_exists("ghcr.io/org/a", "abc")
+    assert excinfo.value.retry_after == 12
@@ -4,9 +4,11 @@ Each test pins one of the three existing pollers' contracts onto the unified
 ``wait_for_deployment`` flags, proving the single loop can reproduce all of them.
 """
 
+import threading
+
 import pytest
 
-from libs.deploy.rollout import RolloutError, wait_for_deployment
+from libs.deploy.rollout import DeploymentWatcher, RolloutError, wait_for_deployment
 
 
 class _Deployments:
@@ -155,3 +157,68 @@ def test_pre_existing_record_is_ignored():
         _now=_clock([0.0, 1.0]),
     )
     assert result.status == "timeout"  # no NEW record, so it times out
+
+
+# --- DeploymentWatcher: one poll per compose per tick, adaptive cadence ---------
+
+
+def _done_when_terminal(deployments, timed_out):
+    if timed_out:
+        raise TimeoutError
+    statuses = {d["status"] for d in deployments if d["id"] != "old"}
+    return "done" if "done" in statuses else None
+
+
+def test_concurrent_waiters_on_one_compose_share_each_poll():
+    frames = _Deployments(
+        [[{"id": "new", "status": "running"}]] * 4 + [[{"id": "new", "status": "done"}]]
+    )
+    watcher = DeploymentWatcher(lambda _cid: frames(), min_interval=0.001)
+    futures = [
+        watcher.watch(
+            "cmp", _done_when_terminal, timeout_seconds=30, interval_seconds=0.01
+        )
+        for _ in range(3)
+    ]
+    results = []
+    threads = [
+        threading.Thread(target=lambda f=f: results.append(watcher.wait(f)))
+        for f in futures
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert results == ["done", "done", "done"]
+    assert watcher.fetches == frames.calls == 5  # not 3 waiters x 5 polls
+
+
+def test_watcher_backs_off_while_quiet_and_snaps_back_when_status_moves():
+    frames = _Deployments(
+        [
+            [{"id": "new", "status": "queued"}],
+            [{"id": "new", "status": "queued"}],
+            [{"id": "new", "status": "queued"}],
+            [{"id": "new", "status": "running"}],
+            [{"id": "new", "status": "done"}],
+        ]
+    )
+    clock = {"t": 0.0}
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock["t"] += seconds
+
+    watcher = DeploymentWatcher(
+        lambda _cid: frames(), _sleep=sleep, _now=lambda: clock["t"]
+    )
+    result = watcher.wait(
+        watcher.watch(
+            "cmp", _done_when_terminal, timeout_seconds=60, interval_seconds=5
+        )
+    )
+
+    assert result == "done"
+    assert sleeps == [1.0, 1.5, 2.25, 1.0]
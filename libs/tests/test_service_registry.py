@@ -138,3 +138,59 @@ def test_services_in_env_excludes_prod_only_off_production() -> None:
     assert reg.shared_services() & staging == set()
     assert reg.shared_services() <= production
     assert production == set(reg.all_services())
+
+
+def _tmp_layer(tmp_path: Path, monkeypatch) -> Path:
+    layer = tmp_path / "platform"
+    (layer / "01.cache").mkdir(parents=True)
+    (layer / "01.cache" / "deploy.py").write_text(
+        "class CacheDeployer(Deployer):\n    service = 'cache'\n", encoding="utf-8"
+    )
+    monkeypatch.setattr(reg, "_LAYERS", {"platform": layer})
+    monkeypatch.setattr(reg, "REPO_ROOT", tmp_path)
+    monkeypatch.setattr(reg, "_index", None)
+    return layer
+
+
+def test_registry_index_is_memoized_and_invalidated_by_deploy_file_changes(
+    tmp_path, monkeypatch
+) -> None:
+    layer = _tmp_layer(tmp_path, monkeypatch)
+    monkeypatch.delenv("SERVICE_REGISTRY_INDEX", raising=False)
+
+    first = reg.registry_index()
+    assert reg.registry_index() is first
+    assert reg.service_id_for_dokploy("platform", "cache") == "platform/cache"
+    assert reg.resolve_container_host("platform-cache-staging").service_id == (
+        "platform/cache"
+    )
+
+    (layer / "02.queue").mkdir()
+    (layer / "02.queue" / "deploy.py").write_text(
+        "class QueueDeployer(Deployer):\n    service = 'queue'\n", encoding="utf-8"
+    )
+    assert reg.all_services() == ["platform/cache", "platform/queue"]
+    assert reg.registry_index() is not first
+    assert reg.service_id_for_component("queue") == "platform/queue"
+
+
+def test_registry_index_round_trips_through_its_on_disk_form(
+    tmp_path, monkeypatch
+) -> None:
+    """A CLI process loads the serialized index without any AST pass."""
+    cache = tmp_path / "registry-index.json"
+    monkeypatch.setenv("SERVICE_REGISTRY_INDEX", str(cache))
+    real = reg.service_attrs()
+    monkeypatch.setattr(reg, "_index", None)
+    built = reg.registry_index()
+    assert cache.exists()
+    assert reg.RegistryIndex.from_json(cache.read_text(encoding="utf-8")) == built
+
+    monkeypatch.setattr(reg, "_index", None)
+    monkeypatch.setattr(
+        reg,
+        "_meta_from_deploy_file",
+        lambda *_args, **_kwargs: pytest.fail("cached index must not re-parse"),
+    )
+    assert reg.service_attrs() == real
+    assert list(reg.service_attrs()) == list(real)
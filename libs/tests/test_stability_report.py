@@ -93,3 +93,42 @@ def test_negative_empty_default_still_fails_loudly(monkeypatch, capsys) -> None:
 
     assert rc == 2
     assert "required" in capsys.readouterr().err
+
+
+# ---- 正例: the R2 cold archive adds multi-week history -----------------------
+
+
+def test_positive_archive_history_is_appended_and_cached(
+    tmp_path, monkeypatch, capsys
+) -> None:
+    sync = _load_module()
+    ledger_file = tmp_path / "ledger.json"
+    ledger_file.write_text(json.dumps(LEDGER))
+    archived = {
+        "date": "2026-06-09",
+        "runs": 48,
+        "signals": {"production:minio-public-route": {"ok": 44, "fail": 4}},
+    }
+    synced: list[str] = []
+
+    def fake_sync(matrix, remote):
+        synced.append(remote)
+        return matrix.add_days([archived]) if "2026-06-09" not in matrix.dates else 0
+
+    monkeypatch.setattr(sync, "sync_archive", fake_sync)
+    cache = tmp_path / "matrix.json"
+
+    rc = sync.run(
+        {"INFRA2_STABILITY_REPORT_DRY_RUN": "1", "INFRA2_STABILITY_SLO_PCT": "99"},
+        input_path=str(ledger_file),
+        archive="r2:infra2",
+        archive_cache=str(cache),
+    )
+
+    assert rc == 0
+    assert synced == ["r2:infra2"]
+    out = capsys.readouterr().out
+    assert "History (SLO 99.0%, through 2026-06-10):" in out
+    assert "  28d: 93.75% | 0/1 signals at 100% | 2 days of data" in out
+    # Only finalized archive days are cached, never the live /ledger day.
+    assert json.loads(cache.read_text())["dates"] == ["2026-06-09"]
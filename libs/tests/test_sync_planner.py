@@ -0,0 +1,191 @@
+"""Tests for the fleet-level sync planner (libs/deploy/sync_planner.py)."""
+
+from __future__ import annotations
+
+import types
+
+from libs.deploy import sync_planner
+from libs.deploy.deployer import Deployer
+from libs.service_identity import ServiceIdentity
+
+
+DEPLOY_SHA = "a" * 40
+ENV = {
+    "ENV": "staging",
+    "ENV_SUFFIX": "-staging",
+    "ENV_DOMAIN_SUFFIX": "-staging",
+    "INTERNAL_DOMAIN": "example.com",
+    "PROJECT": "platform",
+}
+
+
+class _PlannedDeployer(Deployer):
+    secret_key = ""
+
+    @classmethod
+    def env(cls):
+        return dict(ENV)
+
+    @classmethod
+    def compute_local_config_hash(cls, c, env_vars):
+        return f"{cls.service}-hash"
+
+
+class RedisDeployer(_PlannedDeployer):
+    service = "redis"
+    compose_path = "platform/02.redis/compose.yaml"
+    data_path = "/data/platform/redis"
+
+
+class PostgresDeployer(_PlannedDeployer):
+    service = "postgres"
+    compose_path = "platform/01.postgres/compose.yaml"
+    data_path = "/data/platform/postgres"
+
+
+class PrefectDeployer(_PlannedDeployer):
+    service = "prefect"
+    compose_path = "platform/23.prefect/compose.yaml"
+    data_path = "/data/platform/prefect"
+
+
+class SignozDeployer(_PlannedDeployer):
+    service = "signoz"
+    compose_path = "platform/11.signoz/compose.yaml"
+    data_path = "/data/platform/signoz"
+    prod_only = True
+
+
+class AlertingDeployer(_PlannedDeployer):
+    service = "alerting"
+    compose_path = "platform/12.alerting/compose.yaml"
+    data_path = "/data/platform/alerting"
+
+    @classmethod
+    def sync(cls, c, force=False):
+        return super().sync(c, force=force)
+
+
+def _deployed_env(dep: type[Deployer], service_id: str, runtime_hash: str) -> str:
+    identity = ServiceIdentity.build(
+        service_id,
+        "staging",
+        component=dep.service,
+        service_name=dep.service,
+        version=DEPLOY_SHA,
+        iac_ref=DEPLOY_SHA,
+    )
+    values = {
+        "IAC_CONFIG_HASH": runtime_hash,
+        "IAC_SOURCE_CONFIG_HASH": f"v1:{runtime_hash}",
+        "IAC_DEPLOY_REF": "b" * 40,
+        "VAULT_ROLE_ID": "role",
+        "VAULT_SECRET_ID": "secret",
+        **identity.deploy_env(),
+    }
+    return "\n".join(f"{key}={value}" for key, value in values.items())
+
+
+class _FakeTopology:
+    def __init__(self, composes: dict[str, str]):
+        self.composes = composes
+
+    def find_compose(self, name, project_name=None, env_name=None):
+        assert (project_name, env_name) == ("platform", "staging")
+        if name in self.composes:
+            return {"name": name, "composeId": self.composes[name]}
+        return None
+
+
+class _FakeDokploy:
+    def __init__(self, envs: dict[str, str]):
+        self.envs = envs
+        self.batches: list[set[str]] = []
+
+    def topology(self):
+        return _FakeTopology({name: f"id-{name}" for name in self.envs})
+
+    def get_composes_many(self, compose_ids):
+        self.batches.append(set(compose_ids))
+        return {cid: {"env": self.envs[cid.removeprefix("id-")]} for cid in compose_ids}
+
+
+def _patch(monkeypatch, client: _FakeDokploy) -> list[list[str]]:
+    deployers = {
+        "platform/redis": RedisDeployer,
+        "platform/postgres": PostgresDeployer,
+        "platform/prefect": PrefectDeployer,
+        "platform/signoz": SignozDeployer,
+        "platform/alerting": AlertingDeployer,
+    }
+    prefetched: list[list[str]] = []
+    monkeypatch.setattr(sync_planner, "load_deployer_class", deployers.get)
+    monkeypatch.setattr(sync_planner, "validate_env", lambda: [])
+    monkeypatch.setattr(Deployer, "env", classmethod(lambda cls: dict(ENV)))
+    session = types.SimpleNamespace(prefetch=prefetched.append)
+    monkeypatch.setattr(sync_planner, "secrets_session", lambda: session)
+    monkeypatch.setattr("libs.dokploy.get_dokploy", lambda host=None: client)
+    return prefetched
+
+
+def test_plan_skips_only_provably_unchanged_services(monkeypatch) -> None:
+    client = _FakeDokploy(
+        {
+            "redis": _deployed_env(RedisDeployer, "platform/redis", "redis-hash"),
+            "prefect": _deployed_env(PrefectDeployer, "platform/prefect", "old-hash"),
+        }
+    )
+    prefetched = _patch(monkeypatch, client)
+
+    plan = sync_planner.plan_services(
+        [
+            "platform/redis",
+            "platform/postgres",
+            "platform/prefect",
+            "platform/signoz",
+            "platform/alerting",
+            "bootstrap/vault",
+        ],
+        DEPLOY_SHA,
+        c=object(),
+    )
+
+    assert {sid: item.action for sid, item in plan.items()} == {
+        "bootstrap/vault": "deploy",
+        "platform/alerting": "deploy",
+        "platform/postgres": "deploy",
+        "platform/prefect": "deploy",
+        "platform/redis": "skip",
+        "platform/signoz": "skip",
+    }
+    assert plan["platform/prefect"].reason == (
+        "runtime config changed (old-hash -> prefect-hash)"
+    )
+    assert plan["platform/postgres"].reason == "no compose in Dokploy yet"
+    assert plan["platform/alerting"].reason == "Deployer overrides sync"
+    # Every remote identity came from ONE batched compose read.
+    assert client.batches == [{"id-redis", "id-prefect"}]
+    assert len(prefetched) == 1
+
+
+def test_plan_defers_unprovable_services_to_their_sync(monkeypatch) -> None:
+    redis_env = _deployed_env(RedisDeployer, "platform/redis", "redis-hash")
+    legacy = redis_env.replace("VAULT_ROLE_ID=role\n", "VAULT_APP_TOKEN=t\n")
+    client = _FakeDokploy({"redis": legacy})
+    _patch(monkeypatch, client)
+
+    plan = sync_planner.plan_services(["platform/redis"], DEPLOY_SHA, c=object())
+    assert plan["platform/redis"].reason == (
+        "legacy VAULT_APP_TOKEN needs sync's preflight"
+    )
+
+    plan = sync_planner.plan_services(["platform/redis"], "main", c=object())
+    assert plan["platform/redis"].reason == "deploy ref is not an exact commit"
+
+    def unreachable():
+        raise RuntimeError("dokploy down")
+
+    client.topology = unreachable
+    plan = sync_planner.plan_services(["platform/redis"], DEPLOY_SHA, c=object())
+    assert plan["platform/redis"].action == "deploy"
+    assert "dokploy down" in plan["platform/redis"].reason
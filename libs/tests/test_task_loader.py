@@ -0,0 +1,128 @@
+"""Tests for the indexed (lazy) invoke task loader in tools/loader.py."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from tools import loader
+
+
+ROOT = Path(__file__).resolve().parents[2]
+
+COMPONENT_PREFIXES = ("bootstrap.", "platform.", "finance_report.", "truealpha.")
+
+# Runs in a fresh interpreter so startup is measured, not this process's cache.
+# invoke/rich/dotenv are imported first: they are paid either way and would
+# otherwise dominate the measurement.
+_STARTUP_PROBE = """
+import json, sys, time
+sys.path.append({root!r})
+import dotenv, invoke, rich.console
+start = time.perf_counter()
+from tools.loader import ns
+startup = time.perf_counter() - start
+
+def loaded():
+    return sorted(
+        name for name in sys.modules
+        if name.startswith({prefixes!r}) or name.startswith("tools.")
+    )
+
+at_startup = loaded()
+task = ns["alerting.shared.print-channel-payload"]
+task(invoke.Context())
+print(json.dumps({{"startup": startup, "at_startup": at_startup, "after_task": loaded()}}))
+"""
+
+
+def _describe(ns) -> dict:
+    """What the invoke CLI sees: names, aliases, flags, help and docstrings."""
+    described = {}
+    for context in ns.to_contexts():
+        described[context.name] = {
+            "aliases": sorted(context.aliases),
+            "doc": ns[context.name].__doc__,
+            "flags": sorted(
+                (
+                    tuple(arg.names),
+                    getattr(arg.kind, "__name__", str(arg.kind)),
+                    repr(arg.default),
+                    arg.help,
+                    arg.positional,
+                    arg.optional,
+                )
+                for arg in context.flags.values()
+            ),
+        }
+    return described
+
+
+def _run_probe(index: Path) -> dict:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _STARTUP_PROBE.format(root=str(ROOT), prefixes=COMPONENT_PREFIXES),
+        ],
+        cwd=ROOT,
+        env={**os.environ, loader.TASK_INDEX_ENV: str(index)},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_indexed_collection_matches_eager_load(tmp_path: Path) -> None:
+    index_path = tmp_path / "index.json"
+
+    eager = loader.load_all(index_path=index_path)
+    index = json.loads(index_path.read_text())
+    indexed = loader.load_all(index_path=index_path)
+
+    assert index["signature"] == loader.tree_signature()
+    assert not [n["name"] for n in index["namespaces"] if n.get("eager")]
+    assert sorted(indexed.task_names) == sorted(eager.task_names)
+    assert _describe(indexed) == _describe(eager)
+    # Cross-component sys.modules lookups are realized before the dependant.
+    requires = {n["name"]: n["requires"] for n in index["namespaces"]}
+    assert "minio" in requires["fr-app"]
+    assert "alerting" in requires["fr-observability"]
+
+
+def test_stale_or_foreign_index_is_ignored(tmp_path: Path, monkeypatch) -> None:
+    index_path = tmp_path / "index.json"
+    signature = loader.tree_signature()
+    loader.write_task_index(
+        index_path,
+        {"version": loader.TASK_INDEX_VERSION, "signature": "old", "namespaces": []},
+    )
+
+    assert loader.read_task_index(index_path, signature) is None
+    index_path.write_text("not json")
+    assert loader.read_task_index(index_path, signature) is None
+
+    monkeypatch.setenv(loader.TASK_INDEX_ENV, "0")
+    assert loader.task_index_path() is None
+
+
+def test_single_task_startup_imports_only_its_namespace(tmp_path: Path) -> None:
+    """Import-time benchmark: an indexed startup must not import component
+    modules, and running one task imports only that task's namespace."""
+    index_path = tmp_path / "index.json"
+    eager = _run_probe(index_path)  # no index yet: eager load writes it
+    lazy = _run_probe(index_path)
+
+    assert [m for m in eager["at_startup"] if m.startswith(COMPONENT_PREFIXES)]
+    assert lazy["at_startup"] == ["tools.loader"]
+    assert [m for m in lazy["after_task"] if m != "tools.loader"] == [
+        "platform.12.alerting.deploy",
+        "platform.12.alerting.shared",
+    ]
+    # Generous bound so a loaded CI box does not flake; the real ratio is ~20x.
+    assert lazy["startup"] * 3 < eager["startup"], (lazy, eager)
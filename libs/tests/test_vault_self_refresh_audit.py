@@ -388,7 +388,12 @@ def test_mount_exempt_app_container_not_flagged_for_missing_secrets_mount() -> N
                         "VAULT_SECRET_ID=test-secret-id-not-a-real-secret\n"
                     ),
                     "token_lookup": None,
-                    "rendered_env": {"exists": True, "readable": True, "size": 20, "mtime": 0},
+                    "rendered_env": {
+                        "exists": True,
+                        "readable": True,
+                        "size": 20,
+                        "mtime": 0,
+                    },
                     "vault_agent_logs": "",
                     "vault_agent_container": {
                         "name": "platform-prefect-vault-agent",
@@ -892,9 +897,7 @@ def test_optional_inert_field_watchlist_covers_llm_encryption_keys() -> None:
     #542: the watchlist now lives as `optional_inert_fields` on the owning
     service's SecretsFacet, derived into the inventory."""
     by_id = {service.id: service for service in load_inventory()}
-    assert by_id["finance_report/app"].optional_inert_fields == (
-        "LLM_ENCRYPTION_KEYS",
-    )
+    assert by_id["finance_report/app"].optional_inert_fields == ("LLM_ENCRYPTION_KEYS",)
     # No watchlist entries for services never flagged as having this gap.
     assert by_id["platform/postgres"].optional_inert_fields == ()
 
@@ -1060,3 +1063,101 @@ def test_collect_live_observations_skips_token_lookup_for_approle_service(
     observations = collect_live_observations([service], env="production")
 
     assert observations["services"][service.id]["token_lookup"] is None
+
+
+def test_collect_live_observations_batches_host_reads_and_one_topology_fetch(
+    monkeypatch,
+) -> None:
+    """Every Docker read for the host travels in one SSH round-trip, and every
+    service's compose env comes from one topology snapshot + one bulk fetch."""
+    import base64
+    import json
+
+    approle = _service()
+    token_service = _token_service()
+    calls = {"ssh": [], "topology": 0, "lookups": []}
+
+    class FakeSnapshot:
+        def find_compose(self, name, project, env):
+            return {"composeId": f"id-{name}"}
+
+    class FakeDokployClient:
+        def topology(self):
+            calls["topology"] += 1
+            return FakeSnapshot()
+
+        def get_composes_many(self, ids, concurrency=8):
+            return {
+                compose_id: {"env": "VAULT_APP_TOKEN=s.token-not-a-secret\n"}
+                for compose_id in ids
+            }
+
+        def find_compose_by_name(self, *args, **kwargs):
+            raise AssertionError("per-service compose lookup must not be used")
+
+    def resolved(*names):
+        return sorted({name.replace("${ENV_SUFFIX}", "") for name in names})
+
+    agents = resolved(
+        approle.vault_agent_container, token_service.vault_agent_container
+    )
+    apps = resolved(*approle.app_containers, *token_service.app_containers)
+    document = {
+        "batch": 1,
+        "inspect": [
+            {"Name": f"/{name}", "State": {"Status": "running", "Running": True}}
+            for name in apps + agents
+        ],
+        "secret_state": {
+            name: {
+                "exists": True,
+                "readable": True,
+                "size": 3,
+                "mtime": 1,
+                "has_no_value": False,
+            }
+            for name in agents
+        },
+        "logs": {
+            name: base64.b64encode(b"rendered template\n").decode() for name in agents
+        },
+        "secret_text": {
+            name: base64.b64encode(b"KEY=value\n").decode() for name in agents
+        },
+    }
+
+    def fake_ssh(host, command):
+        calls["ssh"].append(command)
+
+        class Result:
+            returncode = 0
+            stdout = json.dumps(document)
+            stderr = ""
+
+        return Result()
+
+    def fake_verify(token, addr=None, min_ttl_hours=None):
+        calls["lookups"].append(token)
+        return {"ok": True}
+
+    monkeypatch.setattr("libs.common.get_env", lambda: {"VPS_HOST": "vps.example"})
+    monkeypatch.setattr(
+        "libs.dokploy.get_dokploy", lambda host=None: FakeDokployClient()
+    )
+    monkeypatch.setattr(
+        vault_self_refresh_audit_module, "verify_vault_token", fake_verify
+    )
+    monkeypatch.setattr(vault_self_refresh_audit_module, "_ssh", fake_ssh)
+
+    observations = collect_live_observations([approle, token_service], env="production")
+
+    assert len(calls["ssh"]) == 1
+    assert calls["topology"] == 1
+    assert calls["lookups"] == ["s.token-not-a-secret"]
+    legacy = observations["services"][token_service.id]
+    assert legacy["token_lookup"] == {"ok": True}
+    assert legacy["vault_agent_logs"] == "rendered template\n"
+    assert legacy["rendered_env"]["readable"] is True
+    assert legacy["vault_agent_container"]["exists"] is True
+    assert [c["name"] for c in legacy["app_containers"]] == ["legacy-app"]
+    assert observations["services"][approle.id]["token_lookup"] is None
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import importlib.util
+import io
 import json
+import zipfile
 from datetime import UTC, datetime
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
@@ -53,7 +55,9 @@ def test_summarize_weekly_runs_filters_old_runs() -> None:
     assert summary["failed_run_urls"] == ["https://example/failure"]
 
 
-def test_fetch_recent_runs_filters_ops_checks_to_watchdog_jobs_and_paginates(monkeypatch) -> None:
+def test_fetch_recent_runs_filters_ops_checks_to_watchdog_jobs_and_paginates(
+    monkeypatch,
+) -> None:
     """Infra-012.8: digest only selects watchdog job runs from ops-checks pages."""
     digest = _load_module()
     now = datetime(2026, 6, 9, 0, 0, tzinfo=UTC)
@@ -134,7 +138,9 @@ def test_fetch_recent_runs_filters_ops_checks_to_watchdog_jobs_and_paginates(mon
     assert requested_job_runs == ["1", "2", "3"]
 
 
-def test_fetch_stale_open_issues_filters_prs_and_recent_and_paginates(monkeypatch) -> None:
+def test_fetch_stale_open_issues_filters_prs_and_recent_and_paginates(
+    monkeypatch,
+) -> None:
     """#508: only open issues (not PRs) older than the threshold are returned."""
     digest = _load_module()
     now = datetime(2026, 7, 17, 0, 0, tzinfo=UTC)
@@ -212,7 +218,10 @@ def test_fetch_stale_open_issues_filters_prs_and_recent_and_paginates(monkeypatc
     )
 
     assert [issue["number"] for issue in stale] == [438, 402]
-    assert requested_pages == ["1", "2"]  # page 3 never fetched — stopped at the fresh issue
+    assert requested_pages == [
+        "1",
+        "2",
+    ]  # page 3 never fetched — stopped at the fresh issue
 
 
 def test_summarize_stale_issues_shape() -> None:
@@ -261,7 +270,10 @@ def test_build_digest_message_includes_stale_issues_section() -> None:
         repository="wangzitian0/infra2",
     )
     assert f"Stale open issues ({digest.STALE_ISSUE_DAYS}+ days untouched):" in message
-    assert "#438 Weekly ops review (https://github.com/wangzitian0/infra2/issues/438)" in message
+    assert (
+        "#438 Weekly ops review (https://github.com/wangzitian0/infra2/issues/438)"
+        in message
+    )
 
 
 def test_build_digest_message_omits_stale_issues_section_when_empty() -> None:
@@ -374,11 +386,68 @@ def test_summarize_watchdog_log_events_flags_missing_alert_evidence() -> None:
     assert audit["alert_recall_evidence_pct"] == 0.0
 
 
+def test_fetch_recent_run_logs_streams_events_and_caches_completed_runs(
+    monkeypatch, tmp_path
+) -> None:
+    """Run logs are reduced to watchdog events; completed runs are never re-downloaded."""
+    digest = _load_module()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as handle:
+        handle.writestr(
+            "1_watchdog.txt",
+            "\n".join(
+                [
+                    "2026-06-08T02:17:00Z noise",
+                    '2026-06-08T02:17:01Z {"event":"watchdog.check","status":"fail",'
+                    '"failure_domain":"alert-bridge"}',
+                    '2026-06-08T02:17:02Z {"event":"unrelated"}',
+                ]
+            ),
+        )
+    downloads: list[str] = []
+
+    def fake_urlopen(request, timeout):  # noqa: ANN001, ARG001
+        run_id = request.full_url.split("/actions/runs/", 1)[1].split("/", 1)[0]
+        downloads.append(run_id)
+        if run_id == "3":
+            raise OSError("log archive expired")
+        return io.BytesIO(archive.getvalue())
+
+    monkeypatch.setattr(digest, "urlopen", fake_urlopen)
+    runs = [
+        {"id": 1, "status": "completed"},
+        {"id": 2, "status": "in_progress"},
+        {"id": 3, "status": "completed"},
+    ]
+
+    first = digest.fetch_recent_run_logs(
+        "wangzitian0/infra2", "token", runs, cache_dir=tmp_path
+    )
+    second = digest.fetch_recent_run_logs(
+        "wangzitian0/infra2", "token", runs, cache_dir=tmp_path
+    )
+
+    assert first == second
+    assert list(first) == ["1", "2", "3"]
+    assert first["1"] == [
+        {"event": "watchdog.check", "status": "fail", "failure_domain": "alert-bridge"}
+    ]
+    assert first["3"][0]["event"] == "watchdog.digest.log_fetch_failure"
+    # run 1 is served from the cache; in-progress and failed fetches are retried.
+    assert sorted(downloads) == ["1", "2", "2", "3", "3"]
+    audit = digest.summarize_watchdog_log_events(first)
+    assert audit["failed_check_count"] == 2
+    assert audit["log_fetch_error_count"] == 1
+
+
 def test_weekly_digest_workflow_schedule_and_dispatch_contract() -> None:
     """Infra-012.8: weekly digest workflow keeps fixed weekly schedule + manual dry-run."""
     workflow = yaml.safe_load(WORKFLOW_PATH.read_text(encoding="utf-8"))
 
     assert {"cron": "0 1 * * 1"} in workflow["on"]["schedule"]
     assert "workflow_dispatch" in workflow["on"]
-    assert "watchdog-weekly-digest" in workflow["on"]["workflow_dispatch"]["inputs"]["task"]["options"]
+    assert (
+        "watchdog-weekly-digest"
+        in workflow["on"]["workflow_dispatch"]["inputs"]["task"]["options"]
+    )
     assert "dry_run" in workflow["on"]["workflow_dispatch"]["inputs"]
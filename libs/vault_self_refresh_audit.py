@@ -42,8 +42,10 @@ story at write time, not later.
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
+import base64
 import json
 import os
 import re
@@ -107,6 +109,14 @@ RESTART_RECENCY_WINDOW_SECONDS = 3600
 # (e.g. #475's tighter sidecar loop) may reasonably want a tighter window.
 DEFAULT_LOG_SINCE = "1h"
 
+# Live collection batches every Docker read for one host into a single remote
+# script (one SSH round-trip instead of ~5 per service) and runs the Vault token
+# lookups concurrently. A host whose batch cannot be run or parsed falls back to
+# the per-check helpers below, so a batching defect never blinds the audit.
+BATCH_SCRIPT_VERSION = 1
+TOKEN_LOOKUP_CONCURRENCY = 8
+_SAFE_CONTAINER_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
 ERROR_LOG_PATTERNS = (
     "permission denied",
     "token expired",
@@ -275,9 +285,7 @@ def inventory_ids_not_in_production() -> frozenset[str]:
 
     metas = {**bootstrap_facet_attrs(), **service_attrs()}
     owners = services_without_prod_compose() | {
-        service_id
-        for service_id, meta in metas.items()
-        if meta.not_yet_in_production
+        service_id for service_id, meta in metas.items() if meta.not_yet_in_production
     }
     excluded: set[str] = set()
     for service_id, meta in metas.items():
@@ -676,8 +684,7 @@ def audit_from_observations(
         # SecretsFacet; the facet keeps ${ENV_SUFFIX} symbolic, so resolve it
         # for the audited env before comparing against live container names.
         mount_exempt = {
-            _resolve_env_suffix(name, env)
-            for name in service.mount_exempt_containers
+            _resolve_env_suffix(name, env) for name in service.mount_exempt_containers
         }
         for app_state in obs.get("app_containers", []):
             exempt = str(app_state.get("name") or "") in mount_exempt
@@ -734,57 +741,139 @@ def collect_live_observations(
     vault_addr = _vault_addr_from_env(env_vars)
     dokploy_host = f"cloud.{internal_domain}" if internal_domain else None
     client = get_dokploy(host=dokploy_host)
-    observations: dict[str, Any] = {"services": {}}
-    for service in services:
-        compose = client.find_compose_by_name(
-            service.dokploy_service,
-            project_name=service.project,
-            env_name=env,
-        )
-        env_text = compose.get("env", "") if compose else ""
+    env_texts = _dokploy_env_texts(client, services, env)
+
+    def lookup(service: VaultService) -> dict[str, Any] | None:
         # AppRole services (#264/#531) have no static token to look up -- mirrors the
         # skip in classify_token / preflight_vault_token above.
         if service.auth_method == "approle":
-            token_lookup = None
-        else:
-            token = parse_env(env_text).get(service.vault_token_env_key)
-            token_lookup = (
-                verify_vault_token(
-                    token,
-                    addr=vault_addr,
-                    min_ttl_hours=service.min_token_ttl_hours,
-                )
-                if token
-                else None
+            return None
+        token = parse_env(env_texts[service.id]).get(service.vault_token_env_key)
+        if not token:
+            return None
+        return verify_vault_token(
+            token,
+            addr=vault_addr,
+            min_ttl_hours=service.min_token_ttl_hours,
+        )
+
+    with ThreadPoolExecutor(max_workers=TOKEN_LOOKUP_CONCURRENCY) as executor:
+        token_lookups = dict(zip(services, executor.map(lookup, services)))
+
+    agent_names = {
+        service.id: _resolve_env_suffix(service.vault_agent_container, env)
+        for service in services
+    }
+    app_names = {
+        service.id: [_resolve_env_suffix(name, env) for name in service.app_containers]
+        for service in services
+    }
+    # Only services with `optional_inert_fields` facet entries (#526/#542) have
+    # their rendered file read -- keeps secret-content exposure scoped to the
+    # fields this audit actually needs to see are non-empty.
+    text_agents = {
+        agent_names[service.id] for service in services if service.optional_inert_fields
+    }
+    batch = _remote_host_batch(
+        vps_host,
+        agents=sorted(set(agent_names.values())),
+        apps=sorted({name for names in app_names.values() for name in names}),
+        text_agents=text_agents,
+        since=log_since,
+    )
+
+    observations: dict[str, Any] = {"services": {}}
+    for service in services:
+        vault_agent_name = agent_names[service.id]
+        if batch is None:
+            host_view = _host_view_per_check(
+                vps_host,
+                vault_agent_name,
+                app_names[service.id],
+                read_text=vault_agent_name in text_agents,
+                since=log_since,
             )
-        vault_agent_name = _resolve_env_suffix(service.vault_agent_container, env)
-        app_names = [_resolve_env_suffix(name, env) for name in service.app_containers]
-        inert_fields = service.optional_inert_fields
+        else:
+            host_view = {
+                "rendered_env": batch["secret_state"][vault_agent_name],
+                "rendered_env_text": batch["secret_text"].get(vault_agent_name, ""),
+                "vault_agent_logs": batch["logs"][vault_agent_name],
+                "vault_agent_container": batch["containers"][vault_agent_name],
+                "app_containers": [
+                    batch["containers"][name] for name in app_names[service.id]
+                ],
+            }
         observations["services"][service.id] = {
-            "dokploy_env": env_text,
-            "token_lookup": token_lookup,
-            "rendered_env": _remote_secret_file_state(vps_host, vault_agent_name),
-            # Only fetched for services with `optional_inert_fields` facet
-            # entries (#526/#542) -- keeps secret-content exposure scoped to
-            # the fields this audit actually needs to see are non-empty.
-            "rendered_env_text": (
-                _remote_secret_file_text(vps_host, vault_agent_name)
-                if inert_fields
-                else ""
-            ),
-            "vault_agent_logs": _remote_container_logs(
-                vps_host, vault_agent_name, since=log_since
-            ),
-            "vault_agent_container": _remote_container_state(
-                vps_host, vault_agent_name
-            ),
-            "app_containers": [
-                _remote_container_state(vps_host, name) for name in app_names
-            ],
+            "dokploy_env": env_texts[service.id],
+            "token_lookup": token_lookups[service],
+            **host_view,
         }
     return observations
 
 
+def _dokploy_env_texts(
+    client: Any, services: list[VaultService], env: str
+) -> dict[str, str]:
+    """service.id -> Dokploy compose env, from ONE topology snapshot + one bulk fetch.
+
+    ``project.all`` composes are truncated (no ``env``), so the full objects come
+    from a single ``get_composes_many`` fan-out rather than a ``project.all`` +
+    ``compose.one`` pair per service. Clients without the snapshot/bulk API, or a
+    matched compose without an id, take the per-service ``find_compose_by_name``
+    path, whose errors propagate exactly as before.
+    """
+    texts: dict[str, str] = {}
+    topology = getattr(client, "topology", None)
+    get_many = getattr(client, "get_composes_many", None)
+    compose_ids: dict[str, str] = {}
+    if topology is not None and get_many is not None:
+        snapshot = topology()
+        for service in services:
+            compose = snapshot.find_compose(
+                service.dokploy_service, service.project, env
+            )
+            if compose is None:
+                texts[service.id] = ""
+            elif compose.get("composeId"):
+                compose_ids[service.id] = compose["composeId"]
+        fetched = get_many(list(compose_ids.values())) if compose_ids else {}
+        for service_id, compose_id in compose_ids.items():
+            compose = fetched[compose_id]
+            if isinstance(compose, Exception):
+                raise compose
+            texts[service_id] = (compose or {}).get("env", "") or ""
+    for service in services:
+        if service.id in texts:
+            continue
+        compose = client.find_compose_by_name(
+            service.dokploy_service,
+            project_name=service.project,
+            env_name=env,
+        )
+        texts[service.id] = compose.get("env", "") if compose else ""
+    return texts
+
+
+def _host_view_per_check(
+    host: str,
+    vault_agent_name: str,
+    app_names: list[str],
+    *,
+    read_text: bool,
+    since: str,
+) -> dict[str, Any]:
+    """One service's Docker reads as individual SSH round-trips (batch fallback)."""
+    return {
+        "rendered_env": _remote_secret_file_state(host, vault_agent_name),
+        "rendered_env_text": (
+            _remote_secret_file_text(host, vault_agent_name) if read_text else ""
+        ),
+        "vault_agent_logs": _remote_container_logs(host, vault_agent_name, since=since),
+        "vault_agent_container": _remote_container_state(host, vault_agent_name),
+        "app_containers": [_remote_container_state(host, name) for name in app_names],
+    }
+
+
 def inventory_compose_paths() -> set[str]:
     return {service.compose_path for service in load_inventory()}
 
@@ -920,6 +1009,12 @@ def _remote_container_state(host: str, container_name: str) -> dict[str, Any]:
     data = _remote_json(host, command)
     if not data.get("exists", True):
         return {"name": container_name, "exists": False, "error": data.get("error")}
+    return _container_state_from_inspect(container_name, data)
+
+
+def _container_state_from_inspect(
+    container_name: str, data: dict[str, Any]
+) -> dict[str, Any]:
     state = data.get("State", {})
     mounts = [mount.get("Destination") for mount in data.get("Mounts", [])]
     health = state.get("Health", {}).get("Status") or "none"
@@ -942,8 +1037,8 @@ def _remote_container_state(host: str, container_name: str) -> dict[str, Any]:
     }
 
 
-def _remote_secret_file_state(host: str, vault_agent_container: str) -> dict[str, Any]:
-    script = (
+def _secret_file_state_script() -> str:
+    return (
         "if [ ! -e /vault/secrets/.env ]; then "
         "printf '{\"exists\":false}'; "
         "elif [ ! -r /vault/secrets/.env ]; then "
@@ -957,6 +1052,10 @@ def _remote_secret_file_state(host: str, vault_agent_container: str) -> dict[str
         '"$size" "$mtime" "$has_no_value"; '
         "fi"
     )
+
+
+def _remote_secret_file_state(host: str, vault_agent_container: str) -> dict[str, Any]:
+    script = _secret_file_state_script()
     command = (
         f"docker exec {shlex.quote(vault_agent_container)} sh -lc {shlex.quote(script)}"
     )
@@ -1004,6 +1103,111 @@ def _remote_container_logs(
     return result.stdout + result.stderr
 
 
+def _host_batch_script(
+    agents: list[str], apps: list[str], text_agents: set[str], since: str
+) -> str:
+    """One POSIX-sh script printing every Docker read for a host as one JSON document.
+
+    Inspect output is Docker's own JSON; log and file bodies are base64 so no shell
+    quoting can corrupt the document. Each read keeps its per-check command's exact
+    flags (``--since``/``--tail``, the stat probe), so the observations match.
+    """
+    containers = sorted(set(agents) | set(apps))
+    probe = shlex.quote(_secret_file_state_script())
+    lines = [f'printf \'{{"batch":{BATCH_SCRIPT_VERSION},"inspect":[\'', "sep=''"]
+    for name in containers:
+        lines.append(
+            f"if out=$(docker inspect --format '{{{{json .}}}}' {name} 2>/dev/null); "
+            "then printf '%s%s' \"$sep\" \"$out\"; sep=','; fi"
+        )
+    lines += ["printf '],\"secret_state\":{'", "sep=''"]
+    for name in agents:
+        lines.append(
+            f'if out=$(docker exec {name} sh -lc {probe} 2>&1) && [ -n "$out" ]; '
+            f'then printf \'%s"%s":%s\' "$sep" {name} "$out"; '
+            'else printf \'%s"%s":{"exists":false,"error_b64":"%s"}\' '
+            f'"$sep" {name} "$(printf \'%s\' "$out" | base64 | tr -d \'\\n\')"; fi; '
+            "sep=','"
+        )
+    lines += ["printf '},\"logs\":{'", "sep=''"]
+    for name in agents:
+        lines.append(
+            f'printf \'%s"%s":"%s"\' "$sep" {name} '
+            f'"$(docker logs --since {shlex.quote(since)} --tail 200 {name} 2>&1 '
+            "| base64 | tr -d '\\n')\"; sep=','"
+        )
+    lines += ["printf '},\"secret_text\":{'", "sep=''"]
+    for name in sorted(text_agents):
+        lines.append(
+            f'printf \'%s"%s":"%s"\' "$sep" {name} '
+            f"\"$(docker exec {name} sh -lc 'cat /vault/secrets/.env 2>/dev/null' "
+            "| base64 | tr -d '\\n')\"; sep=','"
+        )
+    lines.append("printf '}}'")
+    return "\n".join(lines)
+
+
+def _b64_text(value: str) -> str:
+    return base64.b64decode(value or "").decode("utf-8", errors="replace")
+
+
+def _remote_host_batch(
+    host: str,
+    *,
+    agents: list[str],
+    apps: list[str],
+    text_agents: set[str],
+    since: str = DEFAULT_LOG_SINCE,
+) -> dict[str, Any] | None:
+    """Every container/secret-file/log read for ``host`` in ONE SSH round-trip.
+
+    Returns ``{"containers", "secret_state", "secret_text", "logs"}`` keyed by
+    container name, or None when the batch cannot be trusted (unsafe name, SSH
+    failure, unparseable or foreign document) so the caller falls back to the
+    per-check helpers.
+    """
+    names = set(agents) | set(apps)
+    if not names or not all(_SAFE_CONTAINER_NAME.match(name) for name in names):
+        return None
+    result = _ssh(host, _host_batch_script(agents, apps, text_agents, since))
+    if result.returncode != 0:
+        return None
+    try:
+        document = json.loads(result.stdout)
+        if (
+            not isinstance(document, dict)
+            or document.get("batch") != BATCH_SCRIPT_VERSION
+        ):
+            return None
+        inspected = {
+            str(item.get("Name", "")).lstrip("/"): item for item in document["inspect"]
+        }
+        secret_state = {}
+        for name in agents:
+            state = dict(document["secret_state"][name])
+            if "error_b64" in state:
+                state["error"] = _b64_text(state.pop("error_b64")).strip()
+            secret_state[name] = state
+        return {
+            "containers": {
+                name: (
+                    _container_state_from_inspect(name, inspected[name])
+                    if name in inspected
+                    else {"name": name, "exists": False, "error": ""}
+                )
+                for name in names
+            },
+            "secret_state": secret_state,
+            "secret_text": {
+                name: _b64_text(document["secret_text"].get(name, ""))
+                for name in text_agents
+            },
+            "logs": {name: _b64_text(document["logs"][name]) for name in agents},
+        }
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
 def write_report(report: dict[str, Any], *, as_json: bool = False) -> str:
     if as_json:
         return json.dumps(report, indent=2, sort_keys=True)
@@ -22,6 +22,7 @@ class AuthentikDeployer(Deployer):
     service = "authentik"
     compose_path = "platform/10.authentik/compose.yaml"
     data_path = "/data/platform/authentik"
+    secret_dependencies = ("postgres", "redis")
 
     # Backup facts (#542): the backup inventory derives from these
     # (formerly the ops.backup-inventory YAML, deleted).
@@ -19,6 +19,7 @@ class PrefectDeployer(Deployer):
     uid = "999"
     gid = "999"
     secret_key = "postgres_password"
+    secret_dependencies = ("postgres", "redis")
 
     subdomain = None
     service_port = 4200
@@ -16,6 +16,7 @@ class OpenPanelDeployer(Deployer):
     service = "openpanel"
     compose_path = "platform/24.openpanel/compose.yaml"
     data_path = "/data/platform/openpanel"
+    secret_dependencies = ("postgres", "redis")
 
     # Backup facts (#542): the backup inventory derives from these
     # (formerly the ops.backup-inventory YAML, deleted).
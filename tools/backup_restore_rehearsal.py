@@ -45,19 +45,16 @@ def main(argv: list[str] | None = None) -> int:
     )
     assert_rehearsal_target(args.target_container)
     download_dir = Path(args.download_dir)
-    archive = (
-        planned_artifact_path(artifact, download_dir)
-        if args.dry_run
-        else materialize_artifact(artifact, download_dir)
-    )
     invariants = tuple(args.invariant_sql) or (
         "SELECT 1",
         "SELECT count(*) >= 1 FROM pg_database",
     )
+    # Plan first: an artifact the rehearsal cannot replay is refused before any
+    # download. materialize_artifact writes to the planned path.
     plan = build_postgres_rehearsal_plan(
         entry=entries[args.service_id],
         artifact=artifact,
-        archive_path=archive,
+        archive_path=planned_artifact_path(artifact, download_dir),
         target_container=args.target_container,
         pg_user=args.pg_user,
         database=args.database,
@@ -72,6 +69,7 @@ def main(argv: list[str] | None = None) -> int:
         )
         return 0
 
+    materialize_artifact(artifact, download_dir)
     print(json.dumps(run_postgres_restore_rehearsal(plan), indent=2, sort_keys=True))
     return 0
 
@@ -1,19 +1,45 @@
 #!/usr/bin/env python3
-"""Create inventory-backed backup archives and optional off-host uploads."""
+"""Create inventory-backed backup archives and optional off-host uploads.
+
+Each entry is archived in a single streaming pass: tar -> compress -> sha256 ->
+``rclone rcat`` (or a local file with ``--no-upload``), so no full archive is
+staged on disk before upload. Independent entries run concurrently under a shared
+bandwidth budget, and the manifest records each artifact's compression ratio and
+throughput alongside the fields ``libs/backup_verification.py`` checks.
+
+``--incremental`` switches to content-defined chunks (``libs/backup_chunks.py``):
+each run uploads only chunks the remote store lacks plus a per-run index, which the
+manifest references and ``libs/backup_restore.py`` reassembles. New chunks are
+staged and moved to the remote in ``--chunk-batch-mib`` batches, so local disk
+never holds more than about one batch.
+"""
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import gzip
 import hashlib
 import json
 import os
-import shutil
 import subprocess
+import tarfile
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO
 
+from libs.backup_chunks import ChunkStore, build_index
 from libs.backup_verification import BackupEntry, load_backup_inventory
 
+CODECS = ("gzip", "zstd")
+ARCHIVE_SUFFIXES = {"gzip": ".tar.gz", "zstd": ".tar.zst"}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+DEFAULT_CHUNK_BATCH_MIB = 256
+_CHUNK_BYTES = 1024 * 1024
+
 
 def main() -> int:
     parser = argparse.ArgumentParser()
@@ -22,43 +48,91 @@ def main() -> int:
     parser.add_argument("--service", action="append", default=[])
     parser.add_argument("--no-upload", action="store_true")
     parser.add_argument("--manifest", default="")
+    parser.add_argument(
+        "--codec", choices=CODECS, default=os.getenv("BACKUP_CODEC", "gzip")
+    )
+    parser.add_argument("--level", type=int, default=None)
+    parser.add_argument(
+        "--jobs", type=int, default=int(os.getenv("BACKUP_CONCURRENCY", "2"))
+    )
+    parser.add_argument(
+        "--codec-threads",
+        type=int,
+        default=int(os.getenv("BACKUP_CODEC_THREADS", "0")),
+        help="zstd worker threads per job (0 = split the host's CPUs across jobs)",
+    )
+    parser.add_argument(
+        "--bandwidth-mib",
+        type=float,
+        default=float(os.getenv("BACKUP_BANDWIDTH_MIB", "0")),
+        help="total upload budget shared by all jobs, MiB/s (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=os.getenv("BACKUP_INCREMENTAL", "").lower() in {"1", "true", "yes"},
+        help="upload content-defined chunks + an index instead of a full archive",
+    )
+    parser.add_argument(
+        "--chunk-batch-mib",
+        type=int,
+        default=int(os.getenv("BACKUP_CHUNK_BATCH_MIB", str(DEFAULT_CHUNK_BATCH_MIB))),
+        help="incremental uploads: staged chunk bytes per rclone move (local disk bound)",
+    )
     args = parser.parse_args()
 
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     entries = _select_entries(load_backup_inventory(), set(args.service))
     timestamp = int(time.time())
-    artifacts = []
-    for entry in entries:
-        archive = _archive_entry(entry, output_dir, timestamp)
-        digest = _sha256(archive)
-        remote_uri = f"{args.remote.rstrip('/')}/{entry.service_id}/{archive.name}"
-        if not args.no_upload:
-            _upload(archive, remote_uri)
-        artifacts.append(
-            {
-                "service_id": entry.service_id,
-                "created_at": timestamp,
-                "size_bytes": archive.stat().st_size,
-                "sha256": digest,
-                "remote_uri": remote_uri if not args.no_upload else f"local:{archive}",
-                "method": entry.method,
-            }
+    jobs = max(1, args.jobs)
+    codec_threads = args.codec_threads or max(1, (os.cpu_count() or 1) // jobs)
+    throttle = _Throttle(int(args.bandwidth_mib * 1024 * 1024))
+    level = args.level if args.level is not None else DEFAULT_LEVELS[args.codec]
+
+    def run(entry: BackupEntry) -> dict:
+        if args.incremental:
+            return _backup_entry_chunked(
+                entry,
+                output_dir=output_dir,
+                timestamp=timestamp,
+                remote=None if args.no_upload else args.remote,
+                bwlimit_bytes=throttle.rate // jobs,
+                batch_bytes=max(1, args.chunk_batch_mib) * 1024 * 1024,
+            )
+        return _backup_entry(
+            entry,
+            output_dir=output_dir,
+            timestamp=timestamp,
+            remote=None if args.no_upload else args.remote,
+            codec=args.codec,
+            level=level,
+            codec_threads=codec_threads,
+            throttle=throttle,
         )
 
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        artifacts = list(executor.map(run, entries))
+
     manifest = {
         "schema_version": 1,
         "generated_at": timestamp,
         "verified_at": timestamp,
         "artifacts": artifacts,
     }
-    manifest_path = Path(args.manifest) if args.manifest else output_dir / "manifest.json"
-    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    manifest_path = (
+        Path(args.manifest) if args.manifest else output_dir / "manifest.json"
+    )
+    manifest_path.write_text(
+        json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
+    )
     print(manifest_path)
     return 0
 
 
-def _select_entries(entries: list[BackupEntry], selected: set[str]) -> list[BackupEntry]:
+def _select_entries(
+    entries: list[BackupEntry], selected: set[str]
+) -> list[BackupEntry]:
     if not selected:
         return entries
     known = {entry.service_id for entry in entries}
@@ -68,33 +142,387 @@ def _select_entries(entries: list[BackupEntry], selected: set[str]) -> list[Back
     return [entry for entry in entries if entry.service_id in selected]
 
 
-def _archive_entry(entry: BackupEntry, output_dir: Path, timestamp: int) -> Path:
-    source = Path(entry.data_path)
-    if not source.exists():
-        raise SystemExit(f"Backup source is missing: {entry.service_id} {source}")
-    archive_dir = output_dir / entry.service_id.replace("/", "_")
-    archive_dir.mkdir(parents=True, exist_ok=True)
-    archive_base = archive_dir / f"{timestamp}"
-    return Path(
-        shutil.make_archive(
-            str(archive_base),
-            "gztar",
-            root_dir=source,
-            base_dir=".",
+def _backup_entry(
+    entry: BackupEntry,
+    *,
+    output_dir: Path,
+    timestamp: int,
+    remote: str | None,
+    codec: str = "gzip",
+    level: int | None = None,
+    codec_threads: int = 1,
+    throttle: _Throttle | None = None,
+) -> dict:
+    """Archive one entry straight to its destination and return its manifest row."""
+    source = _source_dir(entry)
+    name = f"{timestamp}{ARCHIVE_SUFFIXES[codec]}"
+    started = time.monotonic()
+    if remote is None:
+        archive = _archive_dir(entry, output_dir) / name
+        with archive.open("wb") as handle:
+            sink = _Meter(handle, throttle=throttle, digest=True)
+            raw_bytes = _stream_archive(
+                source, sink, codec=codec, level=level, threads=codec_threads
+            )
+        remote_uri = f"local:{archive}"
+    else:
+        remote_uri = f"{remote.rstrip('/')}/{entry.service_id}/{name}"
+        sink, raw_bytes = _upload_stream(
+            source,
+            remote_uri,
+            codec=codec,
+            level=level,
+            codec_threads=codec_threads,
+            throttle=throttle,
         )
-    )
+    elapsed = max(time.monotonic() - started, 1e-6)
+    return {
+        "service_id": entry.service_id,
+        "created_at": timestamp,
+        "size_bytes": sink.bytes,
+        "sha256": sink.hexdigest(),
+        "remote_uri": remote_uri,
+        "method": entry.method,
+        "codec": codec,
+        "uncompressed_bytes": raw_bytes,
+        "compression_ratio": round(raw_bytes / sink.bytes, 3) if sink.bytes else 0.0,
+        "duration_seconds": round(elapsed, 3),
+        "throughput_bytes_per_second": int(raw_bytes / elapsed),
+    }
+
+
+def _backup_entry_chunked(
+    entry: BackupEntry,
+    *,
+    output_dir: Path,
+    timestamp: int,
+    remote: str | None,
+    bwlimit_bytes: int = 0,
+    batch_bytes: int = DEFAULT_CHUNK_BATCH_MIB * 1024 * 1024,
+) -> dict:
+    """Chunk one entry into its content-addressed store and return its manifest row.
+
+    The row's ``remote_uri``/``sha256``/``size_bytes`` describe the run's index (the
+    restorable artifact); chunks are uploaded before the index so a published index
+    never references a chunk the store lacks.
+    """
+    source = _source_dir(entry)
+    archive_dir = _archive_dir(entry, output_dir)
+    last_index_path = archive_dir / "last.index.json"
+    previous = _read_json(last_index_path)
+    started = time.monotonic()
+    if remote is None:
+        store_uri = f"local:{archive_dir / 'chunks'}"
+        index, stats = build_index(
+            source,
+            ChunkStore(archive_dir / "chunks"),
+            created_at=timestamp,
+            previous=previous,
+        )
+    else:
+        store_uri = f"{remote.rstrip('/')}/{entry.service_id}/chunks"
+        with tempfile.TemporaryDirectory(dir=archive_dir) as staging:
+            store = _UploadingChunkStore(
+                Path(staging),
+                store_uri,
+                batch_bytes=batch_bytes,
+                bwlimit_bytes=bwlimit_bytes,
+            )
+            index, stats = build_index(
+                source,
+                store,
+                created_at=timestamp,
+                previous=previous,
+                known_chunks=_remote_chunk_ids(store_uri),
+            )
+            store.flush()
+    index_path = archive_dir / f"{timestamp}.index.json"
+    index_bytes = json.dumps(index, sort_keys=True).encode()
+    index_path.write_bytes(index_bytes)
+    if remote is None:
+        remote_uri = f"local:{index_path}"
+    else:
+        remote_uri = f"{remote.rstrip('/')}/{entry.service_id}/{index_path.name}"
+        _rclone(["copyto", str(index_path), remote_uri], bwlimit_bytes=bwlimit_bytes)
+    last_index_path.write_bytes(index_bytes)
+    elapsed = max(time.monotonic() - started, 1e-6)
+    return {
+        "service_id": entry.service_id,
+        "created_at": timestamp,
+        "size_bytes": len(index_bytes),
+        "sha256": hashlib.sha256(index_bytes).hexdigest(),
+        "remote_uri": remote_uri,
+        "method": entry.method,
+        "format": "chunked",
+        "chunk_store_uri": store_uri,
+        "codec": "zlib",
+        "uncompressed_bytes": stats["logical_bytes"],
+        "chunks_total": stats["chunks_total"],
+        "chunks_new": stats["chunks_new"],
+        "uploaded_bytes": stats["stored_bytes"],
+        "files_reused": stats["files_reused"],
+        "compression_ratio": (
+            round(stats["new_bytes"] / stats["stored_bytes"], 3)
+            if stats["stored_bytes"]
+            else 0.0
+        ),
+        "duration_seconds": round(elapsed, 3),
+        "throughput_bytes_per_second": int(stats["logical_bytes"] / elapsed),
+    }
+
+
+class _UploadingChunkStore(ChunkStore):
+    """Staging store that moves its chunks to ``store_uri`` every ``batch_bytes``.
 
+    ``build_index`` only asks it about chunks of the current run; anything already
+    uploaded is in its ``known_chunks`` set, so emptying the staging directory
+    loses nothing. ``flush()`` ships the last partial batch.
+    """
 
-def _upload(archive: Path, remote_uri: str) -> None:
-    remote_dir = remote_uri.rsplit("/", 1)[0]
+    def __init__(
+        self, root: Path, store_uri: str, *, batch_bytes: int, bwlimit_bytes: int = 0
+    ):
+        super().__init__(root)
+        self.store_uri = store_uri
+        self.batch_bytes = batch_bytes
+        self.bwlimit_bytes = bwlimit_bytes
+        self.staged_bytes = 0
+
+    def put(self, chunk_id: str, data: bytes) -> int:
+        stored = super().put(chunk_id, data)
+        self.staged_bytes += stored
+        if self.staged_bytes >= self.batch_bytes:
+            self.flush()
+        return stored
+
+    def flush(self) -> None:
+        if not self.staged_bytes:
+            return
+        _rclone(
+            ["move", str(self.root), self.store_uri], bwlimit_bytes=self.bwlimit_bytes
+        )
+        self.staged_bytes = 0
+
+
+def _remote_chunk_ids(store_uri: str) -> set[str]:
     result = subprocess.run(
-        ["rclone", "copyto", str(archive), remote_uri],
+        ["rclone", "lsf", "-R", "--files-only", store_uri],
         text=True,
         capture_output=True,
         check=False,
     )
+    # A store that does not exist yet is the first incremental run, not an error.
+    if result.returncode != 0:
+        return set()
+    return {line.rsplit("/", 1)[-1] for line in result.stdout.split() if line}
+
+
+def _rclone(args: list[str], *, bwlimit_bytes: int = 0) -> None:
+    command = ["rclone", *args]
+    if bwlimit_bytes > 0:
+        command += ["--bwlimit", f"{max(1, bwlimit_bytes // 1024)}k"]
+    result = subprocess.run(command, text=True, capture_output=True, check=False)
     if result.returncode != 0:
-        raise SystemExit(result.stderr.strip() or f"rclone upload failed: {remote_dir}")
+        raise SystemExit(
+            result.stderr.strip() or f"rclone {args[0]} failed: {args[-1]}"
+        )
+
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _source_dir(entry: BackupEntry) -> Path:
+    source = Path(entry.data_path)
+    if not source.exists():
+        raise SystemExit(f"Backup source is missing: {entry.service_id} {source}")
+    return source
+
+
+def _archive_dir(entry: BackupEntry, output_dir: Path) -> Path:
+    archive_dir = output_dir / entry.service_id.replace("/", "_")
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    return archive_dir
+
+
+def _archive_entry(
+    entry: BackupEntry, output_dir: Path, timestamp: int, *, codec: str = "gzip"
+) -> Path:
+    """Write one entry's archive under ``output_dir`` (the ``--no-upload`` shape)."""
+    source = _source_dir(entry)
+    archive = _archive_dir(entry, output_dir) / f"{timestamp}{ARCHIVE_SUFFIXES[codec]}"
+    with archive.open("wb") as handle:
+        _stream_archive(source, handle, codec=codec)
+    return archive
+
+
+def _upload_stream(
+    source: Path,
+    remote_uri: str,
+    *,
+    codec: str,
+    level: int | None,
+    codec_threads: int,
+    throttle: _Throttle | None,
+) -> tuple[_Meter, int]:
+    """Pipe the compressed archive into ``rclone rcat``; rclone does the multipart upload."""
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(
+            ["rclone", "rcat", remote_uri], stdin=subprocess.PIPE, stderr=stderr
+        )
+        assert proc.stdin is not None
+        sink = _Meter(proc.stdin, throttle=throttle, digest=True)
+        raw_bytes = 0
+        try:
+            raw_bytes = _stream_archive(
+                source, sink, codec=codec, level=level, threads=codec_threads
+            )
+            proc.stdin.close()
+        except BrokenPipeError:
+            # rclone exited early; its status and stderr explain why.
+            with contextlib.suppress(OSError):
+                proc.stdin.close()
+        except BaseException:
+            # Kill rclone while its stdin is still open: a clean EOF would make it
+            # commit the truncated (yet well-formed) archive as the artifact.
+            proc.kill()
+            proc.wait()
+            with contextlib.suppress(OSError):
+                proc.stdin.close()
+            raise
+        returncode = proc.wait()
+        stderr.seek(0)
+        message = stderr.read().decode(errors="replace").strip()
+    if returncode != 0:
+        raise SystemExit(
+            message or f"rclone upload failed: {remote_uri.rsplit('/', 1)[0]}"
+        )
+    return sink, raw_bytes
+
+
+def _stream_archive(
+    source: Path,
+    target: BinaryIO,
+    *,
+    codec: str = "gzip",
+    level: int | None = None,
+    threads: int = 1,
+) -> int:
+    """Write ``source`` as a compressed tarball to ``target``; return the tar byte count.
+
+    Members are rooted at ``.`` like ``shutil.make_archive(..., base_dir=".")`` so
+    existing restore steps extract the same layout.
+    """
+    level = level if level is not None else DEFAULT_LEVELS[codec]
+    if codec == "gzip":
+        with gzip.GzipFile(
+            fileobj=target, mode="wb", compresslevel=level, mtime=0
+        ) as compressor:
+            raw = _Meter(compressor)
+            with tarfile.open(fileobj=raw, mode="w|") as tar:
+                tar.add(source, arcname=".")
+        return raw.bytes
+    if codec != "zstd":
+        raise SystemExit(f"Unknown backup codec: {codec}")
+
+    try:
+        proc = subprocess.Popen(
+            ["zstd", "-q", "-c", f"-{level}", f"-T{max(1, threads)}"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+    except FileNotFoundError as exc:
+        raise SystemExit("zstd codec needs the zstd binary on PATH") from exc
+    assert proc.stdin is not None and proc.stdout is not None
+    pump_error: list[BaseException] = []
+
+    def pump() -> None:
+        try:
+            for chunk in iter(lambda: proc.stdout.read(_CHUNK_BYTES), b""):
+                target.write(chunk)
+        except BaseException as exc:  # surfaced on the archiving thread below
+            pump_error.append(exc)
+            proc.kill()
+
+    reader = threading.Thread(target=pump, daemon=True)
+    reader.start()
+    raw = _Meter(proc.stdin)
+    try:
+        with tarfile.open(fileobj=raw, mode="w|") as tar:
+            tar.add(source, arcname=".")
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass  # the pump failed and killed zstd; re-raised below
+    except BaseException:
+        # Same rule as the upload: no EOF for zstd, so no well-formed frame
+        # around a partial tar reaches ``target``.
+        proc.kill()
+        reader.join()
+        proc.wait()
+        with contextlib.suppress(OSError):
+            proc.stdin.close()
+        raise
+    reader.join()
+    returncode = proc.wait()
+    if pump_error:
+        raise pump_error[0]
+    if returncode != 0:
+        raise SystemExit(f"zstd exited with code {returncode}")
+    return raw.bytes
+
+
+class _Throttle:
+    """Token bucket shared by every job so the total upload rate stays under budget."""
+
+    def __init__(self, bytes_per_second: int):
+        self.rate = bytes_per_second
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def consume(self, size: int) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + size / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+
+class _Meter:
+    """Write-through wrapper that counts bytes and optionally hashes and throttles them."""
+
+    def __init__(
+        self,
+        target: BinaryIO,
+        *,
+        throttle: _Throttle | None = None,
+        digest: bool = False,
+    ):
+        self.target = target
+        self.throttle = throttle
+        self.bytes = 0
+        self._digest = hashlib.sha256() if digest else None
+
+    def write(self, data: bytes) -> int:
+        if self.throttle is not None:
+            self.throttle.consume(len(data))
+        if self._digest is not None:
+            self._digest.update(data)
+        self.bytes += len(data)
+        self.target.write(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+    def hexdigest(self) -> str:
+        assert self._digest is not None
+        return self._digest.hexdigest()
 
 
 def _sha256(path: Path) -> str:
@@ -26,6 +26,7 @@ import math
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 import httpx  # Dokploy transport errors from libs.dokploy surface as httpx exceptions
@@ -49,6 +50,7 @@ from libs.deploy_contract import (
     validate_ref_form,
 )
 from libs.deploy_env_config import env_config
+from libs.registry_client import RegistryUnavailable, shared_registry_client
 from libs.service_registry import domain_for_service
 from libs.deploy.promote import deploy as _deploy_fixed
 from libs.deploy.promote import model_overrides_from_env
@@ -84,14 +86,12 @@ _INFRA2_DEFAULT_BRANCH = "main"
 _CANARY_PR = 999
 _DEFAULT_IMAGE_WAIT_SECONDS = 300
 _DEFAULT_IMAGE_POLL_SECONDS = 10.0
-_IMAGE_MANIFEST_ACCEPT = ", ".join(
-    [
-        "application/vnd.oci.image.index.v1+json",
-        "application/vnd.oci.image.manifest.v1+json",
-        "application/vnd.docker.distribution.manifest.list.v2+json",
-        "application/vnd.docker.distribution.manifest.v2+json",
-    ]
-)
+# Concurrent manifest HEADs per readiness round; a service declares a handful of images.
+_IMAGE_CHECK_CONCURRENCY = 8
+# Registry 429/5xx/transport errors back off geometrically up to this cap (or the
+# registry's Retry-After); plain "not published yet" rounds keep the base interval so
+# the gate returns as soon as the last image lands.
+_IMAGE_ERROR_BACKOFF_CAP_SECONDS = 60.0
 
 
 def _infra2_owner_name(repo: str) -> str:
@@ -223,91 +223,14 @@ def _env_number(name: str, default: float) -> float:
     return value
 
 
-def _registry_image_parts(image: str) -> tuple[str, str]:
-    registry, sep, repository = image.partition("/")
-    if not sep or not registry or not repository:
-        raise ValueError(
-            f"image repository must include registry and repository path, got {image!r}"
-        )
-    return registry, repository
-
-
-def _parse_bearer_authenticate(header: str) -> dict[str, str]:
-    scheme, _, rest = header.partition(" ")
-    if scheme.lower() != "bearer":
-        raise RuntimeError("registry did not return a Bearer authentication challenge")
-    params: dict[str, str] = {}
-    for item in rest.split(","):
-        key, sep, value = item.strip().partition("=")
-        if sep:
-            params[key] = value.strip().strip('"')
-    return params
-
-
-def _registry_bearer_token(client: httpx.Client, authenticate_header: str) -> str:
-    params = _parse_bearer_authenticate(authenticate_header)
-    realm = params.get("realm")
-    if not realm:
-        raise RuntimeError("registry Bearer challenge did not include a token realm")
-    token_params = {
-        key: value for key in ("service", "scope") if (value := params.get(key))
-    }
-    response = client.get(realm, params=token_params)
-    response.raise_for_status()
-    payload = response.json()
-    token = payload.get("token") or payload.get("access_token")
-    if not token:
-        raise RuntimeError("registry token response did not include a token")
-    return str(token)
-
-
-def _image_manifest_exists(
-    image: str, image_ref: str, *, client: httpx.Client | None = None
-) -> bool:
+def _image_manifest_exists(image: str, image_ref: str) -> bool:
     """Return whether ``image:image_ref`` exists in the registry.
 
     The app images live in GHCR, but this uses the standard Docker Registry v2
-    manifest API. Public GHCR packages often answer the first request with a
-    Bearer challenge; in that case we fetch an anonymous pull token and retry.
+    manifest API through the process-wide :class:`~libs.registry_client.RegistryClient`,
+    which reuses pooled connections and cached pull tokens across polls.
     """
-    registry, repository = _registry_image_parts(image)
-    url = f"https://{registry}/v2/{repository}/manifests/{image_ref}"
-    headers = {"Accept": _IMAGE_MANIFEST_ACCEPT}
-
-    def request(c: httpx.Client, *, token: str | None = None) -> httpx.Response:
-        req_headers = dict(headers)
-        if token:
-            req_headers["Authorization"] = f"Bearer {token}"
-        return c.get(url, headers=req_headers)
-
-    if client is None:
-        with httpx.Client(timeout=10.0, follow_redirects=True) as created:
-            return _image_manifest_exists(image, image_ref, client=created)
-
-    response = request(client)
-    if response.status_code == 401:
-        token = _registry_bearer_token(
-            client, response.headers.get("www-authenticate", "")
-        )
-        response = request(client, token=token)
-    if 200 <= response.status_code < 300:
-        return True
-    if response.status_code == 404:
-        return False
-    if response.status_code in (401, 403):
-        raise RuntimeError(
-            f"registry refused manifest check for {image}:{image_ref} "
-            f"(status {response.status_code})"
-        )
-    if response.status_code == 429 or response.status_code >= 500:
-        raise RuntimeError(
-            f"registry manifest check for {image}:{image_ref} is temporarily unavailable "
-            f"(status {response.status_code})"
-        )
-    raise RuntimeError(
-        f"registry manifest check for {image}:{image_ref} returned status "
-        f"{response.status_code}"
-    )
+    return shared_registry_client().manifest_exists(image, image_ref)
 
 
 def _wait_for_image_dependencies(
@@ -343,35 +266,58 @@ def _wait_for_image_dependencies(
         )
 
     deadline = time.monotonic() + max_wait
-    last_missing: list[str] = []
-    last_errors: list[str] = []
-    while True:
-        missing: list[str] = []
-        errors: list[str] = []
-        for image in repositories:
-            try:
-                if not _image_manifest_exists(image, image_ref):
-                    missing.append(image)
-            except (RuntimeError, httpx.HTTPError) as exc:
-                errors.append(f"{image}: {exc}")
-        if not missing and not errors:
-            return
-        last_missing = missing
-        last_errors = errors
-        if time.monotonic() >= deadline:
-            parts = []
-            if last_missing:
-                parts.append(
-                    "missing " + ", ".join(f"{i}:{image_ref}" for i in last_missing)
+    # Only images not yet seen are re-checked: a published manifest stays published.
+    pending = list(repositories)
+    backoff = interval
+    shared_registry_client().expect(pending)
+
+    def check(image: str) -> tuple[bool | None, Exception | None]:
+        try:
+            return _image_manifest_exists(image, image_ref), None
+        except (RuntimeError, httpx.HTTPError) as exc:
+            return None, exc
+
+    with ThreadPoolExecutor(
+        max_workers=min(len(pending), _IMAGE_CHECK_CONCURRENCY)
+    ) as executor:
+        while True:
+            results = list(zip(pending, executor.map(check, pending)))
+            missing = [image for image, (found, _) in results if found is False]
+            failures = [(image, exc) for image, (_, exc) in results if exc is not None]
+            pending = missing + [image for image, _ in failures]
+            if not pending:
+                return
+            if time.monotonic() >= deadline:
+                parts = []
+                if missing:
+                    parts.append(
+                        "missing " + ", ".join(f"{i}:{image_ref}" for i in missing)
+                    )
+                if failures:
+                    parts.append(
+                        "errors " + "; ".join(f"{i}: {exc}" for i, exc in failures)
+                    )
+                detail = "; ".join(parts) or "unknown registry readiness state"
+                raise RuntimeError(
+                    f"required image artifacts for {spec.key} image_ref {image_ref!r} "
+                    f"not published after {max_wait:g}s: {detail}"
                 )
-            if last_errors:
-                parts.append("errors " + "; ".join(last_errors))
-            detail = "; ".join(parts) or "unknown registry readiness state"
-            raise RuntimeError(
-                f"required image artifacts for {spec.key} image_ref {image_ref!r} "
-                f"not published after {max_wait:g}s: {detail}"
-            )
-        time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+            if failures:
+                retry_after = max(
+                    (
+                        exc.retry_after or 0.0
+                        for _, exc in failures
+                        if isinstance(exc, RegistryUnavailable)
+                    ),
+                    default=0.0,
+                )
+                backoff = min(
+                    max(backoff * 2, retry_after), _IMAGE_ERROR_BACKOFF_CAP_SECONDS
+                )
+                delay = backoff
+            else:
+                backoff = delay = interval
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
 
 
 def resolve_data_lane(target: DeployTarget) -> str:
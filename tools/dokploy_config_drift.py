@@ -10,7 +10,9 @@ How the expected hash is computed WITHOUT a worktree (main-worktree only):
   1. Enumerate WHICH files feed a service's hash using the REAL deploy enumeration on disk
      (_compose_artifact_files + the declared dependency globs) — no re-implementation, so the
      file set can't diverge from the deploy.
-  2. Read those files' CONTENT at the target ref via ``git cat-file --batch`` (in memory).
+  2. Read those files' CONTENT at the target ref through the shared
+     libs.git_objects reader (one long-lived ``git cat-file --batch``, blob-id cache), and
+     resolve the declared dependency globs against the ref's TREE, not today's disk.
   3. Feed (compose, env, items) to libs.deploy.deployer.config_hash_from_items — the SAME pure function
      compute_local_config_hash uses, now path-independent (so a ref's content reproduces the
      iac-runner's hash exactly).
@@ -34,8 +36,6 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-import glob as _glob  # noqa: E402
-
 from invoke import Context  # noqa: E402
 
 from libs.deploy.deployer import (  # noqa: E402
@@ -52,58 +52,44 @@ from libs.deploy_dependencies import (  # noqa: E402
     service_key_from_path,
 )
 from libs import service_registry  # noqa: E402
+from libs.git_objects import shared_reader  # noqa: E402
+
+
+# Disk enumeration (compose render + build-context walk) per Deployer, shared by every ref
+# a scan compares, instead of re-walking per ref.
+_ARTIFACT_PATHS: dict[type, list[str]] = {}
+
+
+def _artifact_paths(dep: type[Deployer], c: Context) -> list[str]:
+    if dep not in _ARTIFACT_PATHS:
+        compose_content = dep.get_compose_content(c)
+        _ARTIFACT_PATHS[dep] = [
+            _repo_rel(p)
+            for p in _compose_artifact_files(dep.compose_path, compose_content)
+        ]
+    return _ARTIFACT_PATHS[dep]
 
 
 def _hash_input_paths(
-    dep: type[Deployer], c: Context
+    dep: type[Deployer], c: Context, ref: str = "HEAD"
 ) -> tuple[str, list[str], list[str]]:
-    """Repo-relative (compose_path, artifact_paths, dep_paths) for a service, enumerated on disk
-    with the REAL deploy enumeration (so the file set matches what the deploy would hash)."""
-    compose_content = dep.get_compose_content(c)
-    artifact_paths = [
-        _repo_rel(p) for p in _compose_artifact_files(dep.compose_path, compose_content)
-    ]
+    """Repo-relative (compose_path, artifact_paths, dep_paths) for a service. Artifacts use
+    the REAL deploy enumeration on disk (so the file set matches what the deploy would hash);
+    the declared dependency globs resolve against ``ref``'s tree, i.e. the clean checkout the
+    iac-runner hashes at that ref (no __pycache__/.pyc, no untracked files)."""
+    reader = shared_reader(ROOT)
     key = service_key_from_path(dep.compose_path)
-    matched: set[Path] = set()
+    matched: set[str] = set()
     for pattern in extra_dependency_globs(key) if key else []:
-        for hit in _glob.glob(str(ROOT / pattern), recursive=True):
-            p = Path(hit)
-            # Same exclusion as libs.deploy.deployer._dependency_items_from_disk: transient
-            # __pycache__/.pyc/.pyo are not in git and absent on a clean checkout.
-            if (
-                p.is_file()
-                and "__pycache__" not in p.parts
-                and not p.name.endswith((".pyc", ".pyo"))
-            ):
-                matched.add(p.resolve())
-    dep_paths = [_repo_rel(p) for p in sorted(matched)]
-    return dep.compose_path, artifact_paths, dep_paths
+        matched.update(reader.glob(ref, pattern))
+    return dep.compose_path, _artifact_paths(dep, c), sorted(matched)
 
 
 def contents_at_ref(ref: str, paths: list[str]) -> dict[str, bytes]:
-    """{repo-relative path: content bytes} at a git ref, via one ``git cat-file --batch`` (in
-    memory; no checkout / worktree). A path absent at the ref is omitted (caller detects it)."""
-    if not paths:
-        return {}
-    stdin = "".join(f"{ref}:{p}\n" for p in paths).encode()
-    proc = subprocess.run(
-        ["git", "cat-file", "--batch"], input=stdin, cwd=ROOT, capture_output=True
-    )
-    proc.check_returncode()
-    out: dict[str, bytes] = {}
-    buf = proc.stdout
-    pos = 0
-    for path in paths:
-        nl = buf.index(b"\n", pos)
-        header = buf[pos:nl].decode()
-        pos = nl + 1
-        if header.endswith(" missing"):
-            continue  # path does not exist at this ref
-        _sha, _type, size = header.split()
-        size = int(size)
-        out[path] = buf[pos : pos + size]
-        pos += size + 1  # skip content + trailing newline
-    return out
+    """{repo-relative path: content bytes} at a git ref, via the shared ``git cat-file
+    --batch`` reader (in memory; no checkout / worktree; a blob shared by several services or
+    refs is read once). A path absent at the ref is omitted (caller detects it)."""
+    return shared_reader(ROOT).contents_at_ref(ref, paths)
 
 
 def _source_env_vars(dep: type[Deployer]) -> dict[str, str]:
@@ -117,7 +103,7 @@ def expected_hash_at(
 ) -> tuple[str | None, list[str]]:
     """(hash, missing_paths) — the config hash recomputed from `ref`'s content. missing_paths
     are hash-input files that don't exist at `ref` (a structural change → can't compare)."""
-    compose_path, artifact_paths, dep_paths = _hash_input_paths(dep, c)
+    compose_path, artifact_paths, dep_paths = _hash_input_paths(dep, c, ref)
     contents = contents_at_ref(ref, [compose_path, *artifact_paths, *dep_paths])
     missing = [
         p for p in (compose_path, *artifact_paths, *dep_paths) if p not in contents
@@ -206,17 +192,7 @@ def _latest_release_tag() -> str:
 
 
 def _commit_at_ref(ref: str) -> str:
-    value = (
-        subprocess.run(
-            ["git", "rev-parse", f"{ref}^{{commit}}"],
-            cwd=ROOT,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        .stdout.strip()
-        .lower()
-    )
+    value = (shared_reader(ROOT).commit(ref) or "").lower()
     if not EXACT_COMMIT_RE.fullmatch(value):
         raise RuntimeError(f"{ref} did not resolve to an exact commit SHA")
     return value
@@ -226,32 +202,41 @@ def _deployed_identities() -> dict[str, DeployedIdentity]:
     from libs.dokploy import DokployClient
     from libs.service_registry import _LAYERS
 
-    client = DokployClient()
-    out: dict[str, DeployedIdentity] = {}
-    for p in client.list_projects():
-        if p.get("name") not in _LAYERS:
-            continue
-        for env in p.get("environments", []):
-            if env.get("name") != "production":
+    targets: list[tuple[str, str]] = []  # (service key, composeId)
+    with DokployClient() as client:
+        for p in client.list_projects():
+            if p.get("name") not in _LAYERS:
                 continue
-            for cp in env.get("compose") or []:
-                d = client._request("GET", f"compose.one?composeId={cp['composeId']}")
-                env_str = d.get("env") or ""
-                values = {}
-                for line in env_str.splitlines():
-                    key, separator, value = line.partition("=")
-                    if separator and key in {
-                        "IAC_CONFIG_HASH",
-                        "IAC_SOURCE_CONFIG_HASH",
-                        "IAC_DEPLOY_REF",
-                    }:
-                        values[key] = value.strip()
-                if values:
-                    out[f"{p['name']}/{cp['name']}"] = DeployedIdentity(
-                        runtime_hash=values.get("IAC_CONFIG_HASH"),
-                        source_hash=values.get("IAC_SOURCE_CONFIG_HASH"),
-                        deploy_ref=values.get("IAC_DEPLOY_REF"),
-                    )
+            for env in p.get("environments", []):
+                if env.get("name") != "production":
+                    continue
+                for cp in env.get("compose") or []:
+                    targets.append((f"{p['name']}/{cp['name']}", cp["composeId"]))
+
+        # One bounded-concurrency fan-out over compose.one instead of one call
+        # after another; a failed read still aborts the scan, as the serial loop did.
+        composes = client.get_composes_many([compose_id for _, compose_id in targets])
+    out: dict[str, DeployedIdentity] = {}
+    for key, compose_id in targets:
+        d = composes[compose_id]
+        if isinstance(d, Exception):
+            raise d
+        env_str = d.get("env") or ""
+        values = {}
+        for line in env_str.splitlines():
+            k, separator, value = line.partition("=")
+            if separator and k in {
+                "IAC_CONFIG_HASH",
+                "IAC_SOURCE_CONFIG_HASH",
+                "IAC_DEPLOY_REF",
+            }:
+                values[k] = value.strip()
+        if values:
+            out[key] = DeployedIdentity(
+                runtime_hash=values.get("IAC_CONFIG_HASH"),
+                source_hash=values.get("IAC_SOURCE_CONFIG_HASH"),
+                deploy_ref=values.get("IAC_DEPLOY_REF"),
+            )
     return out
 
 
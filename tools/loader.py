@@ -1,15 +1,29 @@
 """
 Task loader for invoke automation
 Discovers and loads tasks from bootstrap, platform, and tools directories.
+
+Importing every component's deploy.py/shared_tasks.py (and their transitive
+imports) costs far more than any single task needs, and the iac-runner pays it
+on every ``invoke <svc>.sync`` subprocess. After one eager load the task
+metadata (names, params, help) is written to a task index; while the tree is
+unchanged, later startups build placeholder tasks from the index and only
+import a component's modules when one of its tasks actually runs.
+
+Set ``INFRA2_TASK_INDEX`` to move the index, or to ``0`` to always load eagerly.
 """
 
 from __future__ import annotations
 
 from invoke import Collection, Task
 from pathlib import Path
+import hashlib
 import importlib.util
+import inspect
+import json
+import os
+import re
 import sys
-from typing import Optional
+from typing import Any, Optional
 from dotenv import load_dotenv
 from libs.console import success, error, warning
 
@@ -17,6 +31,38 @@ from libs.console import success, error, warning
 load_dotenv()
 load_dotenv(".env.local", override=True)
 
+ROOT = Path(__file__).parent.parent
+
+# Bump when the index layout or the placeholder semantics change.
+TASK_INDEX_VERSION = 1
+TASK_INDEX_ENV = "INFRA2_TASK_INDEX"
+DEFAULT_TASK_INDEX = Path(".cache") / "invoke-task-index.json"
+
+# (project dir relative to root, project name, task-name prefix). Prefixes avoid
+# conflicts with platform/postgres, platform/redis and must match
+# discover_services() in libs/deploy/deployer.py.
+_PROJECTS = [
+    ("", "bootstrap", ""),
+    ("", "platform", ""),
+    # App layers use a nested structure: <app>/<app>/
+    ("finance_report", "finance_report", "fr-"),
+    ("truealpha", "truealpha", "ta-"),
+]
+
+# Tools are loaded into isolated namespaces to avoid task name collisions.
+_TOOLS = [
+    ("env", "env_tool"),
+    ("dokploy", "dokploy_env"),
+    ("local", "local_init"),
+    ("vault-audit", "vault_audit"),
+]
+
+# Cross-component lookups (e.g. platform/03.minio shared tasks used by app
+# deploys) go through the loader's sys.modules registrations.
+_SYS_MODULES_LOOKUP = re.compile(r"""sys\.modules\.get\(\s*["']([^"']+)["']""")
+
+_SCALARS = (type(None), bool, int, float, str)
+
 
 def _load_module(file_path, module_name):
     """Load a Python file as a module"""
@@ -65,94 +111,387 @@ def _load_tasks_into_collection(
     return len(collection.tasks) > before
 
 
-def _load_project(ns, root, project_name, prefix=""):
-    """Load all services from a project directory
+def _project_namespaces(root, project_name, prefix=""):
+    """Describe the namespaces of all services in a project directory
 
     Args:
-        ns: Root namespace collection
         root: Root directory path
         project_name: Name of the project (e.g., 'platform', 'finance_report')
         prefix: Optional task-name prefix (e.g. 'fr-') to avoid conflicts with
             platform services. Must match discover_services() in libs/deploy/deployer.py.
+
+    Returns:
+        One spec per component: ``{"name", "label", "sources"}`` where each
+        source is ``[path, module_name, sub_collection]`` in load order
+        (deploy.py reads its shared tasks back out of sys.modules).
     """
     project_dir = root / project_name
     if not project_dir.exists():
-        return
+        return []
 
+    specs = []
     for comp_dir in sorted(project_dir.iterdir()):
         if not comp_dir.is_dir():
             continue
 
         name = comp_dir.name.split(".")[-1]
-        # Prefix service name if needed (e.g., fr-postgres, ta-postgres)
-        task_name = f"{prefix}{name}"
-        coll = Collection()
-        loaded = False
-
-        loaded |= _load_tasks_into_collection(
-            comp_dir / "shared_tasks.py",
-            f"{project_name}.{comp_dir.name}.shared",
-            coll,
-            sub_name="shared",
-        )
-        loaded |= _load_tasks_into_collection(
-            comp_dir / "deploy.py",
-            f"{project_name}.{comp_dir.name}.deploy",
-            coll,
-        )
+        module_base = f"{project_name}.{comp_dir.name}"
+        sources = [
+            [str(comp_dir / filename), f"{module_base}.{suffix}", sub]
+            for filename, suffix, sub in (
+                ("shared_tasks.py", "shared", "shared"),
+                ("deploy.py", "deploy", None),
+                ("tasks.py", "tasks", None),
+            )
+            if (comp_dir / filename).exists()
+        ]
+        if sources:
+            specs.append(
+                {
+                    # Prefix service name if needed (e.g., fr-postgres, ta-postgres)
+                    "name": f"{prefix}{name}",
+                    "label": f"{project_name}/{name}",
+                    "sources": sources,
+                }
+            )
+    return specs
+
+
+def _tool_namespaces(root):
+    """Describe the tools namespaces (one module each)."""
+    tools_dir = root / "tools"
+    return [
+        {
+            "name": name,
+            "label": f"tools/{name}",
+            "sources": [[str(tools_dir / f"{module}.py"), f"tools.{module}", None]],
+        }
+        for name, module in _TOOLS
+        if (tools_dir / f"{module}.py").exists()
+    ]
+
+
+def _namespace_specs(root):
+    """All task namespaces in load order."""
+    specs = []
+    for parent, project, prefix in _PROJECTS:
+        specs.extend(_project_namespaces(root / parent, project, prefix))
+    specs.extend(_tool_namespaces(root))
+    return specs
+
+
+def _load_namespace(spec) -> Optional[Collection]:
+    """Import a namespace's sources in order; None if they define no tasks."""
+    coll = Collection()
+    loaded = False
+    for path, module_name, sub_name in spec["sources"]:
         loaded |= _load_tasks_into_collection(
-            comp_dir / "tasks.py",
-            f"{project_name}.{comp_dir.name}.tasks",
-            coll,
+            Path(path), module_name, coll, sub_name=sub_name
         )
+    return coll if loaded else None
 
-        if loaded:
-            ns.add_collection(coll, name=task_name)
-            success(f"{project_name}/{name}")
 
+# ---------------------------------------------------------------------------
+# Task index
+# ---------------------------------------------------------------------------
 
-def _load_tools(ns, root):
-    """Load tools as a special project"""
-    tools_dir = root / "tools"
-    if not tools_dir.exists():
-        return
 
-    # Tools are loaded into isolated namespaces to avoid task name collisions.
-    coll = Collection()
-    if _load_tasks_into_collection(tools_dir / "env_tool.py", "tools.env_tool", coll):
-        ns.add_collection(coll, name="env")
-        success("tools/env")
+def task_index_path(root: Path = ROOT) -> Optional[Path]:
+    """Where the task index lives, or None when lazy loading is disabled."""
+    raw = os.environ.get(TASK_INDEX_ENV, "").strip()
+    if raw.lower() in {"0", "off", "false", "no"}:
+        return None
+    return Path(raw).expanduser() if raw else root / DEFAULT_TASK_INDEX
 
-    coll = Collection()
-    if _load_tasks_into_collection(
-        tools_dir / "dokploy_env.py", "tools.dokploy_env", coll
-    ):
-        ns.add_collection(coll, name="dokploy")
-        success("tools/dokploy")
 
-    coll = Collection()
-    if _load_tasks_into_collection(
-        tools_dir / "local_init.py", "tools.local_init", coll
-    ):
-        ns.add_collection(coll, name="local")
-        success("tools/local")
+def tree_signature(root: Path = ROOT) -> str:
+    """Fingerprint everything that can change the task set.
 
+    Stats (not contents) of every source file under the task projects, tools/
+    and libs/ (make_tasks lives there), plus the interpreter and invoke
+    versions. Cheap enough to run on every startup.
+    """
+    import invoke
+
+    digest = hashlib.sha256()
+    digest.update(
+        f"{TASK_INDEX_VERSION}|{sys.version}|{invoke.__version__}|{root}".encode()
+    )
+    dirs = [root / parent / project for parent, project, _ in _PROJECTS]
+    dirs += [root / "tools", root / "libs"]
+    for base in dirs:
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(
+                d for d in dirnames if d not in {"__pycache__", "tests"}
+            )
+            for filename in sorted(filenames):
+                if not filename.endswith(".py"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+class _Unindexable(Exception):
+    """A task whose metadata cannot be replayed from JSON."""
+
+
+def _scalar(value):
+    if not isinstance(value, _SCALARS):
+        raise _Unindexable(f"non-scalar value {value!r}")
+    return value
+
+
+def _task_key(collection: Collection, task: Any) -> str:
+    for key, candidate in collection.tasks.items():
+        if candidate is task:
+            return key
+    raise _Unindexable(f"pre/post task {task!r} is not in the same collection")
+
+
+def _task_entry(collection: Collection, sub: str, key: str, task: Task) -> dict:
+    if type(task) is not Task:
+        raise _Unindexable(f"{key}: custom task class {type(task).__name__}")
+    params = []
+    for param in task.argspec(task.body).parameters.values():
+        has_default = param.default is not inspect.Parameter.empty
+        params.append(
+            [
+                param.name,
+                param.kind.name,
+                has_default,
+                _scalar(param.default) if has_default else None,
+            ]
+        )
+    return {
+        "collection": sub,
+        "name": key,
+        "body": task.__name__,
+        "module": task.__module__,
+        "doc": task.__doc__,
+        "params": params,
+        "aliases": list(task.aliases),
+        "default": bool(task.is_default),
+        "positional": list(task.positional),
+        "optional": list(task.optional),
+        "iterable": list(task.iterable),
+        "incrementable": list(task.incrementable),
+        "auto_shortflags": task.auto_shortflags,
+        "autoprint": task.autoprint,
+        "help": {str(k): _scalar(v) for k, v in task.help.items()},
+        "pre": [_task_key(collection, t) for t in task.pre],
+        "post": [_task_key(collection, t) for t in task.post],
+    }
+
+
+def _namespace_tasks(coll: Collection) -> list[dict]:
+    entries = []
+    for sub, collection in [("", coll), *sorted(coll.collections.items())]:
+        if sub and collection.collections:
+            raise _Unindexable("nested sub-collections")
+        for key, task in collection.tasks.items():
+            entries.append(_task_entry(collection, sub, key, task))
+    return entries
+
+
+def build_task_index(loaded, signature: str) -> dict:
+    """Index of eagerly ``loaded`` ``(spec, collection)`` pairs.
+
+    A namespace whose tasks cannot be replayed from JSON (custom Task classes,
+    non-scalar defaults, cross-collection pre/post) is kept but flagged
+    ``eager`` so indexed startups still import it up front.
+    """
+    owners = {
+        module_name: spec["name"]
+        for spec, _ in loaded
+        for _, module_name, _ in spec["sources"]
+    }
+    namespaces = []
+    for spec, coll in loaded:
+        entry = dict(spec)
+        requires = set()
+        for path, _, _ in spec["sources"]:
+            source = Path(path).read_text(encoding="utf-8")
+            requires.update(
+                owners[name]
+                for name in _SYS_MODULES_LOOKUP.findall(source)
+                if name in owners
+            )
+        requires.discard(spec["name"])
+        entry["requires"] = sorted(requires)
+        try:
+            entry["tasks"] = _namespace_tasks(coll)
+        except _Unindexable:
+            entry["eager"] = True
+        namespaces.append(entry)
+    return {
+        "version": TASK_INDEX_VERSION,
+        "signature": signature,
+        "namespaces": namespaces,
+    }
+
+
+def read_task_index(path: Path, signature: str) -> Optional[dict]:
+    """The index at ``path`` if it still describes this tree, else None."""
+    try:
+        index = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict):
+        return None
+    if index.get("version") != TASK_INDEX_VERSION:
+        return None
+    if index.get("signature") != signature:
+        return None
+    return index
+
+
+def write_task_index(path: Path, index: dict) -> None:
+    """Atomically write the index; a read-only checkout just stays eager."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(index, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        warning(f"Task index not written ({path}): {e}")
+        tmp.unlink(missing_ok=True)
+
+
+class _LazyNamespace:
+    """An indexed namespace whose modules are imported on first task call."""
+
+    def __init__(self, spec: dict, registry: dict[str, "_LazyNamespace"]):
+        self.spec = spec
+        self.registry = registry
+        self.collection: Optional[Collection] = None
+        self._loading = False
+
+    def realize(self) -> Optional[Collection]:
+        if self.collection is not None or self._loading:
+            return self.collection
+        self._loading = True
+        try:
+            for name in self.spec.get("requires", []):
+                required = self.registry.get(name)
+                if required is not None:
+                    required.realize()
+            self.collection = _load_namespace(self.spec)
+        finally:
+            self._loading = False
+        return self.collection
+
+    def resolve(self, sub: str, name: str) -> Task:
+        coll = self.realize()
+        if coll is not None and sub:
+            coll = coll.collections.get(sub)
+        task = coll.tasks.get(name) if coll is not None else None
+        if task is None:
+            raise RuntimeError(
+                f"Task {self.spec['name']}.{name} is in the task index but not in "
+                f"{self.spec['label']}; remove {task_index_path()} and retry"
+            )
+        return task
+
+
+def _placeholder(namespace: _LazyNamespace, entry: dict) -> Task:
+    """A task with the indexed signature that runs the real task on call."""
+
+    def body(*args, **kwargs):
+        real = namespace.resolve(entry["collection"], entry["name"])
+        return real(*args, **kwargs)
+
+    params = [inspect.Parameter("c", inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+    for name, kind, has_default, default in entry["params"]:
+        params.append(
+            inspect.Parameter(
+                name,
+                inspect._ParameterKind[kind],
+                default=default if has_default else inspect.Parameter.empty,
+            )
+        )
+    body.__signature__ = inspect.Signature(params)
+    body.__name__ = body.__qualname__ = entry["body"]
+    body.__doc__ = entry["doc"]
+    body.__module__ = entry["module"]
+    return Task(
+        body,
+        name=entry["name"],
+        aliases=entry["aliases"],
+        positional=entry["positional"],
+        optional=entry["optional"],
+        default=entry["default"],
+        auto_shortflags=entry["auto_shortflags"],
+        help=entry["help"],
+        autoprint=entry["autoprint"],
+        iterable=entry["iterable"],
+        incrementable=entry["incrementable"],
+    )
+
+
+def _indexed_collection(namespace: _LazyNamespace) -> Collection:
     coll = Collection()
-    if _load_tasks_into_collection(
-        tools_dir / "vault_audit.py", "tools.vault_audit", coll
-    ):
-        ns.add_collection(coll, name="vault-audit")
-        success("tools/vault-audit")
-
-
-def load_all():
-    """Load all modules from all projects"""
-    from libs.common import validate_env
+    subs: dict[str, Collection] = {"": coll}
+    tasks: dict[tuple[str, str], Task] = {}
+    for entry in namespace.spec["tasks"]:
+        sub = entry["collection"]
+        if sub not in subs:
+            subs[sub] = Collection()
+        task = _placeholder(namespace, entry)
+        tasks[sub, entry["name"]] = task
+        subs[sub].add_task(task)
+    # pre/post reference placeholders so invoke's call-chain dedup still works.
+    for entry in namespace.spec["tasks"]:
+        task = tasks[entry["collection"], entry["name"]]
+        task.pre = [tasks[entry["collection"], key] for key in entry["pre"]]
+        task.post = [tasks[entry["collection"], key] for key in entry["post"]]
+    for sub, collection in subs.items():
+        if sub:
+            coll.add_collection(collection, name=sub)
+    return coll
+
+
+def _load_indexed(ns: Collection, index: dict) -> None:
+    registry: dict[str, _LazyNamespace] = {}
+    for spec in index["namespaces"]:
+        registry[spec["name"]] = _LazyNamespace(spec, registry)
+    for name, namespace in registry.items():
+        if namespace.spec.get("eager"):
+            coll = namespace.realize()
+            if coll is not None:
+                ns.add_collection(coll, name=name)
+        else:
+            ns.add_collection(_indexed_collection(namespace), name=name)
+
+
+def _load_eager(ns: Collection, root: Path) -> list:
+    loaded = []
+    for spec in _namespace_specs(root):
+        coll = _load_namespace(spec)
+        if coll is not None:
+            ns.add_collection(coll, name=spec["name"])
+            success(spec["label"])
+            loaded.append((spec, coll))
+    return loaded
+
+
+def load_all(root: Path = ROOT, index_path: Optional[Path] = None):
+    """Load all modules from all projects
+
+    Uses the task index at ``index_path`` (default: ``task_index_path()``)
+    when it matches the tree, otherwise loads eagerly and rewrites it.
+    """
     from invoke import task
 
     @task
     def check_env(c):
         """Check required environment variables"""
+        from libs.common import validate_env
+
         missing = validate_env()
         if missing:
             error(f"Missing: {', '.join(missing)}")
@@ -162,20 +501,20 @@ def load_all():
     ns = Collection()
     ns.add_task(check_env)
 
-    root = Path(__file__).parent.parent
-
-    # Load projects
-    for project in ["bootstrap", "platform"]:
-        _load_project(ns, root, project)
-
-    # Load app layers (nested structure: <app>/<app>/)
-    # Prefixes avoid conflicts with platform/postgres, platform/redis
-    _load_project(ns, root / "finance_report", "finance_report", prefix="fr-")
-    _load_project(ns, root / "truealpha", "truealpha", prefix="ta-")
+    if index_path is None:
+        index_path = task_index_path(root)
+    if index_path is None:
+        _load_eager(ns, root)
+        return ns
 
-    # Load tools
-    _load_tools(ns, root)
+    signature = tree_signature(root)
+    index = read_task_index(index_path, signature)
+    if index is not None:
+        _load_indexed(ns, index)
+        return ns
 
+    loaded = _load_eager(ns, root)
+    write_task_index(index_path, build_task_index(loaded, signature))
     return ns
 
 
@@ -8,7 +8,9 @@ import os
 import re
 import subprocess
 import sys
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
@@ -32,6 +34,11 @@ DEFAULT_WORKER_STATUS_URL = (
     "https://infra2-cloudflare-watchdog.wangzitian-ai.workers.dev/status"
 )
 
+# HTTP targets are independent endpoints; SSH sessions share one ControlMaster
+# connection and stay under sshd's default MaxSessions (10).
+CHECK_CONCURRENCY = 8
+SSH_SESSION_CONCURRENCY = 8
+
 DEFAULT_SSH_TARGETS = """\
 infra2-ssh|echo infra2-ssh-ok|infra2-ssh-ok
 infra2-docker|docker info >/dev/null && echo docker-ok|docker-ok
@@ -126,40 +133,57 @@ def run_http_checks(
     *,
     max_attempts: int = 2,
     retry_delay_seconds: float = 60.0,
+    concurrency: int = CHECK_CONCURRENCY,
 ) -> list[CheckResult]:
-    """Run public endpoint checks from outside infra2 with bounded retries."""
-    results: list[CheckResult] = []
+    """Run public endpoint checks from outside infra2 with bounded retries.
+
+    Targets run concurrently and each sleeps out its own retry delay, so one
+    flapping endpoint never holds up the others. Results keep target order.
+    """
     attempts = max(1, max_attempts)
     retry_delay = max(0.0, retry_delay_seconds)
-    for target in targets:
-        result: CheckResult | None = None
-        for attempt in range(1, attempts + 1):
-            result = _run_http_check_once(target, timeout)
-            if result.ok:
-                detail = result.detail
-                if attempt > 1:
-                    detail = f"{result.detail}; recovered_on_attempt={attempt}"
-                result = CheckResult(
-                    result.name,
-                    True,
-                    detail,
-                    result.failure_domain,
-                    attempt_count=attempt,
-                )
-                break
-            if attempt < attempts and retry_delay > 0:
-                time.sleep(retry_delay)
-        assert result is not None
-        if not result.ok:
-            result = CheckResult(
+    if not targets:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(concurrency, len(targets)))
+    ) as executor:
+        return list(
+            executor.map(
+                lambda target: _run_http_check_with_retries(
+                    target, timeout, attempts, retry_delay
+                ),
+                targets,
+            )
+        )
+
+
+def _run_http_check_with_retries(
+    target: HttpTarget, timeout: float, attempts: int, retry_delay: float
+) -> CheckResult:
+    result: CheckResult | None = None
+    for attempt in range(1, attempts + 1):
+        result = _run_http_check_once(target, timeout)
+        if result.ok:
+            detail = result.detail
+            if attempt > 1:
+                detail = f"{result.detail}; recovered_on_attempt={attempt}"
+            return CheckResult(
                 result.name,
-                result.ok,
-                result.detail,
+                True,
+                detail,
                 result.failure_domain,
-                attempt_count=attempts,
+                attempt_count=attempt,
             )
-        results.append(result)
-    return results
+        if attempt < attempts and retry_delay > 0:
+            time.sleep(retry_delay)
+    assert result is not None
+    return CheckResult(
+        result.name,
+        result.ok,
+        result.detail,
+        result.failure_domain,
+        attempt_count=attempts,
+    )
 
 
 def run_worker_status_check(
@@ -351,9 +375,19 @@ def _run_http_check_once(target: HttpTarget, timeout: float) -> CheckResult:
 
 
 def run_ssh_checks(
-    config: SshConfig | None, targets: list[SshTarget], timeout: float = 20.0
+    config: SshConfig | None,
+    targets: list[SshTarget],
+    timeout: float = 20.0,
+    *,
+    concurrency: int = SSH_SESSION_CONCURRENCY,
 ) -> list[CheckResult]:
-    """Run bridge health checks through SSH from the external runner."""
+    """Run bridge health checks through SSH from the external runner.
+
+    One ControlMaster connection is opened first and every target runs as a
+    multiplexed session over it, concurrently, instead of paying a handshake
+    each. If the master cannot be established the targets still run: ssh falls
+    back to a direct connection when the control socket is absent.
+    """
     if not targets:
         return []
     if config is None:
@@ -367,84 +401,126 @@ def run_ssh_checks(
             for target in targets
         ]
 
-    results: list[CheckResult] = []
-    for target in targets:
-        target_command = _decode_ssh_command(target.command)
-        command = [
-            "ssh",
-            "-i",
-            config.key_path,
-            "-p",
-            str(config.port),
-            "-o",
-            "BatchMode=yes",
-            "-o",
-            "ConnectTimeout=10",
+    with tempfile.TemporaryDirectory(prefix="watchdog-ssh-") as control_dir:
+        control_path = os.path.join(control_dir, "mux")
+        master = _ssh_base_command(config, control_path, "yes") + [
             "-o",
-            "StrictHostKeyChecking=no",
-            "-o",
-            "UserKnownHostsFile=/dev/null",
-            f"{config.user}@{config.host}",
-            target_command,
+            "ControlPersist=yes",
+            "-N",
+            "-f",
         ]
         try:
-            completed = subprocess.run(
-                command,
+            # -f backgrounds the master after auth; it must not inherit our pipes.
+            subprocess.run(
+                master + [f"{config.user}@{config.host}"],
                 check=False,
-                capture_output=True,
-                text=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=timeout,
             )
-        except subprocess.TimeoutExpired:
-            results.append(
-                CheckResult(
-                    target.name,
-                    False,
-                    "ssh command timed out",
-                    _failure_domain_for_ssh_target(target.name),
-                )
-            )
-            continue
-        except OSError as exc:
-            results.append(
-                CheckResult(
-                    target.name,
-                    False,
-                    f"ssh command failed: {exc}",
-                    _failure_domain_for_ssh_target(target.name),
-                )
-            )
-            continue
-        output = (completed.stdout + completed.stderr).strip()
-        if completed.returncode != 0:
-            results.append(
-                CheckResult(
-                    target.name,
-                    False,
-                    f"ssh exited {completed.returncode}: {_one_line(output)}",
-                    _failure_domain_for_ssh_target(target.name),
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        try:
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(concurrency, len(targets)))
+            ) as executor:
+                return list(
+                    executor.map(
+                        lambda target: _run_ssh_check_once(
+                            config, control_path, target, timeout
+                        ),
+                        targets,
+                    )
                 )
-            )
-            continue
-        if target.expected_text not in output:
-            results.append(
-                CheckResult(
-                    target.name,
-                    False,
-                    f"ssh output did not contain expected text: {_one_line(output)}",
-                    _failure_domain_for_ssh_target(target.name),
+        finally:
+            try:
+                subprocess.run(
+                    _ssh_base_command(config, control_path, "no")
+                    + ["-O", "exit", f"{config.user}@{config.host}"],
+                    check=False,
+                    capture_output=True,
+                    timeout=timeout,
                 )
-            )
-            continue
-        results.append(
-            CheckResult(
-                target.name,
-                True,
-                f"ssh output contained {target.expected_text}",
-                _failure_domain_for_ssh_target(target.name),
-            )
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+
+
+def _ssh_base_command(
+    config: SshConfig, control_path: str, control_master: str
+) -> list[str]:
+    return [
+        "ssh",
+        "-i",
+        config.key_path,
+        "-p",
+        str(config.port),
+        "-o",
+        "BatchMode=yes",
+        "-o",
+        "ConnectTimeout=10",
+        "-o",
+        "StrictHostKeyChecking=no",
+        "-o",
+        "UserKnownHostsFile=/dev/null",
+        "-o",
+        f"ControlMaster={control_master}",
+        "-o",
+        f"ControlPath={control_path}",
+    ]
+
+
+def _run_ssh_check_once(
+    config: SshConfig, control_path: str, target: SshTarget, timeout: float
+) -> CheckResult:
+    target_command = _decode_ssh_command(target.command)
+    command = _ssh_base_command(config, control_path, "no") + [
+        f"{config.user}@{config.host}",
+        target_command,
+    ]
+    try:
+        completed = subprocess.run(
+            command,
+            check=False,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
         )
-    return results
+    except subprocess.TimeoutExpired:
+        return CheckResult(
+            target.name,
+            False,
+            "ssh command timed out",
+            _failure_domain_for_ssh_target(target.name),
+        )
+    except OSError as exc:
+        return CheckResult(
+            target.name,
+            False,
+            f"ssh command failed: {exc}",
+            _failure_domain_for_ssh_target(target.name),
+        )
+    output = (completed.stdout + completed.stderr).strip()
+    if completed.returncode != 0:
+        return CheckResult(
+            target.name,
+            False,
+            f"ssh exited {completed.returncode}: {_one_line(output)}",
+            _failure_domain_for_ssh_target(target.name),
+        )
+    if target.expected_text not in output:
+        return CheckResult(
+            target.name,
+            False,
+            f"ssh output did not contain expected text: {_one_line(output)}",
+            _failure_domain_for_ssh_target(target.name),
+        )
+    return CheckResult(
+        target.name,
+        True,
+        f"ssh output contained {target.expected_text}",
+        _failure_domain_for_ssh_target(target.name),
+    )
 
 
 def run_dokploy_status_check(
@@ -473,6 +549,7 @@ def run_dokploy_status_check(
     try:
         client = client_factory(host=host)
         projects = client.list_projects()
+        latest = _prefetch_latest_deployments(client, projects)
         results: list[CheckResult] = []
         for project in projects or []:
             project_name = project.get("name", "unknown")
@@ -480,7 +557,7 @@ def run_dokploy_status_check(
                 env_name = environment.get("name", "unknown")
                 for compose in environment.get("compose", []) or []:
                     evidence = (
-                        _dokploy_compose_error_evidence(client, compose)
+                        _dokploy_compose_error_evidence(client, compose, latest)
                         if _dokploy_status_is_error(compose.get("composeStatus"))
                         else {}
                     )
@@ -554,21 +631,63 @@ def _dokploy_status_is_error(status: object) -> bool:
     return isinstance(status, str) and status.strip().lower() == "error"
 
 
+def _dokploy_error_compose_id(compose: Mapping[str, object]) -> str:
+    return str(compose.get("composeId") or compose.get("id") or "").strip()
+
+
+def _prefetch_latest_deployments(client: object, projects: object) -> dict[str, object]:
+    """Fetch every errored compose's deployments in one concurrent fan-out.
+
+    Returns composeId -> latest deployment (or the fetch exception). Clients
+    without the bulk API get an empty map and fall back to one
+    ``get_latest_deployment`` call per errored compose.
+    """
+    get_deployments_many = getattr(client, "get_deployments_many", None)
+    if not callable(get_deployments_many):
+        return {}
+    compose_ids = [
+        _dokploy_error_compose_id(compose)
+        for project in projects or []
+        for environment in project.get("environments", []) or []
+        for compose in environment.get("compose", []) or []
+        if _dokploy_status_is_error(compose.get("composeStatus"))
+        and _dokploy_error_compose_id(compose)
+    ]
+    if not compose_ids:
+        return {}
+    fetched = get_deployments_many(compose_ids)
+    return {
+        compose_id: (
+            deployments
+            if isinstance(deployments, Exception)
+            else (deployments[0] if deployments else None)
+        )
+        for compose_id, deployments in fetched.items()
+    }
+
+
 def _dokploy_compose_error_evidence(
-    client: object, compose: Mapping[str, object]
+    client: object,
+    compose: Mapping[str, object],
+    prefetched: Mapping[str, object] | None = None,
 ) -> dict[str, object]:
-    compose_id = str(compose.get("composeId") or compose.get("id") or "").strip()
+    compose_id = _dokploy_error_compose_id(compose)
     if not compose_id:
         return {}
     evidence: dict[str, object] = {"composeId": compose_id}
-    get_latest_deployment = getattr(client, "get_latest_deployment", None)
-    if not callable(get_latest_deployment):
-        return evidence
-    try:
-        latest = get_latest_deployment(compose_id)
-    except Exception as exc:  # noqa: BLE001 - evidence must not mask status alerts.
+    if prefetched is not None and compose_id in prefetched:
+        latest = prefetched[compose_id]
+    else:
+        get_latest_deployment = getattr(client, "get_latest_deployment", None)
+        if not callable(get_latest_deployment):
+            return evidence
+        try:
+            latest = get_latest_deployment(compose_id)
+        except Exception as exc:  # noqa: BLE001 - evidence must not mask status alerts.
+            latest = exc
+    if isinstance(latest, Exception):
         evidence["latest_deployment_error"] = (
-            f"{type(exc).__name__}: {_one_line(str(exc))}"
+            f"{type(latest).__name__}: {_one_line(str(latest))}"
         )
         return evidence
     if isinstance(latest, Mapping):
@@ -668,22 +787,28 @@ def main(env: Mapping[str, str] | None = None) -> int:
         }
     )
 
-    results = run_http_checks(
-        http_targets,
-        timeout,
-        max_attempts=retry_max_attempts,
-        retry_delay_seconds=retry_delay_seconds,
-    )
-    results.extend(
-        run_worker_status_check(
-            current_env,
-            timeout,
-            max_attempts=retry_max_attempts,
-            retry_delay_seconds=retry_delay_seconds,
-        )
-    )
-    results.extend(run_dokploy_status_check(current_env))
-    results.extend(run_ssh_checks(ssh_config, ssh_targets))
+    # The check groups share nothing, so the run costs its slowest group (incl.
+    # retries) rather than the sum; results keep the historical group order.
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        groups = [
+            executor.submit(
+                run_http_checks,
+                http_targets,
+                timeout,
+                max_attempts=retry_max_attempts,
+                retry_delay_seconds=retry_delay_seconds,
+            ),
+            executor.submit(
+                run_worker_status_check,
+                current_env,
+                timeout,
+                max_attempts=retry_max_attempts,
+                retry_delay_seconds=retry_delay_seconds,
+            ),
+            executor.submit(run_dokploy_status_check, current_env),
+            executor.submit(run_ssh_checks, ssh_config, ssh_targets),
+        ]
+    results = [result for group in groups for result in group.result()]
     results = [
         CheckResult(
             result.name,
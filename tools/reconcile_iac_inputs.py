@@ -5,6 +5,11 @@ This is the release-tag promotion layer for input-drift reconciliation: diff the
 previous release tag -> the promoted tag -> deploy dependency fan-out -> deploy_v2/
 iac_runner per affected service (pinned to the tag) -> Deployer config-hash gate decides
 no-op vs restart. staging/prod accept tags only, so the promoted ref is always a tag.
+
+Execution is pipelined: per environment, iac_pinned services share ONE batched
+deploy_v2 command (one ``_deploy_platform_batch`` call and one terminal-status wait),
+other services get a command each and run concurrently up to ``--concurrency``, and
+every result is streamed into the step summary with its wall time as it finishes.
 """
 
 from __future__ import annotations
@@ -14,16 +19,31 @@ import json
 import os
 import subprocess
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Callable, Sequence
 
 from libs.deploy_dependencies import explain_fanout
+from libs.git_objects import GitObjectError, shared_reader
 from libs.deploy_contract import all_service_keys, service_spec
 
 MANIFEST_PATH = "docs/ssot/deploy-dependencies.yaml"
 
 
+def _env_int(key: str, default: int) -> int:
+    try:
+        return int(os.environ.get(key, "") or default)
+    except ValueError:
+        return default
+
+
+# Deploy commands of one environment run in parallel up to this many at a time.
+# A malformed value falls back to the default instead of failing the import.
+DEFAULT_CONCURRENCY = _env_int("RECONCILE_DEPLOY_CONCURRENCY", 4)
+
+
 @dataclass(frozen=True)
 class ReconcilePlan:
     changed_files: list[str]
@@ -132,22 +152,22 @@ def changed_files_from_git(
     """Return changed files between two release tags (``before``..``after``).
 
     ``before`` is the previous release tag; when it is empty/all-zero (the first
-    release has no predecessor) diff the tagged commit itself instead of a
-    nonexistent range.
+    release has no predecessor) diff the tagged commit against its parent instead
+    of a nonexistent range (like ``git diff-tree``, a root or merge commit yields
+    nothing). Trees are compared through the shared libs.git_objects reader, so
+    only subtrees whose ids differ are read. A rename lists both its old and new
+    path: moving a file out of a service's directory is a change to that service.
     """
 
+    reader = shared_reader(repo_root)
     if before and not is_zero_sha(before):
-        cmd = ["git", "diff", "--name-only", before, after]
-    else:
-        cmd = ["git", "diff-tree", "--no-commit-id", "--name-only", "-r", after]
-    result = subprocess.run(
-        cmd,
-        cwd=repo_root,
-        capture_output=True,
-        check=True,
-        text=True,
-    )
-    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        return reader.changed_paths(before, after)
+    parents = reader.parents(after)
+    if reader.commit(after) is None:
+        raise GitObjectError(f"cannot resolve {after!r} to a commit")
+    if len(parents) != 1:
+        return []
+    return reader.changed_paths(parents[0], after)
 
 
 def iac_pinned_services() -> list[str]:
@@ -221,6 +241,9 @@ def build_deploy_commands(
     timeout: int,
     python_executable: str = sys.executable,
 ) -> list[DeployCommand]:
+    """One deploy_v2 command per environment for its iac_pinned services (deploy_v2
+    routes a comma list through ``_deploy_platform_batch``), plus one command per
+    other service so those can run concurrently."""
     commands: list[DeployCommand] = []
     for deploy_type, services in (
         ("staging", plan.staging_services),
@@ -228,35 +251,40 @@ def build_deploy_commands(
     ):
         if not services:
             continue
-        argv = [
-            python_executable,
-            "-m",
-            "tools.deploy_v2",
-            "--service",
-            ",".join(services),
-            "--type",
-            deploy_type,
-            # iac_pinned services ignore version_ref (their artifact IS the iac_ref stack),
-            # but staging/prod accept tags only — pin both axes to the promoted release tag
-            # so the command is self-consistent and never carries a moving ref to a fixed env.
-            "--version-ref",
-            iac_ref,
-            "--iac-ref",
-            iac_ref,
-            "--domain",
-            domain,
-            "--timeout",
-            str(timeout),
-        ]
-        if deploy_type == "prod":
-            argv.append("--code-reviewed")
-            if set(services) & set(plan.staging_services):
-                argv.append("--staging-validated")
-        commands.append(
-            DeployCommand(
-                service=",".join(services), deploy_type=deploy_type, argv=argv
+        pinned = [service for service in services if service_spec(service).iac_pinned]
+        groups = [pinned] if pinned else []
+        groups += [[service] for service in services if service not in pinned]
+        for group in groups:
+            argv = [
+                python_executable,
+                "-m",
+                "tools.deploy_v2",
+                "--service",
+                ",".join(group),
+                "--type",
+                deploy_type,
+                # iac_pinned services ignore version_ref (their artifact IS the iac_ref
+                # stack), but staging/prod accept tags only — pin both axes to the
+                # promoted release tag so the command is self-consistent and never
+                # carries a moving ref to a fixed env.
+                "--version-ref",
+                iac_ref,
+                "--iac-ref",
+                iac_ref,
+                "--domain",
+                domain,
+                "--timeout",
+                str(timeout),
+            ]
+            if deploy_type == "prod":
+                argv.append("--code-reviewed")
+                if set(group) & set(plan.staging_services):
+                    argv.append("--staging-validated")
+            commands.append(
+                DeployCommand(
+                    service=",".join(group), deploy_type=deploy_type, argv=argv
+                )
             )
-        )
     return commands
 
 
@@ -280,36 +308,103 @@ def commands_to_apply(
     return [command for command in commands if command.deploy_type == wanted]
 
 
+def _run_one(
+    command: DeployCommand, runner: Callable[..., subprocess.CompletedProcess]
+) -> dict:
+    started = time.monotonic()
+    completed = runner(
+        command.argv,
+        capture_output=True,
+        text=True,
+    )
+    record = {
+        "service": command.service,
+        "type": command.deploy_type,
+        "returncode": completed.returncode,
+        "stdout": completed.stdout,
+        "stderr": completed.stderr,
+        "wall_seconds": round(time.monotonic() - started, 3),
+    }
+    if completed.returncode == 0 and completed.stdout.strip():
+        try:
+            record["deploy_v2"] = json.loads(completed.stdout)
+        except json.JSONDecodeError:
+            record["deploy_v2_parse_error"] = "stdout was not JSON"
+    return record
+
+
 def run_deploy_commands(
     commands: Sequence[DeployCommand],
     *,
     runner: Callable[..., subprocess.CompletedProcess] = subprocess.run,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_result: Callable[[dict], None] | None = None,
 ) -> list[dict]:
-    results: list[dict] = []
+    """Run deploy commands environment by environment, in completion order.
+
+    Commands of one environment run concurrently (at most ``concurrency`` at a
+    time); a later environment starts only after every command of the previous
+    one succeeded. After a failure no new command starts — the ones already
+    running finish and are reported — so a failed staging rollout still blocks
+    prod. ``on_result`` is called on the calling thread with each record as it
+    completes.
+    """
+    stages: dict[str, list[DeployCommand]] = {}
     for command in commands:
-        completed = runner(
-            command.argv,
-            capture_output=True,
-            text=True,
-        )
-        record = {
-            "service": command.service,
-            "type": command.deploy_type,
-            "returncode": completed.returncode,
-            "stdout": completed.stdout,
-            "stderr": completed.stderr,
-        }
-        if completed.returncode == 0 and completed.stdout.strip():
-            try:
-                record["deploy_v2"] = json.loads(completed.stdout)
-            except json.JSONDecodeError:
-                record["deploy_v2_parse_error"] = "stdout was not JSON"
-        results.append(record)
-        if completed.returncode != 0:
+        stages.setdefault(command.deploy_type, []).append(command)
+
+    results: list[dict] = []
+    failed = False
+    for stage in stages.values():
+        pending = list(stage)
+        running: set[Future] = set()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            while pending or running:
+                while pending and not failed and len(running) < max(1, concurrency):
+                    running.add(pool.submit(_run_one, pending.pop(0), runner))
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = future.result()
+                    results.append(record)
+                    failed = failed or record["returncode"] != 0
+                    if on_result is not None:
+                        on_result(record)
+        if failed:
             break
     return results
 
 
+def _result_line(record: dict) -> str:
+    outcome = "ok" if record.get("returncode") == 0 else "failed"
+    return (
+        f"- `{record['type']}` `{record['service']}`: {outcome} "
+        f"in {record.get('wall_seconds', 0):.1f}s"
+    )
+
+
+def summary_streamer(path: str | None = None) -> Callable[[dict], None]:
+    """A ``run_deploy_commands`` ``on_result`` hook: log each finished command to
+    stderr and append it to the step summary while the rest are still running."""
+    target = path or os.environ.get("GITHUB_STEP_SUMMARY")
+    started = False
+
+    def stream(record: dict) -> None:
+        nonlocal started
+        line = _result_line(record)
+        print(line, file=sys.stderr, flush=True)
+        if not target:
+            return
+        with open(target, "a", encoding="utf-8") as handle:
+            if not started:
+                handle.write("## IaC Input Reconcile — live results\n\n")
+                started = True
+            handle.write(line + "\n")
+
+    return stream
+
+
 def write_summary(
     *,
     plan: ReconcilePlan,
@@ -317,7 +412,11 @@ def write_summary(
     results: Sequence[dict],
     dry_run: bool,
     path: str | None = None,
+    wall_seconds: float | None = None,
+    results_streamed: bool = False,
 ) -> None:
+    """Append the run summary. With ``results_streamed`` the per-command lines are
+    left out: ``summary_streamer`` already wrote them as the commands finished."""
     target = path or os.environ.get("GITHUB_STEP_SUMMARY")
     if not target:
         return
@@ -347,6 +446,10 @@ def write_summary(
         lines.append(
             f"- Deploy results: `{len(results) - len(failed)} ok / {len(failed)} failed`"
         )
+        if wall_seconds is not None:
+            lines.append(f"- Deploy wall time: `{wall_seconds:.1f}s`")
+        if not results_streamed:
+            lines.extend(_result_line(item) for item in results)
     lines.append("")
     lines.append("```json")
     lines.append(
@@ -390,6 +493,13 @@ def main(argv: list[str] | None = None) -> int:
         default=[],
         help="explicit changed file; bypasses git diff when provided",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="deploy commands of one environment run in parallel up to this many "
+        "(default: RECONCILE_DEPLOY_CONCURRENCY or 4)",
+    )
     parser.add_argument("--output-json", default="", help="optional output JSON path")
     args = parser.parse_args(argv)
 
@@ -416,8 +526,13 @@ def main(argv: list[str] | None = None) -> int:
     )
     deferred = [command for command in commands if command not in applied]
     results: list[dict] = []
+    wall_seconds: float | None = None
     if applied:
-        results = run_deploy_commands(applied)
+        started = time.monotonic()
+        results = run_deploy_commands(
+            applied, concurrency=args.concurrency, on_result=summary_streamer()
+        )
+        wall_seconds = round(time.monotonic() - started, 3)
 
     payload = {
         "plan": plan.to_dict(),
@@ -428,6 +543,7 @@ def main(argv: list[str] | None = None) -> int:
         "deferred": [command.to_dict() for command in deferred],
         "promote_prod": args.promote_prod,
         "results": results,
+        "wall_seconds": wall_seconds,
         "dry_run": args.dry_run,
     }
     print(json.dumps(payload, sort_keys=True))
@@ -435,7 +551,14 @@ def main(argv: list[str] | None = None) -> int:
         Path(args.output_json).write_text(
             json.dumps(payload, indent=2), encoding="utf-8"
         )
-    write_summary(plan=plan, commands=commands, results=results, dry_run=args.dry_run)
+    write_summary(
+        plan=plan,
+        commands=commands,
+        results=results,
+        dry_run=args.dry_run,
+        wall_seconds=wall_seconds,
+        results_streamed=bool(results),
+    )
     return 1 if any(result.get("returncode") != 0 for result in results) else 0
 
 
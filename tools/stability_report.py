@@ -9,6 +9,11 @@ infra2 VPS, and sends Lark a positive-proof summary. See
 Dry run (print, no Lark):
 
     INFRA2_STABILITY_REPORT_DRY_RUN=1 python tools/stability_report.py --input ledger.json
+
+With ``--archive r2:infra2`` (or ``INFRA2_STABILITY_ARCHIVE_REMOTE``) the report
+adds multi-week history from the R2 cold archive via ``libs.ledger_analytics``;
+the materialized matrix is cached at ``--archive-cache`` so only new days are
+downloaded.
 """
 
 from __future__ import annotations
@@ -16,6 +21,7 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import subprocess
 import sys
 from collections.abc import Mapping
 from pathlib import Path
@@ -28,6 +34,13 @@ if str(ROOT) not in sys.path:
 
 from libs.alerting import deliver_out_of_band_text  # noqa: E402
 from libs.availability_ledger import build_report_message, summarize_ledger  # noqa: E402
+from libs.ledger_analytics import (  # noqa: E402
+    DEFAULT_SLO_PCT,
+    history_summary,
+    load_matrix,
+    save_matrix,
+    sync_archive,
+)
 
 # Mirrors out_of_band_watchdog.DEFAULT_WORKER_STATUS_URL: the ledger lives on the
 # same public Worker at a sibling route, so it needs no separate operator-configured
@@ -36,6 +49,7 @@ from libs.availability_ledger import build_report_message, summarize_ledger  # n
 DEFAULT_LEDGER_URL = (
     "https://infra2-cloudflare-watchdog.wangzitian-ai.workers.dev/ledger"
 )
+DEFAULT_ARCHIVE_CACHE = Path.home() / ".cache" / "infra2" / "ledger-matrix.json"
 
 
 def fetch_ledger(url: str, token: str, *, timeout: float = 20.0) -> dict[str, Any]:
@@ -47,7 +61,44 @@ def fetch_ledger(url: str, token: str, *, timeout: float = 20.0) -> dict[str, An
     return payload if isinstance(payload, dict) else {}
 
 
-def run(env: Mapping[str, str], *, input_path: str | None) -> int:
+def archive_history(
+    env: Mapping[str, str],
+    ledger: Mapping[str, Any],
+    *,
+    remote: str,
+    cache_path: Path | None,
+) -> dict[str, Any]:
+    """Sync the cold archive into the cached matrix and summarize trailing windows.
+
+    The live ``/ledger`` days (incl. today's partial one) are layered on top for
+    the report only; the cache holds finalized archive days alone. An unreachable
+    archive degrades to the cached history instead of failing the report.
+    """
+    matrix = load_matrix(cache_path)
+    try:
+        if sync_archive(matrix, remote) and cache_path is not None:
+            save_matrix(matrix, cache_path)
+    except (OSError, subprocess.SubprocessError) as exc:
+        print(
+            f"ledger archive sync failed, using cached history: {exc}", file=sys.stderr
+        )
+    days = ledger.get("ledger")
+    matrix.add_days(days if isinstance(days, list) else [])
+    slo_raw = (env.get("INFRA2_STABILITY_SLO_PCT") or "").strip()
+    try:
+        slo_pct = float(slo_raw) if slo_raw else DEFAULT_SLO_PCT
+    except ValueError:
+        slo_pct = DEFAULT_SLO_PCT
+    return history_summary(matrix, slo_pct=slo_pct)
+
+
+def run(
+    env: Mapping[str, str],
+    *,
+    input_path: str | None,
+    archive: str | None = None,
+    archive_cache: str | None = None,
+) -> int:
     if input_path:
         ledger = json.loads(Path(input_path).read_text())
     else:
@@ -60,7 +111,17 @@ def run(env: Mapping[str, str], *, input_path: str | None) -> int:
         token = (env.get("INFRA2_WATCHDOG_WORKER_STATUS_TOKEN") or "").strip()
         ledger = fetch_ledger(ledger_url, token)
 
-    message = build_report_message(summarize_ledger(ledger))
+    summary = summarize_ledger(ledger)
+    remote = (archive or env.get("INFRA2_STABILITY_ARCHIVE_REMOTE") or "").strip()
+    if remote:
+        cache = archive_cache or env.get("INFRA2_STABILITY_ARCHIVE_CACHE") or ""
+        summary["history"] = archive_history(
+            env,
+            ledger,
+            remote=remote,
+            cache_path=Path(cache) if cache else DEFAULT_ARCHIVE_CACHE,
+        )
+    message = build_report_message(summary)
     if env.get("INFRA2_STABILITY_REPORT_DRY_RUN") == "1":
         print(message)
         return 0
@@ -74,8 +135,21 @@ def main(argv: list[str] | None = None, env: Mapping[str, str] | None = None) ->
     parser.add_argument(
         "--input", help="Local ledger JSON instead of the Worker endpoint."
     )
+    parser.add_argument(
+        "--archive",
+        help="rclone remote holding the R2 cold archive (e.g. r2:infra2).",
+    )
+    parser.add_argument(
+        "--archive-cache",
+        help=f"Materialized history cache (default {DEFAULT_ARCHIVE_CACHE}).",
+    )
     args = parser.parse_args(argv)
-    return run(env or os.environ, input_path=args.input)
+    return run(
+        env or os.environ,
+        input_path=args.input,
+        archive=args.archive,
+        archive_cache=args.archive_cache,
+    )
 
 
 if __name__ == "__main__":
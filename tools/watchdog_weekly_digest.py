@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import io
 import json
 import os
+import shutil
 import sys
+import tempfile
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, BinaryIO, Iterable, Iterator, Mapping
 from urllib.request import Request, urlopen
 import zipfile
 
@@ -29,6 +32,12 @@ DIGEST_WINDOW_DAYS = 7
 # update is long enough that either the issue is genuinely stalled or work landed
 # without being linked back — both are worth a human glance, not silent drift.
 STALE_ISSUE_DAYS = 14
+# Run-log downloads are independent; stay well under GitHub's secondary rate limit.
+LOG_FETCH_CONCURRENCY = 6
+LOG_DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+# Log archives larger than this spool to disk instead of memory.
+LOG_SPOOL_BYTES = 8 * 1024 * 1024
+LOG_CACHE_VERSION = 1
 
 
 def fetch_recent_runs(
@@ -155,16 +164,23 @@ def _run_created_at(run: Mapping[str, Any]) -> datetime | None:
         return None
 
 
-def fetch_run_log(repository: str, token: str, run_id: str | int) -> str:
-    """Fetch and decode the GitHub Actions log archive for one workflow run."""
-    owner, repo = repository.split("/", 1)
-    request = Request(
-        f"https://api.github.com/repos/{owner}/{repo}/actions/runs/{run_id}/logs",
-        headers=_github_headers(token),
-        method="GET",
-    )
-    with urlopen(request, timeout=20) as response:  # noqa: S310
-        return _decode_log_payload(response.read())
+def fetch_run_events(
+    repository: str, token: str, run_id: str | int
+) -> list[dict[str, Any]]:
+    """Fetch one run's log archive and keep only its ``watchdog.*`` events.
+
+    The archive is spooled (to disk past ``LOG_SPOOL_BYTES``) and each member is
+    decoded line by line, so neither the archive nor a member's text is held in
+    memory whole.
+    """
+    request = _run_logs_request(repository, token, run_id)
+    with (
+        urlopen(request, timeout=20) as response,  # noqa: S310
+        tempfile.SpooledTemporaryFile(max_size=LOG_SPOOL_BYTES) as spool,
+    ):
+        shutil.copyfileobj(response, spool, LOG_DOWNLOAD_CHUNK_BYTES)
+        spool.seek(0)
+        return list(_iter_archive_events(spool))
 
 
 def fetch_recent_run_logs(
@@ -173,41 +189,107 @@ def fetch_recent_run_logs(
     runs: list[dict[str, Any]],
     *,
     max_logs: int = 25,
-) -> dict[str, str]:
-    """Fetch logs for recent runs; encode fetch failures as review events."""
-    logs: dict[str, str] = {}
+    cache_dir: Path | None = None,
+    concurrency: int = LOG_FETCH_CONCURRENCY,
+) -> dict[str, list[dict[str, Any]]]:
+    """Fetch watchdog events for recent runs; encode fetch failures as review events.
+
+    Downloads run concurrently. With ``cache_dir``, a completed run's events are
+    stored under its run id and never downloaded again (a finished run's logs
+    do not change); failed fetches are not cached.
+    """
+    pending: list[tuple[str, dict[str, Any]]] = []
     for run in runs[: max(0, max_logs)]:
         run_id = run.get("id") or run.get("databaseId")
-        if not run_id:
-            continue
-        key = str(run_id)
+        if run_id:
+            pending.append((str(run_id), run))
+
+    def load(key: str, run: Mapping[str, Any]) -> list[dict[str, Any]]:
+        cacheable = cache_dir is not None and run.get("status") == "completed"
+        if cacheable:
+            cached = _read_cached_events(cache_dir, key)
+            if cached is not None:
+                return cached
         try:
-            logs[key] = fetch_run_log(repository, token, key)
+            events = fetch_run_events(repository, token, key)
         except Exception as exc:  # noqa: BLE001 - digest must not fail closed on logs.
-            logs[key] = json.dumps(
+            return [
                 {
                     "event": "watchdog.digest.log_fetch_failure",
                     "status": "fail",
                     "run_id": key,
                     "error": _one_line(str(exc)),
-                },
-                sort_keys=True,
-            )
-    return logs
+                }
+            ]
+        if cacheable:
+            _write_cached_events(cache_dir, key, events)
+        return events
+
+    if not pending:
+        return {}
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(concurrency, len(pending)))
+    ) as executor:
+        fetched = list(executor.map(lambda item: load(*item), pending))
+    return {key: events for (key, _run), events in zip(pending, fetched)}
+
+
+def _run_logs_request(repository: str, token: str, run_id: str | int) -> Request:
+    owner, repo = repository.split("/", 1)
+    return Request(
+        f"https://api.github.com/repos/{owner}/{repo}/actions/runs/{run_id}/logs",
+        headers=_github_headers(token),
+        method="GET",
+    )
+
+
+def _read_cached_events(cache_dir: Path, run_id: str) -> list[dict[str, Any]] | None:
+    try:
+        payload = json.loads((cache_dir / f"{run_id}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != LOG_CACHE_VERSION:
+        return None
+    events = payload.get("events")
+    return events if isinstance(events, list) else None
+
+
+def _write_cached_events(
+    cache_dir: Path, run_id: str, events: list[dict[str, Any]]
+) -> None:
+    target = cache_dir / f"{run_id}.json"
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(
+            json.dumps(
+                {"version": LOG_CACHE_VERSION, "events": events}, sort_keys=True
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, target)
+    except OSError:
+        # An unwritable cache only costs the next digest a re-download.
+        tmp.unlink(missing_ok=True)
 
 
-def _decode_log_payload(payload: bytes) -> str:
+def _iter_archive_events(handle: BinaryIO) -> Iterator[dict[str, Any]]:
     try:
-        with zipfile.ZipFile(io.BytesIO(payload)) as archive:
-            chunks: list[str] = []
-            for name in sorted(archive.namelist()):
-                if name.endswith("/"):
-                    continue
-                with archive.open(name) as handle:
-                    chunks.append(handle.read().decode("utf-8", errors="replace"))
-            return "\n".join(chunks)
+        archive = zipfile.ZipFile(handle)
     except zipfile.BadZipFile:
-        return payload.decode("utf-8", errors="replace")
+        handle.seek(0)
+        yield from _iter_watchdog_events(
+            io.TextIOWrapper(handle, encoding="utf-8", errors="replace")
+        )
+        return
+    with archive:
+        for name in sorted(archive.namelist()):
+            if name.endswith("/"):
+                continue
+            with archive.open(name) as member:
+                yield from _iter_watchdog_events(
+                    io.TextIOWrapper(member, encoding="utf-8", errors="replace")
+                )
 
 
 def _parse_iso8601(value: str) -> datetime:
@@ -272,8 +354,14 @@ def summarize_weekly_runs(
     }
 
 
-def summarize_watchdog_log_events(logs_by_run: Mapping[str, str]) -> dict[str, Any]:
-    """Review structured watchdog logs for alert recall evidence."""
+def summarize_watchdog_log_events(
+    logs_by_run: Mapping[str, str | list[dict[str, Any]]],
+) -> dict[str, Any]:
+    """Review structured watchdog logs for alert recall evidence.
+
+    Each run maps to its raw log text or to its already-extracted events (what
+    ``fetch_recent_run_logs`` returns).
+    """
     failure_domains: Counter[str] = Counter()
     reviewed_run_count = len(logs_by_run)
     structured_event_run_count = 0
@@ -285,8 +373,8 @@ def summarize_watchdog_log_events(logs_by_run: Mapping[str, str]) -> dict[str, A
     failed_check_count = 0
     log_fetch_error_count = 0
 
-    for log_text in logs_by_run.values():
-        events = list(_parse_watchdog_events(log_text))
+    for log in logs_by_run.values():
+        events = _parse_watchdog_events(log) if isinstance(log, str) else log
         if events:
             structured_event_run_count += 1
         check_failures = [
@@ -314,7 +402,9 @@ def summarize_watchdog_log_events(logs_by_run: Mapping[str, str]) -> dict[str, A
             event.get("event") == "watchdog.delivery.success" for event in events
         )
         delivery_failures = [
-            event for event in events if event.get("event") == "watchdog.delivery.failure"
+            event
+            for event in events
+            if event.get("event") == "watchdog.delivery.failure"
         ]
         fallback_issue = any(
             str(event.get("fallback_issue_url") or "").strip()
@@ -356,9 +446,12 @@ def summarize_watchdog_log_events(logs_by_run: Mapping[str, str]) -> dict[str, A
 
 
 def _parse_watchdog_events(log_text: str) -> list[dict[str, Any]]:
+    return list(_iter_watchdog_events(log_text.splitlines()))
+
+
+def _iter_watchdog_events(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
     decoder = json.JSONDecoder()
-    events: list[dict[str, Any]] = []
-    for line in log_text.splitlines():
+    for line in lines:
         start = line.find("{")
         while start >= 0:
             candidate = line[start:].strip()
@@ -370,9 +463,8 @@ def _parse_watchdog_events(log_text: str) -> list[dict[str, Any]]:
             if isinstance(parsed, dict) and str(parsed.get("event") or "").startswith(
                 "watchdog."
             ):
-                events.append(parsed)
+                yield parsed
             break
-    return events
 
 
 def _as_int(value: object) -> int:
@@ -420,7 +512,9 @@ def fetch_stale_open_issues(
         for issue in page_issues:
             if not isinstance(issue, dict) or "pull_request" in issue:
                 continue  # the issues API also returns PRs; not what this reports on
-            updated = _parse_iso8601(issue["updated_at"]) if issue.get("updated_at") else None
+            updated = (
+                _parse_iso8601(issue["updated_at"]) if issue.get("updated_at") else None
+            )
             if updated is None:
                 continue
             if updated >= cutoff:
@@ -527,11 +621,13 @@ def main(env: Mapping[str, str] | None = None) -> int:
         "no",
     }:
         max_logs = _as_int(current_env.get("WATCHDOG_DIGEST_LOG_LIMIT")) or 25
+        cache_dir = current_env.get("WATCHDOG_DIGEST_LOG_CACHE_DIR", "").strip()
         logs = fetch_recent_run_logs(
             repository,
             token,
             recent_weekly_runs(runs, now=now),
             max_logs=max_logs,
+            cache_dir=Path(cache_dir) if cache_dir else None,
         )
         summary["log_audit"] = summarize_watchdog_log_events(logs)
     if current_env.get("WATCHDOG_DIGEST_STALE_ISSUES", "1").strip().lower() not in {
@@ -539,8 +635,13 @@ def main(env: Mapping[str, str] | None = None) -> int:
         "false",
         "no",
     }:
-        stale_days = _as_int(current_env.get("WATCHDOG_DIGEST_STALE_ISSUE_DAYS")) or STALE_ISSUE_DAYS
-        stale = fetch_stale_open_issues(repository, token, stale_days=stale_days, now=now)
+        stale_days = (
+            _as_int(current_env.get("WATCHDOG_DIGEST_STALE_ISSUE_DAYS"))
+            or STALE_ISSUE_DAYS
+        )
+        stale = fetch_stale_open_issues(
+            repository, token, stale_days=stale_days, now=now
+        )
         summary["stale_issues"] = summarize_stale_issues(stale)
     message = build_digest_message(summary, repository)
     if current_env.get("WATCHDOG_DIGEST_DRY_RUN") == "1":